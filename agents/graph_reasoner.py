@@ -6,7 +6,7 @@ Multi-hop reasoning over knowledge graphs with attention mechanisms
 
 import logging
 import numpy as np
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
@@ -36,22 +36,54 @@ class KnowledgeGraphReasoner:
     """
     Graph Reasoning Networks for multi-hop reasoning.
     Implements attention mechanisms for graph traversal.
+    
+    Nodes are numbered in insertion order and edges are appended to flat
+    per-edge arrays (source, target, weight, relation id). A CSR index
+    (indptr/targets sorted by source, stable so neighbours keep insertion
+    order) is rebuilt lazily after the graph changes, so a node's
+    neighbourhood is a contiguous slice and attention over a whole frontier
+    is a handful of array operations.
     """
     
-    def __init__(self, embedding_dim: int = 768, max_hops: int = 3):
+    # Attention logit = BASE + RELATION_BOOST * [relation named in query] + WEIGHT_SCALE * weight
+    BASE_SCORE = 0.5
+    RELATION_BOOST = 0.3
+    WEIGHT_SCALE = 0.2
+    
+    def __init__(self, embedding_dim: int = 768, max_hops: int = 3,
+                 top_k: int = 5, max_frontier: int = 64,
+                 min_score: float = 0.0, temperature: float = 1.0):
         """
         Initialize Graph Reasoner
         
         Args:
             embedding_dim: Dimension of node embeddings
             max_hops: Maximum hops for reasoning
+            top_k: Neighbours each frontier node attends to per hop
+            max_frontier: Highest-scoring nodes kept in the frontier per hop
+            min_score: Frontier nodes whose propagated attention falls below this are dropped
+            temperature: Softmax temperature for neighbourhood attention
         """
         self.embedding_dim = embedding_dim
         self.max_hops = max_hops
+        self.top_k = top_k
+        self.max_frontier = max_frontier
+        self.min_score = min_score
+        self.temperature = temperature
         self.nodes: Dict[str, GraphNode] = {}
         self.edges: List[GraphEdge] = []
         self.attention_mechanisms = MultiHeadAttention(embedding_dim)
         
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._relations: List[str] = []
+        self._relation_index: Dict[str, int] = {}
+        self._edge_source: List[int] = []
+        self._edge_target: List[int] = []
+        self._edge_weight: List[float] = []
+        self._edge_relation: List[int] = []
+        self._csr: Optional[Dict[str, np.ndarray]] = None
+        
     def add_node(self, node_id: str, content: str, 
                  embeddings: Optional[np.ndarray] = None,
                  metadata: Optional[Dict[str, Any]] = None) -> GraphNode:
@@ -62,6 +94,13 @@ class KnowledgeGraphReasoner:
             embeddings=embeddings,
             metadata=metadata or {}
         )
+        if node_id in self._node_index:
+            # Replacing a node keeps its edges
+            node.neighbors = self.nodes[node_id].neighbors
+        else:
+            self._node_index[node_id] = len(self._node_ids)
+            self._node_ids.append(node_id)
+            self._csr = None
         self.nodes[node_id] = node
         return node
     
@@ -83,8 +122,38 @@ class KnowledgeGraphReasoner:
         self.edges.append(edge)
         self.nodes[source_id].neighbors.append(target_id)
         
+        relation_id = self._relation_index.get(relation)
+        if relation_id is None:
+            relation_id = self._relation_index[relation] = len(self._relations)
+            self._relations.append(relation)
+        self._edge_source.append(self._node_index[source_id])
+        self._edge_target.append(self._node_index[target_id])
+        self._edge_weight.append(float(weight))
+        self._edge_relation.append(relation_id)
+        self._csr = None
+        
         return edge
     
+    def _adjacency(self) -> Dict[str, np.ndarray]:
+        """CSR adjacency with per-edge feature arrays, rebuilt after changes"""
+        if self._csr is None:
+            sources = np.asarray(self._edge_source, dtype=np.int64)
+            order = np.argsort(sources, kind="stable")
+            indptr = np.zeros(len(self._node_ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=len(self._node_ids)), out=indptr[1:])
+            self._csr = {
+                "indptr": indptr,
+                "targets": np.asarray(self._edge_target, dtype=np.int64)[order],
+                "weights": np.asarray(self._edge_weight, dtype=np.float64)[order],
+                "relations": np.asarray(self._edge_relation, dtype=np.int64)[order],
+            }
+        return self._csr
+    
+    def _relation_mask(self, query: str) -> np.ndarray:
+        """Which relation types are mentioned in the query"""
+        query_lower = query.lower()
+        return np.array([relation in query_lower for relation in self._relations], dtype=bool)
+    
     def retrieve_initial_facts(self, query: str) -> List[str]:
         """
         Retrieve initial facts/nodes relevant to query
@@ -98,12 +167,81 @@ class KnowledgeGraphReasoner:
         # Simple retrieval - in production would use semantic search
         relevant_nodes = []
         
-        query_lower = query.lower()
+        query_words = query.lower().split()
         for node_id, node in self.nodes.items():
-            if any(word in node.content.lower() for word in query_lower.split()):
+            content = node.content.lower()
+            if any(word in content for word in query_words):
                 relevant_nodes.append(node_id)
+                if len(relevant_nodes) == 10:  # Limit to top 10
+                    break
                 
-        return relevant_nodes[:10]  # Limit to top 10
+        return relevant_nodes
+    
+    def _neighbourhood_attention(self, sources: np.ndarray,
+                                 relation_mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Softmax attention over the outgoing edges of every source node at once
+        
+        Returns:
+            (segment, edge, attention): for each gathered edge, the position
+            of its source in `sources`, its CSR edge index and its attention
+            weight; weights sum to one within each source's neighbourhood
+        """
+        csr = self._adjacency()
+        starts = csr["indptr"][sources]
+        counts = csr["indptr"][sources + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        
+        segment = np.repeat(np.arange(len(sources)), counts)
+        offsets = np.cumsum(counts) - counts
+        edge = np.repeat(starts - offsets, counts) + np.arange(total)
+        
+        logits = (self.BASE_SCORE
+                  + self.RELATION_BOOST * relation_mask[csr["relations"][edge]]
+                  + self.WEIGHT_SCALE * csr["weights"][edge]) / self.temperature
+        
+        # Segment-wise softmax: neighbourhoods are contiguous runs of `segment`
+        nonempty = counts > 0
+        run_starts, run_counts = offsets[nonempty], counts[nonempty]
+        logits -= np.repeat(np.maximum.reduceat(logits, run_starts), run_counts)
+        exp = np.exp(logits)
+        attention = exp / np.repeat(np.add.reduceat(exp, run_starts), run_counts)
+        return segment, edge, attention
+    
+    def _attention_hop(self, frontier: np.ndarray, frontier_scores: np.ndarray,
+                       relation_mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expand a frontier by one hop with top-k neighbourhood attention and pruning
+        
+        Each frontier node keeps its top_k neighbours by attention; a
+        neighbour's score is the sum over incoming kept edges of the source's
+        score times the edge's attention. Only the max_frontier best
+        neighbours scoring at least min_score survive, highest first.
+        """
+        segment, edge, attention = self._neighbourhood_attention(frontier, relation_mask)
+        if edge.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        
+        # Rank within each neighbourhood by attention (stable, so ties keep insertion order)
+        order = np.lexsort((-attention, segment))
+        first_in_segment = np.searchsorted(segment, segment[order])
+        kept = order[np.arange(order.size) - first_in_segment < self.top_k]
+        
+        targets = self._adjacency()["targets"][edge[kept]]
+        mass = frontier_scores[segment[kept]] * attention[kept]
+        nodes, inverse = np.unique(targets, return_inverse=True)
+        scores = np.bincount(inverse, weights=mass, minlength=nodes.size)
+        
+        keep = scores >= self.min_score
+        nodes, scores = nodes[keep], scores[keep]
+        if nodes.size > self.max_frontier:
+            best = np.argpartition(-scores, self.max_frontier - 1)[:self.max_frontier]
+            nodes, scores = nodes[best], scores[best]
+        ranked = np.argsort(-scores, kind="stable")
+        return nodes[ranked], scores[ranked]
     
     def graph_attention_step(self, current_nodes: List[str], 
                            query: str) -> List[str]:
@@ -115,62 +253,27 @@ class KnowledgeGraphReasoner:
             query: Original query
             
         Returns:
-            New set of nodes after attention step
+            New set of nodes after attention step, highest attention first
         """
-        next_nodes: Set[str] = set()
-        
-        for node_id in current_nodes:
-            if node_id not in self.nodes:
-                continue
-                
-            node = self.nodes[node_id]
-            
-            # Get neighbors
-            neighbors = node.neighbors
-            
-            # Apply attention to neighbors
-            if neighbors:
-                attention_scores = self._compute_attention_scores(
-                    node_id, neighbors, query
-                )
-                
-                # Select top-k neighbors based on attention
-                top_k = min(5, len(neighbors))
-                top_indices = np.argsort(attention_scores)[-top_k:]
-                
-                for idx in top_indices:
-                    next_nodes.add(neighbors[idx])
-        
-        return list(next_nodes)
+        frontier = np.array([self._node_index[n] for n in current_nodes if n in self._node_index],
+                            dtype=np.int64)
+        nodes, _ = self._attention_hop(frontier, np.ones(frontier.size), self._relation_mask(query))
+        return [self._node_ids[i] for i in nodes]
     
     def _compute_attention_scores(self, current_id: str, 
                                  neighbor_ids: List[str],
                                  query: str) -> np.ndarray:
         """
         Compute attention scores for neighbors
+        
+        Returns the softmax attention of each outgoing edge of current_id,
+        aligned with its neighbors list.
         """
-        if not neighbor_ids:
+        if not neighbor_ids or current_id not in self._node_index:
             return np.array([])
-            
-        # Simplified attention - in production would use learned attention
-        scores = []
-        
-        for neighbor_id in neighbor_ids:
-            neighbor = self.nodes[neighbor_id]
-            
-            # Simple scoring based on content similarity
-            score = 0.5
-            
-            # Boost if relation type is relevant
-            for edge in self.edges:
-                if edge.source_id == current_id and edge.target_id == neighbor_id:
-                    if edge.relation in query.lower():
-                        score += 0.3
-                    score += edge.weight * 0.2
-                    
-            scores.append(score)
-            
-        return np.array(scores)
+        sources = np.array([self._node_index[current_id]], dtype=np.int64)
+        _, _, attention = self._neighbourhood_attention(sources, self._relation_mask(query))
+        return attention
     
     def multi_hop_reasoning(self, query: str, max_hops: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -184,24 +287,28 @@ class KnowledgeGraphReasoner:
             Reasoning result with answer and path
         """
         max_hops = max_hops or self.max_hops
+        relation_mask = self._relation_mask(query)
         
         # Step 1: Retrieve initial facts
         current_nodes = self.retrieve_initial_facts(query)
+        frontier = np.array([self._node_index[n] for n in current_nodes], dtype=np.int64)
+        scores = np.ones(frontier.size)
         
         reasoning_path = [current_nodes.copy()]
         
         # Step 2: Multi-hop reasoning
         for hop in range(max_hops):
-            if not current_nodes:
+            if not frontier.size:
                 break
                 
             # Graph attention step
-            next_nodes = self.graph_attention_step(current_nodes, query)
+            next_frontier, next_scores = self._attention_hop(frontier, scores, relation_mask)
             
-            if not next_nodes:
+            if not next_frontier.size:
                 break
                 
-            current_nodes = next_nodes
+            frontier, scores = next_frontier, next_scores
+            current_nodes = [self._node_ids[i] for i in frontier]
             reasoning_path.append(current_nodes.copy())
             
             logger.debug(f"Hop {hop + 1}: Expanded to {len(current_nodes)} nodes")
@@ -214,6 +321,7 @@ class KnowledgeGraphReasoner:
             "answer": answer,
             "reasoning_path": reasoning_path,
             "final_nodes": current_nodes,
+            "node_scores": dict(zip(current_nodes, scores.tolist())),
             "num_hops": len(reasoning_path) - 1
         }
     
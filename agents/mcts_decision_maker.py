@@ -2,15 +2,26 @@
 """
 Monte Carlo Tree Search (MCTS) for Decision Making in FAME
 Inspired by AlphaGo/AlphaZero architecture
+
+The tree lives in preallocated NumPy arrays indexed by node number (visit
+counts, value sums, priors, parent links and contiguous child ranges), so
+UCT selection over a node's children is a single vectorized expression.
+Leaves are selected in batches with virtual loss and evaluated together,
+and search() can stop at a wall-clock deadline and return the best action
+found so far.
 """
 
 import logging
 import random
 import math
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +34,7 @@ class NodeState(Enum):
 
 @dataclass
 class MCTSNode:
-    """Node in MCTS decision tree"""
+    """Snapshot of a node in the MCTS decision tree (see MCTSDecisionMaker.get_node)"""
     id: str
     state: Any  # State representation
     action: Optional[Any] = None
@@ -42,239 +53,405 @@ class MCTSDecisionMaker:
     """
     Monte Carlo Tree Search for complex decision making.
     Implements selection, expansion, simulation, and backpropagation.
+
+    Node i's statistics are visits[i], value_sum[i] and prior[i]; its
+    children occupy the index range first_child[i] .. first_child[i] +
+    num_children[i], stored in descending prior order so that under UCB1
+    the untried children are always a suffix of that range. States and
+    actions stay in Python lists because they are domain objects.
     """
-    
-    def __init__(self, simulation_budget: int = 1000, exploration_constant: float = 1.414):
+
+    def __init__(self, simulation_budget: int = 1000, exploration_constant: float = 1.414,
+                 batch_size: int = 1, virtual_loss: float = 1.0,
+                 selection: str = "ucb1", initial_capacity: int = 4096,
+                 executor: Optional[Executor] = None, seed: Optional[int] = None):
         """
         Initialize MCTS
-        
+
         Args:
             simulation_budget: Number of simulations to run
             exploration_constant: Exploration vs exploitation trade-off (typically sqrt(2))
+            batch_size: Leaves selected (under virtual loss) and evaluated together
+            virtual_loss: Pessimistic visits added to a path while its leaf is pending
+            selection: "ucb1", or "puct" to weight exploration by action priors
+            initial_capacity: Nodes preallocated; arrays double when full
+            executor: Optional executor used to run a batch's rollouts in parallel
+            seed: Seed for rollout randomness
         """
+        if selection not in ("ucb1", "puct"):
+            raise ValueError(f"Unknown selection rule: {selection}")
         self.simulation_budget = simulation_budget
         self.exploration_constant = exploration_constant
-        self.nodes: Dict[str, MCTSNode] = {}
-        self.root_node_id: Optional[str] = None
-        
-    def search(self, initial_state: Any, available_actions: List[Any]) -> Any:
+        self.batch_size = max(1, int(batch_size))
+        self.virtual_loss = float(virtual_loss)
+        self.selection = selection
+        self.executor = executor
+        self.rng = random.Random(seed)
+
+        self._allocate(max(16, int(initial_capacity)))
+        self.size = 0
+        self.root_node_id: Optional[int] = None
+        self._root_actions: List[Any] = []
+        self._simulations = 0
+        self._elapsed = 0.0
+        self._max_depth = 0
+
+    # Tree storage
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.visits = np.zeros(capacity, dtype=np.float64)
+        self.value_sum = np.zeros(capacity, dtype=np.float64)
+        self.prior = np.zeros(capacity, dtype=np.float64)
+        self.parent = np.full(capacity, -1, dtype=np.int64)
+        self.first_child = np.full(capacity, -1, dtype=np.int64)
+        self.num_children = np.zeros(capacity, dtype=np.int64)
+        self.tried_children = np.zeros(capacity, dtype=np.int64)
+        self.depth = np.zeros(capacity, dtype=np.int64)
+        self.expanded = np.zeros(capacity, dtype=bool)
+        self.terminal = np.zeros(capacity, dtype=bool)
+        self.states: List[Any] = [None] * capacity
+        self.actions: List[Any] = [None] * capacity
+
+    def _reserve(self, count: int):
+        """Grow the arrays (by doubling) so `count` more nodes fit"""
+        needed = self.size + count
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in ("visits", "value_sum", "prior", "parent", "first_child",
+                     "num_children", "tried_children", "depth", "expanded", "terminal"):
+            old = getattr(self, name)
+            grown = np.full(capacity, -1 if name in ("parent", "first_child") else 0, dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+        self.states.extend([None] * (capacity - self.capacity))
+        self.actions.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def _reset(self):
+        used = slice(0, self.size)
+        self.visits[used] = 0.0
+        self.value_sum[used] = 0.0
+        self.prior[used] = 0.0
+        self.parent[used] = -1
+        self.first_child[used] = -1
+        self.num_children[used] = 0
+        self.tried_children[used] = 0
+        self.depth[used] = 0
+        self.expanded[used] = False
+        self.terminal[used] = False
+        self.states[:self.size] = [None] * self.size
+        self.actions[:self.size] = [None] * self.size
+        self.size = 0
+        self._simulations = 0
+        self._elapsed = 0.0
+        self._max_depth = 0
+
+    def _create_node(self, parent: int, state: Any, action: Optional[Any]) -> int:
+        """Create a single (root) node in the tree"""
+        self._reserve(1)
+        node = self.size
+        self.size += 1
+        self.parent[node] = parent
+        self.depth[node] = 0 if parent < 0 else self.depth[parent] + 1
+        self.states[node] = state
+        self.actions[node] = action
+        self.terminal[node] = self._is_terminal(state)
+        return node
+
+    # Search
+
+    def search(self, initial_state: Any, available_actions: List[Any],
+               time_budget: Optional[float] = None) -> Any:
         """
         Perform MCTS search to find best action
-        
+
         Args:
             initial_state: Starting state
             available_actions: List of possible actions
-            
+            time_budget: Optional wall-clock limit in seconds; the search is
+                anytime and returns the best action found when it expires
+
         Returns:
             Best action based on MCTS search
         """
-        # Initialize root node
-        root_id = self._create_node(None, initial_state, None)
-        self.root_node_id = root_id
-        
-        # Run simulations
-        for _ in range(self.simulation_budget):
-            # Selection: Navigate to leaf node
-            leaf_id = self._select(root_id)
-            
-            # Expansion: Add children if not terminal
-            if not self.nodes[leaf_id].is_terminal:
-                if not self.nodes[leaf_id].children:
-                    self._expand(leaf_id, available_actions)
-                    
-            # Simulation: Rollout from leaf
-            simulation_result = self._simulate(leaf_id)
-            
-            # Backpropagation: Update values up the tree
-            self._backpropagate(leaf_id, simulation_result)
-            
-        # Select best action from root
-        best_action = self._best_action(root_id)
-        
-        logger.debug(f"MCTS completed {self.simulation_budget} simulations, selected action: {best_action}")
+        started = time.perf_counter()
+        deadline = None if time_budget is None else started + time_budget
+
+        self._reset()
+        self._root_actions = list(available_actions)
+        root = self._create_node(-1, initial_state, None)
+        self.root_node_id = root
+
+        while self._simulations < self.simulation_budget:
+            batch = min(self.batch_size, self.simulation_budget - self._simulations)
+            self._run_batch(batch)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        self._elapsed = time.perf_counter() - started
+        best_action = self._best_action(root)
+
+        logger.debug(f"MCTS completed {self._simulations} simulations in {self._elapsed:.3f}s, "
+                     f"selected action: {best_action}")
         return best_action
-    
-    def _create_node(self, parent_id: Optional[str], state: Any, 
-                    action: Optional[Any]) -> str:
-        """Create a new node in the tree"""
-        node_id = f"mcts_{id(state)}_{len(self.nodes)}"
-        
-        node = MCTSNode(
-            id=node_id,
-            state=state,
-            action=action,
-            parent_id=parent_id,
-            node_state=NodeState.UNEXPLORED
+
+    def _run_batch(self, batch: int):
+        """Select `batch` leaves under virtual loss, evaluate them together, backpropagate"""
+        paths = []
+        for _ in range(batch):
+            path = self._select(self.root_node_id)
+            if batch > 1:
+                self.visits[path] += self.virtual_loss
+                self.value_sum[path] -= self.virtual_loss
+            paths.append(path)
+
+        leaves = [int(path[-1]) for path in paths]
+        values = self._evaluate_leaves(
+            [self.states[leaf] for leaf in leaves],
+            [bool(self.terminal[leaf]) for leaf in leaves]
         )
-        
-        self.nodes[node_id] = node
-        
-        if parent_id and parent_id in self.nodes:
-            self.nodes[parent_id].children.append(node_id)
-            
-        return node_id
-    
-    def _select(self, node_id: str) -> str:
+
+        lengths = [len(path) for path in paths]
+        if batch == 1:
+            # A single path has no repeated nodes, so plain fancy indexing suffices
+            self.visits[paths[0]] += 1.0
+            self.value_sum[paths[0]] += values[0]
+        else:
+            nodes = np.concatenate(paths)
+            deltas = np.repeat(np.asarray(values, dtype=np.float64), lengths)
+            np.add.at(self.visits, nodes, 1.0 - self.virtual_loss)
+            np.add.at(self.value_sum, nodes, deltas + self.virtual_loss)
+
+        self._simulations += batch
+        self._max_depth = max(self._max_depth, max(lengths) - 1)
+
+    def _select(self, node: int) -> np.ndarray:
         """
-        Selection phase: Navigate from root to leaf using UCB
+        Selection phase: Navigate from root to leaf using UCB, expanding the
+        first unexpanded node reached and stepping into one of its children
+
+        Returns:
+            Node indices on the path, root first
+        """
+        path = [node]
+        while True:
+            if self.terminal[node]:
+                break
+            if not self.expanded[node]:
+                self._expand(node)
+                if self.num_children[node]:
+                    path.append(self._ucb_select(node))
+                break
+            if not self.num_children[node]:
+                break
+            node = self._ucb_select(node)
+            path.append(node)
+        return np.asarray(path, dtype=np.int64)
+
+    def _ucb_select(self, node: int) -> int:
         """
-        current_id = node_id
-        
-        while self.nodes[current_id].children:
-            # Use UCB1 to select child
-            current_id = self._ucb_select(current_id)
-            
-        return current_id
-    
-    def _ucb_select(self, node_id: str) -> str:
+        Select child using Upper Confidence Bound (UCB1), or PUCT with priors
+        """
+        first = self.first_child[node]
+        count = self.num_children[node]
+
+        if self.selection == "ucb1":
+            tried = self.tried_children[node]
+            if tried < count:
+                # Unvisited nodes have infinite UCB; take the next most probable
+                self.tried_children[node] = tried + 1
+                return int(first + tried)
+
+        children = slice(first, first + count)
+        visits = self.visits[children]
+
+        if self.selection == "puct":
+            q = np.divide(self.value_sum[children], visits, out=np.zeros_like(visits), where=visits > 0)
+            u = self.exploration_constant * self.prior[children] * math.sqrt(max(self.visits[node], 1.0)) / (1.0 + visits)
+            return int(first + np.argmax(q + u))
+
+        # UCB1 formula: Q(s,a) + c * sqrt(ln(N(s)) / N(s,a))
+        ucb = self.value_sum[children] / visits + self.exploration_constant * np.sqrt(
+            math.log(self.visits[node]) / visits
+        )
+        return int(first + ucb.argmax())
+
+    def _expand(self, node: int):
         """
-        Select child using Upper Confidence Bound (UCB1)
+        Expansion phase: Add a contiguous block of children for the node's actions
         """
-        node = self.nodes[node_id]
-        
-        if not node.children:
-            return node_id
-            
-        best_value = float('-inf')
-        best_child = node.children[0]
-        
-        for child_id in node.children:
-            child = self.nodes[child_id]
-            
-            if child.visits == 0:
-                return child_id  # Unvisited nodes have infinite UCB
-                
-            # UCB1 formula: Q(s,a) + c * sqrt(ln(N(s)) / N(s,a))
-            exploitation = child.q_value
-            exploration = self.exploration_constant * math.sqrt(
-                math.log(node.visits) / child.visits
-            )
-            ucb_value = exploitation + exploration
-            
-            child.u_value = ucb_value
-            
-            if ucb_value > best_value:
-                best_value = ucb_value
-                best_child = child_id
-                
-        return best_child
-    
-    def _expand(self, node_id: str, available_actions: List[Any]):
+        self.expanded[node] = True
+        state = self.states[node]
+        if node == self.root_node_id:
+            actions = self._root_actions
+        else:
+            actions = self._get_available_actions(state) or self._root_actions
+        if not actions:
+            return
+
+        count = len(actions)
+        self._reserve(count)
+        first = self.size
+        children = slice(first, first + count)
+        self.size += count
+
+        self.first_child[node] = first
+        self.num_children[node] = count
+        self.parent[children] = node
+        self.depth[children] = self.depth[node] + 1
+        priors = np.asarray(self._action_priors(state, actions), dtype=np.float64)
+        total = priors.sum()
+        priors = priors / total if total > 0 else np.full(count, 1.0 / count)
+        order = np.argsort(-priors, kind="stable")
+        self.prior[children] = priors[order]
+
+        for offset, index in enumerate(order.tolist()):
+            action = actions[index]
+            new_state = self._apply_action(state, action)
+            self.states[first + offset] = new_state
+            self.actions[first + offset] = action
+            self.terminal[first + offset] = self._is_terminal(new_state)
+
+    def _evaluate_leaves(self, states: Sequence[Any], terminal: Sequence[bool]) -> List[float]:
         """
-        Expansion phase: Add children for unexplored actions
+        Evaluate a batch of leaves: terminal states directly, others by rollout
+
+        Override to score the whole batch at once (e.g. a vectorized value
+        function); by default rollouts run on `executor` when one is given.
         """
-        node = self.nodes[node_id]
-        
-        for action in available_actions:
-            # Generate new state from action
-            new_state = self._apply_action(node.state, action)
-            
-            # Create child node
-            child_id = self._create_node(node_id, new_state, action)
-            self.nodes[child_id].node_state = NodeState.EXPLORED
-            
-            # Check if terminal
-            if self._is_terminal(new_state):
-                self.nodes[child_id].is_terminal = True
-                self.nodes[child_id].node_state = NodeState.TERMINAL
-                
-    def _simulate(self, node_id: str) -> float:
+        def evaluate(item):
+            state, is_terminal = item
+            return self._evaluate_state(state) if is_terminal else self._simulate(state)
+
+        items = list(zip(states, terminal))
+        if self.executor is not None and len(items) > 1:
+            return list(self.executor.map(evaluate, items))
+        return [evaluate(item) for item in items]
+
+    def _simulate(self, state: Any) -> float:
         """
-        Simulation phase: Random rollout from node to terminal state
+        Simulation phase: Random rollout from state to terminal state
         """
-        node = self.nodes[node_id]
-        current_state = node.state
-        
-        # Check if already terminal
-        if node.is_terminal:
-            return self._evaluate_state(current_state)
-            
+        current_state = state
+
         # Random rollout
         max_simulation_steps = 100
         for _ in range(max_simulation_steps):
             if self._is_terminal(current_state):
                 break
-                
+
             # Random action
             actions = self._get_available_actions(current_state)
             if not actions:
                 break
-                
-            action = random.choice(actions)
+
+            action = self.rng.choice(actions)
             current_state = self._apply_action(current_state, action)
-            
+
         return self._evaluate_state(current_state)
-    
-    def _backpropagate(self, node_id: str, value: float):
-        """
-        Backpropagation phase: Update values up the tree
-        """
-        current_id = node_id
-        
-        while current_id:
-            node = self.nodes[current_id]
-            node.visits += 1
-            node.value += value
-            
-            # Update Q-value (average)
-            if node.visits > 0:
-                node.q_value = node.value / node.visits
-                
-            current_id = node.parent_id
-            
-    def _best_action(self, node_id: str) -> Any:
+
+    def _best_action(self, node: int) -> Any:
         """
-        Select best action based on visit counts or Q-values
+        Select best action based on visit counts
         """
-        node = self.nodes[node_id]
-        
-        if not node.children:
+        if node is None or not self.num_children[node]:
             return None
-            
-        best_child = max(
-            node.children,
-            key=lambda cid: self.nodes[cid].visits
-        )
-        
-        return self.nodes[best_child].action
-    
+        first = self.first_child[node]
+        best_child = first + int(np.argmax(self.visits[first:first + self.num_children[node]]))
+        return self.actions[best_child]
+
     # Abstract methods to be implemented by specific use cases
-    
+
     def _apply_action(self, state: Any, action: Any) -> Any:
         """Apply action to state, return new state"""
         # Placeholder - implement based on domain
         return state
-        
+
     def _is_terminal(self, state: Any) -> bool:
         """Check if state is terminal"""
         # Placeholder - implement based on domain
         return False
-        
+
     def _get_available_actions(self, state: Any) -> List[Any]:
         """Get available actions for state"""
         # Placeholder - implement based on domain
         return []
-        
+
+    def _action_priors(self, state: Any, actions: List[Any]) -> Sequence[float]:
+        """Prior probability of each action (uniform unless overridden)"""
+        return [1.0] * len(actions)
+
     def _evaluate_state(self, state: Any) -> float:
         """
         Evaluate terminal state
         Returns value in range [-1, 1] where 1 is best outcome
         """
         # Placeholder - implement based on domain
-        return random.uniform(-1, 1)
-    
+        return self.rng.uniform(-1, 1)
+
+    # Inspection
+
+    def get_node(self, node: int) -> MCTSNode:
+        """Snapshot a node from the arrays"""
+        visits = int(self.visits[node])
+        first, count = self.first_child[node], self.num_children[node]
+        if self.terminal[node]:
+            node_state = NodeState.TERMINAL
+        elif self.expanded[node] or visits:
+            node_state = NodeState.EXPLORED
+        else:
+            node_state = NodeState.UNEXPLORED
+        return MCTSNode(
+            id=str(node),
+            state=self.states[node],
+            action=self.actions[node],
+            parent_id=str(self.parent[node]) if self.parent[node] >= 0 else None,
+            children=[str(child) for child in range(first, first + count)],
+            visits=visits,
+            value=float(self.value_sum[node]),
+            q_value=float(self.value_sum[node] / visits) if visits else 0.0,
+            node_state=node_state,
+            is_terminal=bool(self.terminal[node]),
+            metadata={"prior": float(self.prior[node]), "depth": int(self.depth[node])}
+        )
+
+    def get_action_statistics(self) -> List[Dict[str, Any]]:
+        """Visit count, mean value and prior of each root action"""
+        root = self.root_node_id
+        if root is None or not self.num_children[root]:
+            return []
+        first = self.first_child[root]
+        stats = []
+        for child in range(first, first + self.num_children[root]):
+            visits = self.visits[child]
+            stats.append({
+                "action": self.actions[child],
+                "visits": int(visits),
+                "q_value": float(self.value_sum[child] / visits) if visits else 0.0,
+                "prior": float(self.prior[child])
+            })
+        return stats
+
     def get_search_statistics(self) -> Dict[str, Any]:
         """Get statistics about the search"""
-        if not self.root_node_id or self.root_node_id not in self.nodes:
+        if self.root_node_id is None:
             return {}
-            
-        root = self.nodes[self.root_node_id]
-        
+
+        root = self.root_node_id
+        visits = self.visits[root]
+
         return {
-            "simulations": self.simulation_budget,
-            "total_nodes": len(self.nodes),
-            "root_visits": root.visits,
-            "root_value": root.q_value,
-            "children_count": len(root.children)
+            "simulations": self._simulations,
+            "total_nodes": self.size,
+            "root_visits": int(visits),
+            "root_value": float(self.value_sum[root] / visits) if visits else 0.0,
+            "children_count": int(self.num_children[root]),
+            "max_depth": self._max_depth,
+            "elapsed_seconds": self._elapsed,
+            "simulations_per_second": self._simulations / self._elapsed if self._elapsed > 0 else 0.0,
+            "batch_size": self.batch_size
         }
-
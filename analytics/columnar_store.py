@@ -0,0 +1,677 @@
+"""Columnar, partitioned storage for feature datasets.
+
+A dataset directory holds one ``_schema.json`` plus partitions laid out as
+``date=YYYY-MM-DD/entity=<id>/part-*/``. Each part stores one ``.npy`` file
+per column (read through ``mmap_mode="r"``, so projection only touches the
+requested columns) and a ``_meta.json`` with row count, schema version and
+per-column min/max statistics used to skip parts during predicate pushdown.
+Nested records are flattened to dotted column names (``features.roi``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FILE = "_schema.json"
+META_FILE = "_meta.json"
+NULL_PARTITION = "__null__"
+ALL_ENTITIES = "__all__"
+TIMESTAMP_CANDIDATES = ("timestamp", "metadata.timestamp")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NUMERIC_KINDS = {"int", "float", "timestamp"}
+
+Filter = Tuple[str, str, Any]
+TimeLike = Union[datetime, date, str, float, int, np.datetime64]
+
+_COMPARISONS = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+
+# ---------------------------------------------------------------------- #
+# Record helpers
+# ---------------------------------------------------------------------- #
+
+
+def flatten_record(record: Mapping[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested mappings into dotted column names."""
+    flat: Dict[str, Any] = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, Mapping) and value:
+            flat.update(flatten_record(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def unflatten_record(flat: Mapping[str, Any]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+    for name, value in flat.items():
+        *parents, leaf = name.split(".")
+        node = record
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    return record
+
+
+def to_epoch_ns(value: Any) -> Optional[int]:
+    """Timestamps (datetime, ISO string, epoch seconds, datetime64) as UTC epoch nanoseconds."""
+    if value is None:
+        return None
+    if isinstance(value, np.datetime64):
+        if np.isnat(value):
+            return None
+        return int(value.astype("datetime64[ns]").astype(np.int64))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(round(float(value) * 1e9))
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        delta = value - EPOCH
+        return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+    return None
+
+
+def _timestamps(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Epoch-ns int64 array and null mask for a sequence of timestamps."""
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        nulls = np.isnat(array)
+        return array.astype("datetime64[ns]").astype(np.int64), nulls
+    converted = [to_epoch_ns(value) for value in array.tolist()]
+    nulls = np.fromiter((value is None for value in converted), dtype=bool, count=len(converted))
+    data = np.fromiter((value or 0 for value in converted), dtype=np.int64, count=len(converted))
+    return data, nulls
+
+
+def _ns_to_iso(value: int) -> str:
+    return (EPOCH + timedelta(microseconds=int(value) // 1_000)).isoformat()
+
+
+# ---------------------------------------------------------------------- #
+# Column encoding
+# ---------------------------------------------------------------------- #
+
+
+def _infer_kind(values: Sequence[Any]) -> str:
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kinds.add("bool")
+        elif isinstance(value, int):
+            kinds.add("int")
+        elif isinstance(value, float):
+            kinds.add("float")
+        elif isinstance(value, str):
+            kinds.add("str")
+        else:
+            return "json"
+    if not kinds:
+        return "float"
+    if len(kinds) == 1:
+        return kinds.pop()
+    return "float" if kinds == {"int", "float"} else "json"
+
+
+def _unify_kinds(current: str, incoming: str) -> str:
+    if current == incoming:
+        return current
+    if {current, incoming} <= {"int", "float"}:
+        return "float"
+    return "json"
+
+
+def _encode(values: Sequence[Any], kind: str) -> Tuple[np.ndarray, np.ndarray]:
+    if kind == "timestamp":
+        return _timestamps(np.asarray(values, dtype=object))
+    nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if kind == "float":
+        data = np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+    elif kind == "int":
+        data = np.array([0 if value is None else int(value) for value in values], dtype=np.int64)
+    elif kind == "bool":
+        data = np.array([bool(value) for value in values], dtype=bool)
+    elif kind == "str":
+        data = np.array(["" if value is None else str(value) for value in values], dtype=str)
+    else:
+        data = np.array(
+            ["" if value is None else json.dumps(value, ensure_ascii=False, sort_keys=True) for value in values],
+            dtype=str,
+        )
+    return data, nulls
+
+
+def _decode(data: np.ndarray, nulls: np.ndarray, kind: str) -> List[Any]:
+    """Column back to Python values (None for nulls)."""
+    if kind == "timestamp":
+        values: List[Any] = [_ns_to_iso(value) for value in data.tolist()]
+    elif kind == "json":
+        values = [json.loads(value) if value else None for value in data.tolist()]
+    else:
+        values = data.tolist()
+    if nulls.any():
+        for index in np.flatnonzero(nulls).tolist():
+            values[index] = None
+    return values
+
+
+def _coerce(data: np.ndarray, nulls: np.ndarray, source: str, target: str) -> np.ndarray:
+    """Convert a part's column to the current schema kind."""
+    if source == target:
+        return data
+    if target == "float" and source in {"int", "bool"}:
+        return data.astype(np.float64)
+    values = _decode(data, nulls, source)
+    if target == "str":
+        return np.array(["" if value is None else str(value) for value in values], dtype=str)
+    return _encode(values, "json")[0]
+
+
+def _finalise(data: np.ndarray, nulls: np.ndarray, kind: str) -> np.ndarray:
+    """Column as returned by `scan`: NaN/NaT/None mark nulls."""
+    has_nulls = bool(nulls.any())
+    if kind == "timestamp":
+        result = data.astype("datetime64[ns]")
+        if has_nulls:
+            result[nulls] = np.datetime64("NaT")
+        return result
+    if kind == "float":
+        if has_nulls:
+            data = data.copy()
+            data[nulls] = np.nan
+        return data
+    if kind == "int":
+        if has_nulls:
+            data = data.astype(np.float64)
+            data[nulls] = np.nan
+        return data
+    if kind == "bool" and not has_nulls:
+        return data
+    return np.array(_decode(data, nulls, kind), dtype=object)
+
+
+def _take(column: np.ndarray, match: np.ndarray) -> np.ndarray:
+    """Gather rows by index, with -1 meaning "no row" (NaN, NaT or None)."""
+    missing = match < 0
+    if not missing.any():
+        return column[match]
+    safe = np.where(missing, 0, match)
+    if column.dtype.kind == "f":
+        result = column[safe] if len(column) else np.zeros(len(match))
+        result[missing] = np.nan
+    elif column.dtype.kind == "M":
+        result = column[safe] if len(column) else np.zeros(len(match), dtype="datetime64[ns]")
+        result[missing] = np.datetime64("NaT")
+    elif column.dtype.kind in "iu":
+        result = column[safe].astype(np.float64) if len(column) else np.zeros(len(match))
+        result[missing] = np.nan
+    else:
+        result = column.astype(object)[safe] if len(column) else np.empty(len(match), dtype=object)
+        result[missing] = None
+    return result
+
+
+def _day(value_ns: Optional[int]) -> str:
+    if value_ns is None:
+        return NULL_PARTITION
+    return str(np.datetime64(value_ns, "ns").astype("datetime64[D]"))
+
+
+# ---------------------------------------------------------------------- #
+# Dataset
+# ---------------------------------------------------------------------- #
+
+
+class ColumnarDataset:
+    """
+    A feature dataset stored column-wise and partitioned by date and entity.
+
+    Every write whose column set or types differ from the latest schema adds
+    a schema version; older parts are read through the newest schema (new
+    columns come back null, ints widen to floats, mixed types fall back to
+    JSON-encoded values), so nothing is rewritten.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        timestamp_column: Optional[str] = None,
+        entity_column: Optional[str] = None,
+    ) -> None:
+        self.root = Path(root)
+        self._timestamp_column = timestamp_column
+        self._entity_column = entity_column
+
+    # ------------------------------------------------------------------ #
+    @property
+    def schema_path(self) -> Path:
+        return self.root / SCHEMA_FILE
+
+    def exists(self) -> bool:
+        return self.schema_path.exists()
+
+    def schema(self) -> Dict[str, Any]:
+        if not self.schema_path.exists():
+            return {
+                "timestamp_column": self._timestamp_column,
+                "entity_column": self._entity_column,
+                "versions": [],
+            }
+        with self.schema_path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def columns(self) -> Dict[str, str]:
+        """Column name -> kind for the latest schema version."""
+        versions = self.schema()["versions"]
+        return dict(versions[-1]["columns"]) if versions else {}
+
+    @property
+    def timestamp_column(self) -> Optional[str]:
+        return self.schema().get("timestamp_column") or self._timestamp_column
+
+    @property
+    def entity_column(self) -> Optional[str]:
+        return self.schema().get("entity_column") or self._entity_column
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    # ------------------------------------------------------------------ #
+    def write(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """Append records as new parts; returns the number of rows written."""
+        rows = [flatten_record(record) for record in records]
+        if not rows:
+            return 0
+
+        names: Dict[str, None] = {}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        columns = {name: [row.get(name) for row in rows] for name in names}
+
+        schema = self.schema()
+        timestamp_column = schema.get("timestamp_column") or self._timestamp_column
+        if timestamp_column is None:
+            timestamp_column = next((name for name in TIMESTAMP_CANDIDATES if name in columns), None)
+        entity_column = schema.get("entity_column") or self._entity_column
+        schema["timestamp_column"] = timestamp_column
+        schema["entity_column"] = entity_column
+
+        kinds = {
+            name: "timestamp" if name == timestamp_column else _infer_kind(values)
+            for name, values in columns.items()
+        }
+        version = self._register_version(schema, kinds)
+
+        encoded = {name: _encode(values, kinds[name]) for name, values in columns.items()}
+        if timestamp_column in encoded:
+            ts_data, ts_nulls = encoded[timestamp_column]
+            days = np.where(ts_nulls, NULL_PARTITION, ts_data.astype("datetime64[ns]").astype("datetime64[D]").astype(str))
+        else:
+            days = np.full(len(rows), NULL_PARTITION)
+        if entity_column:
+            entities = np.array(
+                [NULL_PARTITION if value is None else str(value) for value in columns.get(entity_column, [None] * len(rows))]
+            )
+        else:
+            entities = np.full(len(rows), ALL_ENTITIES)
+
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for row, key in enumerate(zip(days.tolist(), entities.tolist())):
+            groups.setdefault(key, []).append(row)
+        for (day, entity), rows_in_partition in groups.items():
+            index = np.asarray(rows_in_partition)
+            part = {name: (data[index], nulls[index]) for name, (data, nulls) in encoded.items()}
+            self._write_part(self._partition_dir(day, entity), part, kinds, version)
+        return len(rows)
+
+    def _register_version(self, schema: Dict[str, Any], kinds: Dict[str, str]) -> int:
+        versions = schema["versions"]
+        current = dict(versions[-1]["columns"]) if versions else {}
+        merged = dict(current)
+        for name, kind in kinds.items():
+            merged[name] = _unify_kinds(current[name], kind) if name in current else kind
+        if versions and merged == current:
+            return versions[-1]["version"]
+        version = len(versions) + 1
+        versions.append({
+            "version": version,
+            "columns": merged,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.schema_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(schema, handle, indent=2)
+        os.replace(tmp_path, self.schema_path)
+        return version
+
+    def _partition_dir(self, day: str, entity: str) -> Path:
+        return self.root / f"date={day}" / f"entity={quote(entity, safe='')}"
+
+    def _write_part(
+        self,
+        directory: Path,
+        columns: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        kinds: Dict[str, str],
+        version: int,
+    ) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_dir = directory / f".tmp-{uuid.uuid4().hex}"
+        tmp_dir.mkdir()
+        meta: Dict[str, Any] = {"rows": 0, "schema_version": version, "columns": {}}
+        for position, (name, (data, nulls)) in enumerate(columns.items()):
+            filename = f"c{position}"
+            np.save(tmp_dir / f"{filename}.npy", data, allow_pickle=False)
+            column_meta: Dict[str, Any] = {"kind": kinds[name], "file": filename, "nulls": bool(nulls.any())}
+            if column_meta["nulls"]:
+                np.save(tmp_dir / f"{filename}.nulls.npy", nulls, allow_pickle=False)
+            valid = data[~nulls]
+            if kinds[name] in NUMERIC_KINDS and len(valid) and not (kinds[name] == "float" and np.isnan(valid).all()):
+                column_meta["min"] = valid.min().item() if kinds[name] != "float" else float(np.nanmin(valid))
+                column_meta["max"] = valid.max().item() if kinds[name] != "float" else float(np.nanmax(valid))
+            meta["columns"][name] = column_meta
+            meta["rows"] = int(len(data))
+        with (tmp_dir / META_FILE).open("w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        os.replace(tmp_dir, directory / f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}")
+
+    # ------------------------------------------------------------------ #
+    def scan(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Sequence[Filter]] = None,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+        entities: Optional[Iterable[Any]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read `columns` (default: all) for rows matching every filter.
+
+        `filters` are ``(column, op, value)`` with op one of ``==, !=, <, <=,
+        >, >=, in``; `start`/`end` bound the timestamp column inclusively.
+        Partitions and parts that cannot match are skipped unread. Numeric
+        nulls come back as NaN, timestamps as ``datetime64[ns]`` (NaT) and
+        other nullable columns as object arrays with None. Rows are ordered
+        by partition, not globally by time.
+        """
+        raw, kinds = self._scan(columns, filters, start, end, entities)
+        return {name: _finalise(data, nulls, kinds[name]) for name, (data, nulls) in raw.items()}
+
+    def read_records(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        """`scan`, returned as nested records (timestamps as ISO strings)."""
+        raw, kinds = self._scan(kwargs.pop("columns", None), **kwargs)
+        decoded = {name: _decode(data, nulls, kinds[name]) for name, (data, nulls) in raw.items()}
+        count = len(next(iter(decoded.values()))) if decoded else 0
+        names = list(decoded)
+        return [unflatten_record({name: decoded[name][row] for name in names}) for row in range(count)]
+
+    def _scan(
+        self,
+        columns: Optional[Sequence[str]],
+        filters: Optional[Sequence[Filter]] = None,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+        entities: Optional[Iterable[Any]] = None,
+    ) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], Dict[str, str]]:
+        schema_kinds = self.columns()
+        projected = list(schema_kinds) if columns is None else list(columns)
+        unknown = [name for name in projected if name not in schema_kinds]
+        if unknown:
+            raise KeyError(f"Unknown feature columns: {unknown}")
+        kinds = {name: schema_kinds[name] for name in projected}
+
+        timestamp_column = self.timestamp_column
+        entity_column = self.entity_column
+        predicates: List[Filter] = list(filters or [])
+        for name, op, _ in predicates:
+            if name not in schema_kinds:
+                raise KeyError(f"Unknown filter column: {name}")
+            if op not in _COMPARISONS and op != "in":
+                raise ValueError(f"Unsupported filter operator: {op}")
+        predicates = [
+            (name, op, self._normalise_value(value, schema_kinds[name], op)) for name, op, value in predicates
+        ]
+        start_ns, end_ns = to_epoch_ns(start), to_epoch_ns(end)
+        if timestamp_column:
+            if start_ns is not None:
+                predicates.append((timestamp_column, ">=", start_ns))
+            if end_ns is not None:
+                predicates.append((timestamp_column, "<=", end_ns))
+
+        wanted_entities = None if entities is None else {str(entity) for entity in entities}
+        for name, op, value in predicates:
+            if name == entity_column and op in {"==", "in"}:
+                values = {str(v) for v in (value if op == "in" else [value])}
+                wanted_entities = values if wanted_entities is None else wanted_entities & values
+
+        pieces: Dict[str, List[Tuple[np.ndarray, np.ndarray]]] = {name: [] for name in projected}
+        for part_dir, meta in self._parts(start_ns, end_ns, wanted_entities):
+            if not self._part_may_match(meta, predicates):
+                continue
+            rows = meta["rows"]
+            mask = np.ones(rows, dtype=bool)
+            for name, op, value in predicates:
+                data, nulls = self._load_column(part_dir, meta, name, schema_kinds[name], rows)
+                mask &= ~nulls
+                if op == "in":
+                    mask &= np.isin(data, value)
+                else:
+                    mask &= _COMPARISONS[op](data, value)
+                if not mask.any():
+                    break
+            if not mask.any():
+                continue
+            selected = None if mask.all() else np.flatnonzero(mask)
+            for name in projected:
+                data, nulls = self._load_column(part_dir, meta, name, kinds[name], rows)
+                if selected is not None:
+                    data, nulls = data[selected], nulls[selected]
+                pieces[name].append((np.asarray(data), np.asarray(nulls)))
+
+        result: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for name, parts in pieces.items():
+            if parts:
+                result[name] = (np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]))
+            else:
+                result[name] = _encode([], kinds[name])
+        return result, kinds
+
+    @staticmethod
+    def _normalise_value(value: Any, kind: str, op: str) -> Any:
+        if kind == "timestamp":
+            return [to_epoch_ns(item) for item in value] if op == "in" else to_epoch_ns(value)
+        if kind == "json":
+            encode = lambda item: json.dumps(item, ensure_ascii=False, sort_keys=True)
+            return [encode(item) for item in value] if op == "in" else encode(value)
+        return list(value) if op == "in" else value
+
+    def _parts(
+        self,
+        start_ns: Optional[int],
+        end_ns: Optional[int],
+        entities: Optional[set],
+    ) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        if not self.root.exists():
+            return
+        first_day = _day(start_ns) if start_ns is not None else None
+        last_day = _day(end_ns) if end_ns is not None else None
+        for date_dir in sorted(self.root.glob("date=*")):
+            day = date_dir.name[len("date="):]
+            if day == NULL_PARTITION:
+                if first_day or last_day:
+                    continue
+            elif (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            for entity_dir in sorted(date_dir.glob("entity=*")):
+                entity = unquote(entity_dir.name[len("entity="):])
+                if entities is not None and entity != ALL_ENTITIES and entity not in entities:
+                    continue
+                for part_dir in sorted(entity_dir.glob("part-*")):
+                    with (part_dir / META_FILE).open("r", encoding="utf-8") as handle:
+                        yield part_dir, json.load(handle)
+
+    @staticmethod
+    def _part_may_match(meta: Dict[str, Any], predicates: Sequence[Filter]) -> bool:
+        for name, op, value in predicates:
+            column = meta["columns"].get(name)
+            if column is None:
+                return False  # column absent from this part: all null, nothing matches
+            if "min" not in column or op not in {"==", "<", "<=", ">", ">="}:
+                continue
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            low, high = column["min"], column["max"]
+            if (
+                (op == "==" and not low <= value <= high)
+                or (op == "<" and low >= value)
+                or (op == "<=" and low > value)
+                or (op == ">" and high <= value)
+                or (op == ">=" and high < value)
+            ):
+                return False
+        return True
+
+    @staticmethod
+    def _load_column(
+        part_dir: Path,
+        meta: Dict[str, Any],
+        name: str,
+        kind: str,
+        rows: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        column = meta["columns"].get(name)
+        if column is None:
+            return _encode([None] * rows, kind)
+        data = np.load(part_dir / f"{column['file']}.npy", mmap_mode="r", allow_pickle=False)
+        if column["nulls"]:
+            nulls = np.load(part_dir / f"{column['file']}.nulls.npy", allow_pickle=False)
+        else:
+            nulls = np.zeros(rows, dtype=bool)
+        if column["kind"] != kind:
+            data = _coerce(np.asarray(data), nulls, column["kind"], kind)
+        return data, nulls
+
+    # ------------------------------------------------------------------ #
+    def as_of_join(
+        self,
+        labels: Union[Mapping[str, Sequence[Any]], Sequence[Mapping[str, Any]]],
+        columns: Optional[Sequence[str]] = None,
+        label_time: str = "timestamp",
+        label_entity: Optional[str] = None,
+        tolerance: Optional[timedelta] = None,
+        allow_exact_matches: bool = True,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Attach to each label the latest feature row at or before its timestamp.
+
+        Point-in-time correct: a label never sees features stamped after it
+        (or at the same instant with ``allow_exact_matches=False``). Matching
+        is per entity when the dataset is partitioned by entity; `tolerance`
+        bounds how stale a feature row may be. Returns the label columns, the
+        requested feature columns and ``feature_timestamp`` (NaT/NaN/None
+        where nothing matched).
+        """
+        timestamp_column = self.timestamp_column
+        if not timestamp_column:
+            raise ValueError("as_of_join requires a dataset with a timestamp column")
+        entity_column = self.entity_column
+        label_entity = label_entity or entity_column
+
+        if isinstance(labels, Mapping):
+            label_columns = {name: np.asarray(values) for name, values in labels.items()}
+        else:
+            names: Dict[str, None] = {}
+            for label in labels:
+                names.update(dict.fromkeys(label))
+            label_columns = {name: np.array([label.get(name) for label in labels], dtype=object) for name in names}
+        label_ns, label_nulls = _timestamps(label_columns[label_time])
+        count = len(label_ns)
+
+        features = [name for name in (columns or self.columns()) if name not in {timestamp_column, entity_column}]
+        read = features + [timestamp_column] + ([entity_column] if entity_column else [])
+        valid_ns = label_ns[~label_nulls]
+        start = None
+        if tolerance is not None and len(valid_ns):
+            start = np.datetime64(int(valid_ns.min()) - int(tolerance / timedelta(microseconds=1)) * 1_000, "ns")
+        end = np.datetime64(int(valid_ns.max()), "ns") if len(valid_ns) else None
+
+        label_keys = None
+        wanted = None
+        if entity_column:
+            label_keys = np.array([str(value) for value in label_columns[label_entity].tolist()])
+            wanted = set(label_keys.tolist())
+        raw, kinds = self._scan(read, start=start, end=end, entities=wanted)
+        feature_ns, feature_nulls = raw[timestamp_column]
+        keep = ~feature_nulls
+        feature_keys = (
+            np.array([str(value) for value in _decode(*raw[entity_column], kinds[entity_column])])
+            if entity_column else np.full(len(feature_ns), ALL_ENTITIES)
+        )
+        if label_keys is None:
+            label_keys = np.full(count, ALL_ENTITIES)
+
+        rows = np.flatnonzero(keep)
+        order = rows[np.lexsort((feature_ns[rows], feature_keys[rows]))]
+        sorted_keys = feature_keys[order]
+        sorted_ns = feature_ns[order]
+        match = np.full(count, -1, dtype=np.int64)
+        side = "right" if allow_exact_matches else "left"
+        limit = None if tolerance is None else int(tolerance / timedelta(microseconds=1)) * 1_000
+
+        unique_keys, first = np.unique(sorted_keys, return_index=True)
+        bounds = dict(zip(unique_keys.tolist(), zip(first.tolist(), list(first[1:]) + [len(sorted_keys)])))
+        for key in np.unique(label_keys).tolist():
+            if key not in bounds:
+                continue
+            lo, hi = bounds[key]
+            targets = np.flatnonzero((label_keys == key) & ~label_nulls)
+            position = np.searchsorted(sorted_ns[lo:hi], label_ns[targets], side=side) - 1
+            found = position >= 0
+            candidates = np.where(found, lo + position, 0)
+            if limit is not None:
+                found &= label_ns[targets] - sorted_ns[candidates] <= limit
+            match[targets[found]] = order[candidates[found]]
+
+        result = dict(label_columns)
+        for name in features:
+            result[name] = _take(_finalise(*raw[name], kinds[name]), match)
+        result["feature_timestamp"] = _take(_finalise(feature_ns, feature_nulls, "timestamp"), match)
+        return result
+
+
+__all__ = [
+    "ColumnarDataset",
+    "flatten_record",
+    "unflatten_record",
+    "to_epoch_ns",
+]
@@ -5,8 +5,13 @@ from __future__ import annotations
 import json
 import logging
 from dataclasses import dataclass
+from datetime import timedelta
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from analytics.columnar_store import ColumnarDataset, Filter, TimeLike
 
 
 logger = logging.getLogger(__name__)
@@ -14,34 +19,151 @@ logger = logging.getLogger(__name__)
 
 @dataclass(slots=True)
 class FeatureStore:
-    """Simple JSONL-backed feature store for offline/online training."""
+    """
+    Feature store for offline/online training.
+
+    Datasets are written as JSONL by default, or column-wise and
+    partitioned by date/entity with ``backend="columnar"``. Column queries
+    read a columnar copy, migrating JSONL datasets on first use (or up front
+    with `migrate_to_columnar`); `load_dataset` keeps returning the JSONL
+    records exactly as written while that file exists.
+    """
 
     root: Path = Path("data/feature_store")
+    backend: str = "jsonl"
+    timestamp_column: Optional[str] = None
+    entity_column: Optional[str] = None
 
     def __post_init__(self) -> None:
+        if self.backend not in {"jsonl", "columnar"}:
+            raise ValueError(f"Unknown feature store backend: {self.backend}")
         self.root.mkdir(parents=True, exist_ok=True)
 
     def dataset_path(self, run_id: str) -> Path:
         return self.root / f"features_{run_id}.jsonl"
 
+    def columnar_path(self, run_id: str) -> Path:
+        return self.root / f"features_{run_id}"
+
+    def columnar_dataset(self, run_id: str) -> ColumnarDataset:
+        return ColumnarDataset(
+            self.columnar_path(run_id),
+            timestamp_column=self.timestamp_column,
+            entity_column=self.entity_column,
+        )
+
     def save_dataset(self, run_id: str, records: Iterable[Dict]) -> Path:
+        if self.backend == "columnar":
+            dataset = self.columnar_dataset(run_id)
+            dataset.clear()
+            rows = dataset.write(records)
+            dataset.root.mkdir(parents=True, exist_ok=True)
+            logger.info(
+                "Feature dataset saved",
+                extra={"run_id": run_id, "path": str(dataset.root), "rows": rows, "backend": self.backend},
+            )
+            return dataset.root
+
         path = self.dataset_path(run_id)
         with path.open("w", encoding="utf-8") as handle:
             for record in records:
                 handle.write(json.dumps(record, ensure_ascii=False))
                 handle.write("\n")
+        # a columnar copy migrated from the previous JSONL is now stale
+        self.columnar_dataset(run_id).clear()
         logger.info("Feature dataset saved", extra={"run_id": run_id, "path": str(path)})
         return path
 
+    def _columnar_is_current(self, run_id: str) -> bool:
+        """Columnar copy exists and is not older than the JSONL file (if any)."""
+        dataset = self.columnar_dataset(run_id)
+        if not dataset.exists():
+            return False
+        path = self.dataset_path(run_id)
+        return not path.exists() or path.stat().st_mtime <= dataset.schema_path.stat().st_mtime
+
     def load_dataset(self, run_id: str) -> List[Dict]:
         path = self.dataset_path(run_id)
         if not path.exists():
+            # records rebuilt from columns lose row order, absent keys and
+            # timestamp formatting, so they are only used without a JSONL file
+            dataset = self.columnar_dataset(run_id)
+            if dataset.exists():
+                return dataset.read_records()
             logger.warning("Feature dataset not found", extra={"run_id": run_id, "path": str(path)})
             return []
         with path.open("r", encoding="utf-8") as handle:
             return [json.loads(line) for line in handle if line.strip()]
 
     def list_datasets(self) -> List[str]:
-        return sorted(p.stem.replace("features_", "") for p in self.root.glob("features_*.jsonl"))
+        names = {p.stem.replace("features_", "") for p in self.root.glob("features_*.jsonl")}
+        names.update(p.name.replace("features_", "") for p in self.root.glob("features_*") if p.is_dir())
+        return sorted(names)
+
+    # ------------------------------------------------------------------ #
+    # Columnar access
+    # ------------------------------------------------------------------ #
+
+    def migrate_to_columnar(self, run_id: str, batch_size: int = 50_000, remove_jsonl: bool = False) -> Path:
+        """Convert a JSONL dataset to the columnar layout, streaming `batch_size` records at a time."""
+        path = self.dataset_path(run_id)
+        if not path.exists():
+            raise FileNotFoundError(path)
+        dataset = self.columnar_dataset(run_id)
+        dataset.clear()
+        rows = 0
+        batch: List[Dict] = []
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    rows += dataset.write(batch)
+                    batch = []
+        rows += dataset.write(batch)
+        dataset.root.mkdir(parents=True, exist_ok=True)
+        if remove_jsonl:
+            path.unlink()
+        logger.info("Feature dataset migrated to columnar", extra={"run_id": run_id, "rows": rows})
+        return dataset.root
+
+    def _readable_columnar(self, run_id: str) -> ColumnarDataset:
+        dataset = self.columnar_dataset(run_id)
+        if not self._columnar_is_current(run_id) and self.dataset_path(run_id).exists():
+            self.migrate_to_columnar(run_id)
+        return dataset
 
+    def load_columns(
+        self,
+        run_id: str,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Sequence[Filter]] = None,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+        entities: Optional[Iterable[Any]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Projected, filtered feature columns (see `ColumnarDataset.scan`); JSONL datasets are migrated first."""
+        return self._readable_columnar(run_id).scan(
+            columns=columns, filters=filters, start=start, end=end, entities=entities
+        )
 
+    def as_of_join(
+        self,
+        run_id: str,
+        labels: Union[Mapping[str, Sequence[Any]], Sequence[Mapping[str, Any]]],
+        columns: Optional[Sequence[str]] = None,
+        label_time: str = "timestamp",
+        label_entity: Optional[str] = None,
+        tolerance: Optional[timedelta] = None,
+        allow_exact_matches: bool = True,
+    ) -> Dict[str, np.ndarray]:
+        """Point-in-time join of features onto labels (see `ColumnarDataset.as_of_join`)."""
+        return self._readable_columnar(run_id).as_of_join(
+            labels,
+            columns=columns,
+            label_time=label_time,
+            label_entity=label_entity,
+            tolerance=tolerance,
+            allow_exact_matches=allow_exact_matches,
+        )
@@ -0,0 +1,268 @@
+"""
+Admission control and load shedding for the FAME HTTP APIs.
+
+Each endpoint gets its own concurrency limit and a bounded wait queue ordered
+by priority class (health > trading > chat). Shedding is driven by queue
+delay in the style of CoDel: once waiters have sat in the queue longer than
+``target_delay`` for a whole ``interval``, the endpoint enters a dropping
+state in which new non-health arrivals are rejected with 503 and stale
+waiters are shed at dequeue time. A full queue rejects with 429.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = Gauge = Histogram = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+if Gauge is not None:
+    QUEUE_DEPTH = Gauge("api_admission_queue_depth", "Requests waiting for admission", ["endpoint"])
+    IN_FLIGHT = Gauge("api_admission_in_flight", "Requests currently admitted", ["endpoint"])
+    SHED_TOTAL = Counter("api_admission_shed_total", "Requests rejected by admission control", ["endpoint", "reason"])
+    QUEUE_DELAY = Histogram(
+        "api_admission_queue_delay_seconds",
+        "Time spent waiting for admission",
+        ["endpoint"],
+        buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    )
+else:  # pragma: no cover - optional dependency
+    QUEUE_DEPTH = IN_FLIGHT = SHED_TOTAL = QUEUE_DELAY = None
+
+
+class Priority(IntEnum):
+    """Priority classes; lower values are served first."""
+
+    HEALTH = 0
+    TRADING = 1
+    CHAT = 2
+
+    @classmethod
+    def from_label(cls, label: Optional[str], default: Optional["Priority"] = None) -> "Priority":
+        try:
+            return cls[str(label).upper()]
+        except KeyError:
+            return default if default is not None else cls.CHAT
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, endpoint: str, reason: str, status_code: int, retry_after: float) -> None:
+        super().__init__(f"{endpoint}: {reason}")
+        self.endpoint = endpoint
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+@dataclass
+class EndpointLimits:
+    """Concurrency, queue and CoDel settings for one endpoint."""
+
+    max_concurrency: int = 8
+    max_queue: int = 64
+    target_delay: float = 0.5   # acceptable standing queue delay (seconds)
+    interval: float = 5.0       # how long delay must stay above target before shedding
+    max_wait: float = 30.0      # hard cap on time spent queued
+
+
+@dataclass
+class _EndpointState:
+    name: str
+    limits: EndpointLimits
+    active: int = 0
+    waiters: List[Tuple[int, int, float, asyncio.Future]] = field(default_factory=list)
+    first_above: float = 0.0
+    dropping: bool = False
+    admitted: int = 0
+    shed: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def queued(self) -> int:
+        return len(self.waiters)
+
+    def discard(self, fut: asyncio.Future) -> None:
+        self.waiters = [w for w in self.waiters if w[3] is not fut]
+        heapq.heapify(self.waiters)
+
+
+class AdmissionController:
+    """
+    Per-endpoint admission control with priority queues and delay-based shedding.
+
+    Usage::
+
+        async with controller.admit("query", Priority.CHAT):
+            ...
+
+    raises :class:`AdmissionRejected` when the request is shed.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, EndpointLimits]] = None,
+                 default_limits: Optional[EndpointLimits] = None) -> None:
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits or EndpointLimits()
+        self._states: Dict[str, _EndpointState] = {}
+        self._seq = itertools.count()
+
+    def _state(self, endpoint: str) -> _EndpointState:
+        state = self._states.get(endpoint)
+        if state is None:
+            state = _EndpointState(endpoint, self.limits.get(endpoint, self.default_limits))
+            self._states[endpoint] = state
+        return state
+
+    # --- CoDel bookkeeping -------------------------------------------------
+
+    def _observe_delay(self, state: _EndpointState, sojourn: float, now: float) -> None:
+        limits = state.limits
+        if sojourn < limits.target_delay:
+            state.first_above = 0.0
+            if state.dropping:
+                logger.info("Admission %s: queue delay back under target, leaving dropping state", state.name)
+            state.dropping = False
+        elif state.first_above == 0.0:
+            state.first_above = now + limits.interval
+        elif now >= state.first_above and not state.dropping:
+            state.dropping = True
+            logger.warning("Admission %s: queue delay above %.2fs for %.1fs, shedding load",
+                           state.name, limits.target_delay, limits.interval)
+        if QUEUE_DELAY is not None:
+            QUEUE_DELAY.labels(endpoint=state.name).observe(sojourn)
+
+    def _reject(self, state: _EndpointState, reason: str, status_code: int) -> AdmissionRejected:
+        state.shed[reason] = state.shed.get(reason, 0) + 1
+        if SHED_TOTAL is not None:
+            SHED_TOTAL.labels(endpoint=state.name, reason=reason).inc()
+        return AdmissionRejected(state.name, reason, status_code, state.limits.interval)
+
+    def _update_gauges(self, state: _EndpointState) -> None:
+        if QUEUE_DEPTH is not None:
+            QUEUE_DEPTH.labels(endpoint=state.name).set(state.queued)
+            IN_FLIGHT.labels(endpoint=state.name).set(state.active)
+
+    # --- acquire / release -------------------------------------------------
+
+    def _dispatch(self, state: _EndpointState) -> None:
+        """Hand free slots to the highest-priority waiters, shedding stale ones."""
+        while state.waiters and state.active < state.limits.max_concurrency:
+            priority, _, enqueued, fut = heapq.heappop(state.waiters)
+            if fut.done():
+                continue  # cancelled while being discarded
+            now = time.monotonic()
+            sojourn = now - enqueued
+            self._observe_delay(state, sojourn, now)
+            if state.dropping and priority != Priority.HEALTH and sojourn > state.limits.target_delay:
+                fut.set_exception(self._reject(state, "queue_delay", 503))
+                continue
+            state.active += 1
+            state.admitted += 1
+            fut.set_result(sojourn)
+        if not state.waiters:
+            state.dropping = False
+            state.first_above = 0.0
+        self._update_gauges(state)
+
+    async def _acquire(self, state: _EndpointState, priority: Priority) -> None:
+        limits = state.limits
+        if state.active < limits.max_concurrency and not state.queued:
+            state.active += 1
+            state.admitted += 1
+            self._observe_delay(state, 0.0, time.monotonic())
+            self._update_gauges(state)
+            return
+
+        if state.queued >= limits.max_queue:
+            raise self._reject(state, "queue_full", 429)
+        if state.dropping and priority != Priority.HEALTH:
+            raise self._reject(state, "overloaded", 503)
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        heapq.heappush(state.waiters, (int(priority), next(self._seq), time.monotonic(), fut))
+        self._update_gauges(state)
+        try:
+            await asyncio.wait_for(fut, timeout=limits.max_wait)
+        except asyncio.TimeoutError:
+            state.discard(fut)
+            raise self._reject(state, "queue_timeout", 503) from None
+        except asyncio.CancelledError:
+            state.discard(fut)
+            # the slot may have been granted just before the caller went away
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                self._release(state)
+            raise
+        finally:
+            self._update_gauges(state)
+
+    def _release(self, state: _EndpointState) -> None:
+        state.active = max(0, state.active - 1)
+        self._dispatch(state)
+
+    @asynccontextmanager
+    async def admit(self, endpoint: str, priority: Priority = Priority.CHAT) -> AsyncIterator[None]:
+        state = self._state(endpoint)
+        await self._acquire(state, priority)
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    # --- introspection -----------------------------------------------------
+
+    def is_congested(self, endpoint: Optional[str] = None) -> bool:
+        """True when the endpoint (or any endpoint) has a queue or is shedding."""
+        states = [self._states[endpoint]] if endpoint in self._states else (
+            [] if endpoint else list(self._states.values()))
+        return any(s.dropping or s.queued > 0 for s in states)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "in_flight": state.active,
+                "queue_depth": state.queued,
+                "max_concurrency": state.limits.max_concurrency,
+                "max_queue": state.limits.max_queue,
+                "dropping": state.dropping,
+                "admitted": state.admitted,
+                "shed": dict(state.shed),
+            }
+            for name, state in self._states.items()
+        }
+
+
+def limits_from_config(config: Optional[Dict[str, Any]]) -> Dict[str, EndpointLimits]:
+    """Build per-endpoint limits from an ``admission`` config mapping."""
+    limits: Dict[str, EndpointLimits] = {}
+    for endpoint, values in (config or {}).items():
+        if isinstance(values, dict):
+            limits[endpoint] = EndpointLimits(**{
+                key: value for key, value in values.items() if key in EndpointLimits.__dataclass_fields__
+            })
+    return limits
+
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionRejected",
+    "EndpointLimits",
+    "Priority",
+    "limits_from_config",
+]
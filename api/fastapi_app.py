@@ -18,6 +18,7 @@ import sys
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from api.admission import AdmissionController, AdmissionRejected, Priority, limits_from_config
 from core.agi_core import AGICore
 from utils.logger import AGILogger
 from utils.monitoring import SystemMonitor
@@ -44,6 +45,7 @@ else:
 agi_logger = AGILogger(cfg)
 monitor = SystemMonitor()
 agi = None  # Will be initialized on startup
+admission = AdmissionController(limits_from_config(cfg.get("api", {}).get("admission")))
 
 app = FastAPI(
     title="FAME AGI Service",
@@ -66,6 +68,16 @@ class AskRequest(BaseModel):
     prompt: str
     context: Optional[List[Dict[str, str]]] = None
     stream: bool = False
+    priority: Optional[str] = None  # "trading" or "chat"
+
+
+def _shed(exc: AdmissionRejected) -> HTTPException:
+    logger.warning(f"Request shed by admission control: {exc}")
+    return HTTPException(
+        status_code=exc.status_code,
+        detail={"error": exc.reason, "endpoint": exc.endpoint},
+        headers=exc.headers,
+    )
 
 
 class PlanRequest(BaseModel):
@@ -102,7 +114,11 @@ async def shutdown_event():
 async def health_check():
     """Health check endpoint"""
     global agi
-    health_status = await monitor.check_health()
+    try:
+        async with admission.admit("health", Priority.HEALTH):
+            health_status = await monitor.check_health()
+    except AdmissionRejected as exc:
+        raise _shed(exc)
     
     components = {
         "memory": agi.memory is not None if agi else False,
@@ -131,7 +147,8 @@ async def get_metrics():
     metrics = {
         "system_metrics": agi.metrics,
         "performance_metrics": monitor.get_performance_metrics(),
-        "persona_profile": agi.persona.profile if agi.persona else {}
+        "persona_profile": agi.persona.profile if agi.persona else {},
+        "admission": admission.snapshot()
     }
     
     # Add autonomous engine metrics if available
@@ -157,8 +174,11 @@ async def ask_agi(request: AskRequest):
     if not agi:
         raise HTTPException(status_code=503, detail="AGI Core not initialized")
     
+    # Never let a client claim health priority
+    priority = max(Priority.from_label(request.priority), Priority.TRADING)
     try:
-        result = await agi.run(request.prompt, request.context)
+        async with admission.admit("ask", priority):
+            result = await agi.run(request.prompt, request.context)
         
         return {
             "success": True,
@@ -170,6 +190,8 @@ async def ask_agi(request: AskRequest):
             "breakdown": result.get("breakdown", []),
             "metrics": result.get("metrics", {})
         }
+    except AdmissionRejected as exc:
+        raise _shed(exc)
     except Exception as e:
         logger.error(f"AGI query failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"AGI processing error: {str(e)}")
@@ -183,7 +205,9 @@ async def create_plan(request: PlanRequest):
         raise HTTPException(status_code=503, detail="Planning not available")
     
     try:
-        plan = agi.planner.decompose(request.goal, request.parameters)
+        async with admission.admit("plan", Priority.CHAT):
+            # decompose is synchronous; keep it off the event loop
+            plan = await asyncio.to_thread(agi.planner.decompose, request.goal, request.parameters)
         agi.active_plans[plan.id] = plan
         
         return {
@@ -193,6 +217,8 @@ async def create_plan(request: PlanRequest):
             "tasks": plan.tasks,
             "created_at": plan.created_at
         }
+    except AdmissionRejected as exc:
+        raise _shed(exc)
     except Exception as e:
         logger.error(f"Planning failed: {e}")
         raise HTTPException(status_code=500, detail=f"Planning failed: {str(e)}")
@@ -279,7 +305,8 @@ async def autonomous_background_loop():
     global agi
     while True:
         try:
-            if agi:
+            # Yield the loop to user traffic while any endpoint is queueing
+            if agi and not admission.is_congested():
                 await agi.run_autonomous_cycle()
             await asyncio.sleep(60)  # Run every minute
         except Exception as e:
@@ -220,15 +220,7 @@ async def wipe_memory(confirm: bool = False):
         raise HTTPException(status_code=503, detail="Memory not available")
     
     try:
-        # Clear memory
-        agi.autonomous_engine.memory._mem = {
-            "conversations": [],
-            "knowledge": {},
-            "patterns": {},
-            "source_stats": {},
-            "meta": {}
-        }
-        agi.autonomous_engine.memory.save(force=True)
+        agi.autonomous_engine.memory.clear()
         
         return {"status": "success", "message": "Memory wiped"}
     except Exception as e:
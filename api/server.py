@@ -4,15 +4,25 @@ Minimal FastAPI server exposing FAME query and health endpoints.
 
 from __future__ import annotations
 
+import asyncio
+import json
 import os
 import time
 from typing import Any, Dict, Optional
 import logging
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+from api.admission import AdmissionController, AdmissionRejected, EndpointLimits, Priority
+
 # Import startup validation gatekeeper
 try:
     from core.startup_fail_fast import run_all_validations
@@ -44,6 +54,26 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Per-endpoint admission control; queries are shed early instead of piling up
+admission = AdmissionController({
+    "query": EndpointLimits(
+        max_concurrency=int(os.getenv("FAME_QUERY_CONCURRENCY", "8")),
+        max_queue=int(os.getenv("FAME_QUERY_QUEUE", "64")),
+        target_delay=float(os.getenv("FAME_QUERY_TARGET_DELAY", "0.5")),
+        max_wait=float(os.getenv("FAME_QUERY_MAX_WAIT", "30")),
+    ),
+    "health": EndpointLimits(max_concurrency=4, max_queue=16, target_delay=0.1, max_wait=2.0),
+})
+
+
+def _shed(exc: AdmissionRejected) -> HTTPException:
+    logger.warning(f"Request shed by admission control: {exc}")
+    return HTTPException(
+        status_code=exc.status_code,
+        detail={"error": exc.reason, "endpoint": exc.endpoint},
+        headers=exc.headers,
+    )
+
 
 class QueryRequest(BaseModel):
     text: str
@@ -69,9 +99,12 @@ async def startup_event() -> None:
 @app.get("/healthz", tags=["health"])
 async def healthcheck() -> Dict[str, Any]:
     try:
-        fame = get_fame()
-        status = fame.health_monitor.check_system_health()
+        async with admission.admit("health", Priority.HEALTH):
+            fame = get_fame()
+            status = fame.health_monitor.check_system_health()
         return status
+    except AdmissionRejected as exc:
+        raise _shed(exc)
     except Exception as e:
         logger.error(f"Health check failed: {e}", exc_info=True)
         return {
@@ -84,12 +117,15 @@ async def healthcheck() -> Dict[str, Any]:
 @app.get("/readyz", tags=["health"])
 async def readiness() -> Dict[str, Any]:
     try:
-        fame = get_fame()
-        status = fame.health_monitor.check_system_health()
+        async with admission.admit("health", Priority.HEALTH):
+            fame = get_fame()
+            status = fame.health_monitor.check_system_health()
         overall = status.get("overall_status", "unknown")
         if overall != "healthy":
             raise HTTPException(status_code=503, detail=status)
         return {"status": "ready", "timestamp": status.get("timestamp")}
+    except AdmissionRejected as exc:
+        raise _shed(exc)
     except Exception as e:
         logger.error(f"Readiness check failed: {e}", exc_info=True)
         raise HTTPException(status_code=503, detail={"error": str(e)})
@@ -99,13 +135,24 @@ async def readiness() -> Dict[str, Any]:
 async def process_query(request: QueryRequest) -> Dict[str, Any]:
     """
     Process a query with FAME.
-    Includes timeout protection to prevent hanging requests.
+    Includes admission control and timeout protection to prevent hanging requests.
     """
-    import asyncio
-    
     # Get timeout from environment or use default (60 seconds)
     query_timeout = int(os.getenv("FAME_QUERY_TIMEOUT", "60"))
-    
+
+    # Trading traffic is served ahead of chat; queries never get health priority
+    metadata = request.metadata or {}
+    default_priority = Priority.TRADING if request.source == "trading" else Priority.CHAT
+    priority = max(Priority.from_label(metadata.get("priority"), default_priority), Priority.TRADING)
+
+    try:
+        async with admission.admit("query", priority):
+            return await _run_query(request, query_timeout)
+    except AdmissionRejected as exc:
+        raise _shed(exc)
+
+
+async def _run_query(request: QueryRequest, query_timeout: int) -> Dict[str, Any]:
     try:
         fame = get_fame()
         session_id = request.session_id or f"session_{int(time.time())}"
@@ -141,3 +188,11 @@ async def process_query(request: QueryRequest) -> Dict[str, Any]:
             "error": str(e),
             "timestamp": time.time()
         }
+
+
+@app.get("/metrics", tags=["health"])
+async def metrics() -> Response:
+    """Prometheus metrics, including admission queue depth and shed counts."""
+    if PROMETHEUS_AVAILABLE:
+        return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=json.dumps({"admission": admission.snapshot()}), media_type="application/json")
@@ -2,17 +2,42 @@
 """
 FAME AGI - Benchmark Suite
 Speed, reasoning depth, memory precision, and trade signal confidence benchmarks
+Open-loop load benchmarks with baseline regression checks
 """
 
 import logging
 import time
 import asyncio
 import statistics
-from typing import Dict, Any, List, Optional
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 import json
 
+try:
+    from benchmarks.load_harness import (
+        BenchmarkRegression,
+        baseline_entry,
+        compare_to_baseline,
+        load_baseline,
+        run_latency_curve,
+        saturation_rate,
+        save_baseline,
+    )
+except ImportError:  # pragma: no cover - run as a script from benchmarks/
+    from load_harness import (  # type: ignore
+        BenchmarkRegression,
+        baseline_entry,
+        compare_to_baseline,
+        load_baseline,
+        run_latency_curve,
+        saturation_rate,
+        save_baseline,
+    )
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +52,103 @@ class BenchmarkResult:
     details: Dict[str, Any]
 
 
+class _OfflineRequests:
+    """Stands in for the `requests` module: every provider call fails fast"""
+
+    class RequestException(Exception):
+        pass
+
+    ConnectionError = RequestException
+    Timeout = RequestException
+
+    def __getattr__(self, name):
+        def unavailable(*args, **kwargs):
+            raise self.ConnectionError("network disabled for offline benchmarks")
+        return unavailable
+
+
+@contextmanager
+def offline_providers():
+    """Redirect telemetry to a scratch directory and stub the qa_engine HTTP providers"""
+    patches = []
+    try:
+        import telemetry.events as telemetry_events
+        patches.append((telemetry_events, "EVENT_SINK", telemetry_events.EVENT_SINK))
+        telemetry_events.EVENT_SINK = Path(tempfile.mkdtemp(prefix="fame-bench-telemetry-"))
+    except ImportError:
+        pass
+    # imported here so targets built inside the block see the stub too
+    try:
+        import core.qa_engine as qa_engine
+    except ImportError:
+        qa_engine = None
+    if qa_engine is not None and hasattr(qa_engine, "requests"):
+        patches.append((qa_engine, "requests", qa_engine.requests))
+        qa_engine.requests = _OfflineRequests()
+    try:
+        yield
+    finally:
+        for module, name, value in reversed(patches):
+            setattr(module, name, value)
+
+
+def default_load_targets(provider_latency: float = 0.002) -> Dict[str, Any]:
+    """
+    Offline load targets: the orchestrator brain with a stubbed market-data
+    plugin, the qa_engine on questions it answers locally, and the risk
+    orchestrator's sizing + metrics path.
+    """
+    import itertools
+    import random
+    from types import SimpleNamespace
+    
+    targets: Dict[str, Any] = {}
+    
+    from orchestrator.brain import Brain
+    brain = Brain(plugin_folder=tempfile.mkdtemp(prefix="fame-bench-plugins-"))
+    
+    async def market_data_stub(query):
+        await asyncio.sleep(provider_latency)  # simulated provider round trip
+        return {"response": "BTC 64000 (stub)", "confidence": 0.8, "source": "stub_provider"}
+    
+    brain.plugins = {"market_data_stub": SimpleNamespace(handle=market_data_stub)}
+    brain_queries = itertools.cycle(["price of btc", "analyze apple stock", "market overview"])
+    
+    async def brain_target():
+        response = await brain.handle_query({"text": next(brain_queries), "selected_modules": ["market_data_stub"]})
+        if not response or response.get("error"):
+            raise RuntimeError(f"brain returned {response}")
+    
+    targets["brain"] = brain_target
+    
+    import core.qa_engine as qa_engine
+    qa_queries = itertools.cycle([
+        "what is 15 plus 27", "what time is it", "what is today's date",
+        "explain cache architecture", "who are you",
+    ])
+    
+    def qa_target():
+        response = qa_engine.handle({"text": next(qa_queries)})
+        if not response.get("response"):
+            raise RuntimeError(f"qa_engine returned {response}")
+    
+    targets["qa_engine"] = qa_target
+    
+    from risk.risk_orchestrator import RiskOrchestrator
+    risk = RiskOrchestrator()
+    rng = random.Random(7)
+    risk.extend_returns(rng.gauss(0.0005, 0.01) for _ in range(252))
+    signals = {f"ASSET{i}": rng.uniform(-0.3, 0.3) for i in range(20)}
+    
+    def risk_target():
+        risk.record_return(rng.gauss(0.0005, 0.01))
+        positions = risk.apply(signals)
+        risk.risk_metrics(positions=positions, portfolio_value=1_000_000.0)
+    
+    targets["risk"] = risk_target
+    return targets
+
+
 class BenchmarkSuite:
     """
     Comprehensive benchmark suite for FAME AGI evaluation.
@@ -210,8 +332,255 @@ class BenchmarkSuite:
         self.results.append(result)
         return result
     
-    async def run_all_benchmarks(self) -> Dict[str, Any]:
-        """Run all benchmarks"""
+    async def run_options_chain_benchmark(self, num_strikes: int = 2000, num_expiries: int = 12,
+                                          repeats: int = 5) -> BenchmarkResult:
+        """Benchmark chain-level pricing, greeks and implied-vol throughput"""
+        import numpy as np
+        from intelligence.options_pricing import black_scholes_greeks, black_scholes_price, implied_volatility
+        
+        spot = 100.0
+        strikes = np.linspace(50.0, 150.0, num_strikes)[:, None]
+        expiries = np.linspace(7.0, 730.0, num_expiries)[None, :] / 365.0
+        vols = 0.2 + 0.3 * np.log(strikes / spot) ** 2 + 0.0 * expiries
+        is_call = strikes >= spot  # quote the out-of-the-money side, as listed chains do
+        contracts = vols.size
+        
+        timings = {"price": [], "greeks": [], "implied_vol": []}
+        max_iv_error = 0.0
+        for _ in range(repeats):
+            start = time.perf_counter()
+            prices = black_scholes_price(spot, strikes, expiries, vols, 0.03, 0.0, is_call)
+            timings["price"].append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            black_scholes_greeks(spot, strikes, expiries, vols, 0.03, 0.0, is_call)
+            timings["greeks"].append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            ivs = implied_volatility(prices, spot, strikes, expiries, 0.03, is_call=is_call)
+            timings["implied_vol"].append(time.perf_counter() - start)
+            # far wings worth less than a millionth of spot carry no vol information
+            quoted = prices > 1e-6 * spot
+            max_iv_error = max(max_iv_error, float(np.nanmax(np.abs(ivs - vols)[quoted])))
+        
+        throughput = {
+            name: contracts / statistics.median(values) for name, values in timings.items()
+        }
+        
+        result = BenchmarkResult(
+            name="options_chain_benchmark",
+            metric="implied_vol_throughput",
+            value=throughput["implied_vol"],
+            unit="contracts/second",
+            timestamp=time.time(),
+            details={
+                "contracts": contracts,
+                "strikes": num_strikes,
+                "expiries": num_expiries,
+                "price_contracts_per_second": throughput["price"],
+                "greeks_contracts_per_second": throughput["greeks"],
+                "implied_vol_contracts_per_second": throughput["implied_vol"],
+                "median_chain_seconds": {name: statistics.median(values) for name, values in timings.items()},
+                "max_iv_error": max_iv_error
+            }
+        )
+        
+        self.results.append(result)
+        return result
+    
+    async def run_mcts_benchmark(self, simulations: int = 4000, branching: int = 32,
+                                 batch_sizes: List[int] = None,
+                                 time_budget: float = 0.25) -> BenchmarkResult:
+        """Benchmark MCTS simulations per second, serial and with batched virtual-loss leaves"""
+        from agents.mcts_decision_maker import MCTSDecisionMaker
+        
+        actions = list(range(-(branching // 2), branching - branching // 2))
+        target = 8 * max(actions) // 2
+        
+        class RandomWalk(MCTSDecisionMaker):
+            """Eight-step walk over `branching` moves; reward is closeness to a target"""
+            def _apply_action(self, state, action):
+                return state[0] + action, state[1] + 1
+            
+            def _is_terminal(self, state):
+                return state[1] >= 8
+            
+            def _get_available_actions(self, state):
+                return [] if state[1] >= 8 else actions
+            
+            def _evaluate_state(self, state):
+                return 1.0 - abs(state[0] - target) / (8.0 * branching)
+        
+        throughput = {}
+        for batch_size in batch_sizes or [1, 8, 32]:
+            searcher = RandomWalk(simulation_budget=simulations, batch_size=batch_size, seed=0)
+            best_action = searcher.search((0, 0), actions)
+            stats = searcher.get_search_statistics()
+            throughput[f"batch_{batch_size}"] = {
+                "simulations_per_second": stats["simulations_per_second"],
+                "total_nodes": stats["total_nodes"],
+                "max_depth": stats["max_depth"],
+                "best_action": best_action
+            }
+        
+        # anytime: how many simulations fit in a fixed decision deadline
+        anytime = RandomWalk(simulation_budget=10**9, batch_size=8, seed=0)
+        anytime.search((0, 0), actions, time_budget=time_budget)
+        anytime_stats = anytime.get_search_statistics()
+        
+        best = max(entry["simulations_per_second"] for entry in throughput.values())
+        result = BenchmarkResult(
+            name="mcts_benchmark",
+            metric="simulations_per_second",
+            value=best,
+            unit="simulations/second",
+            timestamp=time.time(),
+            details={
+                "simulations": simulations,
+                "branching": branching,
+                "by_batch_size": throughput,
+                "anytime_budget_seconds": time_budget,
+                "anytime_simulations": anytime_stats["simulations"],
+                "anytime_elapsed_seconds": anytime_stats["elapsed_seconds"]
+            }
+        )
+        
+        self.results.append(result)
+        return result
+    
+    async def run_cache_contention_benchmark(self, threads: int = 4, coroutines: int = 8,
+                                             operations: int = 5000, keyspace: int = 5000,
+                                             max_size: int = 1000) -> BenchmarkResult:
+        """Benchmark EnterpriseCache under mixed thread and coroutine load with a skewed key mix"""
+        import random
+        import threading
+        from services.cache.enterprise_cache import EnterpriseCache
+        
+        cache = EnterpriseCache(max_size=max_size, default_ttl=0, max_bytes=max_size * 2048)
+        payload = {"symbol": "BTC-USD", "risk": "moderate", "limits": list(range(16))}
+        
+        def next_key(rng):
+            return f"user-{int(keyspace * rng.random() ** 3)}"  # skewed: low ids are hot
+        
+        def thread_load(seed):
+            rng = random.Random(seed)
+            for _ in range(operations):
+                key = next_key(rng)
+                if cache.get_sync(key) is None:
+                    cache.set_sync(key, payload)
+        
+        async def coroutine_load(seed):
+            rng = random.Random(seed)
+            for i in range(operations):
+                key = next_key(rng)
+                if await cache.get(key) is None:
+                    await cache.set(key, payload)
+                if i % 256 == 0:
+                    await asyncio.sleep(0)
+        
+        workers = [threading.Thread(target=thread_load, args=(seed,)) for seed in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        await asyncio.gather(*(coroutine_load(1000 + seed) for seed in range(coroutines)))
+        await asyncio.to_thread(lambda: [worker.join() for worker in workers])
+        elapsed = time.perf_counter() - start
+        
+        stats = cache.get_stats()
+        total_ops = (threads + coroutines) * operations
+        result = BenchmarkResult(
+            name="cache_contention_benchmark",
+            metric="operations_per_second",
+            value=total_ops / elapsed,
+            unit="ops/second",
+            timestamp=time.time(),
+            details={
+                "threads": threads,
+                "coroutines": coroutines,
+                "operations": total_ops,
+                "elapsed_seconds": elapsed,
+                "hit_ratio": stats["hit_ratio"],
+                "evictions": stats["evictions"],
+                "rejections": stats["rejections"],
+                "bytes": stats["bytes"],
+                "shard_hit_ratios": [shard["hit_ratio"] for shard in stats["shards"]]
+            }
+        )
+        
+        self.results.append(result)
+        return result
+    
+    async def run_load_benchmark(self, targets: Optional[Dict[str, Any]] = None,
+                                 rates: Sequence[float] = (25.0, 50.0, 100.0, 200.0),
+                                 duration: float = 2.0, concurrency: int = 8,
+                                 baseline_path: Optional[Path] = None,
+                                 update_baseline: bool = False,
+                                 fail_on_regression: bool = True,
+                                 alpha: float = 0.01, min_effect: float = 0.10,
+                                 warmup: int = 5) -> BenchmarkResult:
+        """
+        Open-loop load benchmark: per target, a throughput-vs-latency curve over
+        `rates` with HDR percentiles. The lowest rate is the reference point
+        compared against the stored baseline; a significant slowdown raises
+        BenchmarkRegression (after the result is recorded).
+        """
+        baseline_path = Path(baseline_path) if baseline_path else self.data_dir / "load_baseline.json"
+        report: Dict[str, Any] = {}
+        reference: Dict[str, Dict[str, Any]] = {}
+        
+        with offline_providers():
+            targets = targets if targets is not None else default_load_targets()
+            for name, target in targets.items():
+                for _ in range(warmup):  # imports, caches and lazy initialisation
+                    result = target()
+                    if asyncio.iscoroutine(result):
+                        await result
+                logger.info(f"Load benchmark: {name} at {list(rates)} req/s")
+                curve = await run_latency_curve(target, rates, duration, concurrency=concurrency, name=name)
+                reference[name] = baseline_entry(curve[0])
+                report[name] = {
+                    "curve": [point.to_dict() for point in curve],
+                    "saturation_rate": saturation_rate(curve),
+                    "reference": curve[0].to_dict(),
+                }
+        
+        baseline = load_baseline(baseline_path)
+        comparison = compare_to_baseline(reference, baseline, alpha=alpha, min_effect=min_effect) if baseline else []
+        regressions = [entry for entry in comparison if entry["regressed"]]
+        if update_baseline or (not baseline and not regressions):
+            save_baseline(baseline_path, reference)
+        
+        worst_p99 = max((entry["latency"]["p99_ms"] for entry in reference.values()), default=0.0)
+        result = BenchmarkResult(
+            name="load_benchmark",
+            metric="reference_p99_latency",
+            value=worst_p99,
+            unit="ms",
+            timestamp=time.time(),
+            details={
+                "rates": list(rates),
+                "duration_seconds": duration,
+                "concurrency": concurrency,
+                "targets": report,
+                "baseline": str(baseline_path),
+                "comparison": comparison,
+                "regressions": [entry["target"] for entry in regressions]
+            }
+        )
+        
+        self.results.append(result)
+        if regressions and fail_on_regression:
+            raise BenchmarkRegression(
+                "Latency regression vs baseline: " + ", ".join(
+                    f"{entry['target']} median {entry['median_change']:+.1%} (p={entry['p_value']:.2g}), "
+                    f"error rate {entry['error_rate_change']:+.1%}"
+                    for entry in regressions
+                )
+            )
+        return result
+    
+    async def run_all_benchmarks(self, include_load: bool = False) -> Dict[str, Any]:
+        """Run all benchmarks; the open-loop load benchmark only with `include_load`"""
         logger.info("Starting benchmark suite...")
         
         results = {}
@@ -232,6 +601,27 @@ class BenchmarkSuite:
         logger.info("Running trade signal confidence benchmark...")
         results["confidence"] = await self.run_trade_signal_confidence_benchmark()
         
+        # Options chain throughput benchmark
+        logger.info("Running options chain benchmark...")
+        results["options_chain"] = await self.run_options_chain_benchmark()
+        
+        # MCTS search throughput benchmark
+        logger.info("Running MCTS benchmark...")
+        results["mcts"] = await self.run_mcts_benchmark()
+        
+        # Cache contention benchmark
+        logger.info("Running cache contention benchmark...")
+        results["cache"] = await self.run_cache_contention_benchmark()
+        
+        # Open-loop load benchmark (offline targets, baseline regression check);
+        # regressions are recorded in its details rather than raised, so the
+        # other results are still saved
+        if include_load:
+            logger.info("Running load benchmark...")
+            results["load"] = await self.run_load_benchmark(fail_on_regression=False)
+            if results["load"].details["regressions"]:
+                logger.warning(f"Load benchmark regressions: {results['load'].details['regressions']}")
+        
         # Save results
         self.save_results()
         
@@ -276,8 +666,51 @@ class BenchmarkSuite:
         }
 
 
-async def main():
+async def main(argv: Optional[List[str]] = None) -> int:
     """Run benchmarks"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="FAME benchmark suite")
+    parser.add_argument("--load", action="store_true", help="only run the offline load benchmark")
+    parser.add_argument("--with-load", action="store_true", help="include the load benchmark in a full run")
+    parser.add_argument("--targets", nargs="*", help="load targets to run (default: all)")
+    parser.add_argument("--rates", type=float, nargs="+", default=[25.0, 50.0, 100.0, 200.0])
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--min-effect", type=float, default=0.10)
+    args = parser.parse_args(argv)
+    
+    if args.load:
+        suite = BenchmarkSuite(None)
+        targets = None
+        if args.targets:
+            with offline_providers():
+                available = default_load_targets()
+            targets = {name: available[name] for name in args.targets}
+        try:
+            result = await suite.run_load_benchmark(
+                targets=targets, rates=args.rates, duration=args.duration,
+                concurrency=args.concurrency, baseline_path=args.baseline,
+                update_baseline=args.update_baseline, alpha=args.alpha, min_effect=args.min_effect
+            )
+        except BenchmarkRegression as e:
+            result = suite.results[-1]
+            print(f"REGRESSION: {e}")
+        print("\n=== Load Benchmark ===")
+        for name, entry in result.details["targets"].items():
+            print(f"{name}: saturation ~{entry['saturation_rate']:.0f} req/s")
+            for point in entry["curve"]:
+                latency = point["latency"]
+                print(f"  {point['offered_rate']:>7.1f} req/s -> {point['throughput']:>7.1f} req/s  "
+                      f"p50 {latency['p50_ms']:.2f}ms  p99 {latency['p99_ms']:.2f}ms  "
+                      f"p999 {latency['p999_ms']:.2f}ms  errors {point['errors']}")
+        for entry in result.details["comparison"]:
+            print(f"  vs baseline {entry['target']}: {entry['status']}")
+        return 1 if result.details["regressions"] else 0
+    
     from core.agi_core import AGICore
     import yaml
     
@@ -290,15 +723,15 @@ async def main():
     
     # Run benchmarks
     suite = BenchmarkSuite(agi)
-    results = await suite.run_all_benchmarks()
+    results = await suite.run_all_benchmarks(include_load=args.with_load)
     
     # Print summary
     print("\n=== Benchmark Results ===")
     for name, result in results.items():
         print(f"{name}: {result.value:.3f} {result.unit}")
         print(f"  Details: {result.details}")
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
-
+    sys.exit(asyncio.run(main()))
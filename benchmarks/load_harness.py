@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+FAME AGI - Load Harness
+Open-loop load generation, HDR latency histograms and baseline regression tests
+"""
+
+import asyncio
+import inspect
+import json
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+Target = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class BenchmarkRegression(Exception):
+    """Raised when a run is significantly slower than the stored baseline"""
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of integer microseconds.
+
+    Values below `2 ** sub_bucket_bits` are counted exactly; above that each
+    power-of-two range is split into `2 ** (sub_bucket_bits - 1)` linear
+    buckets, so any recorded value is reported within 1 / 2 ** (bits - 1)
+    relative error (0.1% with the default 11 bits, i.e. three significant
+    figures) in constant memory.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 11):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.min_value: Optional[int] = None
+        self.max_value = 0
+        self._sum = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + ((value >> shift) - self.half_count)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self.sub_bucket_count:
+            return index
+        shift, offset = divmod(index - self.sub_bucket_count, self.half_count)
+        shift += 1
+        return ((offset + self.half_count + 1) << shift) - 1
+
+    def record(self, value_us: Union[int, float], count: int = 1) -> None:
+        value = max(0, int(value_us))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self._sum += value * count
+        self.max_value = max(self.max_value, value)
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+
+    def record_seconds(self, seconds: float) -> None:
+        self.record(seconds * 1e6)
+
+    def percentile(self, percentile: float) -> int:
+        """Value (microseconds) at or below which `percentile`% of samples fall"""
+        if not self.total_count:
+            return 0
+        threshold = max(1, math.ceil(self.total_count * percentile / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self._highest_equivalent(index), self.max_value)
+        return self.max_value
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.total_count if self.total_count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self._sum += other._sum
+        self.max_value = max(self.max_value, other.max_value)
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+
+    def summary(self) -> Dict[str, float]:
+        """Percentiles in milliseconds"""
+        return {
+            "count": self.total_count,
+            "mean_ms": self.mean / 1000.0,
+            "p50_ms": self.percentile(50) / 1000.0,
+            "p90_ms": self.percentile(90) / 1000.0,
+            "p99_ms": self.percentile(99) / 1000.0,
+            "p999_ms": self.percentile(99.9) / 1000.0,
+            "max_ms": self.max_value / 1000.0,
+        }
+
+
+@dataclass
+class LoadResult:
+    """Outcome of one open-loop run at a fixed offered rate"""
+    target: str
+    offered_rate: float
+    concurrency: int
+    duration: float
+    sent: int = 0
+    completed: int = 0
+    errors: int = 0
+    dropped: int = 0
+    elapsed: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    service_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    samples: List[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def arrival_rate(self) -> float:
+        """Rate actually offered (Poisson arrivals scatter around `offered_rate`)"""
+        return self.sent / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        finished = self.completed + self.errors
+        return self.errors / finished if finished else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        summary = self.latency.summary()
+        return {
+            "target": self.target,
+            "offered_rate": self.offered_rate,
+            "concurrency": self.concurrency,
+            "throughput": self.throughput,
+            "arrival_rate": self.arrival_rate,
+            "error_rate": self.error_rate,
+            "sent": self.sent,
+            "completed": self.completed,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "latency": summary,
+            "service_time": self.service_time.summary(),
+        }
+
+
+async def run_open_loop(
+    target: Target,
+    rate: float,
+    duration: float,
+    concurrency: int = 8,
+    name: str = "target",
+    arrivals: str = "poisson",
+    max_outstanding: int = 10000,
+    reservoir_size: int = 2000,
+    seed: int = 0,
+) -> LoadResult:
+    """
+    Offer `rate` requests/second for `duration` seconds regardless of how
+    fast the target answers (open loop). At most `concurrency` requests run
+    at once; the rest queue. Latency is measured from each request's
+    *scheduled* arrival, so queueing behind a slow target is counted
+    instead of hidden (no coordinated omission). Failed requests count
+    as errors and their latency is recorded too, so a target that fails
+    fast cannot look faster than it is. Sync targets run on a thread pool
+    of `concurrency` workers.
+    """
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    result = LoadResult(target=name, offered_rate=rate, concurrency=concurrency, duration=duration)
+    slots = asyncio.Semaphore(concurrency)
+    is_async = inspect.iscoroutinefunction(target)
+    executor = None if is_async else ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load")
+    outstanding: set = set()
+    seen = 0
+
+    async def one(intended: float) -> None:
+        nonlocal seen
+        async with slots:
+            started = loop.time()
+            try:
+                if is_async:
+                    await target()
+                else:
+                    await loop.run_in_executor(executor, target)
+            except Exception:
+                result.errors += 1
+            else:
+                result.completed += 1
+            finished = loop.time()
+        latency = finished - intended
+        result.latency.record_seconds(latency)
+        result.service_time.record_seconds(finished - started)
+        # reservoir sample of latencies for the significance test
+        seen += 1
+        if len(result.samples) < reservoir_size:
+            result.samples.append(latency)
+        else:
+            slot = rng.randrange(seen)
+            if slot < reservoir_size:
+                result.samples[slot] = latency
+
+    start = loop.time()
+    next_arrival = start
+    end = start + duration
+    try:
+        while next_arrival < end:
+            delay = next_arrival - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(outstanding) >= max_outstanding:
+                result.dropped += 1
+            else:
+                task = loop.create_task(one(next_arrival))
+                outstanding.add(task)
+                task.add_done_callback(outstanding.discard)
+                result.sent += 1
+            gap = rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+            next_arrival += gap
+        if outstanding:
+            await asyncio.gather(*outstanding)
+    finally:
+        result.elapsed = loop.time() - start
+        if executor is not None:
+            executor.shutdown(wait=False)
+    return result
+
+
+async def run_latency_curve(
+    target: Target,
+    rates: Sequence[float],
+    duration: float,
+    concurrency: int = 8,
+    name: str = "target",
+    seed: int = 0,
+    **options: Any,
+) -> List[LoadResult]:
+    """Throughput-vs-latency curve: one open-loop run per offered rate"""
+    return [
+        await run_open_loop(target, rate, duration, concurrency=concurrency, name=name, seed=seed + i, **options)
+        for i, rate in enumerate(rates)
+    ]
+
+
+def saturation_rate(curve: Sequence[LoadResult], tolerance: float = 0.9) -> float:
+    """
+    Highest offered rate the target kept up with: throughput at least
+    `tolerance` times the arrival rate actually generated in that run
+    """
+    sustained = [point.offered_rate for point in curve if point.throughput >= tolerance * point.arrival_rate]
+    return max(sustained) if sustained else 0.0
+
+
+def mann_whitney_u(current: Sequence[float], baseline: Sequence[float]) -> float:
+    """
+    One-sided Mann-Whitney U test (normal approximation with tie
+    correction). Returns the p-value for "current is stochastically larger
+    than baseline", i.e. slower when the samples are latencies.
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    pooled = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        average = (i + j) / 2.0 + 1.0
+        for k in range(i, j + 1):
+            ranks[k] = average
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def compare_to_baseline(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    alpha: float = 0.01,
+    min_effect: float = 0.10,
+    max_error_increase: float = 0.01,
+) -> List[Dict[str, Any]]:
+    """
+    Compare per-target latency samples against the baseline. A target
+    regresses when it is slower with p < `alpha` *and* its median latency
+    grew by more than `min_effect` (so tiny but significant shifts on
+    large samples do not fail the run), or when its error rate rose by
+    more than `max_error_increase`.
+    """
+    report = []
+    for name, entry in current.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get("samples"):
+            report.append({"target": name, "status": "no_baseline", "regressed": False})
+            continue
+        p_value = mann_whitney_u(entry["samples"], reference["samples"])
+        base_median = _median(reference["samples"])
+        median_change = (_median(entry["samples"]) / base_median - 1.0) if base_median > 0 else 0.0
+        base_p99 = reference.get("latency", {}).get("p99_ms", 0.0)
+        p99_change = (entry["latency"]["p99_ms"] / base_p99 - 1.0) if base_p99 > 0 else 0.0
+        error_change = entry.get("error_rate", 0.0) - reference.get("error_rate", 0.0)
+        slower = p_value < alpha and median_change > min_effect
+        failing = error_change > max_error_increase
+        regressed = slower or failing
+        report.append({
+            "target": name,
+            "status": "regressed" if regressed else "ok",
+            "regressed": regressed,
+            "p_value": p_value,
+            "median_change": median_change,
+            "p99_change": p99_change,
+            "error_rate_change": error_change,
+        })
+    return report
+
+
+def baseline_entry(result: LoadResult) -> Dict[str, Any]:
+    entry = result.to_dict()
+    entry["samples"] = list(result.samples)
+    return entry
+
+
+def save_baseline(path: Union[str, Path], entries: Dict[str, Dict[str, Any]]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"created": time.time(), "targets": entries}, indent=2))
+    tmp.replace(path)
+
+
+def load_baseline(path: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get("targets", {})
@@ -21,6 +21,9 @@ import asyncio
 import hashlib
 import logging
 import shutil
+import threading
+from array import array
+from collections import deque
 from typing import Optional, Dict, List, Any, Tuple
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -83,8 +86,11 @@ logger = logging.getLogger("fame_engine")
 class Config:
     data_dir: Path = Path(os.getenv("FAME_DATA_DIR", "./fame_data"))
     memory_file: Path = field(init=False)
+    memory_dir: Path = field(init=False)
     convo_history_max: int = int(os.getenv("FAME_CONVO_MAX", "2000"))
     save_every_seconds: int = int(os.getenv("FAME_SAVE_EVERY", "30"))
+    memory_segment_bytes: int = int(os.getenv("FAME_MEMORY_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+    memory_compact_ratio: float = float(os.getenv("FAME_MEMORY_COMPACT_RATIO", "3.0"))
     embed_model_name: str = os.getenv("FAME_EMBED_MODEL", "all-mpnet-base-v2")  # sentence-transformers
     llm_cloud: str = os.getenv("FAME_LLM_CLOUD", "openai")  # openai / google / custom
     openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
@@ -95,7 +101,8 @@ class Config:
 
     def __post_init__(self):
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.memory_file = self.data_dir / "memory.json"
+        self.memory_file = self.data_dir / "memory.json"  # legacy monolithic file, migrated on load
+        self.memory_dir = self.data_dir / "memory"
 
 # single global config instance
 CFG = Config()
@@ -111,44 +118,342 @@ def hash_text(t: str) -> str:
 # -------------------------
 
 class MemoryManager:
+    """
+    Append-only persistent memory.
+
+    Layout under ``cfg.memory_dir``:
+      conversations-NNNNNN.jsonl  segmented conversation log (one record per line)
+      knowledge-NNNNNN.jsonl      segmented knowledge log (last write per key wins)
+      embeddings-NNNNNN.bin       float32 vectors referenced by knowledge records
+      state.json                  patterns, source stats and meta (small, rewritten)
+
+    ``save`` only appends records created since the previous save. Startup reads
+    just enough conversation segments (newest first) to fill the history window.
+    ``compact`` rewrites live data into fresh segments once the logs carry too
+    much superseded or trimmed data.
+    """
+
+    CONVO_PREFIX = "conversations"
+    KNOWLEDGE_PREFIX = "knowledge"
+
     def __init__(self, cfg: Config):
         self.cfg = cfg
-        self._mem: Dict[str, Any] = {
-            "conversations": [],
-            "knowledge": {},           # keyed by hash -> {answer, embedding, timestamp, source, confidence}
+        self.dir = cfg.memory_dir
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._state_file = self.dir / "state.json"
+        self._conversations: deque = deque(maxlen=cfg.convo_history_max)
+        self._knowledge: Dict[str, Dict[str, Any]] = {}
+        self._emb_refs: Dict[str, Tuple[str, int, int]] = {}   # key -> (file, offset, dim)
+        self._state: Dict[str, Any] = {
             "patterns": {},            # simple learned templates (can evolve)
             "source_stats": {},
             "meta": {"created": now_iso(), "updated": now_iso()}
         }
+        self._pending_convos: List[Dict[str, Any]] = []
+        self._pending_knowledge: Dict[str, Dict[str, Any]] = {}
+        self._state_dirty = False
+        self._knowledge_records = 0    # records on disk, including superseded ones
+        self._convo_records = 0
+        self._lock = threading.Lock()
         self._dirty = False
         self._last_save = time.time()
         self._load()
 
+    # --- loading ---
+
+    def _segments(self, prefix: str, suffix: str = ".jsonl") -> List[Path]:
+        return sorted(self.dir.glob(f"{prefix}-*{suffix}"))
+
+    def _new_segment(self, prefix: str, suffix: str = ".jsonl") -> Path:
+        segments = self._segments(prefix, suffix)
+        seq = int(segments[-1].stem.rsplit("-", 1)[1]) + 1 if segments else 1
+        return self.dir / f"{prefix}-{seq:06d}{suffix}"
+
+    def _emb_file(self) -> Path:
+        files = self._segments("embeddings", ".bin")
+        return files[-1] if files else self._new_segment("embeddings", ".bin")
+
+    def _active_segment(self, prefix: str) -> Path:
+        segments = self._segments(prefix)
+        if not segments:
+            return self._new_segment(prefix)
+        last = segments[-1]
+        if last.stat().st_size >= self.cfg.memory_segment_bytes:
+            return self._new_segment(prefix)
+        return last
+
+    @staticmethod
+    def _read_records(path: Path) -> List[Dict[str, Any]]:
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # torn tail from an interrupted append
+                    logger.warning("Skipping corrupt memory record in %s", path.name)
+        return records
+
+    @staticmethod
+    def _repair_tail(path: Path):
+        """Cut a torn final record so the next append starts on a fresh line."""
+        with open(path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+            logger.warning("Truncated torn record at the end of %s", path.name)
+
     def _load(self):
-        if self.cfg.memory_file.exists():
-            try:
-                with open(self.cfg.memory_file, "r", encoding="utf-8") as f:
-                    self._mem = json.load(f)
-                    logger.info("Memory loaded: %d conversations", len(self._mem.get("conversations", [])))
-            except Exception as e:
-                logger.exception("Failed to load memory file: %s", e)
+        try:
+            for prefix in (self.CONVO_PREFIX, self.KNOWLEDGE_PREFIX):
+                segments = self._segments(prefix)
+                if segments:
+                    self._repair_tail(segments[-1])
+            if self._state_file.exists():
+                with open(self._state_file, "r", encoding="utf-8") as f:
+                    self._state.update(json.load(f))
+
+            # newest segments first, stop once the history window is full
+            window = self.cfg.convo_history_max
+            loaded: List[Dict[str, Any]] = []
+            for seg in reversed(self._segments(self.CONVO_PREFIX)):
+                if len(loaded) >= window:
+                    break
+                records = self._read_records(seg)
+                self._convo_records += len(records)
+                loaded = records + loaded
+            self._conversations.extend(loaded[-window:] if window else [])
+
+            for seg in self._segments(self.KNOWLEDGE_PREFIX):
+                for rec in self._read_records(seg):
+                    self._knowledge_records += 1
+                    key = rec.get("key")
+                    if key is None:
+                        continue
+                    self._knowledge[key] = rec.get("item", {})
+                    if rec.get("emb"):
+                        name, offset, dim = rec["emb"]
+                        self._emb_refs[key] = (name, int(offset), int(dim))
+                    else:
+                        self._emb_refs.pop(key, None)
+        except Exception as e:
+            logger.exception("Failed to load memory log: %s", e)
+
+        if self.cfg.memory_file.exists() and not self._segments(self.KNOWLEDGE_PREFIX) \
+                and not self._segments(self.CONVO_PREFIX):
+            self._migrate_legacy()
+        logger.info("Memory loaded: %d conversations, %d knowledge items",
+                    len(self._conversations), len(self._knowledge))
+
+    def _migrate_legacy(self):
+        """Import a monolithic memory.json written by earlier versions."""
+        try:
+            with open(self.cfg.memory_file, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.exception("Failed to load legacy memory file: %s", e)
+            return
+        for conv in legacy.get("conversations", [])[-self.cfg.convo_history_max:]:
+            self._conversations.append(conv)
+            self._pending_convos.append(conv)
+        for key, item in legacy.get("knowledge", {}).items():
+            self.cache_knowledge(key, item)
+        for name in ("patterns", "source_stats", "meta"):
+            if name in legacy:
+                self._state[name] = legacy[name]
+        self._state_dirty = True
+        self._dirty = True
+        self.save(force=True)
+        try:
+            self.cfg.memory_file.replace(self.cfg.memory_file.with_suffix(".json.migrated"))
+        except OSError:
+            pass
+        logger.info("Migrated legacy memory file into %s", self.dir)
+
+    # --- persistence ---
+
+    def _append(self, prefix: str, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with open(self._active_segment(prefix), "a", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _write_embedding(fh, vec: List[float]) -> Tuple[str, int, int]:
+        arr = array("f", (float(v) for v in vec))
+        offset = fh.tell()
+        arr.tofile(fh)
+        return Path(fh.name).name, offset, len(arr)
+
+    def _read_embedding(self, ref: Tuple[str, int, int]) -> Optional[List[float]]:
+        name, offset, dim = ref
+        try:
+            with open(self.dir / name, "rb") as f:
+                f.seek(offset)
+                arr = array("f")
+                arr.fromfile(f, dim)
+            return arr.tolist()
+        except (OSError, EOFError):
+            logger.warning("Embedding %s@%d unavailable", name, offset)
+            return None
 
     def save(self, force: bool = False):
         if not force and not self._dirty:
             return
         if time.time() - self._last_save < self.cfg.save_every_seconds and not force:
             return
-        try:
-            self._mem["meta"]["updated"] = now_iso()
-            tmp = self.cfg.memory_file.with_suffix(".tmp")
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(self._mem, f, indent=2, ensure_ascii=False)
-            tmp.replace(self.cfg.memory_file)
+        with self._lock:
+            convos, self._pending_convos = self._pending_convos, []
+            knowledge, self._pending_knowledge = self._pending_knowledge, {}
+            try:
+                self._append(self.CONVO_PREFIX, convos)
+                self._convo_records += len(convos)
+
+                records = []
+                if knowledge:
+                    with open(self._emb_file(), "ab") as emb_fh:
+                        for key, item in knowledge.items():
+                            item = dict(item)
+                            vec = item.pop("embedding", None)
+                            rec: Dict[str, Any] = {"key": key, "item": item}
+                            if vec is not None:
+                                ref = self._write_embedding(emb_fh, vec)
+                                self._emb_refs[key] = ref
+                                rec["emb"] = list(ref)
+                            records.append(rec)
+                        emb_fh.flush()
+                        os.fsync(emb_fh.fileno())
+                self._append(self.KNOWLEDGE_PREFIX, records)
+                self._knowledge_records += len(records)
+
+                if self._state_dirty or records or convos:
+                    self._write_state()
+
+                self._dirty = False
+                self._last_save = time.time()
+                logger.debug("Memory saved: %d conversations, %d knowledge records", len(convos), len(records))
+            except Exception as e:
+                # keep the deltas so the next save retries them
+                self._pending_convos = convos + self._pending_convos
+                self._pending_knowledge = {**knowledge, **self._pending_knowledge}
+                logger.exception("Failed to save memory: %s", e)
+                return
+
+        if self._needs_compaction():
+            self.compact()
+
+    def _write_state(self):
+        self._state["meta"]["updated"] = now_iso()
+        tmp = self._state_file.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+        tmp.replace(self._state_file)
+        self._state_dirty = False
+
+    def _needs_compaction(self) -> bool:
+        ratio = self.cfg.memory_compact_ratio
+        live_knowledge = max(len(self._knowledge), 1)
+        live_convos = max(self.cfg.convo_history_max, 1)
+        return (self._knowledge_records > ratio * live_knowledge + 100
+                or self._convo_records > ratio * live_convos)
+
+    def compact(self):
+        """Rewrite live conversations, knowledge and embeddings into fresh segments.
+
+        New files get higher sequence numbers than the ones they replace and
+        old files are only removed afterwards, so a crash at any point leaves
+        a log that still loads correctly.
+        """
+        with self._lock:
+            if self._pending_convos or self._pending_knowledge:
+                # compaction only runs on a fully flushed log
+                return
+            try:
+                old_files = (self._segments(self.CONVO_PREFIX)
+                             + self._segments(self.KNOWLEDGE_PREFIX)
+                             + self._segments("embeddings", ".bin"))
+
+                convo_seg = self._new_segment(self.CONVO_PREFIX)
+                tmp = convo_seg.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    for conv in self._conversations:
+                        f.write(json.dumps(conv, ensure_ascii=False) + "\n")
+                tmp.replace(convo_seg)
+
+                knowledge_seg = self._new_segment(self.KNOWLEDGE_PREFIX)
+                tmp = knowledge_seg.with_suffix(".tmp")
+                new_refs: Dict[str, Tuple[str, int, int]] = {}
+                with open(tmp, "w", encoding="utf-8") as f, \
+                        open(self._new_segment("embeddings", ".bin"), "wb") as emb_fh:
+                    for key, item in self._knowledge.items():
+                        rec: Dict[str, Any] = {"key": key, "item": item}
+                        ref = self._emb_refs.get(key)
+                        vec = self._read_embedding(ref) if ref else None
+                        if vec is not None:
+                            new_refs[key] = self._write_embedding(emb_fh, vec)
+                            rec["emb"] = list(new_refs[key])
+                        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    emb_fh.flush()
+                    os.fsync(emb_fh.fileno())
+                tmp.replace(knowledge_seg)
+
+                for path in old_files:
+                    path.unlink()
+                self._emb_refs = new_refs
+                self._convo_records = len(self._conversations)
+                self._knowledge_records = len(self._knowledge)
+                logger.info("Memory compacted: %d conversations, %d knowledge items",
+                            len(self._conversations), len(self._knowledge))
+            except Exception as e:
+                logger.exception("Memory compaction failed: %s", e)
+
+    def clear(self):
+        """Forget all conversations, knowledge, embeddings and learned state, on disk too."""
+        with self._lock:
+            for path in (self._segments(self.CONVO_PREFIX)
+                         + self._segments(self.KNOWLEDGE_PREFIX)
+                         + self._segments("embeddings", ".bin")):
+                path.unlink()
+            if self.cfg.memory_file.exists():
+                # otherwise the next start would migrate it back in
+                self.cfg.memory_file.unlink()
+            self._conversations.clear()
+            self._knowledge.clear()
+            self._emb_refs.clear()
+            self._pending_convos = []
+            self._pending_knowledge = {}
+            self._convo_records = 0
+            self._knowledge_records = 0
+            self._state = {
+                "patterns": {},
+                "source_stats": {},
+                "meta": {"created": now_iso(), "updated": now_iso()}
+            }
+            self._write_state()
             self._dirty = False
             self._last_save = time.time()
-            logger.debug("Memory saved.")
-        except Exception as e:
-            logger.exception("Failed to save memory: %s", e)
+        logger.info("Memory cleared")
+
+    # --- public API ---
 
     def add_conversation(self, query: str, response: str, source: str, confidence: float):
         conv = {
@@ -159,35 +464,57 @@ class MemoryManager:
             "timestamp": now_iso(),
             "id": hash_text(query + str(time.time()))
         }
-        self._mem.setdefault("conversations", []).append(conv)
-        # trim
-        if len(self._mem["conversations"]) > self.cfg.convo_history_max:
-            self._mem["conversations"] = self._mem["conversations"][-self.cfg.convo_history_max:]
-        self._mem["source_stats"][source] = self._mem["source_stats"].get(source, 0) + 1
-        self._mem["meta"]["updated"] = now_iso()
+        # bounded deque drops the oldest entry in O(1)
+        self._conversations.append(conv)
+        self._pending_convos.append(conv)
+        self._state["source_stats"][source] = self._state["source_stats"].get(source, 0) + 1
+        self._state_dirty = True
         self._dirty = True
 
+    def get_conversations(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        convos = list(self._conversations)
+        return convos[-limit:] if limit else convos
+
     def cache_knowledge(self, key: str, item: Dict[str, Any]):
-        self._mem.setdefault("knowledge", {})[key] = item
+        item = dict(item)
+        self._pending_knowledge[key] = dict(item)
+        if "embedding" in item:
+            # vectors live in embeddings.bin; keep only the reference in RAM
+            item.pop("embedding")
+        else:
+            self._emb_refs.pop(key, None)
+        self._knowledge[key] = item
         self._dirty = True
 
     def get_knowledge(self, key: str) -> Optional[Dict[str, Any]]:
-        return self._mem.get("knowledge", {}).get(key)
+        item = self._knowledge.get(key)
+        if item is None:
+            return None
+        pending = self._pending_knowledge.get(key)
+        if pending is not None and "embedding" in pending:
+            return {**item, "embedding": pending["embedding"]}
+        ref = self._emb_refs.get(key)
+        if ref:
+            vec = self._read_embedding(ref)
+            if vec is not None:
+                return {**item, "embedding": vec}
+        return item
 
     def add_pattern(self, token: str, template: str):
-        patterns = self._mem.setdefault("patterns", {})
+        patterns = self._state.setdefault("patterns", {})
         patterns[token] = {"template": template, "last": now_iso(), "count": patterns.get(token, {}).get("count", 0) + 1}
+        self._state_dirty = True
         self._dirty = True
 
     def get_patterns(self) -> Dict[str, Any]:
-        return self._mem.get("patterns", {})
+        return self._state.get("patterns", {})
 
     def stats(self) -> Dict[str, Any]:
         return {
-            "conversations": len(self._mem.get("conversations", [])),
-            "knowledge_cache": len(self._mem.get("knowledge", {})),
-            "patterns": len(self._mem.get("patterns", {})),
-            "source_stats": self._mem.get("source_stats", {})
+            "conversations": len(self._conversations),
+            "knowledge_cache": len(self._knowledge),
+            "patterns": len(self._state.get("patterns", {})),
+            "source_stats": self._state.get("source_stats", {})
         }
 
 # -------------------------
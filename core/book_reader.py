@@ -5,8 +5,14 @@ Reads and summarizes books from various formats (PDF, TXT, EPUB, DOCX)
 """
 
 import os
+import json
+import time
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -35,14 +41,17 @@ except ImportError:
     logger.warning("ebooklib not available. EPUB reading disabled.")
 
 
-def read_pdf(file_path: str, max_pages: int = 100) -> str:
+def read_pdf(file_path: str, max_pages: Optional[int] = None) -> str:
     """
     Extract text from PDF file with improved error handling and fallback methods
     
     Uses multiple extraction strategies:
-    1. Try PyPDF2 first (fast)
+    1. Try PyPDF2 first (fast), reading pages in order
     2. Fallback to pdfplumber if available (better quality)
-    3. Sample pages across document for better coverage
+    
+    All pages are read unless max_pages is given. For whole libraries use
+    ingest_books(), which spreads pages over a process pool and streams them
+    into the knowledge base instead of returning one string.
     """
     if not PDF_AVAILABLE:
         return "ERROR: PyPDF2 not installed. Install with: pip install PyPDF2"
@@ -66,14 +75,9 @@ def read_pdf(file_path: str, max_pages: int = 100) -> str:
             if total_pages == 0:
                 return "ERROR: PDF has no pages"
             
-            pages_to_read = min(total_pages, max_pages)
-            
-            # Strategy: Read first 50%, then sample from rest for better coverage
-            first_half = min(pages_to_read // 2, total_pages // 2)
-            remaining_pages = pages_to_read - first_half
+            pages_to_read = total_pages if max_pages is None else min(total_pages, max_pages)
             
-            # Read first half
-            for page_num in range(first_half):
+            for page_num in range(pages_to_read):
                 try:
                     page = pdf_reader.pages[page_num]
                     text = page.extract_text()
@@ -84,25 +88,6 @@ def read_pdf(file_path: str, max_pages: int = 100) -> str:
                     errors.append(f"Page {page_num}: {str(e)}")
                     logger.debug(f"Error reading PDF page {page_num}: {e}")
             
-            # Sample from remaining pages
-            if remaining_pages > 0 and total_pages > first_half:
-                import random
-                remaining_range = range(first_half, total_pages)
-                sample_pages = random.sample(
-                    list(remaining_range),
-                    min(remaining_pages, len(remaining_range))
-                )
-                for page_num in sorted(sample_pages):
-                    try:
-                        page = pdf_reader.pages[page_num]
-                        text = page.extract_text()
-                        if text and text.strip():
-                            text_content.append(text)
-                            pages_processed += 1
-                    except Exception as e:
-                        errors.append(f"Page {page_num}: {str(e)}")
-                        logger.debug(f"Error reading PDF page {page_num}: {e}")
-            
             # If extraction was poor, try pdfplumber
             total_chars = sum(len(t) for t in text_content)
             if PDFPLUMBER_AVAILABLE and total_chars < 1000 and pages_processed > 0:
@@ -121,7 +106,7 @@ def read_pdf(file_path: str, max_pages: int = 100) -> str:
                     logger.warning(f"pdfplumber also failed: {e}")
             
             # Add note about extraction
-            if total_pages > max_pages:
+            if total_pages > pages_to_read:
                 text_content.append(f"\n[Note: PDF has {total_pages} pages, extracted {pages_processed} pages]")
             
             if errors:
@@ -319,6 +304,321 @@ def find_books_in_directory(directory: str = None) -> List[Dict[str, Any]]:
     return books
 
 
+# Streaming ingestion -------------------------------------------------------
+
+PAGES_PER_TASK = 16
+PREVIEW_CHARS = 50000
+PAGE_SEPARATOR = "\n\n"
+INGEST_FILE_TYPES = ('.pdf', '.txt', '.docx', '.epub')
+
+
+def file_content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestCheckpoints:
+    """
+    Per-book ingestion progress keyed by content hash
+    
+    Each entry records how many pages have been streamed into the book's
+    content file and how many bytes that was, so an interrupted run resumes
+    at the last completed page range and a finished book is skipped even if
+    it was renamed or moved. Path, size and mtime are kept alongside so an
+    unchanged file does not have to be re-hashed.
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        if path is None:
+            from core.knowledge_base import KNOWLEDGE_BASE_DIR
+            path = KNOWLEDGE_BASE_DIR / "ingest_checkpoints.json"
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable ingest checkpoints {self.path}: {e}")
+    
+    def _lookup(self, file_path: str) -> Optional[str]:
+        stat = os.stat(file_path)
+        for content_hash, entry in self.entries.items():
+            if (entry.get("path") == file_path and entry.get("size") == stat.st_size
+                    and entry.get("mtime") == stat.st_mtime):
+                return content_hash
+        return None
+    
+    def content_hash(self, file_path: str) -> str:
+        """Content hash of a file, reusing the recorded one while size and mtime match"""
+        return self._lookup(file_path) or file_content_hash(file_path)
+    
+    def is_complete(self, file_path: str) -> bool:
+        """True when this exact file (path, size, mtime) has been fully ingested"""
+        content_hash = self._lookup(file_path)
+        return bool(content_hash and self.entries[content_hash].get("complete"))
+    
+    def get(self, content_hash: str) -> Dict[str, Any]:
+        return dict(self.entries.get(content_hash, {}))
+    
+    def update(self, content_hash: str, **fields) -> None:
+        entry = self.entries.setdefault(content_hash, {})
+        entry.update(fields)
+        entry["updated"] = datetime.now().isoformat()
+        self.save()
+    
+    def save(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+
+def _pdf_page_count(file_path: str) -> int:
+    with open(file_path, 'rb') as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def _extract_pdf_pages(task: Tuple[str, int, int]) -> List[str]:
+    """Extract the text of pages [start, end) of a PDF (runs in pool workers)"""
+    file_path, start, end = task
+    texts = []
+    with open(file_path, 'rb') as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        for page_num in range(start, end):
+            try:
+                texts.append(pdf_reader.pages[page_num].extract_text() or "")
+            except Exception as e:
+                logger.debug(f"Error reading PDF page {page_num}: {e}")
+                texts.append("")
+    return texts
+
+
+def iter_pdf_pages(file_path: str, start: int = 0, executor: Optional[Executor] = None,
+                   pages_per_task: int = PAGES_PER_TASK, max_in_flight: int = 8,
+                   total_pages: Optional[int] = None) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Yield (pages_done, page_texts) for consecutive page ranges of a PDF
+    
+    With an executor the ranges are extracted in parallel but still yielded
+    in page order. At most max_in_flight ranges are outstanding, so a slow
+    consumer never pulls the whole book into memory.
+    """
+    if total_pages is None:
+        total_pages = _pdf_page_count(file_path)
+    tasks = [(file_path, first, min(first + pages_per_task, total_pages))
+             for first in range(start, total_pages, pages_per_task)]
+    
+    if executor is None:
+        for task in tasks:
+            yield task[2], _extract_pdf_pages(task)
+        return
+    
+    pending = deque()
+    try:
+        for task in tasks:
+            pending.append((task[2], executor.submit(_extract_pdf_pages, task)))
+            if len(pending) >= max_in_flight:
+                end, future = pending.popleft()
+                yield end, future.result()
+        while pending:
+            end, future = pending.popleft()
+            yield end, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def _iter_document(file_path: Path) -> Iterator[Tuple[int, List[str]]]:
+    """Non-paginated formats are streamed as a single 'page'"""
+    book_data = read_book(str(file_path))
+    if not book_data['success']:
+        raise ValueError(book_data['error'])
+    yield 1, [book_data['content']]
+
+
+def _read_preview(content_file: Path, max_chars: int = PREVIEW_CHARS) -> str:
+    with open(content_file, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read(max_chars)
+
+
+def ingest_book(file_path: str, checkpoints: Optional[IngestCheckpoints] = None,
+                executor: Optional[Executor] = None, pages_per_task: int = PAGES_PER_TASK,
+                max_in_flight: int = 8) -> Dict[str, Any]:
+    """
+    Stream one book into the knowledge base, resuming from its checkpoint
+    
+    Page ranges are appended to the book's content file as they are
+    extracted and the checkpoint is advanced after each one. Key concepts
+    and code examples are taken from the first PREVIEW_CHARS of the stored
+    text once the book is complete.
+    
+    Returns:
+        Dict with 'success', 'book_id', 'title', 'file_type', 'pages',
+        'seconds', 'pages_per_sec', 'content_length', 'preview', 'skipped', 'error'
+    """
+    from core.knowledge_base import (
+        book_content_path, register_book_knowledge, extract_key_concepts,
+        extract_code_examples, get_book_hash, load_index, BOOKS_INDEX_FILE
+    )
+    
+    path = Path(file_path)
+    file_ext = path.suffix.lower()
+    result = {
+        "success": False,
+        "book_id": None,
+        "title": path.stem,
+        "file_type": file_ext,
+        "file_path": str(path),
+        "pages": 0,
+        "seconds": 0.0,
+        "pages_per_sec": 0.0,
+        "content_length": 0,
+        "preview": "",
+        "skipped": False,
+        "error": None
+    }
+    
+    if not path.exists():
+        result["error"] = f"File not found: {path}"
+        return result
+    if file_ext not in INGEST_FILE_TYPES:
+        result["error"] = f"Unsupported file type: {file_ext}"
+        return result
+    if file_ext == '.pdf' and not PDF_AVAILABLE:
+        result["error"] = "ERROR: PyPDF2 not installed. Install with: pip install PyPDF2"
+        return result
+    
+    if checkpoints is None:
+        checkpoints = IngestCheckpoints()
+    started = time.perf_counter()
+    
+    content_hash = checkpoints.content_hash(str(path))
+    state = checkpoints.get(content_hash)
+    stat = path.stat()
+    books_index = load_index(BOOKS_INDEX_FILE)
+    if not state.get("book_id"):
+        # Adopt a book stored by store_book_knowledge under the older
+        # path-based id instead of storing it a second time
+        legacy_id = f"book_{get_book_hash(str(file_path))[:12]}"
+        legacy_file = book_content_path(legacy_id)
+        if legacy_id in books_index and legacy_file.exists():
+            checkpoints.update(content_hash, book_id=legacy_id, path=str(path), size=stat.st_size,
+                               mtime=stat.st_mtime, complete=True,
+                               chars=books_index[legacy_id].get("content_length", 0),
+                               bytes_written=legacy_file.stat().st_size)
+            state = checkpoints.get(content_hash)
+    book_id = state.get("book_id") or f"book_{content_hash[:12]}"
+    content_file = book_content_path(book_id)
+    result["book_id"] = book_id
+    
+    if state.get("complete") and content_file.exists() and book_id in books_index:
+        result.update(success=True, skipped=True, content_length=state.get("chars", 0),
+                      preview=_read_preview(content_file))
+        return result
+    
+    pages_done = state.get("pages_done", 0)
+    bytes_written = state.get("bytes_written", 0)
+    chars = state.get("chars", 0)
+    if not content_file.exists() or content_file.stat().st_size < bytes_written:
+        pages_done = bytes_written = chars = 0
+    
+    progress = {"book_id": book_id, "path": str(path), "size": stat.st_size,
+                "mtime": stat.st_mtime, "complete": False}
+    
+    try:
+        with open(content_file, 'ab') as out:
+            # Drop anything written after the last checkpoint
+            out.truncate(bytes_written)
+            if file_ext == '.pdf':
+                total_pages = _pdf_page_count(str(path))
+                ranges = iter_pdf_pages(str(path), pages_done, executor, pages_per_task,
+                                        max_in_flight, total_pages)
+            else:
+                total_pages = 1
+                ranges = _iter_document(path) if pages_done < total_pages else iter(())
+            
+            for end, texts in ranges:
+                chunk = "".join(text + PAGE_SEPARATOR for text in texts if text.strip())
+                data = chunk.encode('utf-8')
+                out.write(data)
+                out.flush()
+                result["pages"] += end - pages_done
+                pages_done, bytes_written, chars = end, bytes_written + len(data), chars + len(chunk)
+                checkpoints.update(content_hash, pages_done=pages_done, total_pages=total_pages,
+                                   bytes_written=bytes_written, chars=chars, **progress)
+        
+        preview = _read_preview(content_file)
+        register_book_knowledge(
+            book_id, str(path), path.stem, chars,
+            key_concepts=extract_key_concepts(preview),
+            code_examples=extract_code_examples(preview),
+            file_type=file_ext
+        )
+        progress["complete"] = True
+        checkpoints.update(content_hash, pages_done=pages_done, total_pages=total_pages,
+                           bytes_written=bytes_written, chars=chars, **progress)
+        result.update(success=True, content_length=chars, preview=preview)
+    except Exception as e:
+        result["error"] = f"ERROR ingesting {path.name}: {e}"
+        logger.error(result["error"])
+    
+    result["seconds"] = time.perf_counter() - started
+    if result["seconds"] > 0:
+        result["pages_per_sec"] = result["pages"] / result["seconds"]
+    logger.info(f"Ingested {path.name}: {result['pages']} pages in {result['seconds']:.1f}s "
+                f"({result['pages_per_sec']:.1f} pages/sec)")
+    return result
+
+
+def ingest_books(file_paths: Iterable[str], workers: Optional[int] = None,
+                 checkpoints: Optional[IngestCheckpoints] = None,
+                 pages_per_task: int = PAGES_PER_TASK) -> Dict[str, Any]:
+    """
+    Ingest several books, sharing one process pool for PDF page extraction
+    
+    Args:
+        file_paths: Books to ingest, in order
+        workers: Extraction processes (defaults to the CPU count; 1 extracts inline)
+        checkpoints: Progress store (defaults to knowledge_base/ingest_checkpoints.json)
+        pages_per_task: Pages each worker extracts per task
+        
+    Returns:
+        Dict with per-book 'books' results plus total 'pages', 'seconds' and 'pages_per_sec'
+    """
+    file_paths = [str(p) for p in file_paths]
+    if checkpoints is None:
+        checkpoints = IngestCheckpoints()
+    workers = workers or os.cpu_count() or 1
+    
+    use_pool = workers > 1 and PDF_AVAILABLE and any(p.lower().endswith('.pdf') for p in file_paths)
+    executor = ProcessPoolExecutor(max_workers=workers) if use_pool else None
+    started = time.perf_counter()
+    results = []
+    try:
+        for file_path in file_paths:
+            results.append(ingest_book(file_path, checkpoints, executor, pages_per_task,
+                                       max_in_flight=2 * workers))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    
+    seconds = time.perf_counter() - started
+    pages = sum(r["pages"] for r in results)
+    pages_per_sec = pages / seconds if seconds > 0 else 0.0
+    logger.info(f"Ingested {len(results)} book(s): {pages} pages in {seconds:.1f}s "
+                f"({pages_per_sec:.1f} pages/sec, {workers} worker(s))")
+    return {
+        "books": results,
+        "pages": pages,
+        "seconds": seconds,
+        "pages_per_sec": pages_per_sec,
+        "workers": workers
+    }
+
+
 def handle_book_review_request(text: str, directory: str = None, incremental: bool = True, max_books: int = 5) -> Dict[str, Any]:
     """
     Handle a request to review books
@@ -340,7 +640,6 @@ def handle_book_review_request(text: str, directory: str = None, incremental: bo
     # Import knowledge base
     try:
         from core.knowledge_base import (
-            store_book_knowledge, extract_key_concepts, extract_code_examples,
             get_book_hash, load_index, BOOKS_INDEX_FILE, get_knowledge_summary
         )
         KNOWLEDGE_BASE_AVAILABLE = True
@@ -358,15 +657,17 @@ def handle_book_review_request(text: str, directory: str = None, incremental: bo
             "summaries": []
         }
     
-    # Check which books have been processed
+    # Check which books have been processed (checkpointed by content hash,
+    # or stored under the older path-based id)
     processed_books = {}
+    checkpoints = None
     if KNOWLEDGE_BASE_AVAILABLE:
+        checkpoints = IngestCheckpoints()
         books_index = load_index(BOOKS_INDEX_FILE)
         for book_info in books:
-            book_hash = get_book_hash(book_info["path"])
-            book_id = f"book_{book_hash[:12]}"
-            if book_id in books_index:
-                processed_books[book_info["path"]] = books_index[book_id]
+            legacy_id = f"book_{get_book_hash(book_info['path'])[:12]}"
+            if checkpoints.is_complete(book_info["path"]) or legacy_id in books_index:
+                processed_books[book_info["path"]] = books_index.get(legacy_id, {})
     
     # If incremental, only process new books or limit to max_books
     # Sort by size (process smaller books first to avoid timeouts)
@@ -390,61 +691,58 @@ def handle_book_review_request(text: str, directory: str = None, incremental: bo
         response_parts.append(f"Already processed: {len(processed_books)}. ")
     response_parts.append(f"Processing: {len(books_to_process)} book(s):\n\n")
     
-    for i, book_info in enumerate(books_to_process, 1):
+    # Stream books into the knowledge base (pages extracted across a process
+    # pool); without a knowledge base just read them for the summary
+    ingested = None
+    if KNOWLEDGE_BASE_AVAILABLE:
+        ingested = ingest_books([b["path"] for b in books_to_process], checkpoints=checkpoints)
+        outcomes = ingested["books"]
+    else:
+        outcomes = []
+        for book_info in books_to_process:
+            book_data = read_book(book_info['path'])
+            book_data.update(preview=book_data['content'][:PREVIEW_CHARS], book_id=None, pages=0)
+            outcomes.append(book_data)
+    
+    for i, (book_info, outcome) in enumerate(zip(books_to_process, outcomes), 1):
         response_parts.append(f"**{i}. {book_info['name']}** ({book_info['type']})\n")
         response_parts.append(f"   Size: {book_info['size']:,} bytes\n")
         
-        # Read the book (with timeout protection for large files)
-        try:
-            book_data = read_book(book_info['path'])
-        except Exception as e:
-            logger.error(f"Error reading {book_info['name']}: {e}")
-            response_parts.append(f"   ❌ Error reading file: {str(e)}\n\n")
-            continue
-        
-        if book_data['success']:
+        if outcome['success']:
             reviewed_count += 1
-            content = book_data['content']
-            summary = summarize_book(content, max_length=1500)
+            preview = outcome['preview']
+            summary = summarize_book(preview, max_length=1500)
             
             # Extract key insights (first 500 chars)
-            key_insights = content[:500] if len(content) > 500 else content
-            
-            # Store in knowledge base if available (only store first 50KB to avoid memory issues)
-            book_id = None
-            if KNOWLEDGE_BASE_AVAILABLE:
-                try:
-                    # Limit content size for storage (keep full content in file, but limit processing)
-                    content_for_storage = content[:50000] if len(content) > 50000 else content
-                    key_concepts = extract_key_concepts(content_for_storage)
-                    code_examples = extract_code_examples(content_for_storage)
-                    book_id = store_book_knowledge(
-                        book_info["path"],
-                        book_data['title'],
-                        content,  # Store full content in file
-                        key_concepts=key_concepts,
-                        code_examples=code_examples,
-                        file_type=book_data['file_type']
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to store book in knowledge base: {e}")
+            key_insights = preview[:500]
+            book_id = outcome['book_id']
             
             summaries.append({
-                "title": book_data['title'],
-                "file_type": book_data['file_type'],
-                "content_length": book_data['content_length'],
+                "title": outcome['title'],
+                "file_type": outcome['file_type'],
+                "content_length": outcome['content_length'],
                 "summary": summary,
                 "key_insights": key_insights,
                 "book_id": book_id
             })
             
-            response_parts.append(f"   [OK] Successfully read and stored ({book_data['content_length']:,} characters)\n")
+            response_parts.append(f"   [OK] Successfully read and stored ({outcome['content_length']:,} characters)\n")
+            if outcome.get('skipped'):
+                response_parts.append("   [CACHED] Already ingested, skipped extraction\n")
+            elif outcome['pages']:
+                response_parts.append(f"   [PAGES] {outcome['pages']:,} pages at {outcome['pages_per_sec']:.1f} pages/sec\n")
             if book_id:
                 response_parts.append(f"   [STORED] In knowledge base: {book_id}\n")
             response_parts.append(f"   **Key Content:**\n")
             response_parts.append(f"   {key_insights[:300]}...\n\n")
         else:
-            response_parts.append(f"   [ERROR] {book_data.get('error', 'Unknown error')}\n\n")
+            response_parts.append(f"   [ERROR] {outcome.get('error') or 'Unknown error'}\n\n")
+    
+    if ingested and ingested["pages"]:
+        response_parts.append(
+            f"\n**THROUGHPUT:** {ingested['pages']:,} pages in {ingested['seconds']:.1f}s "
+            f"({ingested['pages_per_sec']:.1f} pages/sec, {ingested['workers']} worker(s))\n"
+        )
     
     response_parts.append(f"\n**REVIEW COMPLETE:** Reviewed {reviewed_count} of {len(books)} book(s).\n")
     
@@ -462,7 +760,8 @@ def handle_book_review_request(text: str, directory: str = None, incremental: bo
         "books_reviewed": reviewed_count,
         "summaries": summaries,
         "source": "book_reader",
-        "incremental_mode": incremental
+        "incremental_mode": incremental,
+        "pages_per_sec": ingested["pages_per_sec"] if ingested else 0.0
     }
 
 
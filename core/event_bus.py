@@ -5,64 +5,370 @@ Plugins can subscribe to events and publish messages
 """
 
 import asyncio
-from collections import defaultdict
-from typing import Callable, Dict, List, Any, Optional
+import bisect
+import inspect
 import logging
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Any, Optional
+
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+OVERFLOW_POLICIES = {DROP_OLDEST, DROP_NEWEST, BLOCK}
+
+
+class _TopicIndex:
+    """Ascending offsets of one topic's retained events (head pointer instead of list pops)"""
+
+    __slots__ = ("offsets", "head")
+
+    def __init__(self):
+        self.offsets: List[int] = []
+        self.head = 0
+
+    def __len__(self) -> int:
+        return len(self.offsets) - self.head
+
+    def append(self, offset: int):
+        self.offsets.append(offset)
+
+    def popleft(self):
+        self.head += 1
+        if self.head > 64 and self.head * 2 > len(self.offsets):
+            del self.offsets[:self.head]
+            self.head = 0
+
+    def since(self, offset: int) -> List[int]:
+        return self.offsets[bisect.bisect_left(self.offsets, offset, self.head):]
+
+    def last(self, limit: int) -> List[int]:
+        return self.offsets[max(self.head, len(self.offsets) - limit):]
+
+
+class EventLog:
+    """
+    Bounded ring buffer of events. Every event gets a monotonically
+    increasing offset; per-topic offset indexes make topic history and
+    replay-since-offset queries proportional to the result, not the log.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = max(1, capacity)
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        self._topics: Dict[str, _TopicIndex] = {}
+        self.next_offset = 0
+        self._cleared_at = 0
+
+    def __len__(self) -> int:
+        return self.next_offset - self.first_offset
+
+    @property
+    def first_offset(self) -> int:
+        """Offset of the oldest retained event"""
+        return max(self._cleared_at, self.next_offset - self.capacity)
+
+    def append(self, event: Dict[str, Any]) -> int:
+        offset = self.next_offset
+        slot = offset % self.capacity
+        evicted = self._slots[slot]
+        if evicted is not None:
+            index = self._topics[evicted["topic"]]
+            index.popleft()
+            if not index:
+                del self._topics[evicted["topic"]]
+        event["offset"] = offset
+        self._slots[slot] = event
+        self._topics.setdefault(event["topic"], _TopicIndex()).append(offset)
+        self.next_offset += 1
+        return offset
+
+    def since(self, offset: int, topic: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retained events with offset >= `offset`, oldest first"""
+        if topic is None:
+            offsets = range(max(offset, self.first_offset), self.next_offset)
+        else:
+            index = self._topics.get(topic)
+            offsets = index.since(offset) if index else []
+        if limit is not None:
+            offsets = offsets[:limit]
+        return [self._slots[o % self.capacity] for o in offsets]
+
+    def tail(self, topic: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent `limit` events, oldest first"""
+        if limit <= 0:
+            return []
+        if topic is None:
+            offsets = range(max(self.first_offset, self.next_offset - limit), self.next_offset)
+        else:
+            index = self._topics.get(topic)
+            offsets = index.last(limit) if index else []
+        return [self._slots[o % self.capacity] for o in offsets]
+
+    def clear(self):
+        self._slots = [None] * self.capacity
+        self._topics = {}
+        self._cleared_at = self.next_offset
+
+
+class Subscription:
+    """
+    One subscriber's bounded delivery queue and its worker.
+
+    Async callbacks are awaited in order on the event loop; sync callbacks
+    receive queued events in batches on the bus's shared thread pool. When
+    the queue is full, `policy` decides: "block" makes publishers wait
+    (up to `block_timeout`, after which the event is dropped), "drop_oldest"
+    evicts the oldest queued event, "drop_newest" discards the new one.
+    """
+
+    def __init__(self, bus: "EventBus", topic: str, callback: Callable, max_queue: int = 1000,
+                 policy: str = BLOCK, block_timeout: Optional[float] = None, batch_size: int = 64):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.bus = bus
+        self.topic = topic
+        self.callback = callback
+        self.is_async = inspect.iscoroutinefunction(callback)
+        self.max_queue = max(1, max_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = max(1, batch_size)
+        self.active = True
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._space: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.in_flight = 0
+        self.last_offset = -1
+        self.total_latency = 0.0
+
+    # ------------------------------------------------------------------ #
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._space = asyncio.Event()
+            self._idle = asyncio.Event()
+            if not self._queue:
+                self._idle.set()
+            self._task = None
+        return loop
+
+    def _ensure_worker(self):
+        loop = self._bind_loop()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    async def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Queue an event for delivery; False if it was dropped"""
+        self._bind_loop()
+        if len(self._queue) >= self.max_queue:
+            if self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return False
+            if self.policy == DROP_OLDEST:
+                self._queue.popleft()
+                self.dropped += 1
+            else:
+                deadline = None if self.block_timeout is None else self._loop.time() + self.block_timeout
+                while len(self._queue) >= self.max_queue:
+                    self._space.clear()
+                    remaining = None if deadline is None else deadline - self._loop.time()
+                    if remaining is not None and remaining <= 0:
+                        self.dropped += 1
+                        return False
+                    try:
+                        await asyncio.wait_for(self._space.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+        self._queue.append(event)
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._idle.clear()
+        self._ensure_worker()
+        return True
+
+    async def _run(self):
+        # runs only while there is work, so short-lived loops (one per
+        # query in fame_simple) can close without pending workers
+        loop = asyncio.get_running_loop()
+        while self._queue:
+            # async callbacks take one event at a time so the queue bound
+            # (and its drop policy) governs everything not yet started
+            count = 1 if self.is_async else min(len(self._queue), self.batch_size)
+            batch = [self._queue.popleft() for _ in range(count)]
+            self.in_flight = count
+            self._space.set()
+            if self.is_async:
+                for event in batch:
+                    try:
+                        await self.callback(event["payload"])
+                    except Exception as e:
+                        self.errors += 1
+                        logging.error(f"[EventBus] Error in callback for {self.topic}: {e}")
+            else:
+                self.errors += await loop.run_in_executor(
+                    self.bus._get_executor(), _deliver_batch, self.callback, self.topic, batch
+                )
+            now = loop.time()
+            self.in_flight = 0
+            self.delivered += len(batch)
+            self.last_offset = batch[-1]["offset"]
+            self.total_latency += sum(now - event["timestamp"] for event in batch)
+        self._idle.set()
+
+    async def join(self):
+        """Wait until everything queued so far has been delivered"""
+        if self._idle is not None and self._loop is asyncio.get_running_loop():
+            await self._idle.wait()
+
+    def close(self):
+        self.active = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "topic": self.topic,
+            "callback": getattr(self.callback, "__qualname__", repr(self.callback)),
+            "policy": self.policy,
+            "queue_depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "lag": len(self._queue) + self.in_flight,
+            "lag_seconds": (self._loop.time() - self._queue[0]["timestamp"]) if self._queue and self._loop else 0.0,
+            "last_offset": self.last_offset,
+            "avg_latency_ms": (self.total_latency / self.delivered * 1000.0) if self.delivered else 0.0,
+        }
+
+
+def _deliver_batch(callback: Callable, topic: str, batch: List[Dict[str, Any]]) -> int:
+    """Run a sync callback over a batch in one executor hop; returns the error count"""
+    errors = 0
+    for event in batch:
+        try:
+            callback(event["payload"])
+        except Exception as e:
+            errors += 1
+            logging.error(f"[EventBus] Error in callback for {topic}: {e}")
+    return errors
 
 
 class EventBus:
     """Asynchronous event bus for module-to-module communication"""
-    
-    def __init__(self):
-        self._subscribers: Dict[str, List[Callable[[Any], Any]]] = defaultdict(list)
-        self._event_log: List[Dict[str, Any]] = []
-        self.max_log_size = 1000
-    
-    def subscribe(self, topic: str, callback: Callable):
+
+    def __init__(self, max_log_size: int = 1000, max_queue: int = 1000, policy: str = BLOCK,
+                 executor_workers: int = 4):
+        self._subscribers: Dict[str, List[Subscription]] = defaultdict(list)
+        self._event_log = EventLog(max_log_size)
+        self._topic_offsets: Dict[str, int] = {}
+        self.max_log_size = max_log_size
+        self.max_queue = max_queue
+        self.policy = policy
+        self.executor_workers = executor_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="event-bus")
+        return self._executor
+
+    def subscribe(self, topic: str, callback: Callable, max_queue: Optional[int] = None,
+                  policy: Optional[str] = None, block_timeout: Optional[float] = None,
+                  batch_size: int = 64) -> Subscription:
         """Subscribe a callback to a topic"""
-        self._subscribers[topic].append(callback)
+        subscription = Subscription(
+            self, topic, callback,
+            max_queue=max_queue or self.max_queue,
+            policy=policy or self.policy,
+            block_timeout=block_timeout,
+            batch_size=batch_size,
+        )
+        self._subscribers[topic].append(subscription)
         logging.debug(f"[EventBus] Subscribed to topic: {topic}")
-    
-    async def publish(self, topic: str, payload: Any, source: str = "system"):
-        """Publish an event to all subscribers"""
-        # Log event
-        self._event_log.append({
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering to a subscription (queued events are discarded)"""
+        subscribers = self._subscribers.get(subscription.topic, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+        subscription.close()
+
+    async def publish(self, topic: str, payload: Any, source: str = "system", wait: bool = False) -> int:
+        """
+        Publish an event: log it and queue it for every subscriber of the
+        topic. Returns the event offset; with `wait`, also waits until the
+        subscribers have processed everything queued so far.
+        """
+        event = {
             'topic': topic,
             'payload': payload,
             'source': source,
-            'timestamp': asyncio.get_event_loop().time()
-        })
-        
-        # Keep log size manageable
-        if len(self._event_log) > self.max_log_size:
-            self._event_log = self._event_log[-self.max_log_size:]
-        
-        # Notify subscribers
-        if topic not in self._subscribers:
-            return
-        
-        tasks = []
-        for callback in self._subscribers[topic]:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    tasks.append(callback(payload))
-                else:
-                    # Run sync callbacks in thread
-                    tasks.append(asyncio.to_thread(callback, payload))
-            except Exception as e:
-                logging.error(f"[EventBus] Error in callback for {topic}: {e}")
-        
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-    
+            'timestamp': asyncio.get_running_loop().time()
+        }
+        offset = self._event_log.append(event)
+        self._topic_offsets[topic] = offset
+
+        subscribers = self._subscribers.get(topic)
+        if subscribers:
+            for subscription in list(subscribers):
+                await subscription.enqueue(event)
+            if wait:
+                await asyncio.gather(*(subscription.join() for subscription in subscribers))
+        return offset
+
+    async def drain(self):
+        """Wait until every subscriber has processed its queue"""
+        await asyncio.gather(*(
+            subscription.join()
+            for subscribers in self._subscribers.values()
+            for subscription in subscribers
+        ))
+
+    async def close(self):
+        """Stop delivery workers and the shared executor"""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def topic_offset(self, topic: str) -> int:
+        """Offset of the latest event published on a topic (-1 if none)"""
+        return self._topic_offsets.get(topic, -1)
+
+    @property
+    def latest_offset(self) -> int:
+        return self._event_log.next_offset - 1
+
+    def replay_since(self, offset: int, topic: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Retained events at or after `offset`, optionally for one topic"""
+        return self._event_log.since(offset, topic, limit)
+
     def get_event_history(self, topic: Optional[str] = None, limit: int = 100) -> List[Dict]:
         """Get event history, optionally filtered by topic"""
-        history = self._event_log
-        if topic:
-            history = [e for e in history if e['topic'] == topic]
-        return history[-limit:]
-    
+        return self._event_log.tail(topic, limit)
+
+    def subscriber_metrics(self) -> List[Dict[str, Any]]:
+        """Queue depth, drops, errors, lag (undelivered events, age of the oldest) and latency per subscriber"""
+        return [
+            subscription.metrics()
+            for subscribers in self._subscribers.values()
+            for subscription in subscribers
+        ]
+
     def clear_history(self):
         """Clear event history"""
-        self._event_log = []
-
+        self._event_log.clear()
@@ -4,15 +4,43 @@ FAME AGI - Dual-Core Execution Governor
 Smart fallback logic with latency prediction, GPU/CPU detection, and mode switching
 """
 
+import asyncio
 import logging
+import math
 import time
 import psutil
-from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Any, List, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
 
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = Gauge = Histogram = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+if Histogram is not None:
+    EXECUTOR_LATENCY = Histogram(
+        "execution_governor_latency_seconds",
+        "Observed executor latency",
+        ["executor", "intent", "complexity"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0),
+    )
+    EXECUTOR_LATENCY_QUANTILE = Gauge(
+        "execution_governor_latency_quantile_seconds",
+        "Streaming latency quantile estimate per executor",
+        ["executor", "intent", "complexity", "quantile"],
+    )
+    HEDGED_REQUESTS = Counter(
+        "execution_governor_hedged_total",
+        "Hedged executions by primary executor and winning executor",
+        ["primary", "winner"],
+    )
+else:  # pragma: no cover - optional dependency
+    EXECUTOR_LATENCY = EXECUTOR_LATENCY_QUANTILE = HEDGED_REQUESTS = None
+
 
 class ExecutionMode(Enum):
     """Execution mode types"""
@@ -30,6 +58,63 @@ class ExecutionDecision:
     confidence: float
     reasoning: str
     fallback_chain: List[str]
+    hedge_after: Optional[float] = None  # seconds before firing the first fallback
+
+
+class LatencyHistogram:
+    """
+    Streaming quantile estimator over log-spaced buckets (HDR-histogram style).
+
+    Every bucket spans a fixed relative width, so quantiles carry a bounded
+    relative error regardless of scale and memory stays O(buckets). Counts
+    are halved every ``decay_every`` samples so the estimate tracks drift.
+    """
+
+    def __init__(self, min_value: float = 0.001, max_value: float = 600.0,
+                 relative_error: float = 0.02, decay_every: int = 1000):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self.gamma)
+        self.decay_every = decay_every
+        self.counts: Dict[int, float] = {}
+        self.total = 0.0
+        self.samples = 0
+        self._since_decay = 0
+
+    def _index(self, value: float) -> int:
+        value = min(max(value, self.min_value), self.max_value)
+        return int(math.ceil(math.log(value / self.min_value) / self._log_gamma))
+
+    def _value(self, index: int) -> float:
+        # midpoint of the bucket in log space
+        return self.min_value * self.gamma ** (index - 0.5) if index > 0 else self.min_value
+
+    def record(self, value: float) -> None:
+        idx = self._index(value)
+        self.counts[idx] = self.counts.get(idx, 0.0) + 1.0
+        self.total += 1.0
+        self.samples += 1
+        self._since_decay += 1
+        if self._since_decay >= self.decay_every:
+            self._decay()
+
+    def _decay(self) -> None:
+        self.counts = {k: v / 2 for k, v in self.counts.items() if v / 2 >= 0.01}
+        self.total = sum(self.counts.values())
+        self._since_decay = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.total <= 0:
+            return None
+        target = q * self.total
+        running = 0.0
+        for idx in sorted(self.counts):
+            running += self.counts[idx]
+            if running >= target:
+                return self._value(idx)
+        return self._value(max(self.counts))
+
 
 
 class ExecutionGovernor:
@@ -47,8 +132,16 @@ class ExecutionGovernor:
         self.cpu_count = psutil.cpu_count()
         self.memory_gb = psutil.virtual_memory().total / (1024**3)
         
-        # Latency tracking
-        self.latency_history: Dict[str, List[float]] = {}
+        # Latency tracking: recent raw samples per executor plus streaming
+        # quantile models keyed by (executor, intent, complexity bucket)
+        self.latency_history: Dict[str, Deque[float]] = {}
+        self.latency_models: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self.executor_models: Dict[str, LatencyHistogram] = {}
+        execution_cfg = config.get("execution", {})
+        self.min_model_samples = execution_cfg.get("min_latency_samples", 20)
+        self.hedging_enabled = execution_cfg.get("hedging", True)
+        self.hedge_quantile = execution_cfg.get("hedge_quantile", 0.95)
+        self.hedge_stats = {"hedged": 0, "fallback_wins": 0}
         
         # Preference settings
         self.cloud_preference = config.get("execution", {}).get("prefer_cloud", True)
@@ -80,7 +173,10 @@ class ExecutionGovernor:
         fallback_chain = executors[1:]
         
         # Predict latency
-        expected_latency = self._predict_latency(primary_executor, complexity)
+        expected_latency = self._predict_latency(primary_executor, complexity, intent)
+        hedge_after = None
+        if self.hedging_enabled and fallback_chain:
+            hedge_after = self.predict_quantile(primary_executor, self.hedge_quantile, intent, complexity)
         
         # Estimate confidence
         confidence = self._estimate_confidence(primary_executor, intent, complexity)
@@ -93,7 +189,8 @@ class ExecutionGovernor:
             expected_latency=expected_latency,
             confidence=confidence,
             reasoning=reasoning,
-            fallback_chain=fallback_chain
+            fallback_chain=fallback_chain,
+            hedge_after=hedge_after
         )
     
     def _build_executor_chain(self, intent: str, complexity: int, mode: ExecutionMode,
@@ -139,8 +236,41 @@ class ExecutionGovernor:
         
         return chain
     
-    def _predict_latency(self, executor: str, complexity: int) -> float:
+    @staticmethod
+    def _complexity_bucket(complexity: Optional[int]) -> str:
+        """Bucket complexity on the same thresholds used for mode selection"""
+        if complexity is None:
+            return "any"
+        if complexity < 3:
+            return "low"
+        if complexity > 7:
+            return "high"
+        return "mid"
+
+    def _model_for(self, executor: str, intent: Optional[str],
+                   complexity: Optional[int]) -> Optional[LatencyHistogram]:
+        """Most specific latency model with enough samples to trust"""
+        model = self.latency_models.get((executor, intent or "any", self._complexity_bucket(complexity)))
+        if model is not None and model.samples >= self.min_model_samples:
+            return model
+        model = self.executor_models.get(executor)
+        if model is not None and model.samples >= self.min_model_samples:
+            return model
+        return None
+
+    def predict_quantile(self, executor: str, q: float, intent: Optional[str] = None,
+                         complexity: Optional[int] = None) -> Optional[float]:
+        """Streaming latency quantile estimate, or None while the model is cold"""
+        model = self._model_for(executor, intent, complexity)
+        return model.quantile(q) if model else None
+
+    def _predict_latency(self, executor: str, complexity: int, intent: Optional[str] = None) -> float:
         """Predict execution latency"""
+        # Learned median once enough samples exist for this context
+        p50 = self.predict_quantile(executor, 0.5, intent, complexity)
+        if p50 is not None:
+            return p50
+
         # Base latencies (seconds)
         base_latencies = {
             "local_llm": 0.5,
@@ -194,21 +324,37 @@ class ExecutionGovernor:
         
         return min(1.0, confidence)
     
-    def record_latency(self, executor: str, latency: float):
+    def record_latency(self, executor: str, latency: float, intent: Optional[str] = None,
+                       complexity: Optional[int] = None):
         """Record actual latency for future predictions"""
         if executor not in self.latency_history:
-            self.latency_history[executor] = []
+            self.latency_history[executor] = deque(maxlen=100)
         self.latency_history[executor].append(latency)
-        
-        # Keep only recent history
-        if len(self.latency_history[executor]) > 100:
-            self.latency_history[executor] = self.latency_history[executor][-100:]
+
+        bucket = self._complexity_bucket(complexity)
+        key = (executor, intent or "any", bucket)
+        model = self.latency_models.get(key)
+        if model is None:
+            model = self.latency_models[key] = LatencyHistogram()
+        model.record(latency)
+        self.executor_models.setdefault(executor, LatencyHistogram()).record(latency)
+
+        if EXECUTOR_LATENCY is not None:
+            EXECUTOR_LATENCY.labels(executor=executor, intent=key[1], complexity=bucket).observe(latency)
+            for q in (0.5, 0.95, 0.99):
+                value = model.quantile(q)
+                if value is not None:
+                    EXECUTOR_LATENCY_QUANTILE.labels(
+                        executor=executor, intent=key[1], complexity=bucket, quantile=str(q)
+                    ).set(value)
     
     def should_fallback(self, executor: str, elapsed_time: float, 
-                       expected_latency: float) -> bool:
+                       expected_latency: float, intent: Optional[str] = None,
+                       complexity: Optional[int] = None) -> bool:
         """Determine if should fallback to next executor"""
-        # Fallback if taking too long
-        if elapsed_time > expected_latency * 2:
+        # Fallback once past the learned p99, or twice the estimate while cold
+        p99 = self.predict_quantile(executor, 0.99, intent, complexity)
+        if elapsed_time > (p99 if p99 is not None else expected_latency * 2):
             return True
         
         # Fallback if timeout exceeded
@@ -218,6 +364,84 @@ class ExecutionGovernor:
         
         return False
     
+    async def execute_hedged(self, decision: ExecutionDecision,
+                             runners: Dict[str, Callable[[], Awaitable[Any]]],
+                             intent: Optional[str] = None,
+                             complexity: Optional[int] = None) -> Tuple[str, Any]:
+        """
+        Run the primary executor and hedge with the first fallback.
+
+        The fallback is fired in parallel once the primary passes
+        ``decision.hedge_after`` (its predicted p95) or fails outright.
+        Whichever finishes first successfully wins; the other is cancelled.
+        A cancelled executor's elapsed time is recorded as a (censored)
+        sample, otherwise losing slow calls would drag the learned p95 down.
+        Everything is bounded by the executors' timeouts. Returns
+        ``(executor, result)``.
+        """
+        primary = decision.executor
+        hedge = next((name for name in decision.fallback_chain if name in runners and name != primary), None)
+        loop = asyncio.get_running_loop()
+        timeout = self._get_timeout(primary)
+        deadline = loop.time() + timeout
+
+        async def timed(name: str) -> Any:
+            start = time.perf_counter()
+            try:
+                result = await runners[name]()
+            except asyncio.CancelledError:
+                # at least this slow: record the censored latency
+                self.record_latency(name, time.perf_counter() - start, intent, complexity)
+                raise
+            self.record_latency(name, time.perf_counter() - start, intent, complexity)
+            return result
+
+        tasks: Dict[asyncio.Task, str] = {asyncio.ensure_future(timed(primary)): primary}
+        hedge_after = timeout
+        if hedge and decision.hedge_after is not None:
+            hedge_after = min(decision.hedge_after, timeout)
+
+        errors: Dict[str, BaseException] = {}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            for task in done:
+                if task.exception() is None:
+                    return tasks[task], task.result()
+                errors[tasks[task]] = task.exception()
+                del tasks[task]
+
+            if hedge:
+                # primary is slow or failed: race the first fallback
+                tasks[asyncio.ensure_future(timed(hedge))] = hedge
+                deadline = max(deadline, loop.time() + self._get_timeout(hedge))
+                self.hedge_stats["hedged"] += 1
+
+            while tasks:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks.pop(task)
+                    if task.exception() is not None:
+                        errors[name] = task.exception()
+                        continue
+                    if name != primary:
+                        self.hedge_stats["fallback_wins"] += 1
+                    if HEDGED_REQUESTS is not None and hedge:
+                        HEDGED_REQUESTS.labels(primary=primary, winner=name).inc()
+                    return name, task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                # let cancelled executors record their censored latency
+                await asyncio.wait(list(tasks), timeout=1.0)
+
+        if errors:
+            raise next(iter(errors.values()))
+        raise asyncio.TimeoutError(f"{primary} and hedge {hedge} exceeded their timeouts")
+
     def _get_timeout(self, executor: str) -> float:
         """Get timeout for executor"""
         timeouts = {
@@ -264,6 +488,11 @@ class ExecutionGovernor:
             "cpu_count": self.cpu_count,
             "memory_gb": self.memory_gb,
             "avg_latencies": avg_latencies,
+            "latency_quantiles": {
+                executor: {q: model.quantile(q) for q in (0.5, 0.95, 0.99)}
+                for executor, model in self.executor_models.items()
+            },
+            "hedging": dict(self.hedge_stats),
             "cloud_preference": self.cloud_preference,
             "local_preference": self.local_preference
         }
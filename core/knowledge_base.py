@@ -10,6 +10,8 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+from core.knowledge_search import get_search_index
+
 KNOWLEDGE_BASE_DIR = Path(__file__).parent.parent / "knowledge_base"
 KNOWLEDGE_BASE_DIR.mkdir(exist_ok=True)
 
@@ -42,6 +44,11 @@ def save_index(filename: Path, data: Dict[str, Any]):
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 
+def book_content_path(book_id: str) -> Path:
+    """Path of the full-text file the search index reads for a book"""
+    return KNOWLEDGE_BASE_DIR / f"{book_id}_content.txt"
+
+
 def store_book_knowledge(book_path: str, title: str, content: str, 
                          key_concepts: List[str] = None, 
                          code_examples: List[str] = None,
@@ -55,29 +62,46 @@ def store_book_knowledge(book_path: str, title: str, content: str,
     book_hash = get_book_hash(book_path)
     book_id = f"book_{book_hash[:12]}"
     
-    # Load existing index
-    books_index = load_index(BOOKS_INDEX_FILE)
-    
     # Check if already processed
-    if book_id in books_index:
+    if book_id in load_index(BOOKS_INDEX_FILE):
         return book_id
     
+    # Store full content (chunked for large files)
+    with open(book_content_path(book_id), 'w', encoding='utf-8') as f:
+        f.write(content)
+    
+    return register_book_knowledge(book_id, book_path, title, len(content),
+                                   key_concepts=key_concepts,
+                                   code_examples=code_examples,
+                                   file_type=file_type)
+
+
+def register_book_knowledge(book_id: str, book_path: str, title: str, content_length: int,
+                            key_concepts: List[str] = None,
+                            code_examples: List[str] = None,
+                            file_type: str = "pdf") -> str:
+    """
+    Index a book whose content file has already been written
+    
+    Used directly by streaming ingestion, which appends to the content
+    file page by page and only registers the book once it is complete.
+    
+    Returns:
+        book_id
+    """
+    books_index = load_index(BOOKS_INDEX_FILE)
+    
     # Store book metadata
     books_index[book_id] = {
         "title": title,
         "path": book_path,
         "file_type": file_type,
         "processed_date": datetime.now().isoformat(),
-        "content_length": len(content),
+        "content_length": content_length,
         "key_concepts": key_concepts or [],
         "code_examples_count": len(code_examples) if code_examples else 0
     }
     
-    # Store full content (chunked for large files)
-    book_content_file = KNOWLEDGE_BASE_DIR / f"{book_id}_content.txt"
-    with open(book_content_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
     # Store code examples separately
     if code_examples:
         code_file = KNOWLEDGE_BASE_DIR / f"{book_id}_code.json"
@@ -89,6 +113,8 @@ def store_book_knowledge(book_path: str, title: str, content: str,
     for concept in (key_concepts or []):
         if concept not in knowledge_index:
             knowledge_index[concept] = []
+        if any(entry.get("book_id") == book_id for entry in knowledge_index[concept]):
+            continue
         knowledge_index[concept].append({
             "book_id": book_id,
             "title": title,
@@ -232,15 +258,35 @@ def extract_code_examples(content: str) -> List[str]:
     return code_examples[:50]  # Limit to 50 examples per book
 
 
+CONCEPT_MATCH_BOOST = 10.0
+TITLE_MATCH_BOOST = 3.0
+
+
 def search_knowledge_base(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
-    """Search knowledge base for relevant information"""
+    """
+    Search knowledge base for relevant information
+
+    Books are ranked by their best BM25 passage, boosted when one of their key
+    concepts appears in the query or a query word is in the title. Each
+    result carries its top ``passages`` with offsets into the content file.
+    """
+    index = get_search_index(KNOWLEDGE_BASE_DIR)
+    books_index = index.load_json(BOOKS_INDEX_FILE.name)
+    knowledge_index = index.load_json(KNOWLEDGE_INDEX_FILE.name)
     query_lower = query.lower()
-    
-    # Load indices
-    books_index = load_index(BOOKS_INDEX_FILE)
-    knowledge_index = load_index(KNOWLEDGE_INDEX_FILE)
-    
-    results = []
+    ranked: Dict[str, Dict[str, Any]] = {}
+
+    def entry(book_id: str, title: str) -> Dict[str, Any]:
+        if book_id not in ranked:
+            ranked[book_id] = {
+                "book_id": book_id,
+                "title": title,
+                "concept": None,
+                "relevance": "medium",
+                "score": 0.0,
+                "passages": [],
+            }
+        return ranked[book_id]
     
     # Search by concept
     for concept, book_refs in knowledge_index.items():
@@ -248,41 +294,47 @@ def search_knowledge_base(query: str, max_results: int = 5) -> List[Dict[str, An
             for book_ref in book_refs:
                 book_id = book_ref["book_id"]
                 if book_id in books_index:
-                    results.append({
-                        "book_id": book_id,
-                        "title": book_ref["title"],
-                        "concept": concept,
-                        "relevance": "high"
-                    })
+                    result = entry(book_id, book_ref["title"])
+                    result["concept"] = result["concept"] or concept
+                    result["relevance"] = "high"
+                    result["score"] += CONCEPT_MATCH_BOOST
     
     # Search by book title
+    title_words = [word for word in query_lower.split() if len(word) > 3]
     for book_id, book_info in books_index.items():
         title_lower = book_info["title"].lower()
-        if any(word in title_lower for word in query_lower.split() if len(word) > 3):
-            results.append({
-                "book_id": book_id,
-                "title": book_info["title"],
-                "concept": "title match",
-                "relevance": "medium"
-            })
-    
-    # Remove duplicates
-    seen = set()
-    unique_results = []
-    for result in results:
-        key = (result["book_id"], result["concept"])
-        if key not in seen:
-            seen.add(key)
-            unique_results.append(result)
-    
-    return unique_results[:max_results]
+        if any(word in title_lower for word in title_words):
+            result = entry(book_id, book_info["title"])
+            result["concept"] = result["concept"] or "title match"
+            result["score"] += TITLE_MATCH_BOOST
+    
+    # Search passages
+    for passage in index.search_passages(query, max_results=max_results * 3):
+        book_id = passage["book_id"]
+        title = books_index.get(book_id, {}).get("title", book_id)
+        result = entry(book_id, title)
+        result["concept"] = result["concept"] or "content match"
+        if not result["passages"]:
+            result["score"] += passage["score"]
+        result["passages"].append(passage)
+    
+    results = sorted(ranked.values(), key=lambda r: r["score"], reverse=True)
+    return results[:max_results]
+
+
+def search_passages(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+    """Ranked passages (book_id, offset, length, score, text) matching a query"""
+    return get_search_index(KNOWLEDGE_BASE_DIR).search_passages(query, max_results=max_results)
 
 
 def get_book_content(book_id: str) -> Optional[str]:
     """Retrieve full content of a book"""
+    content = get_search_index(KNOWLEDGE_BASE_DIR).get_text(book_id)
+    if content is not None:
+        return content
     book_content_file = KNOWLEDGE_BASE_DIR / f"{book_id}_content.txt"
     if book_content_file.exists():
-        with open(book_content_file, 'r', encoding='utf-8') as f:
+        with open(book_content_file, 'r', encoding='utf-8', newline='') as f:
             return f.read()
     return None
 
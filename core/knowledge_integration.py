@@ -23,6 +23,17 @@ def get_relevant_knowledge(query: str, max_results: int = 3) -> List[Dict[str, A
         knowledge_list = []
         
         for result in kb_results:
+            passages = result.get("passages") or []
+            if passages:
+                # Best-ranked passage from the search index
+                knowledge_list.append({
+                    "book_title": result["title"],
+                    "concept": result["concept"],
+                    "snippet": passages[0]["text"],
+                    "offset": passages[0]["offset"],
+                    "full_content_available": True
+                })
+                continue
             book_content = get_book_content(result["book_id"])
             if book_content:
                 # Find relevant snippet containing query terms
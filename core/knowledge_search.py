@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+FAME Knowledge Search - resident BM25 index over the knowledge base
+
+Book content files (``book_*_content.txt``) are split into passages and
+tokenized once into a per-book inverted index that stays in memory. Each
+search only stats the knowledge base directory, at most once per
+``check_interval``. Books whose file mtime or size changed are re-indexed;
+the rest are left alone.
+
+Query syntax:
+    plain terms        ranked with BM25
+    "quoted phrase"    passage must contain the words in order
+    prefix*            expands to every indexed term with that prefix
+
+Passages carry character offsets into their content file, so
+``get_book_content(book_id)[offset:offset + length]`` is the passage text.
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#]+|(?:[._][a-z0-9]+)*)")
+QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+CONTENT_SUFFIX = "_content.txt"
+# token boundaries matching TOKEN_RE (\b fails next to "+" / "#", as in "c++")
+TOKEN_START = r"(?<![a-z0-9])(?<![a-z0-9][._])"
+TOKEN_END = r"(?![a-z0-9+#]|[._][a-z0-9])"
+
+# dropped from free-text queries (not from the index or quoted phrases); they
+# match most passages and only cost scoring time
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "should the this to what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class _BookShard:
+    """Inverted index for the passages of one book."""
+    book_id: str
+    mtime_ns: int
+    size: int
+    text: str
+    starts: np.ndarray
+    ends: np.ndarray
+    lengths: np.ndarray  # tokens per passage
+    postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)  # term -> (passages, tf)
+
+
+class KnowledgeSearchIndex:
+    """
+    In-memory BM25 search over knowledge base passages.
+
+    Usage::
+
+        index = KnowledgeSearchIndex(KNOWLEDGE_BASE_DIR)
+        index.search_passages('"sql injection" prevent*', max_results=5)
+    """
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, directory: Path, passage_chars: int = 1200, check_interval: float = 2.0):
+        self.directory = Path(directory)
+        self.passage_chars = passage_chars
+        self.check_interval = check_interval
+        self._shards: Dict[str, _BookShard] = {}
+        self._doc_freq: Counter = Counter()
+        self._total_passages = 0
+        self._total_tokens = 0
+        self._vocabulary: List[str] = []
+        self._dirty = False
+        # merged view across books, rebuilt lazily after any re-index
+        self._book_order: List[str] = []
+        self._base: Dict[str, int] = {}
+        self._doc_book = np.zeros(0, dtype=np.int32)
+        self._doc_start = np.zeros(0, dtype=np.int64)
+        self._doc_end = np.zeros(0, dtype=np.int64)
+        self._doc_norm = np.zeros(0)
+        self._term_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._json_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+
+    # --- maintenance -------------------------------------------------------
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-index books whose content file changed since the last check."""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            seen = set()
+            try:
+                entries = list(os.scandir(self.directory))
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                if not entry.name.endswith(CONTENT_SUFFIX):
+                    continue
+                book_id = entry.name[: -len(CONTENT_SUFFIX)]
+                seen.add(book_id)
+                stat = entry.stat()
+                shard = self._shards.get(book_id)
+                if shard is None or shard.mtime_ns != stat.st_mtime_ns or shard.size != stat.st_size:
+                    self._replace_shard(book_id, self._build_shard(book_id, Path(entry.path), stat))
+            for book_id in [b for b in self._shards if b not in seen]:
+                self._replace_shard(book_id, None)
+
+    def _build_shard(self, book_id: str, path: Path, stat: os.stat_result) -> Optional[_BookShard]:
+        try:
+            # no newline translation: offsets must index the file as stored
+            with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+                text = f.read()
+        except OSError as e:
+            logger.warning(f"Could not index {path}: {e}")
+            return None
+        spans = self._split_passages(text)
+        starts = np.fromiter((s for s, _ in spans), dtype=np.int64, count=len(spans))
+        ends = np.fromiter((e for _, e in spans), dtype=np.int64, count=len(spans))
+        lengths = np.zeros(len(spans), dtype=np.float64)
+        collected: Dict[str, Tuple[List[int], List[int]]] = {}
+        for passage, (start, end) in enumerate(spans):
+            counts = Counter(tokenize(text[start:end]))
+            lengths[passage] = sum(counts.values())
+            for term, tf in counts.items():
+                docs, tfs = collected.setdefault(term, ([], []))
+                docs.append(passage)
+                tfs.append(tf)
+        postings = {
+            term: (np.asarray(docs, dtype=np.int32), np.asarray(tfs, dtype=np.float64))
+            for term, (docs, tfs) in collected.items()
+        }
+        return _BookShard(book_id, stat.st_mtime_ns, stat.st_size, text, starts, ends, lengths, postings)
+
+    def _split_passages(self, text: str) -> List[Tuple[int, int]]:
+        """Cut text into ~passage_chars spans, preferring paragraph then line then word breaks."""
+        spans = []
+        start, n = 0, len(text)
+        while start < n:
+            end = min(n, start + self.passage_chars)
+            if end < n:
+                window = text[start:end]
+                cut = max(window.rfind("\n\n"), window.rfind("\n"), window.rfind("\r"), window.rfind(" "))
+                if cut > self.passage_chars // 2:
+                    end = start + cut + 1
+            if text[start:end].strip():
+                spans.append((start, end))
+            start = end
+        return spans
+
+    def _replace_shard(self, book_id: str, shard: Optional[_BookShard]) -> None:
+        old = self._shards.pop(book_id, None)
+        if old is not None:
+            self._doc_freq.subtract({term: len(docs) for term, (docs, _) in old.postings.items()})
+            self._total_passages -= len(old.lengths)
+            self._total_tokens -= int(old.lengths.sum())
+        if shard is not None:
+            self._shards[book_id] = shard
+            self._doc_freq.update({term: len(docs) for term, (docs, _) in shard.postings.items()})
+            self._total_passages += len(shard.lengths)
+            self._total_tokens += int(shard.lengths.sum())
+        self._dirty = True
+
+    def _merge(self) -> None:
+        """Lay all books out in one global passage space."""
+        if not self._dirty:
+            return
+        self._book_order = list(self._shards)
+        self._base = {}
+        offset = 0
+        for book_id in self._book_order:
+            self._base[book_id] = offset
+            offset += len(self._shards[book_id].lengths)
+        shards = [self._shards[b] for b in self._book_order]
+        if shards:
+            self._doc_book = np.concatenate(
+                [np.full(len(shard.lengths), i, dtype=np.int32) for i, shard in enumerate(shards)]
+            )
+            self._doc_start = np.concatenate([shard.starts for shard in shards])
+            self._doc_end = np.concatenate([shard.ends for shard in shards])
+            lengths = np.concatenate([shard.lengths for shard in shards])
+        else:
+            lengths = np.zeros(0)
+            self._doc_book = np.zeros(0, dtype=np.int32)
+            self._doc_start = self._doc_end = np.zeros(0, dtype=np.int64)
+        avg_length = max(self._total_tokens / max(self._total_passages, 1), 1.0)
+        self._doc_norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+        self._doc_freq = +self._doc_freq  # drop terms that fell to zero
+        self._vocabulary = sorted(self._doc_freq)
+        self._term_cache.clear()
+        self._dirty = False
+
+    def _postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Global (passages, tf) for a term, merged from the books on first use."""
+        cached = self._term_cache.get(term)
+        if cached is None:
+            docs, tfs = [], []
+            for book_id in self._book_order:
+                posting = self._shards[book_id].postings.get(term)
+                if posting is not None:
+                    docs.append(posting[0] + self._base[book_id])
+                    tfs.append(posting[1])
+            if not docs:
+                return None
+            cached = self._term_cache[term] = (np.concatenate(docs), np.concatenate(tfs))
+        return cached
+
+    def load_json(self, name: str) -> Dict[str, Any]:
+        """A JSON index file from the knowledge base, re-read only when its mtime changes."""
+        path = self.directory / name
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        cached = self._json_cache.get(name)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    cached = (mtime, json.load(f))
+            except (OSError, ValueError):
+                cached = (mtime, {})
+            self._json_cache[name] = cached
+        return cached[1]
+
+    # --- querying ----------------------------------------------------------
+
+    def _expand_prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        lo = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[lo:]:
+            if not term.startswith(prefix) or len(terms) >= limit:
+                break
+            terms.append(term)
+        return terms
+
+    def parse_query(self, query: str) -> Tuple[List[str], List[List[str]]]:
+        """Split a query into scoring terms and required phrases."""
+        terms: List[str] = []
+        phrases: List[List[str]] = []
+        for phrase, word in QUERY_RE.findall(query.lower()):
+            if phrase:
+                tokens = tokenize(phrase)
+                if len(tokens) > 1:
+                    phrases.append(tokens)
+                terms.extend(tokens)
+            elif word.endswith("*") and len(word) > 2:
+                terms.extend(self._expand_prefix(word.rstrip("*")))
+            else:
+                terms.extend(t for t in tokenize(word) if t not in STOPWORDS)
+        return list(dict.fromkeys(terms)), phrases
+
+    def search_passages(self, query: str, max_results: int = 5,
+                        book_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Top passages by BM25, each with its book_id and character offset."""
+        self.refresh()
+        with self._lock:
+            self._merge()
+            terms, phrases = self.parse_query(query)
+            if not terms or not self._total_passages:
+                return []
+            scores = np.zeros(self._total_passages)
+            for term in terms:
+                posting = self._postings(term)
+                if posting is None:
+                    continue
+                docs, tf = posting
+                idf = math.log(1.0 + (self._total_passages - len(docs) + 0.5) / (len(docs) + 0.5))
+                scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + self._doc_norm[docs])
+
+            if book_ids is not None:
+                allowed = np.isin(self._doc_book, [self._book_order.index(b) for b in book_ids if b in self._base])
+                scores[~allowed] = 0.0
+            if phrases:
+                # a phrase can only match where all of its words occur
+                for phrase in phrases:
+                    postings = [self._postings(term) for term in phrase]
+                    if any(p is None for p in postings):
+                        return []
+                    required = np.zeros(self._total_passages, dtype=bool)
+                    common = postings[0][0]
+                    for docs, _ in postings[1:]:
+                        common = np.intersect1d(common, docs, assume_unique=True)
+                    required[common] = True
+                    scores[~required] = 0.0
+                phrase_res = [
+                    re.compile(TOKEN_START + r"\W+".join(re.escape(t) for t in phrase) + TOKEN_END, re.IGNORECASE)
+                    for phrase in phrases
+                ]
+            else:
+                phrase_res = []
+
+            hits = np.flatnonzero(scores)
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+            results = []
+            for passage in hits:
+                book_id = self._book_order[self._doc_book[passage]]
+                text = self._shards[book_id].text
+                start, end = int(self._doc_start[passage]), int(self._doc_end[passage])
+                # verify phrases lazily, best-scoring passages first
+                if phrase_res and not all(rx.search(text, start, end) for rx in phrase_res):
+                    continue
+                results.append({
+                    "book_id": book_id,
+                    "offset": start,
+                    "length": end - start,
+                    "score": float(scores[passage]),
+                    "text": text[start:end],
+                })
+                if len(results) >= max_results:
+                    break
+            return results
+
+    def get_text(self, book_id: str) -> Optional[str]:
+        """Resident content of a book, or None if it is not indexed."""
+        self.refresh()
+        shard = self._shards.get(book_id)
+        return shard.text if shard is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "books": len(self._shards),
+                "passages": self._total_passages,
+                "terms": len(self._doc_freq),
+                "tokens": self._total_tokens,
+            }
+
+
+_INDEXES: Dict[Path, KnowledgeSearchIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_search_index(directory: Path) -> KnowledgeSearchIndex:
+    """Process-wide index for a knowledge base directory."""
+    directory = Path(directory)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(directory)
+        if index is None:
+            index = _INDEXES[directory] = KnowledgeSearchIndex(directory)
+        return index
@@ -39,6 +39,8 @@ class ProductionLogger:
                 elastic_index=os.getenv("FAME_LOG_ELASTIC_INDEX", "fame-logs"),
                 splunk_url=os.getenv("FAME_LOG_SPLUNK_HEC"),
                 splunk_token=os.getenv("FAME_LOG_SPLUNK_TOKEN"),
+                batch_size=int(os.getenv("FAME_LOG_EXPORT_BATCH", "200")),
+                spill_dir=self.log_dir / "export_spill",
             )
             if exporter_config.elastic_url or (exporter_config.splunk_url and exporter_config.splunk_token):
                 self._log_exporter = LogExporter(self._aggregator, exporter_config)
@@ -763,7 +763,6 @@ This structure is easy to extend: add new functions and register them in the `op
         (r'([A-Z]{2,5})\s+cost', 'get_crypto_price'),  # "XRP cost"
     ]
     
-    import re
     for pattern, action in crypto_current_price_patterns:
         match = re.search(pattern, text, re.IGNORECASE)
         if match:
@@ -5,9 +5,13 @@ Stores last-known-good data for degraded mode fallback
 Production-grade caching with TTL and deterministic fallback
 """
 
+import heapq
+import json
 import logging
 import time
-from typing import Dict, Any, Optional
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
 from datetime import datetime, timezone
 
 # Try Redis for production, fallback to in-memory
@@ -17,30 +21,170 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
+# Faster encoders when installed; JSON is always available
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+class CacheSerializer:
+    """
+    Binary cache entry codec.
+
+    Entries are stored as ``[timestamp, ttl, data]`` behind a two-byte
+    header: the encoding (``m`` msgpack, ``j`` JSON) and the compression
+    (``-`` none, ``z`` zlib). Bodies of at least ``compress_threshold``
+    bytes are compressed. Values written by the previous JSON-object format
+    are still readable.
+    """
+
+    def __init__(self, compress_threshold: int = 1024, compress_level: int = 1,
+                 use_msgpack: Optional[bool] = None):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.use_msgpack = MSGPACK_AVAILABLE if use_msgpack is None else (use_msgpack and MSGPACK_AVAILABLE)
+
+    def dumps(self, timestamp: float, ttl: int, data: Any) -> bytes:
+        entry = [timestamp, ttl, data]
+        if self.use_msgpack:
+            encoding, body = b"m", msgpack.packb(entry, use_bin_type=True)
+        elif ORJSON_AVAILABLE:
+            encoding, body = b"j", orjson.dumps(entry)
+        else:
+            encoding, body = b"j", json.dumps(entry, separators=(",", ":")).encode("utf-8")
+        if self.compress_threshold is not None and len(body) >= self.compress_threshold:
+            return encoding + b"z" + zlib.compress(body, self.compress_level)
+        return encoding + b"-" + body
+
+    def loads(self, raw: Any) -> Tuple[float, Optional[int], Any]:
+        """Decode to (timestamp, ttl, data)"""
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        if raw[:1] == b"{":
+            legacy = json.loads(raw)
+            return legacy.get("timestamp", 0), legacy.get("ttl"), legacy.get("data")
+        encoding, compression, body = raw[:1], raw[1:2], raw[2:]
+        if compression == b"z":
+            body = zlib.decompress(body)
+        if encoding == b"m":
+            timestamp, ttl, data = msgpack.unpackb(body, raw=False)
+        elif ORJSON_AVAILABLE:
+            timestamp, ttl, data = orjson.loads(body)
+        else:
+            timestamp, ttl, data = json.loads(body)
+        return timestamp, ttl, data
+
+
+class BoundedTTLCache:
+    """
+    In-memory fallback store: LRU-bounded, with a min-heap of expiry times
+    so each write retires at most a few expired entries (amortized O(log n))
+    instead of sweeping the whole dict.
+    """
+
+    def __init__(self, max_entries: int = 10000, expire_batch: int = 8):
+        self.max_entries = max_entries
+        self.expire_batch = expire_batch
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._expiry: List[Tuple[float, float, str]] = []
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Tuple[float, int, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        timestamp, ttl, _ = entry
+        if time.time() - timestamp > ttl:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, timestamp: float, ttl: int, data: Any) -> None:
+        self._entries[key] = (timestamp, ttl, data)
+        self._entries.move_to_end(key)
+        heapq.heappush(self._expiry, (timestamp + ttl, timestamp, key))
+        self.expire(limit=self.expire_batch)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        # stale heap entries (overwritten or evicted keys) must not outgrow the store
+        if len(self._expiry) > 2 * self.max_entries:
+            self._expiry = [(t + l, t, k) for k, (t, l, _) in self._entries.items()]
+            heapq.heapify(self._expiry)
+
+    def expire(self, limit: Optional[int] = None) -> int:
+        """Retire expired entries from the heap front; at most `limit` heap pops"""
+        now = time.time()
+        removed = 0
+        pops = 0
+        while self._expiry and self._expiry[0][0] < now and (limit is None or pops < limit):
+            _, timestamp, key = heapq.heappop(self._expiry)
+            pops += 1
+            entry = self._entries.get(key)
+            # only the heap record matching the live entry may remove it
+            if entry is not None and entry[0] == timestamp:
+                del self._entries[key]
+                removed += 1
+        self.expirations += removed
+        return removed
+
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def peek(self, key: str) -> Optional[Tuple[float, int, Any]]:
+        return self._entries.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class ProductionCacheManager:
     """
     Production cache manager for degraded mode
     Stores last-known-good data with timestamps
     """
     
-    def __init__(self, redis_url: Optional[str] = None, default_ttl: int = 300):
+    def __init__(self, redis_url: Optional[str] = None, default_ttl: int = 300,
+                 max_memory_entries: int = 10000, batch_size: int = 500,
+                 compress_threshold: int = 1024, redis_client: Any = None):
         """
         Initialize cache manager
         
         Args:
             redis_url: Redis connection URL (optional, uses in-memory if not provided)
             default_ttl: Default TTL in seconds (default: 5 minutes)
+            max_memory_entries: Bound on the in-memory fallback store
+            batch_size: Keys per MGET / pipeline round trip in bulk operations
+            compress_threshold: Serialized size in bytes above which values are compressed
+            redis_client: Pre-built client (e.g. fakeredis); overrides redis_url
         """
         self.default_ttl = default_ttl
+        self.batch_size = batch_size
+        self.serializer = CacheSerializer(compress_threshold=compress_threshold)
         self.redis_client = None
-        self.memory_cache: Dict[str, Dict[str, Any]] = {}
+        self.memory_cache = BoundedTTLCache(max_entries=max_memory_entries)
         
-        if REDIS_AVAILABLE and redis_url:
+        if redis_client is not None:
+            self.redis_client = redis_client
+        elif REDIS_AVAILABLE and redis_url:
             try:
-                self.redis_client = redis.from_url(redis_url, decode_responses=True)
+                self.redis_client = redis.from_url(redis_url)
                 self.redis_client.ping()
                 logger.info("Redis cache initialized")
             except Exception as e:
@@ -49,6 +193,16 @@ class ProductionCacheManager:
         else:
             logger.info("Using in-memory cache (Redis not configured)")
     
+    def _fresh(self, key: str, entry: Optional[Tuple[float, Any, Any]], max_age: float, source: str) -> Optional[Any]:
+        if entry is None:
+            return None
+        age = time.time() - (entry[0] or 0)
+        if age < max_age:
+            logger.debug(f"Cache HIT ({source}): {key}, age: {age:.1f}s")
+            return entry[2]
+        logger.debug(f"Cache EXPIRED ({source}): {key}, age: {age:.1f}s")
+        return None
+    
     def get(self, key: str, max_age_seconds: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
         Get cached data if fresh
@@ -60,44 +214,47 @@ class ProductionCacheManager:
         Returns:
             Cached data dict if fresh, None otherwise
         """
+        return self.get_many([key], max_age_seconds).get(key)
+    
+    def get_many(self, keys: Iterable[str], max_age_seconds: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get several keys with one MGET per `batch_size` keys
+        
+        Returns:
+            Dict of key -> data for the keys that are cached and fresh
+        """
+        found: Dict[str, Any] = {}
         try:
+            keys = list(dict.fromkeys(keys))
             max_age = max_age_seconds if max_age_seconds is not None else self.default_ttl
+            remaining = keys
             
             if self.redis_client:
                 # Try Redis first
                 try:
-                    data = self.redis_client.get(key)
-                    if data:
-                        import json
-                        cached_entry = json.loads(data)
-                        age = time.time() - cached_entry.get('timestamp', 0)
-                        if age < max_age:
-                            logger.debug(f"Cache HIT (Redis): {key}, age: {age:.1f}s")
-                            return cached_entry.get('data')
-                        else:
-                            logger.debug(f"Cache EXPIRED (Redis): {key}, age: {age:.1f}s")
-                            return None
+                    for start in range(0, len(keys), self.batch_size):
+                        chunk = keys[start:start + self.batch_size]
+                        for key, raw in zip(chunk, self.redis_client.mget(chunk)):
+                            if raw:
+                                data = self._fresh(key, self.serializer.loads(raw), max_age, "Redis")
+                                if data is not None:
+                                    found[key] = data
+                    remaining = [key for key in keys if key not in found]
                 except Exception as e:
                     logger.warning(f"Redis get failed: {e}, trying memory cache")
             
             # Fallback to memory cache
-            if key in self.memory_cache:
-                cached_entry = self.memory_cache[key]
-                age = time.time() - cached_entry.get('timestamp', 0)
-                if age < max_age:
-                    logger.debug(f"Cache HIT (Memory): {key}, age: {age:.1f}s")
-                    return cached_entry.get('data')
+            for key in remaining:
+                data = self._fresh(key, self.memory_cache.get(key), max_age, "Memory")
+                if data is not None:
+                    found[key] = data
                 else:
-                    logger.debug(f"Cache EXPIRED (Memory): {key}, age: {age:.1f}s")
-                    del self.memory_cache[key]
-                    return None
-            
-            logger.debug(f"Cache MISS: {key}")
-            return None
+                    logger.debug(f"Cache MISS: {key}")
+            return found
             
         except Exception as e:
             logger.error(f"Cache get error: {e}")
-            return None
+            return found
     
     def set(self, key: str, data: Dict[str, Any], ttl: Optional[int] = None) -> bool:
         """
@@ -111,56 +268,70 @@ class ProductionCacheManager:
         Returns:
             True if stored, False otherwise
         """
+        return self.set_many({key: data}, ttl) == 1
+    
+    def set_many(self, items: Mapping[str, Dict[str, Any]], ttl: Optional[int] = None) -> int:
+        """
+        Store several entries through non-transactional pipelines, one round
+        trip per `batch_size` keys
+        
+        Returns:
+            Number of entries stored
+        """
         try:
             ttl_seconds = ttl if ttl is not None else self.default_ttl
-            cached_entry = {
-                'data': data,
-                'timestamp': time.time(),
-                'ttl': ttl_seconds
-            }
+            timestamp = time.time()
+            keys = list(items)
             
             if self.redis_client:
                 try:
-                    import json
-                    self.redis_client.setex(
-                        key,
-                        ttl_seconds,
-                        json.dumps(cached_entry)
-                    )
-                    logger.debug(f"Cached (Redis): {key}, TTL: {ttl_seconds}s")
-                    return True
+                    for start in range(0, len(keys), self.batch_size):
+                        pipe = self.redis_client.pipeline(transaction=False)
+                        for key in keys[start:start + self.batch_size]:
+                            pipe.setex(key, ttl_seconds, self.serializer.dumps(timestamp, ttl_seconds, items[key]))
+                        pipe.execute()
+                    logger.debug(f"Cached (Redis): {len(keys)} keys, TTL: {ttl_seconds}s")
+                    return len(keys)
                 except Exception as e:
                     logger.warning(f"Redis set failed: {e}, using memory cache")
             
             # Fallback to memory cache
-            self.memory_cache[key] = cached_entry
-            
-            # Clean expired entries periodically
-            if len(self.memory_cache) > 1000:
-                self._clean_expired()
+            for key in keys:
+                self.memory_cache.set(key, timestamp, ttl_seconds, items[key])
             
-            logger.debug(f"Cached (Memory): {key}, TTL: {ttl_seconds}s")
-            return True
+            logger.debug(f"Cached (Memory): {len(keys)} keys, TTL: {ttl_seconds}s")
+            return len(keys)
             
         except Exception as e:
             logger.error(f"Cache set error: {e}")
-            return False
+            return 0
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Remove keys from Redis and the memory fallback; returns how many existed"""
+        keys = list(keys)
+        removed = sum(self.memory_cache.delete(key) for key in keys)
+        if self.redis_client and keys:
+            try:
+                for start in range(0, len(keys), self.batch_size):
+                    removed += self.redis_client.delete(*keys[start:start + self.batch_size])
+            except Exception as e:
+                logger.warning(f"Redis delete failed: {e}")
+        return removed
     
     def get_timestamp(self, key: str) -> Optional[float]:
         """Get timestamp of cached data"""
         try:
             if self.redis_client:
                 try:
-                    import json
                     data = self.redis_client.get(key)
                     if data:
-                        cached_entry = json.loads(data)
-                        return cached_entry.get('timestamp')
+                        return self.serializer.loads(data)[0]
                 except Exception:
                     pass
             
-            if key in self.memory_cache:
-                return self.memory_cache[key].get('timestamp')
+            entry = self.memory_cache.peek(key)
+            if entry is not None:
+                return entry[0]
             
             return None
         except Exception as e:
@@ -170,15 +341,9 @@ class ProductionCacheManager:
     def _clean_expired(self):
         """Clean expired entries from memory cache"""
         try:
-            now = time.time()
-            expired_keys = [
-                k for k, v in self.memory_cache.items()
-                if now - v.get('timestamp', 0) > v.get('ttl', self.default_ttl)
-            ]
-            for key in expired_keys:
-                del self.memory_cache[key]
-            if expired_keys:
-                logger.debug(f"Cleaned {len(expired_keys)} expired cache entries")
+            removed = self.memory_cache.expire()
+            if removed:
+                logger.debug(f"Cleaned {removed} expired cache entries")
         except Exception as e:
             logger.error(f"Cache clean error: {e}")
 
@@ -9,7 +9,7 @@ from typing import Dict, Any, Optional
 import re
 
 from .base import BaseTradingHandler
-from ..realtime_enhancer import get_options_chain, extract_symbol
+from ..realtime_enhancer import get_options_chain, extract_symbol, chain_greeks
 
 logger = logging.getLogger(__name__)
 
@@ -136,7 +136,7 @@ class OptionsHandlerV2(BaseTradingHandler):
         
         atm_iv = options_data.get('atm_iv', 0.20)
         underlying_price = options_data.get('underlying_price', 100.0)
-        greeks = options_data.get('greeks', {})
+        greeks = chain_greeks(options_data)
         data_source = options_data.get('data_source', 'unknown')
         
         # Determine IV environment
@@ -162,7 +162,7 @@ class OptionsHandlerV2(BaseTradingHandler):
 - **Target Expiration**: 30-45 days
 - **Delta Targets**: ~15-20 delta for short strikes
 - **Premium Target**: 25-33% of max risk
-
+{self._format_short_strikes(options_data)}
 **Recommendation:**
 {iv_recommendation}
 
@@ -192,6 +192,17 @@ Current IV suggests {"favorable" if atm_iv > 0.20 else "less favorable"} conditi
             }
         )
     
+    @staticmethod
+    def _format_short_strikes(options_data: Dict[str, Any]) -> str:
+        """Short strikes nearest the delta target, as priced from the chain's vol surface"""
+        short = options_data.get('short_strikes')
+        if not short:
+            return ""
+        return (
+            f"- **Suggested Short Put**: ${short['put']:.2f} ({short['put_delta']:.2f} delta)\n"
+            f"- **Suggested Short Call**: ${short['call']:.2f} ({short['call_delta']:.2f} delta)\n"
+        )
+    
     def _handle_gamma_risk_realtime(self, text: str) -> Dict[str, Any]:
         """Handle gamma risk / delta neutral with real-time data"""
         symbol = extract_symbol(text) or 'SPY'
@@ -201,7 +212,7 @@ Current IV suggests {"favorable" if atm_iv > 0.20 else "less favorable"} conditi
         if not options_data:
             return None  # Fall back to static
         
-        greeks = options_data.get('greeks', {})
+        greeks = chain_greeks(options_data)
         underlying_price = options_data.get('underlying_price', 100.0)
         atm_iv = options_data.get('atm_iv', 0.20)
         data_source = options_data.get('data_source', 'unknown')
@@ -30,7 +30,7 @@ except ImportError as e:
 try:
     from .realtime_enhancer import (
         get_options_chain, get_risk_metrics, get_market_regime,
-        get_real_time_price, extract_symbol, KNOWN_TICKERS
+        get_real_time_price, extract_symbol, KNOWN_TICKERS, chain_greeks
     )
     REALTIME_ENHANCER_AVAILABLE = True
 except ImportError:
@@ -206,7 +206,7 @@ class ProductionTradingHandler:
             
             # Calculate live metrics
             iv_skew = self._calculate_live_iv_skew(options_chain)
-            greeks = options_chain.get('greeks', {})
+            greeks = chain_greeks(options_chain)
             
             # Generate dynamic response based on live data
             if 'iv skew' in text.lower() or 'implied volatility' in text.lower():
@@ -647,7 +647,7 @@ class ProductionTradingHandler:
         """Format iron condor strategy analysis"""
         atm_iv = options_chain.get('atm_iv', 0.20)
         underlying_price = options_chain.get('underlying_price', 100.0)
-        greeks = options_chain.get('greeks', {})
+        greeks = chain_greeks(options_chain)
         data_source = options_chain.get('data_source', 'mock')
         
         if atm_iv > 0.25:
@@ -660,6 +660,12 @@ class ProductionTradingHandler:
             iv_env = "Low-Medium (<20%)"
             recommendation = "Less favorable for iron condors (low IV premium)"
         
+        short = options_chain.get('short_strikes')
+        short_strikes = (
+            f"- Short Strikes: ${short['put']:.2f} put ({short['put_delta']:.2f} delta) / "
+            f"${short['call']:.2f} call ({short['call_delta']:.2f} delta)\n"
+        ) if short else ""
+        
         return f"""**Iron Condor Strategy Analysis - {symbol} (Real-Time)**
 
 **Current Market Environment:**
@@ -673,7 +679,7 @@ class ProductionTradingHandler:
 - Target Expiration: 30-45 days
 - Delta Targets: ~15-20 delta for short strikes
 - Premium Target: 25-33% of max risk
-
+{short_strikes}
 **Risk Considerations**:
 - Monitor for volatility expansion (current IV: {atm_iv*100:.1f}%)
 - Current theta: {greeks.get('theta', -0.05):.4f} (time decay benefit)
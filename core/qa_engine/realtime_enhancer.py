@@ -97,17 +97,10 @@ def _mock_options_chain(symbol: str, expiration_days: int) -> Dict[str, Any]:
     put_iv = atm_iv + random.uniform(0.02, 0.08)  # Higher for puts (skew)
     call_iv = atm_iv - random.uniform(0.01, 0.03)  # Lower for calls
     
-    # Mock Greeks
-    delta_put = random.uniform(-0.45, -0.35)  # OTM put delta
-    delta_call = random.uniform(0.35, 0.45)  # OTM call delta
-    gamma = random.uniform(0.01, 0.02)
-    theta = random.uniform(-0.05, -0.02)  # Negative (time decay)
-    vega = random.uniform(0.10, 0.20)
-    
     # Calculate skew
     skew = (put_iv - call_iv) / atm_iv
     
-    return {
+    options_chain = {
         'symbol': symbol,
         'underlying_price': base_price,
         'expiration_days': expiration_days,
@@ -115,16 +108,83 @@ def _mock_options_chain(symbol: str, expiration_days: int) -> Dict[str, Any]:
         'put_iv': put_iv,
         'call_iv': call_iv,
         'skew': skew,
-        'greeks': {
-            'delta_put': delta_put,
-            'delta_call': delta_call,
-            'gamma': gamma,
-            'theta': theta,
-            'vega': vega
-        },
         'timestamp': time.time(),
         'data_source': 'mock'  # Will be 'real' when connected to actual source
     }
+    # Greeks are priced off the mock vol surface rather than drawn at random
+    options_chain.update(price_options_chain(options_chain))
+    return options_chain
+
+
+def price_options_chain(options_chain: Dict[str, Any], strikes: int = 61, width: float = 0.30,
+                        target_delta: float = 0.16) -> Dict[str, Any]:
+    """
+    Price a strike ladder around spot with the vectorized Black-Scholes engine.
+
+    The vol smile is interpolated linearly in moneyness between ``put_iv``
+    (at ``1 - width``), ``atm_iv`` and ``call_iv`` (at ``1 + width``). Returns
+    ATM greeks in the ``greeks`` layout the handlers read, the strike ladder
+    and the short strikes closest to ``target_delta`` for condor-style setups.
+    """
+    import numpy as np
+    from intelligence.options_pricing import black_scholes_greeks
+
+    spot = float(options_chain.get('underlying_price', 100.0))
+    atm_iv = float(options_chain.get('atm_iv', 0.20))
+    put_iv = float(options_chain.get('put_iv', atm_iv))
+    call_iv = float(options_chain.get('call_iv', atm_iv))
+    years = max(float(options_chain.get('expiration_days', 30)), 1.0) / 365.0
+
+    moneyness = np.linspace(1.0 - width, 1.0 + width, strikes)
+    strike = spot * moneyness
+    iv = np.interp(moneyness, [1.0 - width, 1.0, 1.0 + width], [put_iv, atm_iv, call_iv])
+    is_call = np.array([[True], [False]])
+    priced = black_scholes_greeks(spot, strike, years, iv, is_call=is_call)
+    calls = {name: values[0] for name, values in priced.items()}
+    puts = {name: values[1] for name, values in priced.items()}
+
+    atm = int(np.argmin(np.abs(moneyness - 1.0)))
+    short_call = int(np.argmin(np.abs(calls['delta'] - target_delta)))
+    short_put = int(np.argmin(np.abs(puts['delta'] + target_delta)))
+    return {
+        'greeks': {
+            'delta_put': float(puts['delta'][atm]),
+            'delta_call': float(calls['delta'][atm]),
+            'gamma': float(calls['gamma'][atm]),
+            'theta': float(calls['theta'][atm]),
+            'vega': float(calls['vega'][atm]),
+            'rho': float(calls['rho'][atm]),
+        },
+        'short_strikes': {
+            'put': float(strike[short_put]),
+            'put_delta': float(puts['delta'][short_put]),
+            'call': float(strike[short_call]),
+            'call_delta': float(calls['delta'][short_call]),
+        },
+        'chain': {
+            'strike': strike.round(2).tolist(),
+            'iv': iv.tolist(),
+            'call_price': calls['price'].tolist(),
+            'put_price': puts['price'].tolist(),
+            'call_delta': calls['delta'].tolist(),
+            'put_delta': puts['delta'].tolist(),
+            'gamma': calls['gamma'].tolist(),
+        },
+    }
+
+
+def chain_greeks(options_chain: Dict[str, Any]) -> Dict[str, Any]:
+    """Greeks for a chain, pricing them from its vol surface when the source did not quote any"""
+    greeks = options_chain.get('greeks') or {}
+    if 'gamma' in greeks:
+        return greeks
+    try:
+        priced = price_options_chain(options_chain)
+    except Exception as e:
+        logger.debug(f"Could not price options chain: {e}")
+        return greeks
+    options_chain.setdefault('short_strikes', priced['short_strikes'])
+    return priced['greeks']
 
 
 def get_risk_metrics(portfolio: Dict[str, float]) -> Optional[Dict[str, Any]]:
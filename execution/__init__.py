@@ -10,9 +10,19 @@ from .broker_base import (
     OrderStatus,
     OrderType,
     PositionSnapshot,
+    TimeInForce,
+)
+from .order_book import (
+    BookOrder,
+    ConstantLatency,
+    Fill,
+    FixedSlippage,
+    OrderBook,
+    SquareRootSlippage,
+    UniformLatency,
 )
 from .paper_broker import PaperBroker
-from .order_router import ExecutionPlan, OrderRouter
+from .order_router import Basket, ChildOrder, ExecutionPlan, OrderRouter
 from .execution_monitor import ExecutionMonitor
 
 __all__ = [
@@ -23,7 +33,17 @@ __all__ = [
     "OrderStatus",
     "OrderType",
     "PositionSnapshot",
+    "TimeInForce",
+    "BookOrder",
+    "ConstantLatency",
+    "Fill",
+    "FixedSlippage",
+    "OrderBook",
+    "SquareRootSlippage",
+    "UniformLatency",
     "PaperBroker",
+    "Basket",
+    "ChildOrder",
     "ExecutionPlan",
     "OrderRouter",
     "ExecutionMonitor",
@@ -5,6 +5,7 @@ Abstract broker adapter definitions for execution services.
 from __future__ import annotations
 
 import abc
+import asyncio
 import enum
 import uuid
 from dataclasses import dataclass, field
@@ -20,6 +21,15 @@ class OrderSide(str, enum.Enum):
 class OrderType(str, enum.Enum):
     MARKET = "market"
     LIMIT = "limit"
+    STOP = "stop"
+    STOP_LIMIT = "stop_limit"
+
+
+class TimeInForce(str, enum.Enum):
+    GTC = "GTC"
+    DAY = "DAY"
+    IOC = "IOC"  # fill what is available now, cancel the rest
+    FOK = "FOK"  # fill completely now or cancel
 
 
 class OrderStatus(str, enum.Enum):
@@ -40,6 +50,7 @@ class OrderRequest:
     limit_price: Optional[float] = None
     time_in_force: str = "GTC"
     metadata: Dict[str, Any] = field(default_factory=dict)
+    stop_price: Optional[float] = None
 
     def ensure_id(self) -> str:
         request_id = self.metadata.get("request_id")
@@ -93,6 +104,14 @@ class BrokerAdapter(abc.ABC):
     def cancel_order(self, order_id: str) -> None:
         """Cancel an active order if possible."""
 
+    async def submit_order_async(self, order: OrderRequest) -> OrderResult:
+        """Submit without blocking the event loop; adapters with native async I/O override this."""
+        return await asyncio.to_thread(self.submit_order, order)
+
+    def get_order(self, order_id: str) -> Optional[OrderResult]:
+        """Optional lookup of an order by client order id, used for reconciliation."""
+        return None
+
     def update_market_price(self, symbol: str, price: float) -> None:
         """Optional hint to update internal price marks."""
 
@@ -0,0 +1,390 @@
+"""
+Per-symbol limit order book simulator with price-time priority matching.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .broker_base import OrderSide, OrderStatus, OrderType, TimeInForce
+
+EPSILON = 1e-12
+
+
+@dataclass(slots=True)
+class Fill:
+    order_id: str
+    symbol: str
+    side: OrderSide
+    price: float
+    quantity: float
+    timestamp: float
+    liquidity: str  # "maker" or "taker"
+    external: bool = False
+
+
+@dataclass(slots=True)
+class BookOrder:
+    order_id: str
+    side: OrderSide
+    quantity: float
+    order_type: OrderType = OrderType.LIMIT
+    price: Optional[float] = None  # limit price; None trades at any price
+    stop_price: Optional[float] = None
+    time_in_force: TimeInForce = TimeInForce.GTC
+    external: bool = False  # liquidity that does not belong to the broker
+    remaining: float = 0.0
+    filled: float = 0.0
+    notional: float = 0.0
+    status: OrderStatus = OrderStatus.NEW
+    sequence: int = 0
+    resting: bool = False
+
+    def __post_init__(self) -> None:
+        if not self.remaining:
+            self.remaining = float(self.quantity)
+
+    @property
+    def active(self) -> bool:
+        return self.status in {OrderStatus.NEW, OrderStatus.SUBMITTED, OrderStatus.PARTIAL}
+
+    def execute(self, quantity: float, price: float) -> None:
+        self.remaining -= quantity
+        self.filled += quantity
+        self.notional += quantity * price
+        if self.remaining <= EPSILON:
+            self.remaining = 0.0
+            self.status = OrderStatus.FILLED
+        else:
+            self.status = OrderStatus.PARTIAL
+
+
+# ---------------------------------------------------------------------- #
+# Slippage and latency models
+
+
+class FixedSlippage:
+    """Taker fills trade `bps` through the reference price."""
+
+    def __init__(self, bps: float = 5.0) -> None:
+        self.bps = bps
+
+    def __call__(self, side: OrderSide, quantity: float, reference_price: float) -> float:
+        offset = reference_price * self.bps / 10_000.0
+        return reference_price + offset if side == OrderSide.BUY else reference_price - offset
+
+
+class SquareRootSlippage:
+    """Spread cost plus square-root market impact in the order's size.
+
+    Slippage in bps is ``base_bps + impact_bps * sqrt(quantity / reference_size)``.
+    """
+
+    def __init__(self, base_bps: float = 1.0, impact_bps: float = 10.0, reference_size: float = 1_000.0) -> None:
+        self.base_bps = base_bps
+        self.impact_bps = impact_bps
+        self.reference_size = reference_size
+
+    def __call__(self, side: OrderSide, quantity: float, reference_price: float) -> float:
+        bps = self.base_bps + self.impact_bps * math.sqrt(max(quantity, 0.0) / self.reference_size)
+        offset = reference_price * bps / 10_000.0
+        return reference_price + offset if side == OrderSide.BUY else reference_price - offset
+
+
+class ConstantLatency:
+    """Every order reaches the book `seconds` after submission."""
+
+    def __init__(self, seconds: float = 0.0) -> None:
+        self.seconds = seconds
+
+    def __call__(self, order: BookOrder) -> float:
+        return self.seconds
+
+
+class UniformLatency:
+    """Latency drawn uniformly from [low, high] seconds, seeded for replays."""
+
+    def __init__(self, low: float, high: float, seed: Optional[int] = None) -> None:
+        self.low = low
+        self.high = high
+        self._rng = random.Random(seed)
+
+    def __call__(self, order: BookOrder) -> float:
+        return self._rng.uniform(self.low, self.high)
+
+
+SlippageModel = Callable[[OrderSide, float, float], float]
+LatencyModel = Callable[[BookOrder], float]
+
+
+# ---------------------------------------------------------------------- #
+
+
+class OrderBook:
+    """
+    Price-time priority book for one symbol.
+
+    Resting orders sit in a FIFO queue per price level; level prices are
+    kept in a heap per side (bids negated) and emptied levels are dropped
+    lazily. Stop orders wait in per-side heaps keyed by stop price until a
+    trade reaches them. Besides resting liquidity, an incoming order can
+    trade against synthetic liquidity at a reference price through the
+    slippage model, which is how a paper broker fills without a real book;
+    with `synthetic_liquidity` set, triggered stops also fill that way at
+    the last trade price.
+    """
+
+    def __init__(self, symbol: str, slippage: Optional[SlippageModel] = None,
+                 synthetic_liquidity: bool = False) -> None:
+        self.symbol = symbol
+        self.slippage: SlippageModel = slippage or FixedSlippage(0.0)
+        self.synthetic_liquidity = synthetic_liquidity
+        self.last_price: Optional[float] = None
+        self._levels: Dict[OrderSide, Dict[float, Deque[BookOrder]]] = {OrderSide.BUY: {}, OrderSide.SELL: {}}
+        self._level_qty: Dict[OrderSide, Dict[float, float]] = {OrderSide.BUY: {}, OrderSide.SELL: {}}
+        self._heaps: Dict[OrderSide, List[float]] = {OrderSide.BUY: [], OrderSide.SELL: []}
+        self._stops: Dict[OrderSide, List[Tuple[float, int, BookOrder]]] = {OrderSide.BUY: [], OrderSide.SELL: []}
+        self._orders: Dict[str, BookOrder] = {}
+        self._sequence = itertools.count()
+
+    # ------------------------------------------------------------------ #
+    def best_bid(self) -> Optional[float]:
+        return self._best(OrderSide.BUY)
+
+    def best_ask(self) -> Optional[float]:
+        return self._best(OrderSide.SELL)
+
+    def depth(self, levels: int = 5) -> Dict[str, List[Tuple[float, float]]]:
+        """Aggregated quantity at the best `levels` prices of each side."""
+        book = {}
+        for side, key in ((OrderSide.BUY, "bids"), (OrderSide.SELL, "asks")):
+            quantities = self._level_qty[side]
+            prices = [price for price, qty in quantities.items() if qty > EPSILON]
+            prices.sort(reverse=side == OrderSide.BUY)
+            book[key] = [(price, quantities[price]) for price in prices[:levels]]
+        return book
+
+    def queue_position(self, order_id: str) -> Optional[float]:
+        """Quantity resting ahead of an order at its price level."""
+        order = self._orders.get(order_id)
+        if order is None or not order.active or order.price not in self._levels[order.side]:
+            return None
+        ahead = 0.0
+        for resting in self._levels[order.side][order.price]:
+            if resting is order:
+                return ahead
+            if resting.active:
+                ahead += resting.remaining
+        return None
+
+    def get(self, order_id: str) -> Optional[BookOrder]:
+        """Look up a resting or parked order (finished orders are forgotten)."""
+        return self._orders.get(order_id)
+
+    def open_orders(self) -> List[BookOrder]:
+        return list(self._orders.values())
+
+    # ------------------------------------------------------------------ #
+    def submit(
+        self,
+        order: BookOrder,
+        timestamp: float,
+        reference_price: Optional[float] = None,
+    ) -> List[Fill]:
+        """
+        Match an incoming order, then rest, cancel or park the remainder.
+
+        Market and marketable limit orders first take resting liquidity in
+        price-time priority, then, if `reference_price` is given, synthetic
+        liquidity at the slippage-adjusted reference price. IOC remainders
+        are cancelled and FOK orders that cannot fill completely are
+        cancelled untouched. Stop orders wait until a trade reaches the stop.
+        """
+        order.sequence = next(self._sequence)
+        order.status = OrderStatus.SUBMITTED
+        self._orders[order.order_id] = order
+
+        if order.order_type in {OrderType.STOP, OrderType.STOP_LIMIT}:
+            if not self._stop_triggered(order, self.last_price):
+                key = order.stop_price if order.side == OrderSide.BUY else -order.stop_price
+                heapq.heappush(self._stops[order.side], (key, order.sequence, order))
+                return []
+            return self._trigger(order, timestamp)
+        return self._match(order, timestamp, reference_price)
+
+    def cancel(self, order_id: str) -> Optional[BookOrder]:
+        order = self._orders.get(order_id)
+        if order is None or not order.active:
+            return None
+        if order.resting:
+            self._level_qty[order.side][order.price] -= order.remaining
+        order.status = OrderStatus.CANCELLED
+        self._orders.pop(order_id, None)
+        return order
+
+    def on_trade(self, price: float, size: float, timestamp: float) -> List[Fill]:
+        """
+        Apply a market print: fill resting orders it reaches, then trigger stops.
+
+        Levels strictly better than the print are traded through and fill
+        completely. At the print price, `size` is consumed in time priority,
+        so an order only fills once the quantity queued ahead of it has
+        traded.
+        """
+        fills: List[Fill] = []
+        for side in (OrderSide.BUY, OrderSide.SELL):
+            remaining_print = size
+            while True:
+                best = self._best(side)
+                if best is None:
+                    break
+                through = best > price if side == OrderSide.BUY else best < price
+                if not through and best != price:
+                    break
+                queue = self._levels[side][best]
+                while queue and (through or remaining_print > EPSILON):
+                    resting = queue[0]
+                    if not resting.active:
+                        queue.popleft()
+                        continue
+                    quantity = resting.remaining if through else min(resting.remaining, remaining_print)
+                    if not through:
+                        remaining_print -= quantity
+                    self._execute_resting(resting, quantity, best, timestamp, fills)
+                    if not resting.active:
+                        queue.popleft()
+                if queue and not through:
+                    break
+        self.last_price = price
+        fills.extend(self._trigger_stops(timestamp))
+        return fills
+
+    # ------------------------------------------------------------------ #
+    def _best(self, side: OrderSide) -> Optional[float]:
+        heap = self._heaps[side]
+        levels = self._levels[side]
+        while heap:
+            price = -heap[0] if side == OrderSide.BUY else heap[0]
+            queue = levels.get(price)
+            while queue and not queue[0].active:
+                queue.popleft()
+            if queue:
+                return price
+            heapq.heappop(heap)
+            levels.pop(price, None)
+            self._level_qty[side].pop(price, None)
+        return None
+
+    def _rest(self, order: BookOrder) -> None:
+        levels = self._levels[order.side]
+        queue = levels.get(order.price)
+        if queue is None:
+            queue = levels[order.price] = deque()
+            self._level_qty[order.side][order.price] = 0.0
+            heapq.heappush(self._heaps[order.side], -order.price if order.side == OrderSide.BUY else order.price)
+        queue.append(order)
+        order.resting = True
+        self._level_qty[order.side][order.price] += order.remaining
+
+    def _execute_resting(self, resting: BookOrder, quantity: float, price: float,
+                         timestamp: float, fills: List[Fill]) -> None:
+        resting.execute(quantity, price)
+        self._level_qty[resting.side][price] -= quantity
+        if not resting.active:
+            self._orders.pop(resting.order_id, None)
+        fills.append(Fill(resting.order_id, self.symbol, resting.side, price, quantity,
+                          timestamp, "maker", resting.external))
+
+    def _available(self, order: BookOrder, reference_price: Optional[float]) -> float:
+        """Quantity an incoming order could take right now (for FOK)."""
+        contra = OrderSide.SELL if order.side == OrderSide.BUY else OrderSide.BUY
+        if reference_price is not None and self._crosses(order, self.slippage(order.side, order.remaining, reference_price)):
+            return math.inf
+        total = 0.0
+        for price, quantity in self._level_qty[contra].items():
+            if quantity > EPSILON and self._crosses(order, price):
+                total += quantity
+        return total
+
+    @staticmethod
+    def _crosses(order: BookOrder, price: float) -> bool:
+        if order.price is None:
+            return True
+        return price <= order.price if order.side == OrderSide.BUY else price >= order.price
+
+    def _match(self, order: BookOrder, timestamp: float, reference_price: Optional[float]) -> List[Fill]:
+        fills: List[Fill] = []
+        if order.time_in_force == TimeInForce.FOK and self._available(order, reference_price) < order.remaining - EPSILON:
+            order.status = OrderStatus.CANCELLED
+            self._orders.pop(order.order_id, None)
+            return fills
+
+        contra = OrderSide.SELL if order.side == OrderSide.BUY else OrderSide.BUY
+        while order.remaining > EPSILON:
+            best = self._best(contra)
+            if best is None or not self._crosses(order, best):
+                break
+            queue = self._levels[contra][best]
+            resting = queue[0]
+            quantity = min(order.remaining, resting.remaining)
+            self._execute_resting(resting, quantity, best, timestamp, fills)
+            if not resting.active:
+                queue.popleft()
+            order.execute(quantity, best)
+            fills.append(Fill(order.order_id, self.symbol, order.side, best, quantity,
+                              timestamp, "taker", order.external))
+            self.last_price = best
+
+        if order.remaining > EPSILON and reference_price is not None:
+            price = self.slippage(order.side, order.remaining, reference_price)
+            if self._crosses(order, price):
+                quantity = order.remaining
+                order.execute(quantity, price)
+                fills.append(Fill(order.order_id, self.symbol, order.side, price, quantity,
+                                  timestamp, "taker", order.external))
+
+        if order.remaining > EPSILON:
+            if order.price is None or order.time_in_force in {TimeInForce.IOC, TimeInForce.FOK}:
+                order.status = OrderStatus.CANCELLED
+            else:
+                self._rest(order)
+        if not order.active:
+            self._orders.pop(order.order_id, None)
+        if fills:
+            fills.extend(self._trigger_stops(timestamp))
+        return fills
+
+    @staticmethod
+    def _stop_triggered(order: BookOrder, last_price: Optional[float]) -> bool:
+        if last_price is None:
+            return False
+        if order.side == OrderSide.BUY:
+            return last_price >= order.stop_price
+        return last_price <= order.stop_price
+
+    def _trigger(self, order: BookOrder, timestamp: float) -> List[Fill]:
+        """A triggered stop becomes a market order (or a limit order for stop-limit)."""
+        order.order_type = OrderType.LIMIT if order.order_type == OrderType.STOP_LIMIT else OrderType.MARKET
+        reference_price = self.last_price if self.synthetic_liquidity else None
+        return self._match(order, timestamp, reference_price)
+
+    def _trigger_stops(self, timestamp: float) -> List[Fill]:
+        fills: List[Fill] = []
+        for side in (OrderSide.BUY, OrderSide.SELL):
+            heap = self._stops[side]
+            while heap:
+                order = heap[0][2]
+                if not order.active:
+                    heapq.heappop(heap)
+                    continue
+                if not self._stop_triggered(order, self.last_price):
+                    break
+                heapq.heappop(heap)
+                fills.extend(self._trigger(order, timestamp))
+        return fills
@@ -4,12 +4,16 @@ Order routing and plan execution utilities.
 
 from __future__ import annotations
 
+import asyncio
+import uuid
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
-from .broker_base import BrokerAdapter, OrderRequest, OrderResult, OrderSide
+from .broker_base import BrokerAdapter, OrderRequest, OrderResult, OrderSide, OrderStatus
 from .execution_monitor import ExecutionMonitor
 
+TERMINAL_STATUSES = frozenset({OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.REJECTED})
+
 
 @dataclass(slots=True)
 class ExecutionPlan:
@@ -21,13 +25,109 @@ class ExecutionPlan:
         return not self.orders
 
 
+@dataclass(slots=True)
+class ChildOrder:
+    client_order_id: str
+    request: OrderRequest
+    venue: str = "default"
+    attempts: int = 0
+    result: Optional[OrderResult] = None
+    error: Optional[str] = None
+    recorded: bool = False
+
+    @property
+    def status(self) -> OrderStatus:
+        return self.result.status if self.result is not None else OrderStatus.NEW
+
+    @property
+    def in_flight(self) -> bool:
+        """Not yet acknowledged (or outcome unknown), or acknowledged but still working."""
+        return self.result is None or self.result.status not in TERMINAL_STATUSES
+
+
+@dataclass(slots=True)
+class Basket:
+    """Parent of the child orders produced by one execution plan."""
+
+    basket_id: str
+    plan: ExecutionPlan
+    children: Dict[str, ChildOrder] = field(default_factory=dict)
+
+    def results(self) -> List[OrderResult]:
+        return [child.result for child in self.children.values() if child.result is not None]
+
+    def in_flight(self) -> List[ChildOrder]:
+        return [child for child in self.children.values() if child.in_flight]
+
+    def is_complete(self) -> bool:
+        return not self.in_flight()
+
+    def filled_quantities(self) -> Dict[str, float]:
+        """Signed filled quantity per symbol across the basket."""
+        filled: Dict[str, float] = {}
+        for result in self.results():
+            sign = 1.0 if result.side == OrderSide.BUY else -1.0
+            filled[result.symbol] = filled.get(result.symbol, 0.0) + sign * result.filled_qty
+        return filled
+
+    def summary(self) -> Dict[str, Any]:
+        counts = {status.value: 0 for status in OrderStatus}
+        for child in self.children.values():
+            counts[child.status.value] += 1
+        requested = sum(abs(child.request.quantity) for child in self.children.values())
+        filled = sum(result.filled_qty for result in self.results())
+        return {
+            "basket_id": self.basket_id,
+            "orders": len(self.children),
+            "status_counts": counts,
+            "fill_ratio": filled / requested if requested else 1.0,
+            "filled_quantities": self.filled_quantities(),
+            "in_flight": [
+                {
+                    "client_order_id": child.client_order_id,
+                    "symbol": child.request.symbol,
+                    "status": child.status.value,
+                    "attempts": child.attempts,
+                    "error": child.error,
+                }
+                for child in self.in_flight()
+            ],
+            "complete": self.is_complete(),
+        }
+
+
 class OrderRouter:
     """
     Converts position deltas into executable orders and routes them through a broker.
+
+    `execute_plan` submits sequentially. `execute_plan_async` submits a plan
+    as a basket: child orders go out concurrently, bounded per venue
+    (``request.metadata["venue"]``), under deterministic client order ids so
+    that retries and resubmissions of the same basket are deduplicated by
+    the broker. `reconcile` matches acknowledgements and fills back to the
+    basket and reports what is still in flight. Only the most recent
+    ``max_completed_baskets`` complete baskets are kept for lookup; older
+    ones are pruned as baskets are created, submitted and reconciled.
     """
 
-    def __init__(self, monitor: Optional[ExecutionMonitor] = None) -> None:
+    def __init__(
+        self,
+        monitor: Optional[ExecutionMonitor] = None,
+        venue_limits: Optional[Dict[str, int]] = None,
+        default_concurrency: int = 8,
+        max_retries: int = 2,
+        retry_backoff: float = 0.05,
+        retry_on: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError),
+        max_completed_baskets: int = 256,
+    ) -> None:
         self.monitor = monitor or ExecutionMonitor()
+        self.venue_limits = dict(venue_limits or {})
+        self.default_concurrency = max(1, default_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.retry_on = retry_on
+        self.max_completed_baskets = max(0, max_completed_baskets)
+        self._baskets: Dict[str, Basket] = {}
 
     # ------------------------------------------------------------------ #
     def build_plan(
@@ -96,6 +196,131 @@ class OrderRouter:
             results.append(result)
         return results
 
+    # ------------------------------------------------------------------ #
+    def create_basket(
+        self,
+        plan: ExecutionPlan,
+        basket_id: Optional[str] = None,
+        price_map: Optional[Dict[str, float]] = None,
+    ) -> Basket:
+        """Assign client order ids to a plan's orders; an existing basket id is returned as is."""
+        basket_id = basket_id or uuid.uuid4().hex
+        existing = self._baskets.get(basket_id)
+        if existing is not None:
+            return existing
+
+        price_map = price_map or {}
+        basket = Basket(basket_id=basket_id, plan=plan)
+        for index, request in enumerate(plan.orders):
+            price_hint = price_map.get(request.symbol)
+            if price_hint is not None and request.metadata.get("price") is None:
+                request.metadata["price"] = price_hint
+            request.metadata.setdefault("request_id", f"{basket_id}-{index:04d}")
+            request.metadata["basket_id"] = basket_id
+            client_order_id = request.ensure_id()
+            basket.children[client_order_id] = ChildOrder(
+                client_order_id=client_order_id,
+                request=request,
+                venue=str(request.metadata.get("venue", "default")),
+            )
+        self._baskets[basket_id] = basket
+        self._prune_baskets()
+        return basket
+
+    def _prune_baskets(self) -> None:
+        """Forget the oldest complete baskets beyond `max_completed_baskets`; in-flight ones are kept."""
+        complete = [basket_id for basket_id, basket in self._baskets.items() if basket.is_complete()]
+        for basket_id in complete[:max(0, len(complete) - self.max_completed_baskets)]:
+            del self._baskets[basket_id]
+
+    def basket(self, basket_id: str) -> Optional[Basket]:
+        return self._baskets.get(basket_id)
+
+    async def execute_plan_async(
+        self,
+        plan: ExecutionPlan,
+        broker: BrokerAdapter,
+        price_map: Optional[Dict[str, float]] = None,
+        basket_id: Optional[str] = None,
+    ) -> Basket:
+        basket = self.create_basket(plan, basket_id=basket_id, price_map=price_map)
+        return await self.submit_basket(basket, broker)
+
+    async def submit_basket(self, basket: Basket, broker: BrokerAdapter) -> Basket:
+        """Submit every unacknowledged child concurrently, within per-venue limits."""
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        for child in basket.children.values():
+            if child.venue not in semaphores:
+                limit = self.venue_limits.get(child.venue, self.default_concurrency)
+                semaphores[child.venue] = asyncio.Semaphore(max(1, limit))
+        await asyncio.gather(*(
+            self._submit_child(child, broker, semaphores[child.venue])
+            for child in basket.children.values()
+            if child.result is None
+        ))
+        self._prune_baskets()
+        return basket
+
+    async def _submit_child(self, child: ChildOrder, broker: BrokerAdapter, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            if child.attempts:
+                # an earlier attempt may have reached the broker even though its ack was lost
+                result = await asyncio.to_thread(broker.get_order, child.client_order_id)
+                if result is not None:
+                    self._record(child, result)
+                    return
+            else:
+                self.monitor.record_submission(child.request)
+
+            for attempt in range(self.max_retries + 1):
+                child.attempts += 1
+                try:
+                    result = await broker.submit_order_async(child.request)
+                except self.retry_on as exc:
+                    child.error = f"{type(exc).__name__}: {exc}"
+                    result = await asyncio.to_thread(broker.get_order, child.client_order_id)
+                    if result is None:
+                        if attempt < self.max_retries:
+                            await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+                        continue
+                except Exception as exc:  # non-retryable: outcome unknown, leave in flight
+                    child.error = f"{type(exc).__name__}: {exc}"
+                    return
+                child.error = None
+                self._record(child, result)
+                return
+
+    def _record(self, child: ChildOrder, result: OrderResult) -> None:
+        child.result = result
+        if result.status in TERMINAL_STATUSES and not child.recorded:
+            self.monitor.record_result(result)
+            child.recorded = True
+
+    def reconcile(self, basket: Basket, broker: BrokerAdapter) -> Dict[str, Any]:
+        """Refresh in-flight children from the broker and summarise the basket."""
+        for child in basket.in_flight():
+            result = broker.get_order(child.client_order_id)
+            if result is not None:
+                self._record(child, result)
+        self._prune_baskets()
+        return basket.summary()
+
+    async def reconcile_until_complete(
+        self,
+        basket: Basket,
+        broker: BrokerAdapter,
+        timeout: float = 5.0,
+        interval: float = 0.1,
+    ) -> Dict[str, Any]:
+        """Poll `reconcile` until nothing is in flight or `timeout` elapses."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            summary = await asyncio.to_thread(self.reconcile, basket, broker)
+            if summary["complete"] or loop.time() >= deadline:
+                return summary
+            await asyncio.sleep(interval)
+
     def metrics(self) -> Dict[str, float]:
         return self.monitor.metrics_summary()
 
@@ -4,14 +4,16 @@ In-memory paper broker implementation for testing and Stage 2 execution.
 
 from __future__ import annotations
 
-import math
+import heapq
+import itertools
 import threading
-import uuid
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
-from .broker_base import BrokerAdapter, OrderRequest, OrderResult, OrderSide, OrderStatus
+from .broker_base import BrokerAdapter, OrderRequest, OrderResult, OrderSide, OrderStatus, OrderType, TimeInForce
+from .order_book import BookOrder, FixedSlippage, Fill, LatencyModel, OrderBook, SlippageModel
 
 
 @dataclass(slots=True)
@@ -23,11 +25,26 @@ class PaperOrder:
     avg_price: float = 0.0
     submitted_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     completed_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    notional: float = 0.0
+    reference_price: float = 0.0
+    book_order: Optional[BookOrder] = None
+    reason: Optional[str] = None
 
 
 class PaperBroker(BrokerAdapter):
     """
-    Simple deterministic execution engine with optional slippage.
+    Paper execution engine backed by per-symbol limit order books.
+
+    Orders are matched in price-time priority against resting liquidity
+    (seeded with `add_liquidity` or left by earlier orders). What the book
+    cannot fill trades against synthetic liquidity at the mark through the
+    slippage model, so a market order still fills at mark plus slippage as
+    before. Limit orders that are not marketable rest and fill later as
+    trades (`on_trade`, `on_bar`, `replay`, `update_market_price`) reach
+    them in queue order; stops trigger on trades. With a latency model,
+    orders reach the book only once the simulated clock has advanced past
+    their arrival time. DAY orders still resting are cancelled once the
+    clock passes the UTC midnight after they reached the book.
     """
 
     def __init__(
@@ -35,14 +52,24 @@ class PaperBroker(BrokerAdapter):
         starting_cash: float = 1_000_000.0,
         default_price: float = 100.0,
         slippage_bps: float = 5.0,
+        slippage_model: Optional[SlippageModel] = None,
+        latency_model: Optional[LatencyModel] = None,
+        synthetic_liquidity: bool = True,
     ) -> None:
         self._positions: Dict[str, float] = {}
         self._cash = starting_cash
         self._default_price = default_price
-        self._slippage_bps = slippage_bps
+        self._slippage = slippage_model or FixedSlippage(slippage_bps)
+        self._latency = latency_model
+        self._synthetic_liquidity = synthetic_liquidity
         self._prices: Dict[str, float] = {}
         self._orders: Dict[str, PaperOrder] = {}
-        self._lock = threading.Lock()
+        self._books: Dict[str, OrderBook] = {}
+        self._in_flight: List[Tuple[float, int, str]] = []
+        self._day_expiries: List[Tuple[float, int, str]] = []
+        self._arrivals = itertools.count()
+        self._clock: Optional[float] = None
+        self._lock = threading.RLock()
 
     # ------------------------------------------------------------------ #
     def get_positions(self) -> Dict[str, float]:
@@ -57,68 +84,265 @@ class PaperBroker(BrokerAdapter):
         return self._prices.get(symbol, self._default_price)
 
     def update_market_price(self, symbol: str, price: float) -> None:
+        """Move the mark; resting orders it trades through fill and stops trigger."""
+        self.on_trade(symbol, price, 0.0)
+
+    def order_book(self, symbol: str) -> OrderBook:
         with self._lock:
-            self._prices[symbol] = float(price)
+            book = self._books.get(symbol)
+            if book is None:
+                book = self._books[symbol] = OrderBook(symbol, self._slippage, self._synthetic_liquidity)
+                book.last_price = self._prices.get(symbol)
+            return book
 
     def submit_order(self, order: OrderRequest) -> OrderResult:
         with self._lock:
             order_id = order.ensure_id()
-            price = self._determine_price(order)
-            filled_qty = float(abs(order.quantity))
-            notional = filled_qty * price
-
-            side_multiplier = 1.0 if order.side == OrderSide.BUY else -1.0
-            if order.side == OrderSide.BUY and self._cash < notional:
-                status = OrderStatus.REJECTED
-                filled_qty = 0.0
-                notional = 0.0
-            else:
-                status = OrderStatus.FILLED
-                self._positions[order.symbol] = self._positions.get(order.symbol, 0.0) + (
-                    side_multiplier * filled_qty
-                )
-                self._cash -= side_multiplier * notional
-
-            now = datetime.now(timezone.utc)
-            paper_order = PaperOrder(
-                order_id=order_id,
-                request=order,
-                status=status,
-                filled_qty=filled_qty,
-                avg_price=price if filled_qty else 0.0,
-                submitted_at=now,
-                completed_at=now,
-            )
+            existing = self._orders.get(order_id)
+            if existing is not None:  # duplicate client order id: acknowledge, do not re-execute
+                return self._result(existing)
+            now = self._now()
+            self._release(now)
+
+            reference = self._reference_price(order)
+            quantity = float(abs(order.quantity))
+            paper_order = PaperOrder(order_id=order_id, request=order, reference_price=reference)
             self._orders[order_id] = paper_order
 
-            return OrderResult(
+            time_in_force = self._time_in_force(order.time_in_force)
+            reason = self._validate(order, quantity, reference)
+            if reason is None and time_in_force is None:
+                reason = f"unsupported time in force: {order.time_in_force!r}"
+            if reason:
+                paper_order.status = OrderStatus.REJECTED
+                return self._result(paper_order, reason=reason)
+
+            limit = order.limit_price if order.order_type in {OrderType.LIMIT, OrderType.STOP_LIMIT} else None
+            paper_order.book_order = BookOrder(
                 order_id=order_id,
-                symbol=order.symbol,
                 side=order.side,
-                status=status,
-                quantity=order.quantity,
-                filled_qty=filled_qty,
-                avg_fill_price=paper_order.avg_price,
-                notional=notional,
-                submitted_at=paper_order.submitted_at,
-                completed_at=paper_order.completed_at,
-                metadata={"slippage_bps": self._slippage_bps if filled_qty else 0.0},
+                quantity=quantity,
+                order_type=order.order_type,
+                price=float(limit) if limit is not None else None,
+                stop_price=order.stop_price,
+                time_in_force=time_in_force,
             )
+            paper_order.status = OrderStatus.SUBMITTED
+
+            delay = self._latency(paper_order.book_order) if self._latency else 0.0
+            if delay > 0:
+                heapq.heappush(self._in_flight, (now + delay, next(self._arrivals), order_id))
+            else:
+                self._route(paper_order, now)
+            return self._result(paper_order)
 
     def cancel_order(self, order_id: str) -> None:
         with self._lock:
             order = self._orders.get(order_id)
             if order and order.status not in {OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.REJECTED}:
+                if order.book_order is not None:
+                    self.order_book(order.request.symbol).cancel(order_id)
+                    order.book_order.status = OrderStatus.CANCELLED
                 order.status = OrderStatus.CANCELLED
                 order.completed_at = datetime.now(timezone.utc)
 
+    def get_order(self, order_id: str) -> Optional[OrderResult]:
+        with self._lock:
+            order = self._orders.get(order_id)
+            return self._result(order) if order else None
+
+    def open_orders(self) -> List[OrderResult]:
+        with self._lock:
+            return [
+                self._result(order)
+                for order in self._orders.values()
+                if order.status in {OrderStatus.SUBMITTED, OrderStatus.PARTIAL}
+            ]
+
+    def add_liquidity(self, symbol: str, side: OrderSide, price: float, quantity: float) -> str:
+        """Rest external (non-broker) liquidity in the book, e.g. to seed depth or queue ahead."""
+        with self._lock:
+            order_id = f"ext-{next(self._arrivals)}"
+            book_order = BookOrder(order_id=order_id, side=side, quantity=float(quantity),
+                                   price=float(price), external=True)
+            self._apply_fills(self.order_book(symbol).submit(book_order, self._now()))
+            return order_id
+
+    # ------------------------------------------------------------------ #
+    # Market data / replay
+    def on_trade(self, symbol: str, price: float, size: float = 0.0, timestamp: Any = None) -> List[Fill]:
+        """Apply a trade print and return the broker's own fills it caused."""
+        with self._lock:
+            now = self._now(timestamp)
+            fills = self._release(now)  # orders that arrived before this print
+            self._prices[symbol] = float(price)
+            return fills + self._apply_fills(self.order_book(symbol).on_trade(float(price), float(size), now))
+
+    def on_bar(
+        self,
+        symbol: str,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: Optional[float] = None,
+        timestamp: Any = None,
+    ) -> List[Fill]:
+        """
+        Replay an OHLC bar as four prints (open, low, high, close for up bars,
+        open, high, low, close for down bars), splitting volume evenly. Without
+        volume only prices traded through fill resting orders.
+        """
+        size = float(volume) / 4.0 if volume else 0.0
+        path = (open, low, high, close) if close >= open else (open, high, low, close)
+        fills: List[Fill] = []
+        for price in path:
+            fills.extend(self.on_trade(symbol, price, size, timestamp))
+        return fills
+
+    def replay(self, events: Iterable[Mapping[str, Any]]) -> List[Fill]:
+        """
+        Replay trade ticks (``symbol, price, size``) and/or bars (``symbol,
+        open, high, low, close, volume``), each with an optional ``timestamp``.
+        """
+        fills: List[Fill] = []
+        for event in events:
+            if "close" in event:
+                fills.extend(self.on_bar(
+                    event["symbol"], event["open"], event["high"], event["low"], event["close"],
+                    event.get("volume"), event.get("timestamp"),
+                ))
+            else:
+                fills.extend(self.on_trade(
+                    event["symbol"], event["price"], event.get("size", event.get("volume", 0.0)),
+                    event.get("timestamp"),
+                ))
+        return fills
+
+    def advance_to(self, timestamp: Any) -> List[Fill]:
+        """Advance the simulated clock, releasing orders whose latency has elapsed."""
+        with self._lock:
+            return self._release(self._now(timestamp))
+
     # ------------------------------------------------------------------ #
-    def _determine_price(self, order: OrderRequest) -> float:
+    def _now(self, timestamp: Any = None) -> float:
+        if timestamp is not None:
+            seconds = timestamp.timestamp() if hasattr(timestamp, "timestamp") else float(timestamp)
+            self._clock = seconds if self._clock is None else max(self._clock, seconds)
+            return self._clock
+        return self._clock if self._clock is not None else time.time()
+
+    def _release(self, now: float) -> List[Fill]:
+        fills: List[Fill] = []
+        while self._in_flight and self._in_flight[0][0] <= now:
+            arrival, _, order_id = heapq.heappop(self._in_flight)
+            order = self._orders[order_id]
+            if order.status == OrderStatus.CANCELLED:
+                continue
+            fills.extend(self._route(order, arrival))
+        while self._day_expiries and self._day_expiries[0][0] <= now:
+            _, _, order_id = heapq.heappop(self._day_expiries)
+            order = self._orders[order_id]
+            if order.status in {OrderStatus.SUBMITTED, OrderStatus.PARTIAL}:
+                self.cancel_order(order_id)
+                order.reason = "expired"
+        return fills
+
+    def _route(self, order: PaperOrder, now: float) -> List[Fill]:
+        symbol = order.request.symbol
+        # a caller's metadata price wins over the mark, as in _reference_price,
+        # so fills and reported slippage share one reference; without one the
+        # order meets the mark as of its arrival at the book
+        if order.request.metadata.get("price") is not None:
+            reference = order.reference_price
+        else:
+            reference = self._prices.get(symbol, order.reference_price)
+        if not self._synthetic_liquidity:
+            reference = None
+        fills = self._apply_fills(self.order_book(symbol).submit(order.book_order, now, reference))
+        self._sync(order)
+        if order.book_order.time_in_force == TimeInForce.DAY and order.book_order.active:
+            session_end = (int(now // 86400) + 1) * 86400.0
+            heapq.heappush(self._day_expiries, (session_end, next(self._arrivals), order.order_id))
+        return fills
+
+    def _apply_fills(self, fills: List[Fill]) -> List[Fill]:
+        own: List[Fill] = []
+        for fill in fills:
+            if fill.external:
+                continue
+            order = self._orders.get(fill.order_id)
+            if order is None:
+                continue
+            side_multiplier = 1.0 if fill.side == OrderSide.BUY else -1.0
+            self._positions[fill.symbol] = self._positions.get(fill.symbol, 0.0) + side_multiplier * fill.quantity
+            self._cash -= side_multiplier * fill.quantity * fill.price
+            self._sync(order)
+            own.append(fill)
+        return own
+
+    def _sync(self, order: PaperOrder) -> None:
+        book_order = order.book_order
+        order.filled_qty = book_order.filled
+        order.notional = book_order.notional
+        order.avg_price = book_order.notional / book_order.filled if book_order.filled else 0.0
+        order.status = book_order.status
+        if not book_order.active:
+            order.completed_at = datetime.now(timezone.utc)
+
+    @staticmethod
+    def _time_in_force(value: Any) -> Optional[TimeInForce]:
+        if isinstance(value, TimeInForce):
+            return value
+        if isinstance(value, str):
+            try:
+                return TimeInForce(value.upper())
+            except ValueError:
+                return None
+        return None
+
+    def _validate(self, order: OrderRequest, quantity: float, reference: float) -> Optional[str]:
+        if quantity <= 0:
+            return "non-positive quantity"
+        if order.order_type in {OrderType.LIMIT, OrderType.STOP_LIMIT} and order.limit_price is None:
+            return "limit price required"
+        if order.order_type in {OrderType.STOP, OrderType.STOP_LIMIT} and order.stop_price is None:
+            return "stop price required"
+        if order.side == OrderSide.BUY:
+            if order.order_type in {OrderType.LIMIT, OrderType.STOP_LIMIT}:
+                price = float(order.limit_price)
+            else:
+                price = self._slippage(OrderSide.BUY, quantity, reference)
+            if self._cash < quantity * price:
+                return "insufficient cash"
+        return None
+
+    def _reference_price(self, order: OrderRequest) -> float:
         base_price = order.metadata.get("price")
         if base_price is None:
             base_price = self._prices.get(order.symbol, order.limit_price or self._default_price)
+        return max(0.01, float(base_price))
 
-        base_price = max(0.01, float(base_price))
-        slippage = base_price * (self._slippage_bps / 10_000.0)
-        return base_price + slippage if order.side == OrderSide.BUY else base_price - slippage
-
+    def _result(self, order: PaperOrder, reason: Optional[str] = None) -> OrderResult:
+        metadata: Dict[str, Any] = {"slippage_bps": 0.0, "order_type": order.request.order_type.value}
+        if order.filled_qty and order.reference_price:
+            direction = 1.0 if order.request.side == OrderSide.BUY else -1.0
+            metadata["slippage_bps"] = direction * (order.avg_price / order.reference_price - 1.0) * 10_000.0
+        if order.status in {OrderStatus.SUBMITTED, OrderStatus.PARTIAL}:
+            metadata["queue_position"] = self.order_book(order.request.symbol).queue_position(order.order_id)
+        reason = reason or order.reason
+        if reason:
+            metadata["reason"] = reason
+        return OrderResult(
+            order_id=order.order_id,
+            symbol=order.request.symbol,
+            side=order.request.side,
+            status=order.status,
+            quantity=order.request.quantity,
+            filled_qty=order.filled_qty,
+            avg_fill_price=order.avg_price,
+            notional=order.notional,
+            submitted_at=order.submitted_at,
+            completed_at=order.completed_at,
+            metadata=metadata,
+        )
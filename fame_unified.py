@@ -119,6 +119,7 @@ class FAMEUnified:
                 from core.execution_governor import ExecutionGovernor
                 config = {"execution": {"prefer_cloud": True, "prefer_local": False}}
                 self.execution_governor = ExecutionGovernor(config)
+                self.brain.execution_governor = self.execution_governor
                 logger.info("✅ ExecutionGovernor initialized")
             except Exception as e:
                 logger.warning(f"ExecutionGovernor initialization failed: {e}")
@@ -265,6 +266,7 @@ class FAMEUnified:
                             query_with_routing['selected_modules'] = executor_chain
                             query_with_routing['execution_mode'] = decision.mode.value
                             query_with_routing['expected_latency'] = decision.expected_latency
+                            query_with_routing['execution_decision'] = decision
                             logger.debug(f"ExecutionGovernor selected: {decision.executor} (chain: {executor_chain})")
                     except Exception as e:
                         logger.warning(f"ExecutionGovernor failed: {e}")
@@ -450,36 +452,42 @@ class FAMEUnified:
                         module_name, success, response_time
                     )
                 
-                # Record latency for ExecutionGovernor
-                if self.execution_governor and selected_modules:
+                # Record latency for ExecutionGovernor (hedged runs record per executor)
+                hedged = isinstance(brain_response, dict) and 'executor' in brain_response
+                if self.execution_governor and selected_modules and not hedged:
                     primary_executor = selected_modules[0] if selected_modules else 'unknown'
-                    self.execution_governor.record_latency(primary_executor, response_time)
+                    self.execution_governor.record_latency(
+                        primary_executor,
+                        response_time,
+                        intent=routing_info.get('intent_type', 'general'),
+                        complexity=routing_info.get('estimated_complexity', 5),
+                    )
 
-               # Store in MemoryGraph after processing
-               if self.memory_graph:
-                   try:
-                       # Create event description from query and response
-                       event_description = f"Query: {query.get('text', '')} | Response: {final_response.get('response', '')[:200]}"
+                # Store in MemoryGraph after processing
+                if self.memory_graph:
+                    try:
+                        # Create event description from query and response
+                        event_description = f"Query: {query.get('text', '')} | Response: {final_response.get('response', '')[:200]}"
                        
-                       # Store metadata in context
-                       event_context = {
-                           'event_type': "query",
-                           'content': query.get('text', ''),
-                           'response': final_response.get('response', ''),
-                           'intent': routing_info.get("intent_type", "general"),
-                           'confidence': final_response.get('confidence', 0.5),
-                           'sources': final_response.get('sources', []),
-                           'session_id': query.get('session_id')
-                       }
+                        # Store metadata in context
+                        event_context = {
+                            'event_type': "query",
+                            'content': query.get('text', ''),
+                            'response': final_response.get('response', ''),
+                            'intent': routing_info.get("intent_type", "general"),
+                            'confidence': final_response.get('confidence', 0.5),
+                            'sources': final_response.get('sources', []),
+                            'session_id': query.get('session_id')
+                        }
                        
-                       self.memory_graph.add_event(
-                           description=event_description,
-                           participants=[],  # Could extract entities from query if needed
-                           context=event_context
-                       )
-                       logger.debug("MemoryGraph stored query/response")
-                   except Exception as e:
-                       logger.warning(f"MemoryGraph store failed: {e}")
+                        self.memory_graph.add_event(
+                            description=event_description,
+                            participants=[],  # Could extract entities from query if needed
+                            context=event_context
+                        )
+                        logger.debug("MemoryGraph stored query/response")
+                    except Exception as e:
+                        logger.warning(f"MemoryGraph store failed: {e}")
                 
                 # RL Learning update
                 if self.rl_trainer:
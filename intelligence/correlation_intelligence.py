@@ -96,15 +96,43 @@ class AdvancedCorrelationEngine:
         return {"assets": matrix.columns.tolist(), "matrix": matrix.values.tolist(), "summary": summary}
 
     def _rolling_statistics(self, returns: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Latest-window correlation matrix for each configured window.
+
+        Windows are nested at the end of the sample, so the co-moment sums are
+        grown incrementally from the shortest window to the longest instead of
+        running ``rolling().corr()`` over the full history. As with pandas, any
+        missing value inside a window makes that pair's correlation NaN.
+        """
+        windows = sorted({int(window) for window in self._rolling_windows if len(returns) >= window})
+        if not windows:
+            return {}
+        tail = returns.to_numpy(dtype=float)[-windows[-1]:]
+        with np.errstate(all="ignore"):
+            # centring first keeps the one-pass co-moments well conditioned
+            tail = tail - np.nanmean(tail, axis=0)
+        recent_first = tail[::-1]
+
+        sums = np.zeros(tail.shape[1])
+        cross = np.zeros((tail.shape[1], tail.shape[1]))
+        start = 0
+        matrices: Dict[int, np.ndarray] = {}
+        for window in windows:
+            block = recent_first[start:window]
+            sums += block.sum(axis=0)
+            cross += block.T @ block
+            start = window
+            cov = cross - np.outer(sums, sums) / window
+            var = np.clip(np.diag(cov), 0.0, None)
+            with np.errstate(all="ignore"):
+                matrices[window] = np.where(np.outer(var, var) > 0, cov / np.sqrt(np.outer(var, var)), np.nan)
+
         rolling: Dict[str, Any] = {}
         for window in self._rolling_windows:
-            if len(returns) < window:
+            matrix = matrices.get(int(window))
+            if matrix is None:
                 continue
-            window_key = f"window_{window}"
-            correlations = returns.rolling(window=window).corr()
-            latest = correlations.iloc[-returns.shape[1] :]
-            matrix = latest.values.reshape(returns.shape[1], returns.shape[1])
-            rolling[window_key] = {
+            rolling[f"window_{window}"] = {
                 "matrix": matrix.tolist(),
                 "mean": float(np.nanmean(matrix)),
                 "std": float(np.nanstd(matrix)),
@@ -131,61 +159,139 @@ class AdvancedCorrelationEngine:
         return {"regime": regime, "stability": stability, "mean": mean_corr, "volatility": vol_corr}
 
     def _tail_dependencies(self, returns: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """
+        Joint 5%/95% tail co-exceedance for the first ``max_pairs`` asset pairs.
+
+        Columns without gaps share their thresholds, so exceedances become
+        0/1 indicator matrices and every pair's joint frequency is one entry of
+        an indicator Gram matrix. Pairs touching a column with gaps are
+        evaluated on their common rows, as before.
+        """
         assets = returns.columns.tolist()
         limit = min(self._max_pairs, len(assets) * (len(assets) - 1) // 2)
-        dependencies: Dict[str, Dict[str, float]] = {}
+        values = returns.to_numpy(dtype=float)
+        missing = np.isnan(values)
+        complete = ~missing.any(axis=0)
 
-        idx = 0
+        pairs: List[tuple] = []
         for i in range(len(assets)):
             for j in range(i + 1, len(assets)):
-                if idx >= limit:
+                if len(pairs) >= limit:
                     break
-                r1, r2 = returns[assets[i]].dropna(), returns[assets[j]].dropna()
-                common = r1.index.intersection(r2.index)
-                if len(common) < 20:
+                if complete[i] and complete[j]:
+                    if len(values) < 20:
+                        continue
+                elif np.count_nonzero(~(missing[:, i] | missing[:, j])) < 20:
                     continue
-                series1, series2 = r1.loc[common].values, r2.loc[common].values
-                lower_threshold1 = np.percentile(series1, 5)
-                lower_threshold2 = np.percentile(series2, 5)
-                upper_threshold1 = np.percentile(series1, 95)
-                upper_threshold2 = np.percentile(series2, 95)
-
-                lower_joint = np.mean((series1 <= lower_threshold1) & (series2 <= lower_threshold2))
-                upper_joint = np.mean((series1 >= upper_threshold1) & (series2 >= upper_threshold2))
-
-                dependencies[f"{assets[i]}::{assets[j]}"] = {
-                    "lower_tail": float(lower_joint / 0.05 if 0.05 else 0.0),
-                    "upper_tail": float(upper_joint / 0.05 if 0.05 else 0.0),
-                    "tail_asymmetry": float((upper_joint - lower_joint) / 0.05),
-                }
-                idx += 1
+                pairs.append((i, j))
+
+        joint: Dict[tuple, tuple] = {}
+        dense_cols = sorted({col for pair in pairs for col in pair if complete[col]})
+        if dense_cols:
+            dense = values[:, dense_cols]
+            lower = (dense <= np.percentile(dense, 5, axis=0)).astype(float)
+            upper = (dense >= np.percentile(dense, 95, axis=0)).astype(float)
+            lower_joint = lower.T @ lower / len(dense)
+            upper_joint = upper.T @ upper / len(dense)
+            position = {col: k for k, col in enumerate(dense_cols)}
+            for i, j in pairs:
+                if complete[i] and complete[j]:
+                    joint[(i, j)] = (lower_joint[position[i], position[j]], upper_joint[position[i], position[j]])
+
+        dependencies: Dict[str, Dict[str, float]] = {}
+        for i, j in pairs:
+            if (i, j) in joint:
+                lower_pair, upper_pair = joint[(i, j)]
+            else:
+                common = ~(missing[:, i] | missing[:, j])
+                series1, series2 = values[common, i], values[common, j]
+                lower_pair = np.mean(
+                    (series1 <= np.percentile(series1, 5)) & (series2 <= np.percentile(series2, 5))
+                )
+                upper_pair = np.mean(
+                    (series1 >= np.percentile(series1, 95)) & (series2 >= np.percentile(series2, 95))
+                )
+            dependencies[f"{assets[i]}::{assets[j]}"] = {
+                "lower_tail": float(lower_pair / 0.05),
+                "upper_tail": float(upper_pair / 0.05),
+                "tail_asymmetry": float((upper_pair - lower_pair) / 0.05),
+            }
         return dependencies
 
     def _lead_lag_analysis(self, returns: pd.DataFrame, max_lag: int = 5) -> Dict[str, Any]:
+        """
+        Lag (in rows) with the strongest cross-correlation for every asset pair.
+
+        For each lag the series are shifted as whole matrices and correlated
+        with a single standardised matrix product, giving all pairs at once.
+        A positive lag means the second asset leads the first. Pairs touching
+        a column with gaps fall back to their common rows.
+        """
         assets = returns.columns.tolist()
+        values = returns.to_numpy(dtype=float)
+        missing = np.isnan(values)
+        complete = ~missing.any(axis=0)
         analysis: Dict[str, Any] = {}
+
+        dense_cols = np.flatnonzero(complete)
+        stack = None
+        if len(dense_cols) >= 2 and len(values) >= max_lag * 2:
+            stack = self._lagged_correlations(values[:, dense_cols], max_lag)
+            best_index, best_corr = self._best_lag(stack)
+            position = {col: k for k, col in enumerate(dense_cols)}
+
         for i in range(len(assets)):
             for j in range(i + 1, len(assets)):
-                series1 = returns[assets[i]].dropna()
-                series2 = returns[assets[j]].dropna()
-                common = series1.index.intersection(series2.index)
-                if len(common) < max_lag * 2:
-                    continue
-                s1, s2 = series1.loc[common], series2.loc[common]
-                best_lag, best_corr = 0, 0.0
-                for lag in range(-max_lag, max_lag + 1):
-                    if lag < 0:
-                        corr = s1.iloc[:lag].corr(s2.iloc[-lag:])
-                    elif lag > 0:
-                        corr = s1.iloc[lag:].corr(s2.iloc[:-lag])
-                    else:
-                        corr = s1.corr(s2)
-                    corr = 0.0 if np.isnan(corr) else float(corr)
-                    if abs(corr) > abs(best_corr):
-                        best_corr, best_lag = corr, lag
-                analysis[f"{assets[i]}->{assets[j]}"] = {"optimal_lag": best_lag, "correlation": best_corr}
+                if stack is not None and complete[i] and complete[j]:
+                    a, b = position[i], position[j]
+                    best_lag, corr = int(best_index[a, b]) - max_lag, float(best_corr[a, b])
+                else:
+                    common = ~(missing[:, i] | missing[:, j])
+                    if np.count_nonzero(common) < max_lag * 2:
+                        continue
+                    pair = np.column_stack([values[common, i], values[common, j]])
+                    pair_index, pair_corr = self._best_lag(self._lagged_correlations(pair, max_lag))
+                    best_lag, corr = int(pair_index[0, 1]) - max_lag, float(pair_corr[0, 1])
+                analysis[f"{assets[i]}->{assets[j]}"] = {"optimal_lag": best_lag, "correlation": corr}
         return analysis
 
+    @staticmethod
+    def _lagged_correlations(values: np.ndarray, max_lag: int) -> np.ndarray:
+        """
+        Cross-correlations for lags ``-max_lag..max_lag`` as a (lags, N, N) stack.
+
+        Entry ``[lag, i, j]`` correlates ``x_i[t + lag]`` with ``x_j[t]``, each
+        segment standardised over its own overlap as ``Series.corr`` would.
+        """
+        n_obs, n_assets = values.shape
+        stack = np.full((2 * max_lag + 1, n_assets, n_assets), np.nan)
+
+        def standardise(segment: np.ndarray) -> np.ndarray:
+            centred = segment - segment.mean(axis=0)
+            norm = np.sqrt(np.einsum("ij,ij->j", centred, centred))
+            with np.errstate(all="ignore"):
+                return np.where(norm > 0, centred / norm, np.nan)
+
+        for lag in range(0, max_lag + 1):
+            if n_obs - lag < 2:
+                break
+            leading = standardise(values[lag:])
+            lagging = standardise(values[: n_obs - lag])
+            corr = np.clip(leading.T @ lagging, -1.0, 1.0)
+            stack[max_lag + lag] = corr
+            if lag:
+                stack[max_lag - lag] = corr.T
+        return stack
+
+    @staticmethod
+    def _best_lag(stack: np.ndarray) -> tuple:
+        """Index into the lag axis of the strongest correlation; earliest lag wins ties, zero lag if none."""
+        stack = np.nan_to_num(stack, nan=0.0)
+        index = np.argmax(np.abs(stack), axis=0)
+        best = np.take_along_axis(stack, index[None], axis=0)[0]
+        index = np.where(best == 0.0, stack.shape[0] // 2, index)
+        return index, best
+
     def _regime_stability(self) -> float:
         if len(self._history) < 5:
             return 0.5
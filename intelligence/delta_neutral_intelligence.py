@@ -6,10 +6,12 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Mapping
 
 import numpy as np
 
+from intelligence.options_pricing import GREEKS, price_chain
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +28,7 @@ class AdvancedDeltaNeutralEngine:
         if not options_data or not underlying_prices:
             return self._fallback("missing_options_data")
 
-        exposures = self._aggregate_greeks(options_data)
+        exposures = self._aggregate_greeks(options_data, underlying_prices)
         hedging = self._hedging_recommendations(exposures)
         gamma_scalping = self._gamma_scalping_signal(exposures, underlying_prices)
 
@@ -38,23 +40,86 @@ class AdvancedDeltaNeutralEngine:
             "data_quality_score": self._quality_score(options_data),
         }
 
-    def _aggregate_greeks(self, options_data: Dict[str, Any]) -> Dict[str, float]:
-        totals = {"delta": 0.0, "gamma": 0.0, "vega": 0.0, "theta": 0.0, "rho": 0.0}
+    def _aggregate_greeks(self, options_data: Dict[str, Any], underlying_prices: Dict[str, Any] | None = None) -> Dict[str, float]:
+        totals = {greek: 0.0 for greek in GREEKS}
         total_notional = 0.0
         for symbol, chain in options_data.items():
-            for option in chain:
-                size = float(option.get("open_interest", 0))
-                notional = float(option.get("mark_price", 0)) * size
-                total_notional += notional
-                totals["delta"] += float(option.get("delta", 0.0)) * size
-                totals["gamma"] += float(option.get("gamma", 0.0)) * size
-                totals["vega"] += float(option.get("vega", 0.0)) * size
-                totals["theta"] += float(option.get("theta", 0.0)) * size
-                totals["rho"] += float(option.get("rho", 0.0)) * size
+            columns = self._chain_columns(chain)
+            if not columns:
+                continue
+            size = columns["open_interest"]
+            total_notional += float(columns["mark_price"] @ size)
+            greeks = self._chain_greeks(columns, self._spot(underlying_prices, symbol))
+            for greek in GREEKS:
+                totals[greek] += float(greeks[greek] @ size)
 
         totals["notional"] = total_notional
         return totals
 
+    @staticmethod
+    def _chain_columns(chain: Any) -> Dict[str, np.ndarray]:
+        """Turn a chain (list of contract dicts or a column mapping) into float columns."""
+        if isinstance(chain, Mapping) or hasattr(chain, "columns"):
+            keys = list(chain.keys())
+            length = len(chain[keys[0]]) if keys else 0
+            get = lambda key: chain[key] if key in chain else None  # noqa: E731
+        else:
+            chain = list(chain)
+            length = len(chain)
+            keys = set().union(*(option.keys() for option in chain)) if chain else set()
+            get = lambda key: [option.get(key, np.nan) for option in chain]  # noqa: E731
+        if not length:
+            return {}
+
+        columns: Dict[str, np.ndarray] = {}
+        for key in ("open_interest", "mark_price", "strike", "iv", "time_to_expiry", *GREEKS):
+            if key in keys:
+                columns[key] = np.asarray(get(key), dtype=float)
+        for key in ("expiry", "option_type", "is_call"):
+            if key in keys:
+                columns[key] = np.asarray(get(key))
+        columns["open_interest"] = np.nan_to_num(columns.get("open_interest", np.zeros(length)))
+        columns["mark_price"] = np.nan_to_num(columns.get("mark_price", np.zeros(length)))
+        return columns
+
+    @staticmethod
+    def _chain_greeks(columns: Dict[str, np.ndarray], spot: float | None) -> Dict[str, np.ndarray]:
+        """Use quoted greeks where present and price the rest of the chain in one vectorized pass."""
+        length = len(columns["open_interest"])
+        quoted = {greek: columns.get(greek, np.full(length, np.nan)) for greek in GREEKS}
+        missing = np.zeros(length, dtype=bool)
+        for values in quoted.values():
+            missing |= np.isnan(values)
+
+        priceable = (
+            spot
+            and "strike" in columns
+            and ("expiry" in columns or "time_to_expiry" in columns)
+            and ("iv" in columns or "mark_price" in columns)
+        )
+        if missing.any() and priceable:
+            try:
+                priced = price_chain({key: values[missing] for key, values in columns.items()}, spot=spot)
+            except (KeyError, ValueError) as exc:
+                logger.debug("Could not price option chain: %s", exc)
+            else:
+                for greek in GREEKS:
+                    filled = quoted[greek].copy()
+                    filled[missing] = np.where(np.isnan(filled[missing]), priced[greek], filled[missing])
+                    quoted[greek] = filled
+
+        return {greek: np.nan_to_num(values) for greek, values in quoted.items()}
+
+    @staticmethod
+    def _spot(underlying_prices: Dict[str, Any] | None, symbol: str) -> float | None:
+        value = (underlying_prices or {}).get(symbol)
+        if isinstance(value, (list, tuple)):
+            value = value[-1] if value else None
+        try:
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
     def _hedging_recommendations(self, exposures: Dict[str, float]) -> Dict[str, Any]:
         delta = exposures.get("delta", 0.0)
         gamma = exposures.get("gamma", 0.0)
@@ -83,7 +148,8 @@ class AdvancedDeltaNeutralEngine:
 
     @staticmethod
     def _quality_score(options_data: Dict[str, Any]) -> float:
-        count = sum(len(chain) for chain in options_data.values())
+        count = sum(len(AdvancedDeltaNeutralEngine._chain_columns(chain).get("open_interest", ()))
+                    for chain in options_data.values())
         return float(min(1.0, count / 500))
 
     def _fallback(self, reason: str) -> Dict[str, Any]:
@@ -11,6 +11,8 @@ from typing import Any, Dict
 import numpy as np
 import pandas as pd
 
+from intelligence.options_pricing import black_scholes_greeks, years_to_expiry
+
 logger = logging.getLogger(__name__)
 
 
@@ -97,22 +99,42 @@ class AdvancedOpenInterestEngine:
         }
 
     def _gamma_exposure(self, df: pd.DataFrame, prices: Dict[str, Any]) -> Dict[str, Any]:
-        if "gamma" not in df.columns or not prices:
+        if not prices:
             return {"warning": "missing_gamma_data"}
         current_price = np.mean([v[-1] if isinstance(v, list) else v for v in prices.values() if v]) or 0.0
-        df = df.copy()
-        df["total_gamma"] = df["gamma"] * (df["call_oi"] - df["put_oi"])
-        gamma_profile = (
-            df.groupby("strike")["total_gamma"].sum().sort_index().to_dict()
-        )
-        flip_level = min(gamma_profile, key=lambda strike: abs(gamma_profile[strike])) if gamma_profile else None
+        gamma = self._gamma_column(df, current_price)
+        if gamma is None:
+            return {"warning": "missing_gamma_data"}
+
+        net_oi = df["call_oi"].to_numpy(dtype=float) - df["put_oi"].to_numpy(dtype=float)
+        total_gamma = np.nan_to_num(gamma * net_oi)
+        strikes, inverse = np.unique(df["strike"].to_numpy(dtype=float), return_inverse=True)
+        by_strike = np.bincount(inverse, weights=total_gamma, minlength=len(strikes))
+        gamma_profile = dict(zip(strikes.tolist(), by_strike.tolist()))
+        flip_level = float(strikes[np.argmin(np.abs(by_strike))]) if len(strikes) else None
         return {
-            "total_gamma": float(df["total_gamma"].sum()),
+            "total_gamma": float(total_gamma.sum()),
             "gamma_profile": gamma_profile,
-            "gamma_flip_level": float(flip_level) if flip_level is not None else None,
-            "distance_to_flip": abs(current_price - float(flip_level)) if flip_level and current_price else None,
+            "gamma_flip_level": flip_level,
+            "distance_to_flip": abs(current_price - flip_level) if flip_level and current_price else None,
         }
 
+    @staticmethod
+    def _gamma_column(df: pd.DataFrame, spot: float) -> np.ndarray | None:
+        """Quoted gamma if the frame has it, otherwise Black-Scholes gamma from the implied vol."""
+        if "gamma" in df.columns:
+            return df["gamma"].to_numpy(dtype=float)
+        iv_column = next((col for col in ("iv", "atm_iv", "call_iv") if col in df.columns), None)
+        if iv_column is None or not spot:
+            return None
+        greeks = black_scholes_greeks(
+            spot,
+            df["strike"].to_numpy(dtype=float),
+            years_to_expiry(df["expiry"].to_numpy()),
+            df[iv_column].to_numpy(dtype=float),
+        )
+        return greeks["gamma"]
+
     def _smart_money_flow(self, df: pd.DataFrame) -> Dict[str, Any]:
         df = df.copy()
         df["premium"] = df.get("call_oi", 0) * df.get("call_price", 0) + df.get("put_oi", 0) * df.get("put_price", 0)
@@ -1,11 +1,19 @@
 """
 Sharpe and risk-adjusted performance intelligence.
+
+The probabilistic Sharpe ratio defaults to the closed form of Bailey and
+Lopez de Prado (PSR, plus the deflated DSR when several strategies were
+tried), which corrects for skew and fat tails. Bootstrap and parametric
+Monte Carlo paths are available; they draw all resamples at once from a
+seeded generator and score them in one vectorized pass.
 """
 
 from __future__ import annotations
 
 import logging
+import math
 from datetime import datetime, timezone
+from statistics import NormalDist
 from typing import Any, Dict
 
 import numpy as np
@@ -20,6 +28,12 @@ class AdvancedSharpeEngine:
     def __init__(self, config: Dict[str, Any] | None = None) -> None:
         self.config = config or {}
         self._risk_free = float(self.config.get("risk_free_rate", 0.01)) / 252
+        self._psr_method = str(self.config.get("psr_method", "analytic"))
+        self._simulations = int(self.config.get("simulations", 2000))
+        self._benchmark_sharpe = float(self.config.get("benchmark_sharpe", 0.0))
+        self._num_trials = max(1, int(self.config.get("num_trials", 1)))
+        self._trial_sharpe_variance = self.config.get("trial_sharpe_variance")
+        self._rng = np.random.default_rng(self.config.get("seed"))
 
     async def analyze(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
         returns = self._extract_returns(market_data)
@@ -68,21 +82,93 @@ class AdvancedSharpeEngine:
             }
         return metrics
 
-    def _probabilistic_sharpe(self, returns: pd.Series, simulations: int = 2000) -> Dict[str, float]:
+    def _probabilistic_sharpe(self, returns: pd.Series, simulations: int | None = None,
+                              method: str | None = None) -> Dict[str, float]:
         observed = self._sharpe_ratio(returns)
         mu, sigma = float(returns.mean()), float(returns.std(ddof=1))
         if sigma == 0 or len(returns) < 5:
             return {"observed_sharpe": observed, "probability_skill": 0.5}
 
-        simulated = np.random.normal(mu, sigma, size=(simulations, len(returns)))
-        simulated_sharpes = np.array([self._sharpe_ratio(sim) for sim in simulated])
-        prob_skill = float(np.mean(simulated_sharpes < observed))
+        method = method or self._psr_method
+        if method == "analytic":
+            return self._analytic_psr(returns.to_numpy(dtype=float), observed)
+
+        simulations = simulations or self._simulations
+        values = returns.to_numpy(dtype=float)
+        if method == "bootstrap":
+            simulated_sharpes = self._resampled_sharpes(
+                lambda size: values[self._rng.integers(0, len(values), size=size)], simulations, len(values)
+            )
+        else:
+            simulated_sharpes = self._resampled_sharpes(
+                lambda size: self._rng.normal(mu, sigma, size=size), simulations, len(values)
+            )
+        benchmark = self._benchmark_sharpe
         return {
+            "method": method,
             "observed_sharpe": observed,
-            "probability_skill": prob_skill,
+            "probability_skill": float(np.mean(simulated_sharpes > benchmark)),
             "skill_threshold_95": float(np.percentile(simulated_sharpes, 95)),
+            "sharpe_std_error": float(np.std(simulated_sharpes, ddof=1)),
+        }
+
+    def _analytic_psr(self, values: np.ndarray, observed: float) -> Dict[str, float]:
+        """Closed-form PSR / DSR with the skew and kurtosis correction to the Sharpe standard error."""
+        n = len(values)
+        excess = values - self._risk_free
+        centred = excess - excess.mean()
+        std = centred.std(ddof=1)
+        sharpe = excess.mean() / std  # per period
+        m2 = np.mean(centred ** 2)
+        skew = float(np.mean(centred ** 3) / m2 ** 1.5)
+        kurtosis = float(np.mean(centred ** 4) / m2 ** 2)  # raw, 3 for a normal
+
+        variance = (1.0 - skew * sharpe + (kurtosis - 1.0) / 4.0 * sharpe ** 2) / (n - 1)
+        std_error = math.sqrt(max(variance, 1e-18))
+        normal = NormalDist()
+        benchmark = self._benchmark_sharpe / math.sqrt(252)
+        psr = normal.cdf((sharpe - benchmark) / std_error)
+
+        # deflate for selection bias: the expected best Sharpe among N unskilled trials
+        deflated = psr
+        if self._num_trials > 1:
+            trial_variance = float(self._trial_sharpe_variance) / 252 if self._trial_sharpe_variance else variance
+            euler_gamma = 0.5772156649015329
+            expected_max = math.sqrt(trial_variance) * (
+                (1.0 - euler_gamma) * normal.inv_cdf(1.0 - 1.0 / self._num_trials)
+                + euler_gamma * normal.inv_cdf(1.0 - 1.0 / (self._num_trials * math.e))
+            )
+            deflated = normal.cdf((sharpe - max(benchmark, expected_max)) / std_error)
+
+        annualise = math.sqrt(252)
+        return {
+            "method": "analytic",
+            "observed_sharpe": observed,
+            "probability_skill": float(psr),
+            "deflated_sharpe": float(deflated),
+            "skill_threshold_95": float((sharpe + normal.inv_cdf(0.95) * std_error) * annualise),
+            "sharpe_std_error": float(std_error * annualise),
+            "skewness": skew,
+            "kurtosis": kurtosis,
         }
 
+    def _resampled_sharpes(self, draw, simulations: int, length: int, max_cells: int = 2_000_000) -> np.ndarray:
+        """Score ``simulations`` resampled paths in row chunks bounded by ``max_cells`` values."""
+        chunk = max(1, max_cells // max(length, 1))
+        sharpes = [
+            self._sharpe_ratios(draw((min(chunk, simulations - start), length)))
+            for start in range(0, simulations, chunk)
+        ]
+        return np.concatenate(sharpes)
+
+    def _sharpe_ratios(self, samples: np.ndarray) -> np.ndarray:
+        """Annualised Sharpe ratio of every row, matching ``_sharpe_ratio``."""
+        excess = samples - self._risk_free
+        vol = excess.std(axis=1, ddof=1)
+        mean = excess.mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(vol > 0, np.sqrt(252) * mean / vol, 0.0)
+
     def _stability_metric(self, sharpe_metrics: Dict[str, Dict[str, float]]) -> float:
         ratios = [metrics["sharpe_ratio"] for metrics in sharpe_metrics.values()]
         if not ratios:
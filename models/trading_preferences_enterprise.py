@@ -79,6 +79,8 @@ class TradingPreferencesEnterprise(BaseModel):
     user_id: constr(min_length=1, max_length=100)
     session_id: constr(min_length=1, max_length=100)
     preference_version: str = "1.0.0"
+    # bumped on every committed update; used for optimistic concurrency
+    revision: conint(ge=0) = 0
 
     risk_tolerance: RiskTolerance
     trading_style: TradingStyle
@@ -106,13 +108,14 @@ class TradingPreferencesEnterprise(BaseModel):
 
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_risk_tolerance_change: Optional[datetime] = None
     audit_trail: List[AuditEntry] = Field(default_factory=list)
 
     model_config = ConfigDict(validate_assignment=True)
 
-    @field_serializer("created_at", "updated_at")
-    def _serialize_datetime(self, value: datetime, _info: ValidationInfo) -> str:
-        return value.isoformat()
+    @field_serializer("created_at", "updated_at", "last_risk_tolerance_change")
+    def _serialize_datetime(self, value: Optional[datetime], _info: ValidationInfo) -> Optional[str]:
+        return value.isoformat() if value is not None else None
 
     @model_validator(mode="after")
     def validate_asset_classes(self) -> "TradingPreferencesEnterprise":
@@ -126,11 +129,20 @@ class TradingPreferencesEnterprise(BaseModel):
         object.__setattr__(self, "enabled_asset_classes", normalised)
         return self
 
-    def update_preferences(self, updates: Dict[str, Any], *, reason: str, actor: str) -> None:
-        candidate_data = self.model_dump()
-        candidate_data.update(updates)
+    def update_preferences(
+        self, updates: Dict[str, Any], *, reason: str, actor: str, record_audit: bool = True
+    ) -> AuditEntry:
+        """
+        Apply `updates`, validating only the changed fields. Returns the audit
+        entry; it is appended to `audit_trail` unless `record_audit` is False
+        (callers that keep the audit log elsewhere).
+        """
+        # validate_assignment checks each changed field (and the model
+        # validators) without re-validating the whole document
+        candidate = self.model_copy()
         try:
-            candidate = TradingPreferencesEnterprise.model_validate(candidate_data)
+            for key, value in updates.items():
+                setattr(candidate, key, value)
         except ValidationError as exc:
             raise ValueError(f"Invalid preference update: {exc}") from exc
 
@@ -142,26 +154,33 @@ class TradingPreferencesEnterprise(BaseModel):
         snapshot = self._snapshot_state()
         for key in updates:
             object.__setattr__(self, key, getattr(candidate, key))
-        self.updated_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        self.updated_at = now
+        if "risk_tolerance" in updates:
+            object.__setattr__(self, "last_risk_tolerance_change", now)
         change_set = {key: getattr(candidate, key) for key in updates}
-        self.audit_trail.append(
-            AuditEntry(
-                actor=actor,
-                reason=reason,
-                changes=change_set,
-                previous_state=snapshot,
-            )
+        entry = AuditEntry(
+            actor=actor,
+            reason=reason,
+            changes=change_set,
+            previous_state=snapshot,
         )
-        if len(self.audit_trail) > 100:
-            self.audit_trail = self.audit_trail[-100:]
+        if record_audit:
+            self.audit_trail.append(entry)
+            if len(self.audit_trail) > 100:
+                self.audit_trail = self.audit_trail[-100:]
+        return entry
 
     def _validate_risk_tolerance_change(self, new_risk: RiskTolerance) -> None:
+        now = datetime.now(timezone.utc)
         recent_changes = [
             entry
             for entry in self.audit_trail
             if "risk_tolerance" in entry.changes
-            and (datetime.now(timezone.utc) - entry.timestamp) < timedelta(hours=24)
+            and (now - entry.timestamp) < timedelta(hours=24)
         ]
+        if self.last_risk_tolerance_change and (now - self.last_risk_tolerance_change) < timedelta(hours=24):
+            recent_changes.append(self.last_risk_tolerance_change)
         if recent_changes and new_risk in {RiskTolerance.AGGRESSIVE, RiskTolerance.EXTREME}:
             raise ValueError("Risk tolerance increases limited to once per 24 hours.")
 
@@ -6,12 +6,25 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:  # optional dependency
+    from prometheus_client import Counter, Gauge
+except ImportError:  # pragma: no cover
+    Counter = Gauge = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+if Counter is not None:
+    INGEST_EVENTS = Counter("ingest_pipeline_events_total", "Events normalised by the ingest pipeline")
+    INGEST_DROPPED = Counter("ingest_pipeline_dropped_total", "Events dropped by the ingest pipeline", ["stage"])
+    INGEST_LAG = Gauge("ingest_pipeline_lag_seconds", "Age of the oldest event in the latest micro-batch")
+else:  # pragma: no cover
+    INGEST_EVENTS = INGEST_DROPPED = INGEST_LAG = None
+
 
 @dataclass(slots=True)
 class IngestedEvent:
@@ -33,60 +46,174 @@ class IngestedEvent:
         }
 
 
+@dataclass(slots=True)
+class IngestPipelineConfig:
+    queue_size: int = 1024
+    batch_size: int = 256               # max events per micro-batch (1 = per-event mode)
+    batch_max_wait_ms: float = 10.0     # how long to wait for a micro-batch to fill
+    normaliser_workers: int = 1
+    processor_queue_size: int = 1024
+    processor_policy: str = "drop"      # "drop" or "block" when a processor queue is full
+
+
+_STOP = object()
+
+
+@dataclass(slots=True)
+class _ProcessorChannel:
+    processor: "EventProcessor"
+    queue: "asyncio.Queue[Any]"
+    policy: str
+    task: Optional["asyncio.Task[None]"] = None
+    processed: int = 0
+    dropped: int = 0
+    errors: int = 0
+
+
 class IngestPipeline:
     """
     Normalise heterogeneous telemetry events so they can be exported to metrics, traces, or log sinks.
+
+    Normaliser workers drain the intake queue in micro-batches and fan each
+    batch out to per-processor bounded queues, so a slow processor only fills
+    its own queue (dropping or blocking per its policy) instead of stalling
+    every other sink.
     """
 
-    def __init__(self) -> None:
-        self._processors: List["EventProcessor"] = []
-        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=1024)
-        self._shutdown = asyncio.Event()
-        self._task: Optional[asyncio.Task[None]] = None
+    def __init__(self, config: Optional[IngestPipelineConfig] = None) -> None:
+        self.config = config or IngestPipelineConfig()
+        self._channels: List[_ProcessorChannel] = []
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=self.config.queue_size)
+        self._workers: List[asyncio.Task[None]] = []
+        self._stats: Dict[str, float] = {
+            "received": 0,
+            "dropped": 0,
+            "normalised": 0,
+            "failed": 0,
+            "lag_ms": 0.0,
+            "events_per_second": 0.0,
+        }
+        self._started_at: Optional[float] = None
 
-    def register_processor(self, processor: "EventProcessor") -> None:
-        self._processors.append(processor)
+    def register_processor(
+        self,
+        processor: "EventProcessor",
+        policy: Optional[str] = None,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        policy = policy or self.config.processor_policy
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown processor queue policy: {policy}")
+        channel = _ProcessorChannel(
+            processor=processor,
+            queue=asyncio.Queue(maxsize=queue_size or self.config.processor_queue_size),
+            policy=policy,
+        )
+        self._channels.append(channel)
+        if self._workers:
+            channel.task = asyncio.create_task(self._consume(channel), name=f"ingest_{type(processor).__name__}")
 
     async def start(self) -> None:
-        if self._task is None:
-            self._task = asyncio.create_task(self._run(), name="monitoring_ingest_pipeline")
+        if self._workers:
+            return
+        self._started_at = time.monotonic()
+        for channel in self._channels:
+            channel.task = asyncio.create_task(
+                self._consume(channel), name=f"ingest_{type(channel.processor).__name__}"
+            )
+        self._workers = [
+            asyncio.create_task(self._run(), name=f"monitoring_ingest_pipeline_{idx}")
+            for idx in range(max(1, self.config.normaliser_workers))
+        ]
 
     async def stop(self) -> None:
-        self._shutdown.set()
-        if self._task:
-            await self._task
-            self._task = None
+        if not self._workers:
+            return
+        # sentinels queue behind pending events, so workers drain before exiting
+        for _ in self._workers:
+            await self._queue.put(_STOP)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for channel in self._channels:
+            if channel.task:
+                await channel.queue.put(_STOP)
+        await asyncio.gather(*(c.task for c in self._channels if c.task), return_exceptions=True)
+        for channel in self._channels:
+            channel.task = None
 
     async def submit(self, event: Dict[str, Any]) -> None:
-        try:
-            await self._queue.put(event)
-        except asyncio.QueueFull:
-            logger.warning("Ingest pipeline queue full; dropping event from %s", event.get("source", "unknown"))
+        self._stats["received"] += 1
+        await self._queue.put((time.monotonic(), event))
 
     def submit_nowait(self, event: Dict[str, Any]) -> bool:
         try:
-            self._queue.put_nowait(event)
+            self._queue.put_nowait((time.monotonic(), event))
+            self._stats["received"] += 1
             return True
         except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            if INGEST_DROPPED is not None:
+                INGEST_DROPPED.labels(stage="intake").inc()
             logger.warning("Ingest pipeline queue full; dropping event from %s", event.get("source", "unknown"))
         except RuntimeError:
             # Queue not initialised or already closed
             logger.debug("Ingest pipeline queue unavailable for submit_nowait")
         return False
 
-    async def _run(self) -> None:
-        while not self._shutdown.is_set():
+    async def _next_batch(self) -> Tuple[List[Tuple[float, Dict[str, Any]]], bool]:
+        """Drain up to ``batch_size`` items or until ``batch_max_wait_ms`` passes."""
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.batch_max_wait_ms / 1000.0
+        while len(batch) < self.config.batch_size:
             try:
-                event = await asyncio.wait_for(self._queue.get(), timeout=0.5)
-            except asyncio.TimeoutError:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if not batch:
                 continue
-            try:
-                ingested = self._normalise(event)
-                if ingested is None:
+            events: List[IngestedEvent] = []
+            for _, raw in batch:
+                try:
+                    ingested = self._normalise(raw)
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    self._stats["failed"] += 1
+                    logger.exception("Failed to normalise event: %s", exc)
                     continue
-                await self._dispatch(ingested)
-            except Exception as exc:  # pragma: no cover - defensive logging
-                logger.exception("Failed to normalise event: %s", exc)
+                if ingested is not None:
+                    events.append(ingested)
+            self._record_batch(batch, len(events))
+            if events:
+                await self._dispatch(events)
+
+    def _record_batch(self, batch: List[Tuple[float, Dict[str, Any]]], normalised: int) -> None:
+        now = time.monotonic()
+        lag_ms = (now - batch[0][0]) * 1000.0
+        self._stats["normalised"] += normalised
+        self._stats["lag_ms"] = lag_ms
+        if self._started_at is not None and now > self._started_at:
+            self._stats["events_per_second"] = self._stats["normalised"] / (now - self._started_at)
+        if INGEST_EVENTS is not None:
+            INGEST_EVENTS.inc(normalised)
+            INGEST_LAG.set(lag_ms / 1000.0)
 
     def _normalise(self, event: Dict[str, Any]) -> Optional[IngestedEvent]:
         timestamp = event.get("timestamp")
@@ -167,15 +294,75 @@ class IngestPipeline:
 
         return metrics
 
-    async def _dispatch(self, event: IngestedEvent) -> None:
-        if not self._processors:
+    async def _dispatch(self, events: List[IngestedEvent]) -> None:
+        if not self._channels:
             logger.debug("No processors registered for ingest pipeline")
             return
-        await asyncio.gather(*(processor.process(event) for processor in self._processors), return_exceptions=True)
+        for channel in self._channels:
+            if channel.policy == "block":
+                for event in events:
+                    await channel.queue.put(event)
+                continue
+            for idx, event in enumerate(events):
+                try:
+                    channel.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    dropped = len(events) - idx
+                    channel.dropped += dropped
+                    if INGEST_DROPPED is not None:
+                        INGEST_DROPPED.labels(stage=type(channel.processor).__name__).inc(dropped)
+                    logger.warning(
+                        "Processor %s queue full; dropping %s events", type(channel.processor).__name__, dropped
+                    )
+                    break
+
+    async def _consume(self, channel: _ProcessorChannel) -> None:
+        stopping = False
+        while not stopping:
+            item = await channel.queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.config.batch_size:
+                try:
+                    item = channel.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await channel.processor.process_batch(batch)
+                channel.processed += len(batch)
+            except Exception as exc:
+                channel.errors += 1
+                logger.exception("Processor %s failed on batch of %s: %s", type(channel.processor).__name__, len(batch), exc)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queue_depth": self._queue.qsize(),
+            "processors": {
+                type(channel.processor).__name__: {
+                    "processed": channel.processed,
+                    "dropped": channel.dropped,
+                    "errors": channel.errors,
+                    "queue_depth": channel.queue.qsize(),
+                    "policy": channel.policy,
+                }
+                for channel in self._channels
+            },
+        }
 
 
 class EventProcessor:
     async def process(self, event: IngestedEvent) -> None:
         raise NotImplementedError
 
+    async def process_batch(self, events: List[IngestedEvent]) -> None:
+        """Handle a micro-batch; vectorised sinks should override this."""
+        for event in events:
+            await self.process(event)
+
 
@@ -8,13 +8,18 @@ import json
 import threading
 from collections import deque
 from datetime import datetime, timezone
-from typing import Deque, Dict, List, Optional
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Tuple
 
 
 class LogAggregator:
     def __init__(self, max_events: int = 1000) -> None:
         self._buffer: Deque[Dict[str, object]] = deque(maxlen=max_events)
         self._lock = threading.Lock()
+        # Sequence number of the most recently emitted event; events are
+        # numbered 1..N so readers can resume from a cursor without relying
+        # on timestamps.
+        self._sequence = 0
 
     def emit(self, level: str, message: str, **fields: object) -> None:
         payload = {
@@ -24,14 +29,37 @@ class LogAggregator:
             "fields": fields,
         }
         with self._lock:
+            self._sequence += 1
             self._buffer.appendleft(payload)
 
     def emit_json(self, payload: Dict[str, object]) -> None:
         with self._lock:
             payload = dict(payload)
             payload.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+            self._sequence += 1
             self._buffer.appendleft(payload)
 
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    def read_since(self, cursor: int, limit: int = 100) -> Tuple[List[Dict[str, object]], int, int]:
+        """
+        Return up to ``limit`` events emitted after ``cursor`` in chronological order.
+
+        Returns ``(events, next_cursor, dropped)`` where ``dropped`` counts events
+        that were overwritten in the ring buffer before they could be read.
+        """
+        with self._lock:
+            pending = self._sequence - cursor
+            if pending <= 0:
+                return [], self._sequence, 0
+            available = min(pending, len(self._buffer))
+            dropped = pending - available
+            newest_first = list(islice(self._buffer, available))
+        events = newest_first[::-1][:limit]
+        return events, cursor + dropped + len(events), dropped
+
     def recent(self, limit: int = 100) -> List[Dict[str, object]]:
         with self._lock:
             return list(self._buffer)[:limit]
@@ -1,24 +1,55 @@
 """
 Log exporter for forwarding aggregated events to Elasticsearch or Splunk.
+
+Events are read from the aggregator by sequence cursor, so nothing is skipped
+or duplicated when several events share a timestamp. Each cycle drains full
+batches back-to-back and only waits when the aggregator is caught up. Batches
+are sent gzip-compressed over a pooled HTTP session and retried with jittered
+exponential backoff. Batches a sink still refuses are spilled to disk and
+replayed once that sink recovers.
 """
 
 from __future__ import annotations
 
+import gzip
 import json
 import logging
+import random
 import threading
 import time
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
 
 try:  # optional dependency
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:  # pragma: no cover
     requests = None  # type: ignore
+    HTTPAdapter = None  # type: ignore
+
+try:  # optional dependency
+    from prometheus_client import Counter, Gauge
+except ImportError:  # pragma: no cover
+    Counter = Gauge = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+if Gauge is not None:
+    EXPORT_THROUGHPUT = Gauge(
+        "log_exporter_throughput_events_per_second", "Events exported per second over the last cycle", ["sink"]
+    )
+    EXPORT_LAG = Gauge("log_exporter_lag_events", "Aggregated events not yet read by the exporter")
+    EXPORT_SPILLED = Gauge("log_exporter_spilled_events", "Events waiting in the on-disk spill buffer", ["sink"])
+    EXPORT_EVENTS = Counter("log_exporter_events_total", "Exported events by outcome", ["sink", "outcome"])
+else:  # pragma: no cover
+    EXPORT_THROUGHPUT = EXPORT_LAG = EXPORT_SPILLED = EXPORT_EVENTS = None
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# delivery outcomes returned by the sink senders
+SENT, FAILED, REJECTED = "sent", "failed", "rejected"
+
 
 @dataclass(slots=True)
 class LogExporterConfig:
@@ -28,6 +59,13 @@ class LogExporterConfig:
     elastic_index: str = "fame-logs"
     splunk_url: Optional[str] = None
     splunk_token: Optional[str] = None
+    compress: bool = True
+    max_retries: int = 3
+    retry_backoff_seconds: float = 0.5
+    request_timeout: float = 10.0
+    pool_size: int = 4
+    spill_dir: Path = field(default_factory=lambda: Path("logs/export_spill"))
+    spill_max_bytes: int = 64 * 1024 * 1024
 
 
 class LogExporter:
@@ -36,7 +74,10 @@ class LogExporter:
         self.config = config
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
-        self._last_timestamp: Optional[datetime] = None
+        self._cursor = 0
+        self._session = None
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._spill_counts: Dict[str, int] = {}
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -44,6 +85,7 @@ class LogExporter:
         if not (self.config.elastic_url or self.config.splunk_url):
             logger.info("Log exporter configured without endpoints; skipping start.")
             return
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._run, name="FAMELogExporter", daemon=True)
         self._thread.start()
 
@@ -51,83 +93,250 @@ class LogExporter:
         self._stop_event.set()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=3)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
     def _run(self) -> None:
         logger.info("Log exporter thread started")
         while not self._stop_event.is_set():
+            exported = 0
+            try:
+                self._replay_spill()
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.error("Spill replay failed: %s", exc)
             try:
                 exported = self._export_batch()
                 if exported:
                     logger.debug("Exported %s log events", exported)
             except Exception as exc:  # pragma: no cover - defensive logging
                 logger.error("Log export failed: %s", exc)
-            finally:
-                time.sleep(self.config.interval_seconds)
+            # keep draining while a full batch was available; otherwise wait
+            if exported < self.config.batch_size:
+                self._stop_event.wait(self.config.interval_seconds)
+
+    # --- collection ----------------------------------------------------
 
     def _export_batch(self) -> int:
         events = self._collect_events()
         if not events:
             return 0
-        if self.config.elastic_url and requests:
-            self._send_to_elastic(events)
-        if self.config.splunk_url and self.config.splunk_token and requests:
-            self._send_to_splunk(events)
+        for sink in self._sinks():
+            self._deliver(sink, events)
         return len(events)
 
     def _collect_events(self) -> List[dict]:
-        raw_events = self.aggregator.recent(self.config.batch_size)
-        filtered: List[dict] = []
-        for event in reversed(raw_events):  # chronological order
-            timestamp = event.get("timestamp")
-            if not timestamp:
-                continue
+        events, self._cursor, dropped = self.aggregator.read_since(self._cursor, self.config.batch_size)
+        if dropped:
+            logger.warning("Log exporter fell behind; %s events overwritten before export", dropped)
+            for sink in self._sinks():
+                self._count(sink, "dropped", dropped)
+        if EXPORT_LAG is not None:
+            EXPORT_LAG.set(max(0, self.aggregator.sequence - self._cursor))
+        return events
+
+    def _sinks(self) -> List[str]:
+        sinks = []
+        if self.config.elastic_url and requests:
+            sinks.append("elastic")
+        if self.config.splunk_url and self.config.splunk_token and requests:
+            sinks.append("splunk")
+        return sinks
+
+    def _deliver(self, sink: str, events: List[dict]) -> bool:
+        # keep ordering: while a sink has a backlog on disk, new events queue behind it
+        if self._spill_path(sink).exists():
+            self._spill(sink, events)
+            return False
+        started = time.perf_counter()
+        sender = self._send_to_elastic if sink == "elastic" else self._send_to_splunk
+        outcome = sender(events)
+        if outcome == SENT:
+            self._count(sink, "exported", len(events))
+            elapsed = max(time.perf_counter() - started, 1e-6)
+            self._stats.setdefault(sink, {})["events_per_second"] = len(events) / elapsed
+            if EXPORT_THROUGHPUT is not None:
+                EXPORT_THROUGHPUT.labels(sink=sink).set(len(events) / elapsed)
+        elif outcome == REJECTED:
+            # retrying a batch the sink refuses would block the sink forever
+            self._count(sink, "rejected", len(events))
+        else:
+            self._spill(sink, events)
+        return outcome == SENT
+
+    # --- transport -----------------------------------------------------
+
+    def _get_session(self):
+        if self._session is None:
+            session = requests.Session()
+            if HTTPAdapter is not None:
+                adapter = HTTPAdapter(pool_connections=self.config.pool_size, pool_maxsize=self.config.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _post(self, sink: str, url: str, body: str, headers: Dict[str, str]) -> str:
+        """POST with retry and jittered exponential backoff; returns a delivery outcome."""
+        data = body.encode("utf-8")
+        headers = dict(headers)
+        if self.config.compress:
+            data = gzip.compress(data)
+            headers["Content-Encoding"] = "gzip"
+        for attempt in range(self.config.max_retries + 1):
             try:
-                ts = datetime.fromisoformat(str(timestamp))
-            except ValueError:
-                continue
-            if self._last_timestamp and ts <= self._last_timestamp:
-                continue
-            filtered.append(event)
-        if filtered:
-            latest_ts = datetime.fromisoformat(str(filtered[-1]["timestamp"]))
-            self._last_timestamp = latest_ts
-        return filtered
-
-    def _send_to_elastic(self, events: List[dict]) -> None:
+                response = self._get_session().post(
+                    url, data=data, headers=headers, timeout=self.config.request_timeout
+                )
+                if response.status_code < 400:
+                    return SENT
+                if response.status_code not in RETRYABLE_STATUS:
+                    logger.error("%s ingest rejected batch (%s): %s", sink, response.status_code, response.text[:500])
+                    return REJECTED
+                logger.warning("%s ingest returned %s; retrying", sink, response.status_code)
+            except requests.RequestException as exc:
+                logger.warning("%s ingest request failed: %s", sink, exc)
+            if attempt < self.config.max_retries:
+                delay = self.config.retry_backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+                if self._stop_event.wait(delay):
+                    break
+        return FAILED
+
+    def _send_to_elastic(self, events: List[dict]) -> str:
         if not requests:
             logger.warning("requests library unavailable; cannot export to Elasticsearch.")
-            return
+            return FAILED
         bulk_endpoint = f"{self.config.elastic_url.rstrip('/')}/_bulk"
+        action = json.dumps({"index": {"_index": self.config.elastic_index}})
         lines = []
         for event in events:
-            lines.append(json.dumps({"index": {"_index": self.config.elastic_index}}))
+            lines.append(action)
             lines.append(json.dumps(event))
         payload = "\n".join(lines) + "\n"
-        response = requests.post(
-            bulk_endpoint,
-            data=payload,
-            headers={"Content-Type": "application/x-ndjson"},
-            timeout=10,
-        )
-        if response.status_code >= 400:
-            logger.error("Elasticsearch bulk ingest failed: %s", response.text)
+        return self._post("elastic", bulk_endpoint, payload, {"Content-Type": "application/x-ndjson"})
 
-    def _send_to_splunk(self, events: List[dict]) -> None:
+    def _send_to_splunk(self, events: List[dict]) -> str:
         if not requests:
             logger.warning("requests library unavailable; cannot export to Splunk.")
+            return FAILED
+        # HEC accepts many concatenated event objects in one request
+        payload = "\n".join(json.dumps({"event": event}) for event in events)
+        return self._post(
+            "splunk",
+            self.config.splunk_url,
+            payload,
+            {
+                "Authorization": f"Splunk {self.config.splunk_token}",
+                "Content-Type": "application/json",
+            },
+        )
+
+    # --- spill buffer --------------------------------------------------
+
+    def _spill_path(self, sink: str) -> Path:
+        return self.config.spill_dir / f"{sink}.ndjson"
+
+    def _spill(self, sink: str, events: List[dict]) -> None:
+        path = self._spill_path(sink)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists() and path.stat().st_size >= self.config.spill_max_bytes:
+                logger.error("%s spill buffer full; dropping %s events", sink, len(events))
+                self._count(sink, "dropped", len(events))
+                return
+            with path.open("a", encoding="utf-8") as handle:
+                for event in events:
+                    handle.write(json.dumps(event))
+                    handle.write("\n")
+            self._count(sink, "spilled", len(events))
+            self._set_spill_pending(sink, self._spill_pending(sink) + len(events))
+        except OSError as exc:
+            logger.error("Failed to spill %s events for %s: %s", len(events), sink, exc)
+            self._count(sink, "dropped", len(events))
+
+    def _replay_spill(self) -> None:
+        for sink in self._sinks():
+            try:
+                self._replay_sink(sink)
+            except Exception as exc:
+                logger.error("Failed to replay %s spill buffer: %s", sink, exc)
+
+    def _replay_sink(self, sink: str) -> None:
+        path = self._spill_path(sink)
+        if not path.exists():
             return
-        for event in events:
-            payload = {"event": event}
-            response = requests.post(
-                self.config.splunk_url,
-                data=json.dumps(payload),
-                headers={
-                    "Authorization": f"Splunk {self.config.splunk_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=10,
-            )
-            if response.status_code >= 400:
-                logger.error("Splunk HEC ingest failed: %s", response.text)
+        events, corrupt = [], []
+        with path.open("r", encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    corrupt.append(line if line.endswith("\n") else line + "\n")
+        if corrupt:
+            # a torn or corrupt line would fail every replay; set it aside
+            self._quarantine(sink, corrupt)
+        sender = self._send_to_elastic if sink == "elastic" else self._send_to_splunk
+        sent = 0
+        size = self.config.batch_size
+        while sent < len(events):
+            batch = events[sent:sent + size]
+            outcome = sender(batch)
+            if outcome == FAILED:
                 break
+            sent += len(batch)
+            self._count(sink, "exported" if outcome == SENT else "rejected", len(batch))
+        if sent >= len(events):
+            path.unlink()
+            logger.info("Replayed %s spilled events to %s", sent, sink)
+        elif sent or corrupt:
+            tmp = path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as handle:
+                for event in events[sent:]:
+                    handle.write(json.dumps(event))
+                    handle.write("\n")
+            tmp.replace(path)
+        self._set_spill_pending(sink, len(events) - sent)
+
+    def _quarantine(self, sink: str, lines: List[str]) -> None:
+        path = self.config.spill_dir / f"{sink}.corrupt"
+        logger.error("Moving %s unreadable spilled lines for %s to %s", len(lines), sink, path)
+        self._count(sink, "dropped", len(lines))
+        try:
+            with path.open("a", encoding="utf-8") as handle:
+                handle.writelines(lines)
+        except OSError as exc:
+            logger.error("Failed to quarantine spilled lines for %s: %s", sink, exc)
+
+    def _spill_pending(self, sink: str) -> int:
+        if sink not in self._spill_counts:
+            # count once per process; later updates are incremental
+            path = self._spill_path(sink)
+            pending = 0
+            if path.exists():
+                with path.open("rb") as handle:
+                    pending = sum(1 for _ in handle)
+            self._spill_counts[sink] = pending
+        return self._spill_counts[sink]
+
+    def _set_spill_pending(self, sink: str, pending: int) -> None:
+        self._spill_counts[sink] = pending
+        self._stats.setdefault(sink, {})["spilled_pending"] = pending
+        if EXPORT_SPILLED is not None:
+            EXPORT_SPILLED.labels(sink=sink).set(pending)
+
+    # --- stats ---------------------------------------------------------
+
+    def _count(self, sink: str, outcome: str, count: int) -> None:
+        sink_stats = self._stats.setdefault(sink, {})
+        sink_stats[outcome] = sink_stats.get(outcome, 0) + count
+        if EXPORT_EVENTS is not None:
+            EXPORT_EVENTS.labels(sink=sink, outcome=outcome).inc(count)
 
+    def stats(self) -> Dict[str, object]:
+        return {
+            "cursor": self._cursor,
+            "lag": max(0, self.aggregator.sequence - self._cursor),
+            "sinks": {sink: dict(values) for sink, values in self._stats.items()},
+        }
@@ -24,6 +24,7 @@ BASE_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
 from orchestrator.brain import Brain
+from api.admission import AdmissionController, AdmissionRejected, Priority
 
 if FASTAPI_AVAILABLE:
     app = FastAPI(title="FAME Orchestrator API", version="1.0.0")
@@ -39,6 +40,14 @@ if FASTAPI_AVAILABLE:
     
     # Initialize brain
     brain = Brain()
+    admission = AdmissionController()
+
+    def _shed(exc: AdmissionRejected) -> HTTPException:
+        return HTTPException(
+            status_code=exc.status_code,
+            detail={"error": exc.reason, "endpoint": exc.endpoint},
+            headers=exc.headers,
+        )
     
     # Try to initialize Docker manager for sandboxing
     try:
@@ -64,11 +73,20 @@ if FASTAPI_AVAILABLE:
     
     @app.get("/health")
     async def health():
-        return {
-            "status": "healthy",
-            "plugins": len(brain.plugins),
-            "audit_log_size": len(brain.audit_log)
-        }
+        try:
+            async with admission.admit("health", Priority.HEALTH):
+                return {
+                    "status": "healthy",
+                    "plugins": len(brain.plugins),
+                    "audit_log_size": len(brain.audit_log)
+                }
+        except AdmissionRejected as exc:
+            raise _shed(exc)
+
+    @app.get("/metrics")
+    async def metrics():
+        """Admission queue depth, in-flight requests and shed counts"""
+        return {"admission": admission.snapshot()}
     
     @app.post("/query")
     async def query(
@@ -93,9 +111,13 @@ if FASTAPI_AVAILABLE:
                 "key_prefix": x_api_key[:8] if x_api_key else None
             })
         
+        priority = max(Priority.from_label(payload.get("priority")), Priority.TRADING)
         try:
-            resp = await brain.handle_query(payload)
+            async with admission.admit("query", priority):
+                resp = await brain.handle_query(payload)
             return resp
+        except AdmissionRejected as exc:
+            raise _shed(exc)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
@@ -1,6 +1,7 @@
 # orchestrator/brain.py
 
 import asyncio
+import dataclasses
 import inspect
 from typing import Any, Dict, List, Optional
 
@@ -49,6 +50,10 @@ class Brain:
         self.docker_manager = None
         self.sandbox_runner = None
         
+        # ExecutionGovernor (set by the host); with a decision in the query,
+        # the executor chain is run hedged instead of all at once
+        self.execution_governor = None
+        
         # Fallback spam prevention - track recent fallback calls
         self._fallback_call_count = {}
         self._fallback_call_window = 5  # seconds
@@ -88,7 +93,12 @@ class Brain:
                 "source": query.get("source", "unknown"),
             },
         ):
-            return await self._handle_query_internal(query)
+            try:
+                return await self._handle_query_internal(query)
+            finally:
+                # deliver query.* events before returning: callers such as
+                # fame_simple close their event loop right after the query
+                await self.bus.drain()
 
     async def _handle_query_internal(self, query: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -223,8 +233,13 @@ class Brain:
             except Exception as e:
                 return {"plugin": target, "error": str(e)}
         
+        hedged_executor = None
+        decision = query.get('execution_decision')
+        if selector and decision is not None and self.execution_governor is not None:
+            hedged_executor, responses = await self._execute_hedged(decision, query, execute_plugin)
+        
         # Execute all plugins in parallel using asyncio.gather
-        if selector:
+        if selector and hedged_executor is None:
             plugin_tasks = [execute_plugin(target) for target in selector]
             plugin_results = await asyncio.gather(*plugin_tasks, return_exceptions=True)
             
@@ -426,6 +441,8 @@ class Brain:
         # Add processing time
         if isinstance(final, dict):
             final['processing_time'] = time.time() - start_time
+            if hedged_executor:
+                final['executor'] = hedged_executor
         
         self.audit_log.append({"id": qid, "response": final})
         await self.bus.publish("query.completed", {"id": qid, "response": final})
@@ -458,6 +475,39 @@ class Brain:
 
         return final
     
+    async def _execute_hedged(self, decision, query: Dict[str, Any], execute_plugin):
+        """
+        Run the governor's executor chain through ExecutionGovernor.execute_hedged:
+        the primary first, the first fallback only once the primary is slow or
+        fails. Returns (executor, responses), or (None, []) when no executor in
+        the chain is a loaded plugin.
+        """
+        chain = [name for name in [decision.executor] + list(decision.fallback_chain) if name in self.plugins]
+        if not chain:
+            return None, []
+        if chain[0] != decision.executor:
+            decision = dataclasses.replace(decision, executor=chain[0], fallback_chain=chain[1:])
+        
+        def runner(name: str):
+            async def run():
+                res = await execute_plugin(name)
+                if res is None or 'error' in res:
+                    raise RuntimeError((res or {}).get('error', 'no response'))
+                return res
+            return run
+        
+        routing_info = query.get('routing_info') or {}
+        try:
+            winner, response = await self.execution_governor.execute_hedged(
+                decision,
+                {name: runner(name) for name in chain},
+                intent=routing_info.get('intent_type'),
+                complexity=routing_info.get('estimated_complexity'),
+            )
+            return winner, [response]
+        except Exception as e:
+            return chain[0], [{"plugin": chain[0], "error": str(e) or type(e).__name__}]
+    
     def _simple_route(self, query):
         """Simple keyword-based routing"""
         text = (query.get('text') or '').lower().strip()
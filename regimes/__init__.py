@@ -1,19 +1,21 @@
 """Market regime detection package."""
 
-from .regime_types import MarketRegime, MarketState
+from .regime_types import MarketRegime, MarketState, snapshot_market_data
 from .volatility import GARCHVolatilityModel, SimpleVolatilityModel
 from .correlations import CrossAssetCorrelationEngine
 from .macro import MacroRegimeClassifier
 from .transformer import RegimeTransformer
-from .regime_engine import RegimeDetectionEngine
+from .regime_engine import RegimeDetectionEngine, gather_with_budgets
 
 __all__ = [
     "MarketRegime",
     "MarketState",
+    "snapshot_market_data",
     "GARCHVolatilityModel",
     "SimpleVolatilityModel",
     "CrossAssetCorrelationEngine",
     "MacroRegimeClassifier",
     "RegimeTransformer",
     "RegimeDetectionEngine",
+    "gather_with_budgets",
 ]
@@ -2,32 +2,104 @@
 
 from __future__ import annotations
 
+import asyncio
 import collections
-from typing import Dict, List
+import inspect
+import logging
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
 
-from regimes.regime_types import MarketRegime
+from regimes.regime_types import MarketRegime, snapshot_market_data
 from regimes.volatility import GARCHVolatilityModel
 from regimes.correlations import CrossAssetCorrelationEngine
 from regimes.macro import MacroRegimeClassifier
 from regimes.transformer import RegimeTransformer
 
+logger = logging.getLogger(__name__)
+
+
+async def gather_with_budgets(
+    calls: Mapping[str, Callable[[], Any]],
+    budgets: Optional[Mapping[str, float]] = None,
+    default_budget: Optional[float] = None,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Run named child evaluations concurrently, each under its own time budget.
+
+    ``calls`` maps a name to a zero-argument callable returning a value or an
+    awaitable. Results are returned in the order of ``calls``, independent of
+    completion order; children that time out or raise are left out of the
+    results and reported in the second mapping instead. Budgets can only
+    pre-empt children that yield to the event loop.
+    """
+    budgets = budgets or {}
+
+    async def run(name: str, call: Callable[[], Any]) -> Tuple[Any, Optional[str]]:
+        async def invoke() -> Any:
+            result = call()
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        budget = budgets.get(name, default_budget)
+        try:
+            return await asyncio.wait_for(invoke(), budget), None
+        except asyncio.TimeoutError:
+            logger.warning("%s exceeded its %.3fs budget", name, budget)
+            return None, "timeout"
+        except Exception as exc:
+            logger.warning("%s failed: %s", name, exc)
+            return None, f"error: {exc}"
+
+    outcomes = await asyncio.gather(*(run(name, call) for name, call in calls.items()))
+    results: Dict[str, Any] = {}
+    failures: Dict[str, str] = {}
+    for name, (result, failure) in zip(calls, outcomes):
+        if failure is None:
+            results[name] = result
+        else:
+            failures[name] = failure
+    return results, failures
+
 
 class RegimeDetectionEngine:
-    """Combine multiple detectors to infer market regime."""
+    """Combine multiple detectors to infer market regime.
+
+    Detectors run concurrently against a read-only snapshot of the market
+    data, each within ``detector_budget`` seconds (overridable per detector
+    via ``detector_budgets``). Votes are merged in detector order, so ties
+    resolve the same way however the detectors finish.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        detector_budget: Optional[float] = 0.25,
+        detector_budgets: Optional[Dict[str, float]] = None,
+    ) -> None:
         self.volatility_model = GARCHVolatilityModel()
         self.correlation_engine = CrossAssetCorrelationEngine()
         self.macro_classifier = MacroRegimeClassifier()
         self.transformer_model = RegimeTransformer()
+        self.detector_budget = detector_budget
+        self.detector_budgets = dict(detector_budgets or {})
+        self.last_failures: Dict[str, str] = {}
 
     async def analyze(self, market_data: Dict) -> MarketRegime:
-        votes: List[MarketRegime] = []
-        votes.append(await self.volatility_model.detect_regime(market_data))
-        votes.append(await self.correlation_engine.analyze(market_data))
-        votes.append(await self.macro_classifier.classify(market_data))
-        votes.append(self.transformer_model.predict(market_data))
+        snapshot = snapshot_market_data(market_data)
+        votes, self.last_failures = await gather_with_budgets(
+            {
+                "volatility": lambda: self.volatility_model.detect_regime(snapshot),
+                "correlation": lambda: self.correlation_engine.analyze(snapshot),
+                "macro": lambda: self.macro_classifier.classify(snapshot),
+                "transformer": lambda: self.transformer_model.predict(snapshot),
+            },
+            self.detector_budgets,
+            self.detector_budget,
+        )
+        if not votes:
+            return MarketRegime.RANGING
 
-        counter = collections.Counter(votes)
+        counter = collections.Counter(votes.values())
         return counter.most_common(1)[0][0]
 
+    async def analyze_symbols(self, returns_by_symbol: Mapping[str, Sequence[float]]) -> Dict[str, MarketRegime]:
+        """Per-symbol volatility regimes, vectorized across all symbols."""
+        return await self.volatility_model.detect_regimes(returns_by_symbol)
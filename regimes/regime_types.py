@@ -4,7 +4,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+import numpy as np
 
 
 class MarketRegime(Enum):
@@ -26,3 +29,31 @@ class MarketState:
     liquidity_state: str
     cross_asset_correlations: Dict[str, float]
 
+
+
+def snapshot_market_data(market_data: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Read-only deep view of market data, safe to share between concurrent evaluators.
+
+    Mappings become ``MappingProxyType``, lists become tuples and NumPy arrays
+    become non-writeable views; scalars are shared as-is. A snapshot passed
+    back in is returned unchanged.
+    """
+    if isinstance(market_data, MappingProxyType):
+        return market_data
+    return _freeze(market_data)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, MappingProxyType):
+        return value
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    return value
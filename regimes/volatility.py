@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import logging
-from statistics import mean, stdev
-from typing import Dict, Iterable
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
 
 from regimes.regime_types import MarketRegime
 
@@ -20,24 +21,57 @@ class SimpleVolatilityModel:
 
     async def detect_regime(self, market_data: Dict) -> MarketRegime:
         returns = market_data.get("returns")
-        if not returns:
-            return MarketRegime.RANGING
-        if len(returns) < self.window_short:
+        if returns is None or len(returns) < self.window_short:
             return MarketRegime.RANGING
-        short_vol = self._annualised_vol(returns[-self.window_short :])
-        long_vol = self._annualised_vol(returns[-self.window_long :]) if len(returns) >= self.window_long else short_vol
+        return self.classify([returns])[0]
+
+    async def detect_regimes(self, returns_by_symbol: Mapping[str, Sequence[float]]) -> Dict[str, MarketRegime]:
+        """Volatility regime of every symbol in one vectorized pass."""
+        symbols = list(returns_by_symbol)
+        return dict(zip(symbols, self.classify([returns_by_symbol[s] for s in symbols])))
+
+    def classify(self, series: Sequence[Sequence[float]]) -> List[MarketRegime]:
+        """Classify many return series at once.
 
-        if short_vol > long_vol * 1.5:
-            return MarketRegime.HIGH_VOLATILITY
-        if short_vol < long_vol * 0.5:
-            return MarketRegime.LOW_VOLATILITY
-        return MarketRegime.RANGING
+        The last ``window_long`` observations of each series are left-padded
+        with NaN into one matrix, so short and long volatilities for all
+        series come from two nan-aware reductions. Series shorter than the
+        long window compare against their short volatility, and series
+        shorter than the short window are RANGING.
+        """
+        if not len(series):
+            return []
+        width = max(self.window_long, self.window_short)
+        matrix = np.full((len(series), width), np.nan)
+        counts = np.zeros(len(series), dtype=np.int64)
+        for row, returns in enumerate(series):
+            tail = np.asarray(returns, dtype=np.float64)[-width:]
+            counts[row] = tail.size
+            if tail.size:
+                matrix[row, width - tail.size:] = tail
 
-    def _annualised_vol(self, returns: Iterable[float]) -> float:
-        try:
-            return float(stdev(returns)) * (252**0.5)
-        except Exception:
-            return 0.0
+        short_vol = self._annualised_vols(matrix[:, width - self.window_short:])
+        long_vol = np.where(
+            counts >= self.window_long,
+            self._annualised_vols(matrix[:, width - self.window_long:]),
+            short_vol,
+        )
+
+        regimes = np.full(len(series), MarketRegime.RANGING, dtype=object)
+        regimes[short_vol > long_vol * 1.5] = MarketRegime.HIGH_VOLATILITY
+        regimes[short_vol < long_vol * 0.5] = MarketRegime.LOW_VOLATILITY
+        regimes[counts < self.window_short] = MarketRegime.RANGING
+        return regimes.tolist()
+
+    @staticmethod
+    def _annualised_vols(matrix: np.ndarray) -> np.ndarray:
+        """Row-wise sample standard deviation (ignoring NaN padding), annualised."""
+        counts = np.sum(~np.isnan(matrix), axis=1)
+        means = np.nanmean(np.where(counts[:, None] > 0, matrix, 0.0), axis=1)
+        squares = np.nansum((matrix - means[:, None]) ** 2, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(counts > 1, squares / (counts - 1), 0.0)
+        return np.sqrt(variance) * (252**0.5)
 
 
 class GARCHVolatilityModel:
@@ -50,3 +84,6 @@ class GARCHVolatilityModel:
         # TODO: integrate actual GARCH modelling
         return await self.simple.detect_regime(market_data)
 
+    async def detect_regimes(self, returns_by_symbol: Mapping[str, Sequence[float]]) -> Dict[str, MarketRegime]:
+        return await self.simple.detect_regimes(returns_by_symbol)
+
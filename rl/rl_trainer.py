@@ -5,9 +5,11 @@ PPO-lite adaptive policy with Q-value updates and self-correction
 """
 
 import logging
+import math
+import os
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, asdict
 from collections import deque
 import json
 from pathlib import Path
@@ -26,6 +28,197 @@ class PolicyWeights:
     confidence_threshold: float = 0.6
 
 
+class RunningRewardStats:
+    """Windowed mean plus all-time mean/variance (Welford), each update O(1)"""
+
+    def __init__(self, window: int = 1000):
+        self.history: deque = deque(maxlen=window)
+        self._window_sum = 0.0
+        self._since_resum = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, reward: float) -> None:
+        if len(self.history) == self.history.maxlen:
+            self._window_sum -= self.history[0]
+        self.history.append(reward)
+        self._window_sum += reward
+        self._since_resum += 1
+        if self._since_resum >= self.history.maxlen:
+            # bound floating-point drift of the rolling sum
+            self._window_sum = math.fsum(self.history)
+            self._since_resum = 0
+
+        self.count += 1
+        delta = reward - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (reward - self.mean)
+
+    @property
+    def window_mean(self) -> float:
+        return self._window_sum / len(self.history) if self.history else 0.0
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def state(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "m2": self._m2}
+
+    def restore(self, state: Dict[str, float]) -> None:
+        self.count = int(state.get("count", 0))
+        self.mean = float(state.get("mean", 0.0))
+        self._m2 = float(state.get("m2", 0.0))
+
+
+class QTable:
+    """
+    Q-values in a growable (states x actions) float matrix.
+
+    States are interned to row indices on first sight. Checkpoints go to a
+    directory holding ``q_table.npy`` (rewritten in place through a memmap,
+    only rows changed since the last checkpoint are copied; the file is
+    regrown by doubling), an append-only ``states.jsonl`` of state keys and
+    a small ``meta.json`` written last, whose row count marks what is valid.
+    """
+
+    def __init__(self, actions: List[str], capacity: int = 1024):
+        self.actions = list(actions)
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        self.state_index: Dict[str, int] = {}
+        self.states: List[str] = []
+        self.values = np.zeros((capacity, len(self.actions)), dtype=np.float64)
+        self._dirty = np.zeros(capacity, dtype=bool)
+        self._saved_states = 0
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def encode_state(self, state: str) -> int:
+        index = self.state_index.get(state)
+        if index is None:
+            index = len(self.states)
+            if index == len(self.values):
+                self._grow(2 * len(self.values))
+            self.state_index[state] = index
+            self.states.append(state)
+            self._dirty[index] = True
+        return index
+
+    def encode_states(self, states: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.encode_state(state) for state in states), dtype=np.int64)
+
+    def encode_action(self, action: str) -> int:
+        return self.action_index.get(action, self.action_index.get("default", 0))
+
+    def _grow(self, capacity: int) -> None:
+        values = np.zeros((capacity, len(self.actions)), dtype=np.float64)
+        values[: len(self.values)] = self.values
+        dirty = np.zeros(capacity, dtype=bool)
+        dirty[: len(self._dirty)] = self._dirty
+        self.values, self._dirty = values, dirty
+
+    def row(self, state: str) -> Optional[np.ndarray]:
+        index = self.state_index.get(state)
+        return None if index is None else self.values[index]
+
+    def get(self, state: str, action: str) -> float:
+        index = self.state_index.get(state)
+        if index is None or action not in self.action_index:
+            return 0.0
+        return float(self.values[index, self.action_index[action]])
+
+    def update(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        learning_rate: float,
+        gamma: float,
+        dones: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        One vectorized Q-learning step over a batch of transitions.
+
+        TD targets use the table as it was before the batch; updates to the
+        same state-action pair accumulate. Returns the TD errors.
+        """
+        bootstrap = self.values[next_states].max(axis=1)
+        if dones is not None:
+            bootstrap = np.where(dones, 0.0, bootstrap)
+        td_error = rewards + gamma * bootstrap - self.values[states, actions]
+        np.add.at(self.values, (states, actions), learning_rate * td_error)
+        self._dirty[states] = True
+        return td_error
+
+    # ------------------------------------------------------------------ #
+    def save(self, directory: Path, meta: Dict[str, Any]) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        table_path = directory / "q_table.npy"
+        count = len(self.states)
+
+        with open(directory / "states.jsonl", "a" if self._saved_states else "w", encoding="utf-8") as f:
+            for state in self.states[self._saved_states:count]:
+                f.write(json.dumps(state) + "\n")
+
+        table = None
+        if table_path.exists() and self._saved_states:
+            table = np.load(table_path, mmap_mode="r+")
+            if table.shape[0] < count or table.shape[1] != len(self.actions):
+                del table
+                table = None
+        if table is None:
+            capacity = max(len(self.values), 1)
+            tmp_path = directory / "q_table.tmp.npy"
+            table = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64,
+                                              shape=(capacity, len(self.actions)))
+            table[:count] = self.values[:count]
+            table.flush()
+            del table
+            os.replace(tmp_path, table_path)
+        else:
+            rows = np.flatnonzero(self._dirty[:count])
+            table[rows] = self.values[rows]
+            table.flush()
+            del table
+        self._dirty[:] = False
+        self._saved_states = count
+
+        meta = dict(meta, states=count, actions=self.actions)
+        tmp_meta = directory / "meta.json.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_meta, directory / "meta.json")
+
+    def load(self, directory: Path) -> Dict[str, Any]:
+        with open(directory / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        count = int(meta["states"])
+        states = []
+        with open(directory / "states.jsonl", "rb+") as f:
+            for _ in range(count):
+                states.append(json.loads(f.readline()))
+            end = f.tell()
+            if f.seek(0, os.SEEK_END) > end:
+                # lines appended by a save that crashed before meta.json was
+                # replaced; the next save appends after `count` lines again
+                logger.warning("Dropping %d bytes of uncommitted Q-table states", f.tell() - end)
+                f.truncate(end)
+        table = np.load(directory / "q_table.npy", mmap_mode="r")
+        column = {action: i for i, action in enumerate(meta.get("actions", self.actions))}
+        self.state_index = {state: i for i, state in enumerate(states)}
+        self.states = states
+        self.values = np.zeros((max(2 * count, 1024), len(self.actions)), dtype=np.float64)
+        self._dirty = np.zeros(len(self.values), dtype=bool)
+        for action, target in self.action_index.items():
+            if action in column:
+                self.values[:count, target] = table[:count, column[action]]
+        self._saved_states = count
+        return meta
+
+
 class RLTrainer:
     """
     Real RL trainer with PPO-lite policy updates.
@@ -40,70 +233,115 @@ class RLTrainer:
         # Policy weights
         self.policy = PolicyWeights()
         
-        # Q-value storage (state-action pairs)
-        self.q_values: Dict[str, float] = {}
+        # Q-value storage: state keys interned to rows of a (states x actions) matrix
+        self.q_table = QTable(self._get_available_actions())
         
-        # Experience buffer
-        self.experience_buffer = deque(maxlen=10000)
+        # Experience buffer: ring of encoded transitions
+        self.experience_capacity = config.get("rl", {}).get("experience_capacity", 10000)
+        self._exp_states = np.zeros(self.experience_capacity, dtype=np.int64)
+        self._exp_actions = np.zeros(self.experience_capacity, dtype=np.int64)
+        self._exp_rewards = np.zeros(self.experience_capacity, dtype=np.float64)
+        self._exp_next_states = np.zeros(self.experience_capacity, dtype=np.int64)
+        self._exp_count = 0
+        self._exp_cursor = 0
         
         # Learning parameters
         self.learning_rate = config.get("rl", {}).get("learning_rate", 0.01)
         self.gamma = 0.95  # Discount factor
         self.epsilon = 0.1  # Exploration rate
+        self.checkpoint_interval = config.get("rl", {}).get("checkpoint_interval", 100)
+        self.update_count = 0
         
         # Reward statistics
-        self.reward_history = deque(maxlen=1000)
+        self.reward_stats = RunningRewardStats(window=1000)
         self.avg_reward = 0.0
         
         # Load saved policy
         self._load_policy()
     
+    @property
+    def q_values(self) -> Dict[str, float]:
+        """Q-values keyed by "state_action" (materialised on demand)"""
+        table = self.q_table
+        return {
+            f"{state}_{action}": float(table.values[i, j])
+            for i, state in enumerate(table.states)
+            for j, action in enumerate(table.actions)
+            if table.values[i, j] != 0.0
+        }
+    
+    @property
+    def reward_history(self) -> deque:
+        return self.reward_stats.history
+    
     def update(self, interaction: Dict[str, Any], reward: float):
         """
         Update policy based on interaction and reward.
         Implements Q-learning with policy gradient.
         """
         # Store experience
-        state = self._extract_state(interaction)
-        action = self._extract_action(interaction)
+        state = self.q_table.encode_state(self._extract_state(interaction))
+        action = self.q_table.encode_action(self._extract_action(interaction))
         next_state = state  # Simplified
+        self._store_transition(state, action, reward, next_state)
         
-        experience = {
-            "state": state,
-            "action": action,
-            "reward": reward,
-            "next_state": next_state,
-            "timestamp": interaction.get("timestamp", 0)
-        }
-        
-        self.experience_buffer.append(experience)
-        self.reward_history.append(reward)
-        
-        # Update average reward
-        self.avg_reward = np.mean(list(self.reward_history))
-        
-        # Q-value update
-        state_action_key = f"{state}_{action}"
-        current_q = self.q_values.get(state_action_key, 0.0)
+        # Update reward statistics
+        self.reward_stats.add(float(reward))
+        self.avg_reward = self.reward_stats.window_mean
         
         # Q-learning update
-        max_next_q = max([
-            self.q_values.get(f"{next_state}_{a}", 0.0)
-            for a in self._get_available_actions()
-        ], default=0.0)
-        
-        new_q = current_q + self.learning_rate * (
-            reward + self.gamma * max_next_q - current_q
+        self.q_table.update(
+            np.array([state]), np.array([action]), np.array([float(reward)]), np.array([next_state]),
+            self.learning_rate, self.gamma,
         )
-        self.q_values[state_action_key] = new_q
         
         # Policy gradient update (PPO-lite)
         self._update_policy_weights(reward, interaction)
         
-        # Periodic policy save
-        if len(self.experience_buffer) % 100 == 0:
+        # Periodic incremental checkpoint
+        self.update_count += 1
+        if self.update_count % self.checkpoint_interval == 0:
             self._save_policy()
     
+    def batch_update(self, transitions: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Vectorized Q-learning over transitions with "state", "action",
+        "reward" and optional "next_state"/"done" keys. Returns TD errors.
+        """
+        if not transitions:
+            return np.zeros(0)
+        table = self.q_table
+        states = table.encode_states(t["state"] for t in transitions)
+        actions = np.fromiter((table.encode_action(t["action"]) for t in transitions), dtype=np.int64)
+        rewards = np.fromiter((float(t["reward"]) for t in transitions), dtype=np.float64)
+        next_states = table.encode_states(t.get("next_state", t["state"]) for t in transitions)
+        dones = np.fromiter((bool(t.get("done", False)) for t in transitions), dtype=bool)
+        for i in range(len(transitions)):
+            self._store_transition(states[i], actions[i], rewards[i], next_states[i])
+            self.reward_stats.add(rewards[i])
+        self.avg_reward = self.reward_stats.window_mean
+        return table.update(states, actions, rewards, next_states, self.learning_rate, self.gamma, dones)
+    
+    def replay(self, batch_size: int = 256, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Q-learning step over a uniform sample of stored transitions; returns TD errors"""
+        if self._exp_count == 0:
+            return np.zeros(0)
+        rng = rng or np.random.default_rng()
+        idx = rng.integers(0, self._exp_count, size=batch_size)
+        return self.q_table.update(
+            self._exp_states[idx], self._exp_actions[idx], self._exp_rewards[idx],
+            self._exp_next_states[idx], self.learning_rate, self.gamma,
+        )
+    
+    def _store_transition(self, state: int, action: int, reward: float, next_state: int) -> None:
+        cursor = self._exp_cursor
+        self._exp_states[cursor] = state
+        self._exp_actions[cursor] = action
+        self._exp_rewards[cursor] = reward
+        self._exp_next_states[cursor] = next_state
+        self._exp_cursor = (cursor + 1) % self.experience_capacity
+        self._exp_count = min(self._exp_count + 1, self.experience_capacity)
+    
     def _update_policy_weights(self, reward: float, interaction: Dict[str, Any]):
         """Update policy weights based on reward"""
         # Positive reward = increase weights, negative = decrease
@@ -150,18 +388,11 @@ class RLTrainer:
             actions = self._get_available_actions()
             return np.random.choice(actions)
         
-        # Exploitation: best Q-value action
-        best_action = None
-        best_q = float('-inf')
-        
-        for action in self._get_available_actions():
-            q_key = f"{state}_{action}"
-            q_value = self.q_values.get(q_key, 0.0)
-            if q_value > best_q:
-                best_q = q_value
-                best_action = action
-        
-        return best_action or "default"
+        # Exploitation: best Q-value action (first action on ties / unseen states)
+        row = self.q_table.row(state)
+        if row is None:
+            return self.q_table.actions[0]
+        return self.q_table.actions[int(np.argmax(row))]
     
     def get_policy_decision(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Get policy-based decision for current context"""
@@ -196,37 +427,51 @@ class RLTrainer:
         """Get list of available actions"""
         return ["memory", "web", "llm_cloud", "llm_local", "fusion", "default"]
     
+    def _policy_dir(self) -> Path:
+        return Path(self.config.get("memory", {}).get("data_dir", "./fame_data")) / "rl_policy"
+    
     def _load_policy(self):
-        """Load saved policy weights"""
-        policy_file = Path(self.config.get("memory", {}).get("data_dir", "./fame_data")) / "rl_policy.json"
-        if policy_file.exists():
-            try:
-                with open(policy_file, 'r') as f:
+        """Load saved policy weights and Q-table (migrating a legacy rl_policy.json)"""
+        policy_dir = self._policy_dir()
+        legacy_file = policy_dir.with_suffix(".json")
+        try:
+            if (policy_dir / "meta.json").exists():
+                meta = self.q_table.load(policy_dir)
+                self.policy = PolicyWeights(**meta.get("policy", {}))
+                self.reward_stats.restore(meta.get("reward_stats", {}))
+                self.avg_reward = meta.get("avg_reward", 0.0)
+                logger.info("RL policy loaded")
+            elif legacy_file.exists():
+                with open(legacy_file, 'r') as f:
                     data = json.load(f)
-                    self.policy = PolicyWeights(**data.get("policy", {}))
-                    self.q_values = data.get("q_values", {})
-                    logger.info("RL policy loaded")
-            except Exception as e:
-                logger.error(f"Failed to load RL policy: {e}")
+                self.policy = PolicyWeights(**data.get("policy", {}))
+                self.avg_reward = data.get("avg_reward", 0.0)
+                self._import_legacy_q_values(data.get("q_values", {}))
+                logger.info("Legacy RL policy loaded")
+        except Exception as e:
+            logger.error(f"Failed to load RL policy: {e}")
+    
+    def _import_legacy_q_values(self, q_values: Dict[str, float]) -> None:
+        # keys are f"{state}_{action}" and both parts may contain underscores
+        actions = sorted(self.q_table.actions, key=len, reverse=True)
+        for key, value in q_values.items():
+            action = next((a for a in actions if key.endswith(f"_{a}")), None)
+            if action is None:
+                continue
+            state = key[: -len(action) - 1]
+            row = self.q_table.encode_state(state)
+            self.q_table.values[row, self.q_table.action_index[action]] = float(value)
+        self.q_table._dirty[: len(self.q_table)] = True
     
     def _save_policy(self):
-        """Save policy weights"""
-        policy_file = Path(self.config.get("memory", {}).get("data_dir", "./fame_data")) / "rl_policy.json"
+        """Checkpoint policy weights and the Q-rows changed since the last checkpoint"""
         try:
-            data = {
-                "policy": {
-                    "response_length": self.policy.response_length,
-                    "search_depth": self.policy.search_depth,
-                    "tool_usage": self.policy.tool_usage,
-                    "memory_write": self.policy.memory_write,
-                    "hallucination_penalty": self.policy.hallucination_penalty,
-                    "confidence_threshold": self.policy.confidence_threshold
-                },
-                "q_values": self.q_values,
-                "avg_reward": self.avg_reward
-            }
-            with open(policy_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.q_table.save(self._policy_dir(), {
+                "policy": asdict(self.policy),
+                "avg_reward": self.avg_reward,
+                "reward_stats": self.reward_stats.state(),
+                "updates": self.update_count,
+            })
             logger.debug("RL policy saved")
         except Exception as e:
             logger.error(f"Failed to save RL policy: {e}")
@@ -235,8 +480,11 @@ class RLTrainer:
         """Get RL training statistics"""
         return {
             "avg_reward": self.avg_reward,
-            "experience_count": len(self.experience_buffer),
-            "q_values_count": len(self.q_values),
+            "reward_mean": self.reward_stats.mean,
+            "reward_std": math.sqrt(self.reward_stats.variance),
+            "experience_count": self._exp_count,
+            "states_count": len(self.q_table),
+            "q_values_count": int(np.count_nonzero(self.q_table.values[: len(self.q_table)])),
             "policy": {
                 "response_length": self.policy.response_length,
                 "search_depth": self.policy.search_depth,
@@ -1,164 +1,411 @@
 #!/usr/bin/env python3
 """
-Enterprise TTL Cache with LRU eviction
-Thread-safe cache implementation for trading preferences and other services
+Enterprise TTL Cache with W-TinyLFU eviction
+Sharded, thread- and coroutine-safe cache for trading preferences and other services
 """
 
+import sys
 import threading
 import time
 import logging
-import asyncio
-from typing import Any, Dict, Optional, Callable
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# replay recorded reads into the eviction policy once this many are pending
+READ_BUFFER_DRAIN = 64
+
+
+_ATOMIC = (str, bytes, int, float, bool, type(None))
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Approximate deep size in bytes of plain Python data (dicts, lists, strings...)"""
+    if isinstance(value, _ATOMIC):
+        return sys.getsizeof(value)
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, _seen) + estimate_size(v, _seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item, _seen)
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _seen)
+    return size
+
+
+class FrequencySketch:
+    """
+    Count-Min sketch of 4-bit counters (TinyLFU). Counts are halved every
+    `sample_size` increments so old popularity fades.
+    """
+
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+
+    def __init__(self, capacity: int):
+        width = 16
+        while width < max(1, capacity) * 4:
+            width <<= 1
+        self.mask = width - 1
+        self.table = [bytearray(width) for _ in self._SEEDS]
+        self.sample_size = max(10, 10 * capacity)
+        self.additions = 0
+
+    def _indexes(self, key: str):
+        h = hash(key)
+        for seed in self._SEEDS:
+            mixed = ((h ^ seed) * 0x9E3779B1) & 0xFFFFFFFFFFFFFFFF
+            yield (mixed ^ (mixed >> 29)) & self.mask
+
+    def increment(self, key: str) -> None:
+        added = False
+        for row, index in zip(self.table, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self._reset()
+
+    def frequency(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self.table, self._indexes(key)))
+
+    def _reset(self) -> None:
+        self.table = [bytearray(count >> 1 for count in row) for row in self.table]
+        self.additions //= 2
+
+
+class _Entry:
+    __slots__ = ("value", "expire_time", "created_at", "size")
+
+    def __init__(self, value: Any, expire_time: Optional[float], created_at: float, size: int):
+        self.value = value
+        self.expire_time = expire_time
+        self.created_at = created_at
+        self.size = size
+
+
+class CacheShard:
+    """
+    One lock-guarded shard: a small LRU admission window in front of a
+    segmented LRU (probation/protected) main area, with a TinyLFU filter
+    deciding whether a window victim may displace a main victim.
+
+    Reads never take the lock: they look the key up in a plain dict and
+    append the access to a read buffer, which is replayed into the LRU
+    order and the frequency sketch by whoever next holds the lock.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        window = max(1, self.max_entries // 100)
+        self.window_capacity = window
+        self.main_capacity = self.max_entries - window
+        self.protected_capacity = int(self.main_capacity * 0.8)
+
+        self.lock = threading.Lock()
+        self.data: Dict[str, _Entry] = {}
+        self.window: "OrderedDict[str, None]" = OrderedDict()
+        self.probation: "OrderedDict[str, None]" = OrderedDict()
+        self.protected: "OrderedDict[str, None]" = OrderedDict()
+        self.sketch = FrequencySketch(self.max_entries)
+        self.reads: Deque[Tuple[str, bool]] = deque()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.expirations = 0
+
+    # ------------------------------------------------------------------ #
+    # Read path (lock-free)
+    # ------------------------------------------------------------------ #
+    def get(self, key: str, now: float) -> Optional[Any]:
+        entry = self.data.get(key)
+        if entry is not None and entry.expire_time is not None and now > entry.expire_time:
+            self._expire(key, entry)
+            entry = None
+        self.reads.append((key, entry is not None))
+        if len(self.reads) >= READ_BUFFER_DRAIN and self.lock.acquire(blocking=False):
+            try:
+                self._drain_reads()
+            finally:
+                self.lock.release()
+        return None if entry is None else entry.value
+
+    def peek(self, key: str, now: float) -> bool:
+        entry = self.data.get(key)
+        return entry is not None and (entry.expire_time is None or now <= entry.expire_time)
+
+    def _expire(self, key: str, entry: _Entry) -> None:
+        # best effort: if the lock is busy, expire_entries() or the next write cleans up
+        if not self.lock.acquire(blocking=False):
+            return
+        try:
+            if self.data.get(key) is entry:
+                self._remove(key)
+                self.expirations += 1
+        finally:
+            self.lock.release()
+
+    def _drain_reads(self) -> None:
+        reads = self.reads
+        for _ in range(len(reads)):
+            key, hit = reads.popleft()
+            self.sketch.increment(key)
+            if not hit:
+                self.misses += 1
+                continue
+            self.hits += 1
+            if key in self.data:
+                self._on_access(key)
+
+    def _on_access(self, key: str) -> None:
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_capacity:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+
+    # ------------------------------------------------------------------ #
+    # Write path (under the shard lock)
+    # ------------------------------------------------------------------ #
+    def set(self, key: str, value: Any, expire_time: Optional[float], size: int, now: float) -> bool:
+        with self.lock:
+            self._drain_reads()
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejections += 1
+                if key in self.data:
+                    self._remove(key)
+                return False
+            existing = self.data.get(key)
+            if existing is not None:
+                self.bytes += size - existing.size
+                self.data[key] = _Entry(value, expire_time, existing.created_at, size)
+                self._on_access(key)
+            else:
+                self.sketch.increment(key)
+                self.data[key] = _Entry(value, expire_time, now, size)
+                self.bytes += size
+                self.window[key] = None
+                while len(self.window) > self.window_capacity:
+                    candidate, _ = self.window.popitem(last=False)
+                    self._admit(candidate)
+            self._enforce_budget()
+            return key in self.data
+
+    def _admit(self, candidate: str) -> None:
+        """TinyLFU: a window victim enters main only if it is more popular than main's victim"""
+        if len(self.probation) + len(self.protected) < self.main_capacity:
+            self.probation[candidate] = None
+            return
+        segment = self.probation if self.probation else self.protected
+        if not segment:
+            # no main area at all (tiny shards): the window victim simply leaves
+            self._drop(candidate)
+            self.evictions += 1
+            return
+        victim = next(iter(segment))
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            del segment[victim]
+            self._drop(victim)
+            self.evictions += 1
+            self.probation[candidate] = None
+        else:
+            self._drop(candidate)
+            self.rejections += 1
+
+    def _enforce_budget(self) -> None:
+        if self.max_bytes is None:
+            return
+        while self.bytes > self.max_bytes:
+            for segment in (self.probation, self.protected, self.window):
+                if segment:
+                    victim, _ = segment.popitem(last=False)
+                    self._drop(victim)
+                    self.evictions += 1
+                    break
+            else:
+                break
+
+    def _drop(self, key: str) -> None:
+        entry = self.data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def _remove(self, key: str) -> bool:
+        if key not in self.data:
+            return False
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                break
+        self._drop(key)
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self.lock:
+            return self._remove(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.window.clear()
+            self.probation.clear()
+            self.protected.clear()
+            self.reads.clear()
+            self.sketch = FrequencySketch(self.max_entries)
+            self.bytes = 0
+            self.hits = self.misses = self.evictions = self.rejections = self.expirations = 0
+
+    def expire_entries(self, now: float) -> int:
+        with self.lock:
+            expired = [
+                key for key, entry in self.data.items()
+                if entry.expire_time is not None and entry.expire_time < now
+            ]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            self._drain_reads()
+            requests = self.hits + self.misses
+            return {
+                "size": len(self.data),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "rejections": self.rejections,
+                "expirations": self.expirations,
+            }
+
 
 class EnterpriseCache:
     """
-    Thread-safe TTL cache with LRU eviction and circuit breaker support.
+    Sharded TTL cache with W-TinyLFU eviction and a byte budget.
+
+    Keys are spread over up to `num_shards` shards, each with its own lock,
+    so threads and coroutines touching different shards never contend.
+    Reads (`get` / `get_sync`) are lock-free; writes hold one shard lock for
+    O(1) work. `max_size` bounds entries and `max_bytes` (optional) bounds
+    the estimated size of cached values; both are split across shards.
     """
-    
+
     def __init__(
         self,
         max_size: int = 1000,
         default_ttl: float = 3600.0,  # 1 hour default
-        enable_metrics: bool = True
+        enable_metrics: bool = True,
+        max_bytes: Optional[int] = None,
+        num_shards: int = 16,
+        sizeof: Optional[Callable[[Any], int]] = None
     ):
         self.max_size = max_size
         self.default_ttl = default_ttl
         self.enable_metrics = enable_metrics
-        
-        # Thread-safe storage
-        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
-        self._lock = threading.RLock()
-        
-        # Metrics
-        self._hits = 0
-        self._misses = 0
-        self._evictions = 0
-        
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or estimate_size
+
+        # power-of-two shard count, never more shards than entries
+        shards = 1
+        while shards * 2 <= min(num_shards, max(1, max_size)):
+            shards *= 2
+        self._mask = shards - 1
+        self._shards: List[CacheShard] = []
+        for index in range(shards):
+            entries = max_size // shards + (1 if index < max_size % shards else 0)
+            budget = None
+            if max_bytes is not None:
+                budget = max_bytes // shards + (1 if index < max_bytes % shards else 0)
+            self._shards.append(CacheShard(entries, budget))
+
+    def _shard(self, key: str) -> CacheShard:
+        return self._shards[hash(key) & self._mask]
+
+    def _expire_time(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = ttl if ttl is not None else self.default_ttl
+        return time.time() + ttl if ttl > 0 else None
+
     async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache if not expired (async for compatibility)"""
-        with self._lock:
-            if key not in self._cache:
-                self._misses += 1
-                return None
-            
-            entry = self._cache[key]
-            expire_time = entry.get('expire_time')
-            
-            # Check expiration
-            if expire_time and time.time() > expire_time:
-                del self._cache[key]
-                self._misses += 1
-                return None
-            
-            # Move to end (LRU)
-            self._cache.move_to_end(key)
-            self._hits += 1
-            return entry['value']
-    
+        """Get value from cache if not expired; never blocks the event loop on a lock"""
+        return self._shard(key).get(key, time.time())
+
     def get_sync(self, key: str) -> Optional[Any]:
         """Synchronous version of get for compatibility"""
-        with self._lock:
-            if key not in self._cache:
-                self._misses += 1
-                return None
-            
-            entry = self._cache[key]
-            expire_time = entry.get('expire_time')
-            
-            if expire_time and time.time() > expire_time:
-                del self._cache[key]
-                self._misses += 1
-                return None
-            
-            self._cache.move_to_end(key)
-            self._hits += 1
-            return entry['value']
-    
+        return self._shard(key).get(key, time.time())
+
     async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """Set value in cache with optional TTL"""
-        with self._lock:
-            ttl = ttl if ttl is not None else self.default_ttl
-            expire_time = time.time() + ttl if ttl > 0 else None
-            
-            # If key exists, update it
-            if key in self._cache:
-                self._cache[key] = {
-                    'value': value,
-                    'expire_time': expire_time,
-                    'created_at': self._cache[key].get('created_at', time.time())
-                }
-                self._cache.move_to_end(key)
-            else:
-                # Add new entry
-                self._cache[key] = {
-                    'value': value,
-                    'expire_time': expire_time,
-                    'created_at': time.time()
-                }
-                
-                # Evict if over size limit (LRU)
-                if len(self._cache) > self.max_size:
-                    oldest_key = next(iter(self._cache))
-                    del self._cache[oldest_key]
-                    self._evictions += 1
-    
+        self.set_sync(key, value, ttl)
+
+    def set_sync(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set value from synchronous code; False if the admission policy or byte budget rejected it"""
+        return self._shard(key).set(key, value, self._expire_time(ttl), self.sizeof(value), time.time())
+
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
-    
+        return self._shard(key).delete(key)
+
     def clear(self) -> None:
         """Clear all cache entries"""
-        with self._lock:
-            self._cache.clear()
-            self._hits = 0
-            self._misses = 0
-            self._evictions = 0
-    
+        for shard in self._shards:
+            shard.clear()
+
     def expire_entries(self) -> int:
         """Remove expired entries, return count removed"""
-        with self._lock:
-            current_time = time.time()
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if entry.get('expire_time') and entry['expire_time'] < current_time
-            ]
-            for key in expired_keys:
-                del self._cache[key]
-            return len(expired_keys)
-    
+        now = time.time()
+        return sum(shard.expire_entries(now) for shard in self._shards)
+
     def get_metrics_snapshot(self) -> Dict[str, Any]:
         """Get cache metrics for observability"""
-        with self._lock:
-            total_requests = self._hits + self._misses
-            hit_ratio = self._hits / total_requests if total_requests > 0 else 0.0
-            
-            return {
-                'size': len(self._cache),
-                'max_size': self.max_size,
-                'hits': self._hits,
-                'misses': self._misses,
-                'hit_ratio': hit_ratio,
-                'evictions': self._evictions,
-                'expired_entries': self.expire_entries()
-            }
-    
+        expired = self.expire_entries()
+        shards = [shard.stats() for shard in self._shards]
+        hits = sum(s["hits"] for s in shards)
+        misses = sum(s["misses"] for s in shards)
+        total_requests = hits + misses
+
+        return {
+            'size': sum(s["size"] for s in shards),
+            'max_size': self.max_size,
+            'bytes': sum(s["bytes"] for s in shards),
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total_requests if total_requests > 0 else 0.0,
+            'evictions': sum(s["evictions"] for s in shards),
+            'rejections': sum(s["rejections"] for s in shards),
+            'expired_entries': expired,
+            'shards': shards
+        }
+
     def get_stats(self) -> Dict[str, Any]:
         """Alias for get_metrics_snapshot for compatibility"""
         return self.get_metrics_snapshot()
-    
+
     def __len__(self) -> int:
         """Return number of cache entries"""
-        with self._lock:
-            return len(self._cache)
-    
+        return sum(len(shard.data) for shard in self._shards)
+
     def __contains__(self, key: str) -> bool:
-        """Check if key exists in cache (not expired)"""
-        return self.get(key) is not None
+        """Check if key exists in cache (not expired); does not count as an access"""
+        return self._shard(key).peek(key, time.time())
@@ -68,6 +68,36 @@ class ExecutionService:
                 "cash": self.broker.get_cash_balance(),
             }
 
+    async def execute_portfolio_async(
+        self,
+        portfolio_payload: Dict[str, Dict],
+        price_map: Optional[Dict[str, float]] = None,
+        basket_id: Optional[str] = None,
+    ) -> Dict[str, any]:
+        """Like `execute_portfolio`, but submits the plan as a concurrent, reconciled basket."""
+        with span(
+            "ExecutionService.execute_portfolio_async",
+            {"orders_planned": len(portfolio_payload.get("positions") or {})},
+        ):
+            plan = self.plan_execution(portfolio_payload, price_map=price_map)
+            results: List[OrderResult] = []
+            basket_summary = None
+            if not plan.is_empty():
+                basket = await self.router.execute_plan_async(
+                    plan, self.broker, price_map=price_map, basket_id=basket_id
+                )
+                basket_summary = self.router.reconcile(basket, self.broker)
+                results = basket.results()
+                self._log_execution(results, plan)
+            return {
+                "plan": plan,
+                "orders": results,
+                "basket": basket_summary,
+                "metrics": self.monitor.metrics_summary(),
+                "positions": self.broker.get_positions(),
+                "cash": self.broker.get_cash_balance(),
+            }
+
     def metrics(self) -> Dict[str, float]:
         return self.monitor.metrics_summary()
 
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional
 
 try:
     from circuitbreaker import circuit
@@ -26,16 +27,33 @@ from monitoring.trading_preferences_metrics import (
     PREFERENCE_UPDATE_COUNTER,
 )
 from models.trading_preferences_enterprise import (
+    AuditEntry,
     RiskTolerance,
     TradingPreferencesEnterprise,
 )
 from services.cache.enterprise_cache import EnterpriseCache
+from services.trading_preferences_store import (
+    PreferenceDelta,
+    RateLimiter,
+    VersionConflict,
+    WriteBehindBuffer,
+)
 
 logger = logging.getLogger(__name__)
 
+PREFERENCES_TTL_SECONDS = 86400
+
 
 class TradingPreferencesManagerEnterprise:
-    """Main access point for trading preferences with caching, rate limits, and circuit breakers."""
+    """Main access point for trading preferences with caching, rate limits, and circuit breakers.
+
+    Preferences are kept as a compact current snapshot (no audit trail) plus
+    an append-only log of versioned deltas. Updates are optimistic: each
+    commits only if the revision it was based on is still current. Storage
+    writes are write-behind: the newest snapshot per document and all new
+    deltas are flushed together after ``flush_interval`` seconds (or on
+    :meth:`flush` / :meth:`close`).
+    """
 
     def __init__(
         self,
@@ -44,31 +62,32 @@ class TradingPreferencesManagerEnterprise:
         cache: Optional[EnterpriseCache] = None,
         read_rate_limit: int = 100,
         write_rate_limit: int = 10,
+        flush_interval: float = 0.05,
+        max_update_retries: int = 3,
+        max_rate_limit_keys: int = 10000,
+        max_audit_entries: int = 1000,
     ) -> None:
         self.session_manager = session_manager
         self.redis_client = redis_client
         self.cache = cache or EnterpriseCache()
         self.read_rate_limit = read_rate_limit
         self.write_rate_limit = write_rate_limit
-        self._rate_limit: Dict[str, Dict[str, Any]] = {}
+        self.flush_interval = flush_interval
+        self.max_update_retries = max_update_retries
+        self.max_audit_entries = max_audit_entries
+        self._rate_limiter = RateLimiter(max_keys=max_rate_limit_keys)
+        self._pending = WriteBehindBuffer()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_failures = 0
+        self._hit_ratio_updated = 0.0
 
     @PREFERENCE_OPERATION_LATENCY.time()
     @circuit(failure_threshold=3, expected_exception=Exception, recovery_timeout=30)
     async def get_preferences(self, session_id: str, user_id: str) -> TradingPreferencesEnterprise:
-        cache_key = self._cache_key(session_id, user_id)
         try:
-            cached = await self.cache.get(cache_key)
-            if cached:
-                stats = self.cache.get_stats()
-                PREFERENCE_CACHE_HIT_RATIO.set(stats.get("hit_ratio", 0))
-                return TradingPreferencesEnterprise.model_validate(cached)
-            self._throttle(user_id, "read")
-            data = await self._load_preferences(session_id, user_id)
-            if data is None:
-                data = self._create_default_preferences(user_id, session_id).model_dump()
-            prefs = TradingPreferencesEnterprise.model_validate(data)
-            await self.cache.set(cache_key, prefs.model_dump())
-            return prefs
+            return (await self._current(session_id, user_id)).model_copy(deep=True)
         except Exception as exc:
             PREFERENCE_ERROR_COUNTER.labels(error_type=type(exc).__name__).inc()
             logger.error(
@@ -77,6 +96,31 @@ class TradingPreferencesManagerEnterprise:
             )
             raise
 
+    async def _current(self, session_id: str, user_id: str) -> TradingPreferencesEnterprise:
+        """The committed preferences object (shared; never mutate it in place)."""
+        cache_key = self._cache_key(session_id, user_id)
+        pending = self._pending.get(cache_key)
+        if pending is not None:
+            return pending
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            self._report_hit_ratio()
+            return cached
+        self._throttle(user_id, "read")
+        data = await self._load_preferences(session_id, user_id)
+        if data is None:
+            prefs = self._create_default_preferences(user_id, session_id)
+        else:
+            prefs = TradingPreferencesEnterprise.model_validate(data)
+        await self.cache.set(cache_key, prefs)
+        return prefs
+
+    def _report_hit_ratio(self) -> None:
+        now = time.monotonic()
+        if now - self._hit_ratio_updated >= 1.0:
+            self._hit_ratio_updated = now
+            PREFERENCE_CACHE_HIT_RATIO.set(self.cache.get_stats().get("hit_ratio", 0))
+
     @circuit(failure_threshold=2, expected_exception=Exception, recovery_timeout=60)
     async def update_preferences(
         self,
@@ -85,14 +129,38 @@ class TradingPreferencesManagerEnterprise:
         updates: Dict[str, Any],
         reason: str,
         actor: str,
+        expected_revision: Optional[int] = None,
     ) -> TradingPreferencesEnterprise:
+        """
+        Apply `updates` on top of the current revision. With
+        `expected_revision`, raise VersionConflict unless that revision is
+        still current; without it, retry on concurrent commits.
+        """
         self._throttle(user_id, "write")
+        cache_key = self._cache_key(session_id, user_id)
         try:
-            preferences = await self.get_preferences(session_id, user_id)
-            preferences.update_preferences(updates, reason=reason, actor=actor)
-            await self._validate_business_rules(preferences)
-            await self._persist_preferences(preferences, user_id)
-            await self.cache.set(self._cache_key(session_id, user_id), preferences.model_dump())
+            for _ in range(self.max_update_retries):
+                current = await self._current(session_id, user_id)
+                if expected_revision is not None and current.revision != expected_revision:
+                    raise VersionConflict(
+                        f"Preferences are at revision {current.revision}, not {expected_revision}"
+                    )
+                preferences = current.model_copy()
+                entry = preferences.update_preferences(updates, reason=reason, actor=actor, record_audit=False)
+                await self._validate_business_rules(preferences)
+                latest = await self._current(session_id, user_id)
+                if latest.revision != current.revision:
+                    if expected_revision is not None:
+                        raise VersionConflict(
+                            f"Preferences moved to revision {latest.revision} during the update"
+                        )
+                    continue
+                preferences.revision = current.revision + 1
+                self._commit(cache_key, preferences, entry)
+                break
+            else:
+                raise VersionConflict("Too many concurrent updates to trading preferences")
+            await self.cache.set(cache_key, preferences)
             PREFERENCE_UPDATE_COUNTER.labels(risk_level=preferences.risk_tolerance.value).inc()
             logger.info(
                 "Trading preferences updated",
@@ -101,9 +169,10 @@ class TradingPreferencesManagerEnterprise:
                     "session_id": session_id,
                     "actor": actor,
                     "changes": list(updates.keys()),
+                    "revision": preferences.revision,
                 },
             )
-            return preferences
+            return preferences.model_copy(deep=True)
         except Exception as exc:
             PREFERENCE_ERROR_COUNTER.labels(error_type=type(exc).__name__).inc()
             logger.error(
@@ -117,6 +186,95 @@ class TradingPreferencesManagerEnterprise:
             )
             raise
 
+    def _commit(self, cache_key: str, preferences: TradingPreferencesEnterprise, entry: AuditEntry) -> None:
+        delta = PreferenceDelta(
+            user_id=preferences.user_id,
+            session_id=preferences.session_id,
+            revision=preferences.revision,
+            changes=entry.model_dump(mode="json")["changes"],
+            actor=entry.actor,
+            reason=entry.reason,
+            previous_state=entry.previous_state,
+            timestamp=entry.timestamp.isoformat(),
+        )
+        self._pending.add(cache_key, preferences.revision, preferences, delta)
+        self._schedule_flush(self.flush_interval)
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Tie the flush task and lock to the running loop. Callers such as
+        fame_simple run every query on a fresh loop; a flush left on a
+        closed loop never runs, so its writes are taken back here.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._flush_loop:
+            self._flush_loop = loop
+            self._flush_lock = asyncio.Lock()
+            self._flush_task = None
+            self._pending.requeue_in_flight()
+        return loop
+
+    def _schedule_flush(self, delay: float) -> None:
+        loop = self._bind_loop()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await self.flush()
+        except Exception as exc:
+            logger.error("Write-behind flush of trading preferences failed", extra={"error": str(exc)})
+        if self._pending.snapshots:
+            # failed writes were requeued, or commits arrived during the flush
+            retry = min(self.flush_interval * 2 ** self._flush_failures, 30.0)
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later(retry))
+
+    async def flush(self) -> int:
+        """Persist pending snapshots and deltas now; returns the number of documents written."""
+        self._bind_loop()
+        async with self._flush_lock:
+            snapshots, deltas = self._pending.drain()
+            failed: Optional[Exception] = None
+            for cache_key, (revision, preferences) in snapshots.items():
+                document_deltas = deltas.get(cache_key, [])
+                try:
+                    await self._append_deltas(preferences, document_deltas)
+                    document_deltas = []  # appended; only the snapshot is retried
+                    await self._persist_preferences(preferences, preferences.user_id)
+                    self._pending.complete(cache_key, revision)
+                except asyncio.CancelledError:
+                    self._pending.requeue(cache_key, revision, preferences, document_deltas)
+                    self._pending.requeue_in_flight()
+                    raise
+                except Exception as exc:
+                    failed = exc
+                    self._pending.requeue(cache_key, revision, preferences, document_deltas)
+            if failed is not None:
+                self._flush_failures += 1
+                raise failed
+            self._flush_failures = 0
+            return len(snapshots)
+
+    async def close(self) -> None:
+        """Flush outstanding writes; call before shutting the event loop down."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
+
+    async def get_audit_trail(self, session_id: str, user_id: str, limit: int = 100) -> List[PreferenceDelta]:
+        """Most recent deltas for a user's preferences, oldest first."""
+        entries: List[Dict[str, Any]] = []
+        if self.redis_client:
+            raw = await self.redis_client.lrange(self._log_key(user_id), -limit, -1)
+            entries = [json.loads(item) for item in raw or []]
+        elif self.session_manager:
+            entries = list(await self._session_value(session_id, "trading_preferences_log") or [])
+        deltas = [PreferenceDelta.from_dict(item) for item in entries]
+        deltas.extend(self._pending.pending_deltas(self._cache_key(session_id, user_id)))
+        return deltas[-limit:]
+
     async def validate_trade(
         self,
         session_id: str,
@@ -157,33 +315,54 @@ class TradingPreferencesManagerEnterprise:
         preferences: TradingPreferencesEnterprise,
         user_id: str,
     ) -> None:
+        snapshot = self._snapshot(preferences)
         last_exc: Optional[Exception] = None
         for attempt in range(3):
             try:
                 if self.redis_client:
                     await self.redis_client.set(
                         self._redis_key(user_id),
-                        self._serialize(preferences.model_dump()),
-                        ex=86400,
+                        self._serialize(snapshot),
+                        ex=PREFERENCES_TTL_SECONDS,
                     )
                 elif self.session_manager:
-                    if hasattr(self.session_manager, "update_session"):
-                        await self.session_manager.update_session(
-                            preferences.session_id,
-                            {"trading_preferences": preferences.model_dump()},
-                        )
-                    else:
-                        self.session_manager.set_context(  # type: ignore[attr-defined]
-                            preferences.session_id,
-                            "trading_preferences",
-                            preferences.model_dump(),
-                        )
+                    await self._set_session_value(preferences.session_id, "trading_preferences", snapshot)
                 return
             except Exception as exc:
                 last_exc = exc
                 await asyncio.sleep(2**attempt)
         raise PersistenceError(f"Failed to persist preferences: {last_exc}") from last_exc
 
+    async def _append_deltas(self, preferences: TradingPreferencesEnterprise, deltas: List[PreferenceDelta]) -> None:
+        if not deltas:
+            return
+        if self.redis_client:
+            # keep the newest entries only, and let the log expire with its snapshot
+            key = self._log_key(preferences.user_id)
+            await self.redis_client.rpush(key, *(d.to_json() for d in deltas))
+            await self.redis_client.ltrim(key, -self.max_audit_entries, -1)
+            await self.redis_client.expire(key, PREFERENCES_TTL_SECONDS)
+        elif self.session_manager:
+            log = list(await self._session_value(preferences.session_id, "trading_preferences_log") or [])
+            log.extend(json.loads(d.to_json()) for d in deltas)
+            await self._set_session_value(preferences.session_id, "trading_preferences_log", log[-self.max_audit_entries:])
+
+    async def _session_value(self, session_id: str, name: str) -> Any:
+        if hasattr(self.session_manager, "get_session"):
+            session = await self.session_manager.get_session(session_id)
+            return session.get(name) if session else None
+        return self.session_manager.get_context(session_id, name)  # type: ignore[attr-defined]
+
+    async def _set_session_value(self, session_id: str, name: str, value: Any) -> None:
+        if hasattr(self.session_manager, "update_session"):
+            await self.session_manager.update_session(session_id, {name: value})
+        else:
+            self.session_manager.set_context(session_id, name, value)  # type: ignore[attr-defined]
+
+    def _snapshot(self, preferences: TradingPreferencesEnterprise) -> Dict[str, Any]:
+        # the audit trail lives in the delta log, not in the hot document
+        return preferences.model_dump(mode="json", exclude={"audit_trail"})
+
     async def _validate_business_rules(self, preferences: TradingPreferencesEnterprise) -> None:
         if (
             preferences.risk_tolerance == RiskTolerance.CONSERVATIVE
@@ -192,17 +371,8 @@ class TradingPreferencesManagerEnterprise:
             raise BusinessRuleViolation("Conservative risk tolerance limited to 5% position size.")
 
     def _throttle(self, user_id: str, operation: str) -> None:
-        now = datetime.now(timezone.utc)
-        key = f"{user_id}:{operation}"
-        bucket = self._rate_limit.setdefault(
-            key, {"count": 0, "window_start": now, "limit": self._limit_for_operation(operation)}
-        )
-        if now - bucket["window_start"] > timedelta(minutes=1):
-            bucket["count"] = 0
-            bucket["window_start"] = now
-        if bucket["count"] >= bucket["limit"]:
+        if not self._rate_limiter.allow(f"{user_id}:{operation}", self._limit_for_operation(operation)):
             raise RateLimitExceeded(f"Rate limit exceeded for {operation}")
-        bucket["count"] += 1
 
     def _limit_for_operation(self, operation: str) -> int:
         return self.read_rate_limit if operation == "read" else self.write_rate_limit
@@ -213,6 +383,9 @@ class TradingPreferencesManagerEnterprise:
     def _redis_key(self, user_id: str) -> str:
         return f"trading_preferences:{user_id}"
 
+    def _log_key(self, user_id: str) -> str:
+        return f"trading_preferences:{user_id}:deltas"
+
     def _serialize(self, data: Dict[str, Any]) -> Any:
         return data
 
@@ -0,0 +1,166 @@
+"""Versioned delta log, write-behind buffer and rate limiting for trading preferences."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class VersionConflict(Exception):
+    """Raised when an update was based on a revision that is no longer current."""
+
+
+@dataclass
+class PreferenceDelta:
+    """One committed change: the fields that changed, who changed them and why."""
+
+    user_id: str
+    session_id: str
+    revision: int
+    changes: Dict[str, Any]
+    actor: str
+    reason: str
+    previous_state: Dict[str, Any] = field(default_factory=dict)
+    timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=_json_default, separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PreferenceDelta":
+        return cls(**data)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):  # enums
+        return value.value
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class WriteBehindBuffer:
+    """
+    Pending writes keyed by document: only the newest snapshot per key is
+    kept (coalescing), while every delta is kept in commit order. Drained
+    writes stay readable as in-flight until they are completed or requeued,
+    so readers never fall back to storage that is older than a commit.
+    """
+
+    def __init__(self) -> None:
+        self.snapshots: Dict[str, Tuple[int, Any]] = {}
+        self.deltas: Dict[str, List[PreferenceDelta]] = {}
+        self.in_flight: Dict[str, Tuple[int, Any, List[PreferenceDelta]]] = {}
+
+    def add(self, key: str, revision: int, snapshot: Any, delta: PreferenceDelta) -> None:
+        self.snapshots[key] = (revision, snapshot)
+        self.deltas.setdefault(key, []).append(delta)
+
+    def get(self, key: str) -> Optional[Any]:
+        pending = self.snapshots.get(key) or self.in_flight.get(key)
+        return pending[1] if pending else None
+
+    def pending_deltas(self, key: str) -> List[PreferenceDelta]:
+        in_flight = self.in_flight.get(key)
+        return (list(in_flight[2]) if in_flight else []) + self.deltas.get(key, [])
+
+    def drain(self) -> Tuple[Dict[str, Tuple[int, Any]], Dict[str, List[PreferenceDelta]]]:
+        snapshots, deltas = self.snapshots, self.deltas
+        self.snapshots, self.deltas = {}, {}
+        for key, (revision, snapshot) in snapshots.items():
+            self.in_flight[key] = (revision, snapshot, deltas.get(key, []))
+        return snapshots, deltas
+
+    def complete(self, key: str, revision: int) -> None:
+        """The in-flight write of `revision` reached storage."""
+        in_flight = self.in_flight.get(key)
+        if in_flight is not None and in_flight[0] == revision:
+            del self.in_flight[key]
+
+    def requeue(self, key: str, revision: int, snapshot: Any, deltas: List[PreferenceDelta]) -> None:
+        """Put a failed write back, unless a newer snapshot was committed meanwhile."""
+        self.complete(key, revision)
+        current = self.snapshots.get(key)
+        if current is None or current[0] < revision:
+            self.snapshots[key] = (revision, snapshot)
+        if deltas:
+            self.deltas[key] = deltas + self.deltas.get(key, [])
+
+    def requeue_in_flight(self) -> None:
+        """Requeue every in-flight write, e.g. after its flush died with its event loop."""
+        for key, (revision, snapshot, deltas) in list(self.in_flight.items()):
+            self.requeue(key, revision, snapshot, deltas)
+
+    def __len__(self) -> int:
+        return len(self.snapshots.keys() | self.in_flight.keys())
+
+
+@dataclass
+class TokenBucket:
+    capacity: float
+    refill_per_second: float
+    tokens: float
+    updated: float
+
+    def refilled(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.refill_per_second >= self.capacity
+
+    def consume(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class RateLimiter:
+    """
+    Token buckets per key, at most `max_keys` of them. To make room, the
+    least recently used bucket that has fully refilled is dropped (among the
+    `evict_scan` oldest), since forgetting it changes nothing. If all of
+    those are still draining the oldest is dropped anyway and its key starts
+    over with a full bucket, so size `max_keys` above the number of keys
+    active within one `period`.
+    """
+
+    evict_scan = 16
+
+    def __init__(self, max_keys: int = 10000, period: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.period = period
+        self.clock = clock
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def allow(self, key: str, limit: int) -> bool:
+        now = self.clock()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(float(limit), limit / self.period, float(limit), now)
+            if self.buckets and len(self.buckets) >= self.max_keys:
+                self._evict(now)
+            self.buckets[key] = bucket
+        else:
+            self.buckets.move_to_end(key)
+        return bucket.consume(now)
+
+    def _evict(self, now: float) -> None:
+        for index, (key, bucket) in enumerate(self.buckets.items()):
+            if index >= self.evict_scan:
+                break
+            if bucket.refilled(now):
+                del self.buckets[key]
+                return
+        self.buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.buckets)
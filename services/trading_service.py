@@ -526,7 +526,7 @@ class TradingService:
                 price_map = market_state.get("prices") or {}
             if price_map:
                 self.execution_service.update_price_marks(price_map)
-            execution_result = self.execution_service.execute_portfolio(portfolio, price_map=price_map)
+            execution_result = await self.execution_service.execute_portfolio_async(portfolio, price_map=price_map)
             self._update_execution_metrics(execution_result["metrics"])
             return {"portfolio": portfolio, "execution": execution_result}
 
@@ -80,6 +80,19 @@ class TradingPreferencesSkill(Skill):
         except Exception as exc:  # pragma: no cover - defensive guardrail
             logger.exception("Trading preferences skill error: %s", exc)
             return self._error("I ran into a problem updating your preferences.")
+        finally:
+            # callers such as fame_simple close their event loop after each
+            # query, so write-behind updates must reach storage before we return
+            await self.close()
+
+    async def close(self) -> None:
+        """Flush the manager's pending writes."""
+        if self.manager is None:
+            return
+        try:
+            await self.manager.close()
+        except Exception as exc:
+            logger.error("Failed to flush trading preferences: %s", exc)
 
     async def _handle_set_risk(
         self,
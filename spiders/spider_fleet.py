@@ -6,9 +6,12 @@ Continuous crawling with whisper trading signals, deep web, regulatory filings,
 
 import logging
 import asyncio
+import hashlib
+import heapq
+import json
 import aiohttp
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 import time
 
@@ -38,6 +41,30 @@ class SpiderConfig:
     interval: float = 60.0  # seconds
     priority: int = 5  # 1-10
     max_results: int = 10
+    url: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    # adaptive polling bounds; default to interval/4 .. interval*8
+    min_interval: Optional[float] = None
+    max_interval: Optional[float] = None
+    adaptive: bool = True
+
+    def bounds(self) -> Tuple[float, float]:
+        low = self.min_interval if self.min_interval is not None else self.interval / 4.0
+        high = self.max_interval if self.max_interval is not None else self.interval * 8.0
+        return low, max(low, high)
+
+
+@dataclass
+class SpiderState:
+    """Scheduling state the fleet keeps for each spider"""
+    interval: float
+    next_due: float = 0.0
+    change_rate: float = 0.5  # EWMA of "this crawl brought something new"
+    consecutive_errors: int = 0
+    runs: int = 0
+    changes: int = 0
+    errors: int = 0
+    last_duration: float = 0.0
 
 
 class BaseSpider:
@@ -48,13 +75,76 @@ class BaseSpider:
         self.session: Optional[aiohttp.ClientSession] = None
         self.last_run = 0.0
         self.results = []
+        # conditional-request validators and content hashes, per URL
+        self.validators: Dict[str, Dict[str, str]] = {}
+        self.content_hashes: Dict[str, str] = {}
+        self.fetches = 0
+        self.not_modified = 0
+        self.duplicates = 0
     
-    async def crawl(self) -> List[Dict[str, Any]]:
-        """Perform crawl operation"""
-        raise NotImplementedError
+    async def crawl(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Perform crawl operation. Returns None when the source has not changed
+        since the previous crawl (the previous results are kept).
+        """
+        if not self.config.url:
+            raise NotImplementedError
+        body = await self.fetch(self.config.url)
+        if body is None:
+            return None
+        return self.parse(body)[: self.config.max_results]
+    
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """
+        Conditional GET: sends If-None-Match / If-Modified-Since from the last
+        response and returns None on 304 or when the body hashes the same as
+        last time.
+        """
+        session = await self._get_session()
+        headers = dict(self.config.headers)
+        cached = self.validators.get(url, {})
+        if "etag" in cached:
+            headers["If-None-Match"] = cached["etag"]
+        if "last_modified" in cached:
+            headers["If-Modified-Since"] = cached["last_modified"]
+        self.fetches += 1
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304:
+                self.not_modified += 1
+                return None
+            response.raise_for_status()
+            body = await response.read()
+            validators = {}
+            if response.headers.get("ETag"):
+                validators["etag"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                validators["last_modified"] = response.headers["Last-Modified"]
+            self.validators[url] = validators
+        digest = hashlib.sha256(body).hexdigest()
+        if self.content_hashes.get(url) == digest:
+            self.duplicates += 1
+            return None
+        self.content_hashes[url] = digest
+        return body
+    
+    def parse(self, body: bytes) -> List[Dict[str, Any]]:
+        """Turn a response body into signal records (JSON list/object or raw text)"""
+        now = time.time()
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return [{"source": self.config.spider_type.value, "content": body.decode("utf-8", "replace"), "timestamp": now}]
+        items = data if isinstance(data, list) else [data]
+        records = []
+        for item in items:
+            record = dict(item) if isinstance(item, dict) else {"content": item}
+            record.setdefault("source", self.config.spider_type.value)
+            record.setdefault("timestamp", now)
+            records.append(record)
+        return records
     
     async def _get_session(self):
-        """Get or create HTTP session"""
+        """Get the shared fleet session, or create a private one when run standalone"""
         if not self.session or self.session.closed:
             self.session = aiohttp.ClientSession()
         return self.session
@@ -119,13 +209,29 @@ class WhaleTrackingSpider(BaseSpider):
 class SpiderFleet:
     """
     Fleet of 50+ autonomous data spiders for continuous intelligence gathering.
+
+    A single scheduler task keeps a heap of (next_due, -priority) entries and
+    runs due spiders over one shared connection pool, at most
+    ``max_concurrency`` at a time. Each spider's interval adapts between its
+    configured bounds: it halves when a crawl brings new content, grows when
+    the source is unchanged, and backs off exponentially on errors.
     """
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.spiders: Dict[str, BaseSpider] = {}
+        self.states: Dict[str, SpiderState] = {}
         self.running = False
         self.fleet_task: Optional[asyncio.Task] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.max_concurrency = int(config.get("max_concurrency", 8))
+        self.speedup = float(config.get("speedup_factor", 0.5))
+        self.slowdown = float(config.get("slowdown_factor", 1.5))
+        self.change_alpha = float(config.get("change_rate_alpha", 0.3))
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self._seq = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
         
         # Initialize spider fleet
         self._initialize_fleet()
@@ -141,12 +247,12 @@ class SpiderFleet:
             SpiderConfig(SpiderType.WHISPER_TRADING, interval=30.0, priority=9),
             SpiderConfig(SpiderType.WHALE_TRACKING, interval=60.0, priority=8),
             # Add 40+ more spiders...
-        ]
+        ] if self.config.get("default_spiders", True) else []
         
         for spider_config in spider_configs:
             spider = self._create_spider(spider_config)
             if spider:
-                self.spiders[spider_config.spider_type.value] = spider
+                self.add_spider(spider_config.spider_type.value, spider)
         
         logger.info(f"Spider fleet initialized with {len(self.spiders)} spiders")
     
@@ -168,46 +274,149 @@ class SpiderFleet:
             return WhaleTrackingSpider(config)
         return None
     
+    def add_spider(self, spider_id: str, spider: BaseSpider):
+        """Register a spider; it is scheduled immediately if the fleet is running"""
+        if not spider.config.enabled:
+            return
+        self.spiders[spider_id] = spider
+        low, high = spider.config.bounds()
+        self.states[spider_id] = SpiderState(interval=min(max(spider.config.interval, low), high))
+        if self.session is not None:
+            spider.session = self.session
+        if self.running:
+            self._schedule(spider_id, asyncio.get_running_loop().time())
+    
+    def _schedule(self, spider_id: str, due: float):
+        self.states[spider_id].next_due = due
+        priority = self.spiders[spider_id].config.priority
+        self._seq += 1
+        heapq.heappush(self._heap, (due, -priority, self._seq, spider_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=int(self.config.get("connection_limit", 100)),
+            limit_per_host=int(self.config.get("connection_limit_per_host", 10)),
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(total=float(self.config.get("request_timeout", 30.0)))
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+    
     async def start_fleet(self):
         """Start the spider fleet"""
+        if self.running:
+            return
         self.running = True
+        self.session = self._create_session()
+        for spider in self.spiders.values():
+            spider.session = self.session
+        self._wakeup = asyncio.Event()
+        self._heap = []
+        now = asyncio.get_running_loop().time()
+        for spider_id in self.spiders:
+            self._schedule(spider_id, now)
         self.fleet_task = asyncio.create_task(self._fleet_loop())
         logger.info("Spider fleet started")
     
     async def stop_fleet(self):
         """Stop the spider fleet"""
         self.running = False
+        tasks = list(self._inflight.values())
         if self.fleet_task:
-            self.fleet_task.cancel()
+            tasks.append(self.fleet_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
         logger.info("Spider fleet stopped")
     
     async def _fleet_loop(self):
-        """Main fleet loop"""
+        """Scheduler: pop the next due spider, sleep until then, run it"""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_concurrency)
         while self.running:
             try:
-                # Run all spiders concurrently
-                tasks = []
-                for spider in self.spiders.values():
-                    if time.time() - spider.last_run >= spider.config.interval:
-                        tasks.append(self._run_spider(spider))
-                
-                if tasks:
-                    await asyncio.gather(*tasks, return_exceptions=True)
-                
-                await asyncio.sleep(10)  # Check every 10 seconds
+                if not self._heap:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                due = self._heap[0][0]
+                delay = due - loop.time()
+                if delay > 0:
+                    # woken early when a spider is added or rescheduled
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                _, _, _, spider_id = heapq.heappop(self._heap)
+                state = self.states.get(spider_id)
+                if state is None or spider_id in self._inflight or state.next_due != due:
+                    continue  # removed, still running, or a stale entry
+                await slots.acquire()
+                task = asyncio.create_task(self._run_scheduled(spider_id, slots))
+                self._inflight[spider_id] = task
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Fleet loop error: {e}")
-                await asyncio.sleep(60)
+                await asyncio.sleep(1.0)
     
-    async def _run_spider(self, spider: BaseSpider):
-        """Run a single spider"""
+    async def _run_scheduled(self, spider_id: str, slots: asyncio.Semaphore):
+        loop = asyncio.get_running_loop()
+        try:
+            await self._run_spider(self.spiders[spider_id])
+        finally:
+            slots.release()
+            self._inflight.pop(spider_id, None)
+            if self.running and spider_id in self.spiders:
+                self._schedule(spider_id, loop.time() + self.states[spider_id].interval)
+    
+    async def _run_spider(self, spider: BaseSpider) -> bool:
+        """Run a single spider and adapt its interval; True if it found something new"""
+        spider_id = next((key for key, s in self.spiders.items() if s is spider), spider.config.spider_type.value)
+        state = self.states.get(spider_id)
+        started = time.perf_counter()
+        changed = False
         try:
             results = await spider.crawl()
             spider.last_run = time.time()
-            spider.results = results
-            logger.debug(f"Spider {spider.config.spider_type.value} crawled {len(results)} results")
+            if results is not None and results != spider.results:
+                spider.results = results
+                changed = True
+            logger.debug(f"Spider {spider_id} crawled {len(spider.results)} results (changed={changed})")
+            if state is not None:
+                self._adapt(spider, state, changed=changed, failed=False)
         except Exception as e:
-            logger.error(f"Spider {spider.config.spider_type.value} error: {e}")
+            logger.error(f"Spider {spider_id} error: {e}")
+            if state is not None:
+                self._adapt(spider, state, changed=False, failed=True)
+        if state is not None:
+            state.last_duration = time.perf_counter() - started
+        return changed
+    
+    def _adapt(self, spider: BaseSpider, state: SpiderState, changed: bool, failed: bool):
+        state.runs += 1
+        low, high = spider.config.bounds()
+        if failed:
+            state.errors += 1
+            state.consecutive_errors += 1
+            state.interval = min(high, spider.config.interval * (2 ** state.consecutive_errors))
+            return
+        state.consecutive_errors = 0
+        state.change_rate += self.change_alpha * ((1.0 if changed else 0.0) - state.change_rate)
+        if changed:
+            state.changes += 1
+        if not spider.config.adaptive:
+            state.interval = spider.config.interval
+            return
+        factor = self.speedup if changed else self.slowdown
+        state.interval = min(high, max(low, state.interval * factor))
     
     def get_latest_signals(self, spider_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get latest signals from spiders"""
@@ -228,6 +437,20 @@ class SpiderFleet:
             "total_spiders": len(self.spiders),
             "active_spiders": sum(1 for s in self.spiders.values() if s.last_run > 0),
             "spider_types": [s.config.spider_type.value for s in self.spiders.values()],
-            "latest_signals": len(self.get_latest_signals())
+            "latest_signals": len(self.get_latest_signals()),
+            "in_flight": len(self._inflight),
+            "schedule": {
+                spider_id: {
+                    "interval": state.interval,
+                    "next_due": state.next_due,
+                    "change_rate": state.change_rate,
+                    "runs": state.runs,
+                    "changes": state.changes,
+                    "errors": state.errors,
+                    "fetches": self.spiders[spider_id].fetches,
+                    "not_modified": self.spiders[spider_id].not_modified,
+                    "duplicates": self.spiders[spider_id].duplicates,
+                }
+                for spider_id, state in self.states.items()
+            },
         }
-
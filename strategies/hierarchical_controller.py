@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Dict, List, Optional, Tuple
 
-from regimes.regime_engine import RegimeDetectionEngine
-from regimes.regime_types import MarketRegime
+from regimes.regime_engine import RegimeDetectionEngine, gather_with_budgets
+from regimes.regime_types import MarketRegime, snapshot_market_data
 from strategies.strategy_base import TradingSignal
 from strategies.strategy_universe import StrategyUniverse
 
@@ -33,9 +33,22 @@ class MetaStrategyAllocator:
 
 @dataclass(slots=True)
 class HierarchicalStrategyController:
+    """Pick strategies for the detected regime and blend their signals.
+
+    Strategies run concurrently against one read-only snapshot of the market
+    data, each within ``strategy_budget`` seconds (or its entry in
+    ``strategy_budgets``); late or failing strategies are skipped and listed
+    in ``last_failures``. Signals are merged in universe order into fresh
+    ``TradingSignal`` objects, so the blend is deterministic and strategy
+    outputs are never mutated.
+    """
+
     regime_detector: RegimeDetectionEngine = field(default_factory=RegimeDetectionEngine)
     strategy_universe: StrategyUniverse = field(default_factory=StrategyUniverse)
     allocator: MetaStrategyAllocator = field(default_factory=MetaStrategyAllocator)
+    strategy_budget: Optional[float] = 0.25
+    strategy_budgets: Dict[str, float] = field(default_factory=dict)
+    last_failures: Dict[str, str] = field(default_factory=dict, init=False)
 
     async def decide_action(
         self,
@@ -43,7 +56,8 @@ class HierarchicalStrategyController:
         regime_override: Optional[MarketRegime] = None,
         strategy_confidence: Optional[Dict[str, float]] = None,
     ) -> Tuple[MarketRegime, Dict[str, TradingSignal], Dict[str, float]]:
-        regime = regime_override or await self.regime_detector.analyze(market_data)
+        snapshot = snapshot_market_data(market_data)
+        regime = regime_override or await self.regime_detector.analyze(snapshot)
         strategies = self.strategy_universe.suitable_strategies(regime)
         base_weights = self.allocator.get_weights(regime)
         confidence_map = strategy_confidence or {}
@@ -59,19 +73,28 @@ class HierarchicalStrategyController:
         else:
             adjusted_weights = base_weights
 
+        outputs, self.last_failures = await gather_with_budgets(
+            {
+                name: (lambda strategy=strategy: strategy.generate_signals(snapshot, regime))
+                for name, strategy in strategies.items()
+            },
+            self.strategy_budgets,
+            self.strategy_budget,
+        )
+
         combined: Dict[str, TradingSignal] = {}
-        for name, strategy in strategies.items():
-            signals = await strategy.generate_signals(market_data, regime)
+        for name, signals in outputs.items():
             weight = adjusted_weights.get(name, 0.0)
             for asset, signal in signals.items():
-                if asset not in combined:
-                    combined[asset] = signal
-                    combined[asset].size *= weight
-                    combined[asset].confidence *= weight
+                existing = combined.get(asset)
+                if existing is None:
+                    combined[asset] = replace(
+                        signal,
+                        size=signal.size * weight,
+                        confidence=signal.confidence * weight,
+                    )
                 else:
-                    existing = combined[asset]
                     existing.direction = (existing.direction + signal.direction * weight) / 2.0
                     existing.size += signal.size * weight
                     existing.confidence = min(1.0, existing.confidence + signal.confidence * weight)
         return regime, combined, adjusted_weights
-
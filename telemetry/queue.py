@@ -6,9 +6,10 @@ import asyncio
 import json
 import logging
 import os
+import threading
+from collections import deque
 from dataclasses import dataclass
-from queue import Queue, Empty
-from typing import Any, Awaitable, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,206 @@ except ImportError:  # pragma: no cover - optional dependency
 
 
 TrainingEventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
-_IN_MEMORY_QUEUE: Queue = Queue()
+
+
+class InMemoryQueue:
+    """Bounded in-process event queue consumed with plain ``await``.
+
+    Producers may call :meth:`put_nowait` from any thread; events are handed to
+    an ``asyncio.Queue`` on the consumer's loop (directly when already on that
+    loop, via ``call_soon_threadsafe`` otherwise). Events published before a
+    consumer binds are buffered. When full, the oldest event is dropped.
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.dropped = 0
+
+    def put_nowait(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.published += 1
+            loop, queue = self._loop, self._queue
+            if queue is None or loop is None or loop.is_closed():
+                if len(self._pending) >= self.maxsize:
+                    self._pending.popleft()
+                    self.dropped += 1
+                self._pending.append(event)
+                return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._put(queue, event)
+        else:
+            loop.call_soon_threadsafe(self._put, queue, event)
+
+    def _put(self, queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(event)
+
+    def bind(self) -> asyncio.Queue:
+        """Return the queue for the running loop, carrying over anything buffered."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop or self._queue is None:
+                carried: Deque[Dict[str, Any]] = deque()
+                if self._queue is not None:
+                    while not self._queue.empty():
+                        carried.append(self._queue.get_nowait())
+                carried.extend(self._pending)
+                self._pending.clear()
+                queue: asyncio.Queue = asyncio.Queue(self.maxsize)
+                while len(carried) > self.maxsize:
+                    carried.popleft()
+                    self.dropped += 1
+                for event in carried:
+                    queue.put_nowait(event)
+                self._queue, self._loop = queue, loop
+            return self._queue
+
+    async def get(self, stop_event: Optional[asyncio.Event] = None) -> Optional[Dict[str, Any]]:
+        """Await the next event; None once ``stop_event`` is set."""
+        queue = self.bind()
+        if not queue.empty():
+            return queue.get_nowait()
+        if stop_event is None:
+            return await queue.get()
+        if stop_event.is_set():
+            return None
+        getter = asyncio.ensure_future(queue.get())
+        stopper = asyncio.ensure_future(stop_event.wait())
+        done, _ = await asyncio.wait({getter, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        if getter in done:
+            return getter.result()
+        getter.cancel()
+        return None
+
+    def qsize(self) -> int:
+        with self._lock:
+            return len(self._pending) + (self._queue.qsize() if self._queue is not None else 0)
+
+
+class TelemetryProducer:
+    """Long-lived Kafka producer shared by every publish in the process.
+
+    Sends go through the client's batch accumulator (``linger_ms`` /
+    ``max_batch_size``) without waiting for each ack; at most
+    ``max_in_flight`` unacknowledged events are outstanding before
+    :meth:`publish` waits. :meth:`close` flushes before stopping.
+    """
+
+    def __init__(self, settings: "_QueueSettings", producer_factory: Optional[Callable[..., Any]] = None) -> None:
+        self.settings = settings
+        self._factory = producer_factory
+        self._producer: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending: Set[asyncio.Future] = set()
+        self.sent = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # a producer is tied to the loop it was started on
+            stale, stale_loop = self._producer, self._loop
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._producer = None
+            self._pending = set()
+            if stale is not None:
+                await self._retire(stale, stale_loop)
+        async with self._lock:
+            if self._producer is not None:
+                return
+            factory = self._factory or AIOKafkaProducer
+            if factory is None:
+                raise RuntimeError("aiokafka is not installed")
+            options: Dict[str, Any] = {
+                "bootstrap_servers": self.settings.brokers,
+                "client_id": self.settings.client_id,
+                "linger_ms": self.settings.linger_ms,
+                "max_batch_size": self.settings.max_batch_size,
+            }
+            if self.settings.compression_type:
+                options["compression_type"] = self.settings.compression_type
+            producer = factory(**options)
+            await producer.start()
+            self._slots = asyncio.Semaphore(self.settings.max_in_flight)
+            self._producer = producer
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        await self.start()
+        payload = json.dumps(event, ensure_ascii=False).encode("utf-8")
+        await self._slots.acquire()
+        try:
+            future = await self._producer.send(self.settings.topic, payload)
+        except Exception:
+            self._slots.release()
+            self.failed += 1
+            raise
+        self._pending.add(future)
+        future.add_done_callback(self._on_delivered)
+
+    def _on_delivered(self, future: asyncio.Future) -> None:
+        self._pending.discard(future)
+        if self._slots is not None:
+            self._slots.release()
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+            logger.warning("Failed to deliver training event", extra={"error": str(future.exception()) if not future.cancelled() else "cancelled"})
+        else:
+            self.sent += 1
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> None:
+        if self._producer is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self._producer.flush()
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def close(self) -> None:
+        if self._producer is None:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            producer, self._producer = self._producer, None
+            await self._retire(producer, self._loop)
+            return
+        try:
+            await self.flush()
+        finally:
+            producer, self._producer = self._producer, None
+            await producer.stop()
+
+    @staticmethod
+    async def _retire(producer: Any, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Stop a producer started on another event loop, on that loop if it still runs."""
+        try:
+            if loop is not None and loop.is_running():
+                stopped = asyncio.run_coroutine_threadsafe(producer.stop(), loop)
+                await asyncio.wait_for(asyncio.wrap_future(stopped), timeout=5.0)
+            else:
+                await producer.stop()
+        except Exception as exc:
+            logger.warning("Failed to stop producer from a previous event loop", extra={"error": str(exc)})
+
+
+_IN_MEMORY_QUEUE = InMemoryQueue(int(os.getenv("TRAINING_QUEUE_MEMORY_SIZE", "10000")))
+_PRODUCER: Optional[TelemetryProducer] = None
 
 
 def enqueue_event(event: Dict[str, Any]) -> None:
@@ -43,29 +243,42 @@ async def consume_events(handler: TrainingEventHandler, stop_event: Optional[asy
     await _consume_in_memory(handler, stop_event)
 
 
+def get_producer(settings: Optional["_QueueSettings"] = None) -> TelemetryProducer:
+    """Return the process-wide producer, rebuilding it if the settings changed."""
+    global _PRODUCER
+    settings = settings or _QueueSettings.from_env()
+    if _PRODUCER is None or _PRODUCER.settings != settings:
+        _PRODUCER = TelemetryProducer(settings)
+    return _PRODUCER
+
+
 async def publish_event_async(event: Dict[str, Any]) -> None:
     """Publish event to Kafka if configured and library is available."""
     queue_settings = _QueueSettings.from_env()
     if not queue_settings.use_kafka() or AIOKafkaProducer is None:
         return
-    producer = AIOKafkaProducer(
-        bootstrap_servers=queue_settings.brokers,
-        client_id=queue_settings.client_id,
-    )
-    await producer.start()
-    try:
-        payload = json.dumps(event, ensure_ascii=False).encode("utf-8")
-        await producer.send_and_wait(queue_settings.topic, payload)
-    finally:
-        await producer.stop()
+    await get_producer(queue_settings).publish(event)
+
+
+async def flush_producer() -> None:
+    """Wait until every published event has been acknowledged."""
+    if _PRODUCER is not None:
+        await _PRODUCER.flush()
+
+
+async def close_producer() -> None:
+    """Flush and stop the shared producer; call on shutdown."""
+    global _PRODUCER
+    producer, _PRODUCER = _PRODUCER, None
+    if producer is not None:
+        await producer.close()
 
 
 async def _consume_in_memory(handler: TrainingEventHandler, stop_event: Optional[asyncio.Event]) -> None:
-    loop = asyncio.get_running_loop()
     while True:
         if stop_event and stop_event.is_set():
             break
-        event = await loop.run_in_executor(None, _blocking_get)
+        event = await _IN_MEMORY_QUEUE.get(stop_event)
         if event is None:
             break
         await handler(event)
@@ -95,19 +308,16 @@ async def _consume_kafka(settings: "_QueueSettings", handler: TrainingEventHandl
         await consumer.stop()
 
 
-def _blocking_get(timeout: float = 0.5) -> Optional[Dict[str, Any]]:
-    try:
-        return _IN_MEMORY_QUEUE.get(timeout=timeout)
-    except Empty:
-        return None
-
-
 @dataclass(slots=True)
 class _QueueSettings:
     brokers: Optional[str]
     topic: str = "training-telemetry"
     group_id: str = "training-consumer"
     client_id: str = "training-client"
+    linger_ms: int = 5
+    max_batch_size: int = 16384
+    max_in_flight: int = 1000
+    compression_type: Optional[str] = None
 
     @classmethod
     def from_env(cls) -> "_QueueSettings":
@@ -116,6 +326,10 @@ class _QueueSettings:
             topic=os.getenv("TRAINING_QUEUE_TOPIC", "training-telemetry"),
             group_id=os.getenv("TRAINING_QUEUE_GROUP", "training-consumer"),
             client_id=os.getenv("TRAINING_QUEUE_CLIENT", "training-client"),
+            linger_ms=int(os.getenv("TRAINING_QUEUE_LINGER_MS", "5")),
+            max_batch_size=int(os.getenv("TRAINING_QUEUE_BATCH_BYTES", "16384")),
+            max_in_flight=int(os.getenv("TRAINING_QUEUE_MAX_IN_FLIGHT", "1000")),
+            compression_type=os.getenv("TRAINING_QUEUE_COMPRESSION") or None,
         )
 
     def use_kafka(self) -> bool:
@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+import pytest
+
+from agents.graph_reasoner import KnowledgeGraphReasoner
+
+
+def _random_graph(num_nodes: int, num_edges: int, seed: int = 0) -> KnowledgeGraphReasoner:
+    rng = np.random.default_rng(seed)
+    reasoner = KnowledgeGraphReasoner()
+    for i in range(num_nodes):
+        reasoner.add_node(f"n{i}", f"fact {i} about {'volatility' if i % 97 == 0 else 'markets'}")
+    relations = ["causes", "correlates", "hedges", "precedes"]
+    sources = rng.integers(0, num_nodes, num_edges)
+    targets = rng.integers(0, num_nodes, num_edges)
+    weights = rng.random(num_edges)
+    for s, t, w, r in zip(sources, targets, weights, rng.integers(0, 4, num_edges)):
+        reasoner.add_edge(f"n{s}", f"n{t}", relations[r], float(w))
+    return reasoner
+
+
+def test_neighbourhood_attention_is_a_softmax_over_edge_features():
+    reasoner = KnowledgeGraphReasoner()
+    for node_id in "abcd":
+        reasoner.add_node(node_id, node_id)
+    reasoner.add_edge("a", "b", "causes", 1.0)
+    reasoner.add_edge("a", "c", "hedges", 1.0)
+    reasoner.add_edge("a", "d", "hedges", 0.0)
+
+    attention = reasoner._compute_attention_scores("a", reasoner.nodes["a"].neighbors, "what causes this")
+    logits = np.array([0.5 + 0.3 + 0.2, 0.5 + 0.2, 0.5])
+    expected = np.exp(logits) / np.exp(logits).sum()
+    np.testing.assert_allclose(attention, expected)
+    assert reasoner.graph_attention_step(["a"], "what causes this") == ["b", "c", "d"]
+
+
+def test_vectorized_hop_matches_per_node_top_k():
+    reasoner = _random_graph(300, 3000, seed=1)
+    reasoner.max_frontier = 10**6
+    frontier = [f"n{i}" for i in range(0, 300, 7)]
+    query = "what hedges volatility"
+
+    expected = {}
+    for node_id in frontier:
+        neighbours = reasoner.nodes[node_id].neighbors
+        attention = reasoner._compute_attention_scores(node_id, neighbours, query)
+        for idx in np.argsort(-attention, kind="stable")[:reasoner.top_k]:
+            expected[neighbours[idx]] = expected.get(neighbours[idx], 0.0) + attention[idx]
+
+    result = reasoner.graph_attention_step(frontier, query)
+    assert set(result) == set(expected)
+    scores = [expected[node_id] for node_id in result]
+    assert scores == sorted(scores, reverse=True)
+
+    # adding an edge invalidates the CSR index
+    reasoner.add_edge("n0", "n1", "hedges", 5.0)
+    assert "n1" in reasoner.graph_attention_step(["n0"], query)
+
+
+def test_multi_hop_prunes_frontier_on_large_graph():
+    reasoner = _random_graph(20000, 100000, seed=2)
+    reasoner.max_frontier = 32
+    started = time.perf_counter()
+    result = reasoner.multi_hop_reasoning("volatility hedges", max_hops=3)
+    elapsed = time.perf_counter() - started
+    assert result["num_hops"] == 3
+    assert all(len(hop) <= 32 for hop in result["reasoning_path"][1:])
+    assert list(result["node_scores"]) == result["final_nodes"]
+    assert elapsed < 2.0
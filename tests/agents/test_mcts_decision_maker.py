@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from agents.mcts_decision_maker import MCTSDecisionMaker
+
+
+class WalkSearch(MCTSDecisionMaker):
+    """Walk on the integers for `horizon` steps; the reward is closeness to `target`"""
+
+    horizon = 6
+    target = 4
+
+    def _apply_action(self, state, action):
+        position, steps = state
+        return position + action, steps + 1
+
+    def _is_terminal(self, state):
+        return state[1] >= self.horizon
+
+    def _get_available_actions(self, state):
+        return [] if self._is_terminal(state) else [-1, 0, 1]
+
+    def _evaluate_state(self, state):
+        return 1.0 - abs(state[0] - self.target) / self.horizon
+
+
+def test_search_prefers_the_action_towards_the_target():
+    searcher = WalkSearch(simulation_budget=600, seed=0)
+    assert searcher.search((0, 0), [-1, 0, 1]) == 1
+    stats = searcher.get_search_statistics()
+    assert stats["simulations"] == stats["root_visits"] == 600
+    assert stats["total_nodes"] == 1 + 3 * (stats["total_nodes"] // 3)
+    visits = {entry["action"]: entry["visits"] for entry in searcher.get_action_statistics()}
+    assert sum(visits.values()) == 600 and max(visits, key=visits.get) == 1
+
+
+def test_batched_virtual_loss_search_keeps_counts_consistent():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        searcher = WalkSearch(simulation_budget=512, batch_size=16, initial_capacity=16,
+                              executor=executor, seed=1)
+        assert searcher.search((0, 0), [-1, 0, 1]) == 1
+
+    used = slice(0, searcher.size)
+    assert searcher.capacity > 16  # arrays grew past the initial allocation
+    # no virtual loss is left behind
+    assert np.all(searcher.visits[used] >= 0)
+    assert np.all(np.abs(searcher.value_sum[used]) <= searcher.visits[used] + 1e-9)
+    root = searcher.get_node(searcher.root_node_id)
+    children = [searcher.get_node(int(child)) for child in root.children]
+    assert root.visits == 512 == sum(child.visits for child in children)
+
+
+def test_puct_follows_priors():
+    class Biased(WalkSearch):
+        target = WalkSearch.horizon
+
+        def _action_priors(self, state, actions):
+            return [0.05, 0.05, 0.9]
+
+    searcher = Biased(simulation_budget=300, selection="puct", seed=2)
+    assert searcher.search((0, 0), [-1, 0, 1]) == 1
+    stats = {entry["action"]: entry for entry in searcher.get_action_statistics()}
+    assert stats[1]["prior"] == pytest.approx(0.9)
+    assert stats[1]["visits"] > stats[0]["visits"] + stats[-1]["visits"]
+
+
+def test_anytime_search_stops_at_the_deadline():
+    class Slow(WalkSearch):
+        def _evaluate_state(self, state):
+            time.sleep(0.002)
+            return super()._evaluate_state(state)
+
+    searcher = Slow(simulation_budget=10**6, seed=3)
+    started = time.perf_counter()
+    action = searcher.search((0, 0), [-1, 0, 1], time_budget=0.1)
+    assert time.perf_counter() - started < 0.5
+    stats = searcher.get_search_statistics()
+    assert action in (-1, 0, 1)
+    assert 0 < stats["simulations"] < 10**6
+    assert stats["simulations_per_second"] > 0
@@ -0,0 +1,148 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from analytics.feature_store import FeatureStore
+
+START = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _records(count, symbols=("AAPL", "MSFT"), days=4):
+    records = []
+    for i in range(count):
+        records.append({
+            "features": {"symbol": symbols[i % len(symbols)], "roi": i * 0.01, "volume": i},
+            "targets": {"reward": float(i % 3)},
+            "metadata": {"timestamp": (START + timedelta(hours=i * 24 * days / count)).isoformat()},
+        })
+    return records
+
+
+def _store(tmp_path, **kwargs):
+    return FeatureStore(root=tmp_path / "fs", backend="columnar", entity_column="features.symbol", **kwargs)
+
+
+def test_columnar_round_trip_and_partitions(tmp_path):
+    store = _store(tmp_path)
+    records = _records(40)
+    path = store.save_dataset("run", records)
+    assert sorted(p.name for p in path.glob("date=*")) == [f"date=2024-03-0{d}" for d in range(1, 5)]
+    assert {p.name for p in path.glob("date=2024-03-01/entity=*")} == {"entity=AAPL", "entity=MSFT"}
+
+    loaded = store.load_dataset("run")
+    key = lambda r: r["metadata"]["timestamp"]
+    assert sorted(loaded, key=key) == sorted(records, key=key)
+    assert store.list_datasets() == ["run"]
+
+
+def test_projection_and_predicate_pushdown(tmp_path):
+    store = _store(tmp_path)
+    store.save_dataset("run", _records(400))
+
+    columns = store.load_columns(
+        "run",
+        columns=["features.roi", "metadata.timestamp"],
+        filters=[("features.symbol", "==", "MSFT"), ("features.volume", ">=", 100)],
+        start=START + timedelta(days=1),
+        end=START + timedelta(days=2),
+    )
+    assert set(columns) == {"features.roi", "metadata.timestamp"}
+    assert columns["metadata.timestamp"].dtype.kind == "M"
+    expected = [
+        r["features"]["roi"] for i, r in enumerate(_records(400))
+        if i % 2 == 1 and i >= 100 and START + timedelta(days=1) <= datetime.fromisoformat(r["metadata"]["timestamp"]) <= START + timedelta(days=2)
+    ]
+    assert sorted(columns["features.roi"].tolist()) == expected
+
+    with pytest.raises(KeyError):
+        store.load_columns("run", columns=["features.missing"])
+
+
+def test_schema_versions_evolve_without_rewrites(tmp_path):
+    store = _store(tmp_path)
+    dataset = store.columnar_dataset("run")
+    dataset.write([{"timestamp": "2024-03-01T00:00:00+00:00", "features": {"symbol": "AAPL", "score": 1}}])
+    dataset.write([{"timestamp": "2024-03-02T00:00:00+00:00",
+                    "features": {"symbol": "AAPL", "score": 2.5, "tag": "new"}}])
+
+    versions = dataset.schema()["versions"]
+    assert [v["version"] for v in versions] == [1, 2]
+    assert versions[-1]["columns"]["features.score"] == "float"
+
+    columns = dataset.scan(columns=["features.score", "features.tag"])
+    order = np.argsort(columns["features.score"])
+    assert columns["features.score"][order].tolist() == [1.0, 2.5]
+    assert columns["features.tag"][order].tolist() == [None, "new"]
+
+
+def test_as_of_join_is_point_in_time_correct(tmp_path):
+    store = _store(tmp_path)
+    store.save_dataset("run", [
+        {"timestamp": "2024-03-01T10:00:00+00:00", "features": {"symbol": "AAPL", "signal": 1.0}},
+        {"timestamp": "2024-03-01T12:00:00+00:00", "features": {"symbol": "AAPL", "signal": 2.0}},
+        {"timestamp": "2024-03-01T11:00:00+00:00", "features": {"symbol": "MSFT", "signal": 9.0}},
+    ])
+    labels = [
+        {"features.symbol": "AAPL", "timestamp": "2024-03-01T11:59:00+00:00", "label": 1},
+        {"features.symbol": "AAPL", "timestamp": "2024-03-01T12:00:00+00:00", "label": 0},
+        {"features.symbol": "MSFT", "timestamp": "2024-03-01T10:30:00+00:00", "label": 1},
+        {"features.symbol": "MSFT", "timestamp": "2024-03-02T10:30:00+00:00", "label": 1},
+    ]
+    joined = store.as_of_join("run", labels, columns=["features.signal"])
+    assert np.allclose(joined["features.signal"], [1.0, 2.0, np.nan, 9.0], equal_nan=True)
+
+    strict = store.as_of_join("run", labels, columns=["features.signal"], allow_exact_matches=False)
+    assert strict["features.signal"][1] == 1.0
+
+    fresh = store.as_of_join("run", labels, columns=["features.signal"], tolerance=timedelta(hours=2))
+    assert np.isnan(fresh["features.signal"][3])
+    assert fresh["feature_timestamp"][0] == np.datetime64("2024-03-01T10:00:00", "ns")
+
+
+def test_jsonl_migration_and_window_read_speed(tmp_path):
+    jsonl = FeatureStore(root=tmp_path / "fs")
+    records = _records(20_000, symbols=("AAPL", "MSFT", "NVDA", "TSLA"), days=20)
+    jsonl.save_dataset("run", records)
+
+    store = _store(tmp_path)
+    window = dict(start=START + timedelta(days=5), end=START + timedelta(days=7))
+
+    started = time.perf_counter()
+    rows = [json.loads(line) for line in jsonl.dataset_path("run").open(encoding="utf-8")]
+    baseline = [r["features"]["roi"] for r in rows
+                if window["start"] <= datetime.fromisoformat(r["metadata"]["timestamp"]) <= window["end"]]
+    jsonl_seconds = time.perf_counter() - started
+
+    store.migrate_to_columnar("run")
+    started = time.perf_counter()
+    columns = store.load_columns("run", columns=["features.roi"], **window)
+    columnar_seconds = time.perf_counter() - started
+
+    assert sorted(columns["features.roi"].tolist()) == sorted(baseline)
+    assert columnar_seconds < jsonl_seconds
+    assert store.load_dataset("run")[0].keys() == records[0].keys()
+
+
+def test_jsonl_save_replaces_stale_columnar_copy(tmp_path):
+    jsonl = FeatureStore(root=tmp_path / "fs")
+    store = _store(tmp_path)
+    jsonl.save_dataset("run", _records(8))
+    assert len(store.load_columns("run", columns=["features.volume"])["features.volume"]) == 8  # auto-migrated
+
+    jsonl.save_dataset("run", _records(3))
+    assert len(jsonl.load_dataset("run")) == 3
+    assert sorted(store.load_columns("run", columns=["features.volume"])["features.volume"].tolist()) == [0, 1, 2]
+
+
+def test_column_queries_do_not_change_loaded_records(tmp_path):
+    jsonl = FeatureStore(root=tmp_path / "fs", entity_column="features.symbol")
+    records = _records(6)[::-1]
+    records[0]["metadata"]["timestamp"] = "2024-03-02T10:00:00"
+    records[1]["extra"] = {"a.b": 1}
+    jsonl.save_dataset("run", records)
+
+    jsonl.load_columns("run", columns=["features.roi"])  # migrates to columnar as a side effect
+    assert jsonl.load_dataset("run") == records
@@ -0,0 +1,150 @@
+import time
+
+from execution.broker_base import OrderRequest, OrderSide, OrderStatus, OrderType, TimeInForce
+from execution.order_book import BookOrder, ConstantLatency, OrderBook, SquareRootSlippage
+from execution.paper_broker import PaperBroker
+
+
+def _limit(order_id, side, quantity, price, **kwargs):
+    return BookOrder(order_id=order_id, side=side, quantity=quantity, price=price, **kwargs)
+
+
+def test_price_time_priority_and_queue_position():
+    book = OrderBook("AAPL")
+    book.submit(_limit("a", OrderSide.SELL, 5, 101.0), 0.0)
+    book.submit(_limit("b", OrderSide.SELL, 5, 100.0), 1.0)
+    book.submit(_limit("c", OrderSide.SELL, 5, 100.0), 2.0)
+    assert book.best_ask() == 100.0
+    assert book.queue_position("c") == 5
+    assert book.depth()["asks"] == [(100.0, 10.0), (101.0, 5.0)]
+
+    fills = book.submit(_limit("t", OrderSide.BUY, 12, 101.0), 3.0)
+    makers = [(f.order_id, f.quantity, f.price) for f in fills if f.liquidity == "maker"]
+    assert makers == [("b", 5, 100.0), ("c", 5, 100.0), ("a", 2, 101.0)]
+    assert book.get("a").remaining == 3
+    assert book.get("t") is None  # filled orders are forgotten
+
+
+def test_trade_prints_fill_resting_order_after_queue_ahead():
+    broker = PaperBroker(starting_cash=10_000.0, slippage_bps=5.0)
+    broker.update_market_price("AAPL", 100.0)
+    broker.add_liquidity("AAPL", OrderSide.BUY, 99.0, 30)
+    request = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=20,
+                           order_type=OrderType.LIMIT, limit_price=99.0)
+    result = broker.submit_order(request)
+    assert result.status == OrderStatus.SUBMITTED
+    assert result.metadata["queue_position"] == 30
+
+    assert broker.on_trade("AAPL", 99.0, 25) == []
+    fills = broker.on_trade("AAPL", 99.0, 15)
+    assert [f.quantity for f in fills] == [10]
+    assert broker.get_order(request.ensure_id()).status == OrderStatus.PARTIAL
+
+    broker.on_trade("AAPL", 98.5)  # traded through: fills the rest
+    order = broker.get_order(request.ensure_id())
+    assert order.status == OrderStatus.FILLED and order.avg_fill_price == 99.0
+    assert broker.get_positions()["AAPL"] == 20
+    assert abs(broker.get_cash_balance() - (10_000.0 - 20 * 99.0)) < 1e-9
+    assert broker.open_orders() == []
+
+
+def test_ioc_and_fok_against_book_only():
+    broker = PaperBroker(synthetic_liquidity=False)
+    broker.add_liquidity("AAPL", OrderSide.SELL, 100.0, 5)
+
+    fok = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=8, order_type=OrderType.LIMIT,
+                       limit_price=100.0, time_in_force="FOK")
+    assert broker.submit_order(fok).status == OrderStatus.CANCELLED
+    assert broker.order_book("AAPL").depth()["asks"] == [(100.0, 5.0)]
+
+    ioc = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=8, order_type=OrderType.LIMIT,
+                       limit_price=100.0, time_in_force="IOC")
+    result = broker.submit_order(ioc)
+    assert result.status == OrderStatus.CANCELLED and result.filled_qty == 5
+    assert broker.order_book("AAPL").best_ask() is None
+
+
+def test_stop_triggers_during_bar_replay():
+    broker = PaperBroker(slippage_bps=0.0)
+    broker.update_market_price("AAPL", 100.0)
+    broker.submit_order(OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=10))
+    stop = OrderRequest(symbol="AAPL", side=OrderSide.SELL, quantity=10,
+                        order_type=OrderType.STOP, stop_price=95.0)
+    assert broker.submit_order(stop).status == OrderStatus.SUBMITTED
+
+    broker.replay([
+        {"symbol": "AAPL", "open": 100.0, "high": 101.0, "low": 97.0, "close": 99.0, "timestamp": 1.0},
+        {"symbol": "AAPL", "open": 99.0, "high": 99.5, "low": 94.0, "close": 96.0, "timestamp": 2.0},
+    ])
+    order = broker.get_order(stop.ensure_id())
+    assert order.status == OrderStatus.FILLED
+    assert order.avg_fill_price == 94.0  # triggered on the bar low
+    assert broker.get_positions()["AAPL"] == 0
+
+
+def test_time_in_force_enum_members_and_unknown_values():
+    broker = PaperBroker(synthetic_liquidity=False)
+    broker.add_liquidity("AAPL", OrderSide.SELL, 100.0, 5)
+
+    ioc = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=8, order_type=OrderType.LIMIT,
+                       limit_price=100.0, time_in_force=TimeInForce.IOC)
+    result = broker.submit_order(ioc)
+    assert result.status == OrderStatus.CANCELLED and result.filled_qty == 5
+    assert broker.order_book("AAPL").depth()["bids"] == []
+
+    bogus = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=1, order_type=OrderType.LIMIT,
+                         limit_price=99.0, time_in_force="GTD")
+    result = broker.submit_order(bogus)
+    assert result.status == OrderStatus.REJECTED and "time in force" in result.metadata["reason"]
+
+
+def test_day_orders_expire_at_session_end():
+    broker = PaperBroker(slippage_bps=0.0)
+    broker.on_trade("AAPL", 100.0, timestamp=86400.0 * 3 + 3600)
+    day = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=1, order_type=OrderType.LIMIT,
+                       limit_price=95.0, time_in_force="day")
+    gtc = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=1, order_type=OrderType.LIMIT,
+                       limit_price=95.0)
+    broker.submit_order(day)
+    broker.submit_order(gtc)
+
+    broker.advance_to(86400.0 * 4 - 1)
+    assert broker.get_order(day.ensure_id()).status == OrderStatus.SUBMITTED
+    assert broker.on_trade("AAPL", 94.0, timestamp=86400.0 * 4 + 60)[0].order_id == gtc.ensure_id()
+    expired = broker.get_order(day.ensure_id())
+    assert expired.status == OrderStatus.CANCELLED and expired.metadata["reason"] == "expired"
+    assert expired.filled_qty == 0
+
+
+def test_latency_delays_arrival_at_the_book():
+    broker = PaperBroker(slippage_bps=0.0, latency_model=ConstantLatency(0.5))
+    broker.on_trade("AAPL", 100.0, timestamp=10.0)
+    request = OrderRequest(symbol="AAPL", side=OrderSide.BUY, quantity=1)
+    assert broker.submit_order(request).status == OrderStatus.SUBMITTED
+
+    broker.on_trade("AAPL", 101.0, timestamp=10.2)
+    assert broker.get_order(request.ensure_id()).status == OrderStatus.SUBMITTED
+    broker.on_trade("AAPL", 102.0, timestamp=10.6)
+    order = broker.get_order(request.ensure_id())
+    assert order.status == OrderStatus.FILLED and order.avg_fill_price == 101.0
+
+
+def test_square_root_slippage_grows_with_size():
+    model = SquareRootSlippage(base_bps=1.0, impact_bps=10.0, reference_size=100.0)
+    small = model(OrderSide.BUY, 1, 100.0)
+    large = model(OrderSide.BUY, 400, 100.0)
+    assert 100.0 < small < large
+    assert model(OrderSide.SELL, 400, 100.0) < 100.0
+
+
+def test_matching_throughput():
+    book = OrderBook("AAPL")
+    count = 40_000
+    start = time.perf_counter()
+    for i in range(count):
+        side = OrderSide.BUY if i % 2 else OrderSide.SELL
+        offset = (i % 7) * 0.01
+        price = 100.0 - offset if side == OrderSide.BUY else 100.0 + offset - 0.03
+        book.submit(_limit(str(i), side, 1 + i % 5, round(price, 2)), float(i))
+    elapsed = time.perf_counter() - start
+    assert count / elapsed > 20_000
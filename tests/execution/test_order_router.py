@@ -1,5 +1,9 @@
-from execution import ExecutionMonitor, OrderRouter, PaperBroker
-from execution.broker_base import OrderResult, OrderSide
+import asyncio
+import threading
+import time
+
+from execution import ExecutionMonitor, ExecutionPlan, OrderRouter, PaperBroker
+from execution.broker_base import OrderRequest, OrderResult, OrderSide, OrderType
 
 
 def test_order_router_builds_plan_with_deltas():
@@ -24,3 +28,120 @@ def test_order_router_executes_plan_with_paper_broker():
     assert metrics["orders_submitted"] == 1
     assert metrics["orders_filled"] == 1
 
+
+def _limit_plan(orders):
+    return ExecutionPlan(
+        target_positions={},
+        current_positions={},
+        orders=[
+            OrderRequest(symbol=symbol, side=OrderSide.BUY, quantity=qty, order_type=OrderType.LIMIT,
+                         limit_price=price, metadata=dict(metadata or {}))
+            for symbol, qty, price, metadata in orders
+        ],
+    )
+
+
+def test_basket_submission_respects_venue_concurrency():
+    class SlowBroker(PaperBroker):
+        def __init__(self):
+            super().__init__(slippage_bps=0.0)
+            self.active = 0
+            self.peak = 0
+            self.gauge = threading.Lock()
+
+        def submit_order(self, order):
+            with self.gauge:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(0.05)
+            with self.gauge:
+                self.active -= 1
+            return super().submit_order(order)
+
+    broker = SlowBroker()
+    router = OrderRouter(venue_limits={"default": 4})
+    plan = router.build_plan({f"S{i}": 1.0 for i in range(12)}, {})
+    start = time.perf_counter()
+    basket = asyncio.run(router.execute_plan_async(plan, broker, price_map={f"S{i}": 10.0 for i in range(12)}))
+    elapsed = time.perf_counter() - start
+
+    assert broker.peak == 4
+    assert elapsed < 12 * 0.05
+    assert basket.is_complete() and len(basket.results()) == 12
+    assert router.metrics()["orders_filled"] == 12
+
+
+def test_lost_ack_is_retried_without_duplicate_fill():
+
+    class FlakyBroker(PaperBroker):
+        calls = 0
+
+        def submit_order(self, order):
+            self.calls += 1
+            result = super().submit_order(order)
+            if self.calls == 1:
+                raise ConnectionError("ack lost")
+            return result
+
+    broker = FlakyBroker(slippage_bps=0.0)
+    router = OrderRouter(retry_backoff=0.0)
+    plan = router.build_plan({"AAPL": 5.0}, {})
+    basket = asyncio.run(router.execute_plan_async(plan, broker, price_map={"AAPL": 10.0}, basket_id="b1"))
+    assert basket.is_complete()
+    assert broker.get_positions() == {"AAPL": 5.0}
+
+    # resubmitting the same basket is a no-op
+    again = asyncio.run(router.execute_plan_async(plan, broker, basket_id="b1"))
+    assert again is basket
+    assert broker.get_positions() == {"AAPL": 5.0}
+    assert router.metrics()["orders_submitted"] == 1
+
+
+def test_unacknowledged_orders_surface_as_in_flight():
+
+    class DownBroker(PaperBroker):
+        def submit_order(self, order):
+            raise TimeoutError("venue unreachable")
+
+    router = OrderRouter(max_retries=1, retry_backoff=0.0)
+    basket = asyncio.run(router.execute_plan_async(router.build_plan({"AAPL": 1.0}, {}), DownBroker()))
+    summary = basket.summary()
+    assert not summary["complete"]
+    [child] = summary["in_flight"]
+    assert child["attempts"] == 2 and "venue unreachable" in child["error"]
+
+
+def test_reconciliation_matches_fills_back_to_basket():
+
+    broker = PaperBroker(slippage_bps=0.0)
+    broker.update_market_price("AAPL", 100.0)
+    broker.update_market_price("MSFT", 200.0)
+    router = OrderRouter()
+    plan = _limit_plan([("AAPL", 10, 99.0, None), ("MSFT", 4, 201.0, {"venue": "alt"})])
+    basket = asyncio.run(router.execute_plan_async(plan, broker))
+
+    summary = router.reconcile(basket, broker)
+    assert summary["status_counts"]["filled"] == 1
+    assert [c["symbol"] for c in summary["in_flight"]] == ["AAPL"]
+
+    broker.on_trade("AAPL", 98.0)
+    summary = asyncio.run(router.reconcile_until_complete(basket, broker, timeout=1.0, interval=0.01))
+    assert summary["complete"] and summary["fill_ratio"] == 1.0
+    assert summary["filled_quantities"] == {"AAPL": 10.0, "MSFT": 4.0}
+    assert router.metrics()["orders_filled"] == 2
+
+
+def test_completed_baskets_are_pruned_but_in_flight_ones_kept():
+    class DownBroker(PaperBroker):
+        def submit_order(self, order):
+            raise TimeoutError("venue unreachable")
+
+    router = OrderRouter(max_retries=0, retry_backoff=0.0, max_completed_baskets=2)
+    stuck = asyncio.run(router.execute_plan_async(router.build_plan({"AAPL": 1.0}, {}), DownBroker(), basket_id="stuck"))
+    broker = PaperBroker(slippage_bps=0.0)
+    for index in range(5):
+        plan = router.build_plan({"AAPL": 1.0}, {})
+        asyncio.run(router.execute_plan_async(plan, broker, price_map={"AAPL": 10.0}, basket_id=f"b{index}"))
+
+    assert router.basket("stuck") is stuck and not stuck.is_complete()
+    assert [basket_id for basket_id in ("b0", "b1", "b2", "b3", "b4") if router.basket(basket_id)] == ["b3", "b4"]
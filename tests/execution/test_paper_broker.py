@@ -20,3 +20,14 @@ def test_paper_broker_rejects_when_insufficient_cash():
     assert result.status == OrderStatus.REJECTED
     assert broker.get_positions().get("MSFT", 0.0) == 0.0
 
+
+
+def test_metadata_price_is_the_fill_reference_over_the_mark():
+    broker = PaperBroker(starting_cash=10_000.0, slippage_bps=5.0)
+    broker.update_market_price("AAA", 110.0)
+    request = OrderRequest(symbol="AAA", side=OrderSide.BUY, quantity=10, metadata={"price": 100.0})
+    result = broker.submit_order(request)
+
+    assert result.status == OrderStatus.FILLED
+    assert abs(result.avg_fill_price - 100.05) < 1e-9
+    assert abs(result.metadata["slippage_bps"] - 5.0) < 1e-6
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from intelligence.correlation_intelligence import AdvancedCorrelationEngine
+
+
+@pytest.fixture
+def returns() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    market = rng.standard_normal((300, 1))
+    values = 0.01 * (0.5 * market + rng.standard_normal((300, 6)))
+    values[2:, 1] += 0.5 * values[:-2, 0]  # A0 leads A1 by two rows
+    frame = pd.DataFrame(values, columns=[f"A{i}" for i in range(6)])
+    frame.iloc[:40, 3] = np.nan  # late listing
+    frame.iloc[-3:, 5] = np.nan  # stale feed
+    return frame
+
+
+def test_rolling_matrices_match_pandas(returns: pd.DataFrame) -> None:
+    engine = AdvancedCorrelationEngine({"rolling_windows": [60, 5, 20]})
+    rolling = engine._rolling_statistics(returns)
+    assert list(rolling) == ["window_60", "window_5", "window_20"]
+    for window in (5, 20, 60):
+        expected = returns.rolling(window).corr().iloc[-returns.shape[1]:].to_numpy()
+        actual = np.array(rolling[f"window_{window}"]["matrix"], dtype=float)
+        np.testing.assert_allclose(actual, expected, atol=1e-12)
+
+
+def test_tail_dependencies_match_pairwise_percentiles(returns: pd.DataFrame) -> None:
+    engine = AdvancedCorrelationEngine({"max_pairs": 100})
+    dependencies = engine._tail_dependencies(returns)
+    assert len(dependencies) == 15
+    for key, values in dependencies.items():
+        first, second = key.split("::")
+        pair = returns[[first, second]].dropna().to_numpy()
+        lower = np.mean((pair[:, 0] <= np.percentile(pair[:, 0], 5)) & (pair[:, 1] <= np.percentile(pair[:, 1], 5)))
+        assert values["lower_tail"] == pytest.approx(lower / 0.05)
+
+    limited = AdvancedCorrelationEngine({"max_pairs": 4})._tail_dependencies(returns)
+    assert list(limited) == list(dependencies)[:4]
+
+
+def test_lead_lag_finds_shifted_relationship(returns: pd.DataFrame) -> None:
+    engine = AdvancedCorrelationEngine()
+    analysis = engine._lead_lag_analysis(returns)
+    assert len(analysis) == 15
+    assert analysis["A0->A1"]["optimal_lag"] == -2
+
+    pair = returns[["A0", "A1"]].to_numpy()
+    expected = np.corrcoef(pair[:-2, 0], pair[2:, 1])[0, 1]
+    assert analysis["A0->A1"]["correlation"] == pytest.approx(expected)
+
+    # pairs with gaps are correlated on their common rows only
+    common = returns[["A2", "A3"]].dropna().to_numpy()
+    lag = analysis["A2->A3"]["optimal_lag"]
+    if lag > 0:
+        expected = np.corrcoef(common[lag:, 0], common[:-lag, 1])[0, 1]
+    elif lag < 0:
+        expected = np.corrcoef(common[:lag, 0], common[-lag:, 1])[0, 1]
+    else:
+        expected = np.corrcoef(common[:, 0], common[:, 1])[0, 1]
+    assert analysis["A2->A3"]["correlation"] == pytest.approx(expected)
@@ -0,0 +1,98 @@
+import asyncio
+
+import numpy as np
+
+from intelligence.delta_neutral_intelligence import AdvancedDeltaNeutralEngine
+from intelligence.open_interest_intelligence import AdvancedOpenInterestEngine
+from intelligence.options_pricing import (
+    black76_greeks,
+    black76_price,
+    black_scholes_greeks,
+    black_scholes_price,
+    implied_volatility,
+    price_chain,
+)
+
+
+def test_put_call_parity_across_chain() -> None:
+    strikes = np.linspace(60, 140, 41)[:, None]
+    expiries = np.array([7, 30, 90, 365])[None, :] / 365
+    calls = black_scholes_price(100, strikes, expiries, 0.25, 0.03, 0.01, True)
+    puts = black_scholes_price(100, strikes, expiries, 0.25, 0.03, 0.01, False)
+    forward_value = 100 * np.exp(-0.01 * expiries) - strikes * np.exp(-0.03 * expiries)
+    assert calls.shape == (41, 4)
+    np.testing.assert_allclose(calls - puts, forward_value, atol=1e-10)
+
+
+def test_greeks_match_finite_differences() -> None:
+    greeks = black_scholes_greeks(100, 105, 0.25, 0.3, 0.03, 0.01, False)
+    h = 1e-4
+
+    def price(spot=100, t=0.25, vol=0.3, rate=0.03):
+        return black_scholes_price(spot, 105, t, vol, rate, 0.01, False)
+
+    assert np.isclose(greeks["delta"], (price(spot=100 + h) - price(spot=100 - h)) / (2 * h))
+    assert np.isclose(greeks["gamma"], (price(spot=100 + h) - 2 * price() + price(spot=100 - h)) / h**2, rtol=1e-3)
+    assert np.isclose(greeks["vega"], (price(vol=0.3 + h) - price(vol=0.3 - h)) / (2 * h) / 100)
+    assert np.isclose(greeks["rho"], (price(rate=0.03 + h) - price(rate=0.03 - h)) / (2 * h) / 100)
+    assert np.isclose(greeks["theta"], -(price(t=0.25 + h) - price(t=0.25 - h)) / (2 * h) / 365)
+
+
+def test_implied_volatility_round_trip_over_smile() -> None:
+    strikes = np.linspace(80, 125, 91)[:, None]
+    expiries = np.array([30, 90, 365])[None, :] / 365
+    vols = 0.2 + 0.4 * np.log(strikes / 100) ** 2 + 0.0 * expiries
+    for is_call in (True, False):
+        prices = black_scholes_price(100, strikes, expiries, vols, 0.02, 0.0, is_call)
+        solved = implied_volatility(prices, 100, strikes, expiries, 0.02, is_call=is_call)
+        np.testing.assert_allclose(solved, vols, atol=1e-6)
+
+
+def test_implied_volatility_black76_and_arbitrage_bounds() -> None:
+    prices = black76_price(100, [80, 120], 0.5, 0.4, 0.05, [True, False])
+    solved = implied_volatility(prices, 100, [80, 120], 0.5, 0.05, carry=0.0, is_call=[True, False])
+    np.testing.assert_allclose(solved, 0.4, atol=1e-8)
+    assert black76_greeks(100, 100, 0.5, 0.4, 0.05)["rho"] < 0
+
+    # below intrinsic, zero and above the forward are all unsolvable
+    out_of_bounds = implied_volatility([1.0, 0.0, 150.0], 120, 100, 0.25)
+    assert np.isnan(out_of_bounds).all()
+
+
+def test_price_chain_solves_missing_iv_from_marks() -> None:
+    marks = black_scholes_price(100, [90, 110], 30 / 365, [0.35, 0.25], is_call=[False, True])
+    priced = price_chain(
+        {"strike": [90, 110], "expiry": [30, 30], "option_type": ["put", "call"], "mark_price": marks, "iv": [np.nan, 0.25]},
+        spot=100,
+    )
+    np.testing.assert_allclose(priced["iv"], [0.35, 0.25], atol=1e-8)
+    assert priced["delta"][0] < 0 < priced["delta"][1]
+
+
+def test_delta_neutral_prices_contracts_without_quoted_greeks() -> None:
+    engine = AdvancedDeltaNeutralEngine()
+    chain = [
+        {"open_interest": 10, "mark_price": 5.0, "delta": 0.5, "gamma": 0.02, "vega": 0.1, "theta": -0.03, "rho": 0.01},
+        {"open_interest": 10, "strike": 100, "expiry": 30, "iv": 0.3, "option_type": "call"},
+    ]
+    result = asyncio.run(engine.analyze({"options_data": {"SPY": chain}, "prices": {"SPY": [100.0]}}))
+    expected = black_scholes_greeks(100, 100, 30 / 365, 0.3)
+    exposure = result["aggregate_exposure"]
+    assert np.isclose(exposure["delta"], 10 * 0.5 + 10 * expected["delta"])
+    assert np.isclose(exposure["gamma"], 10 * 0.02 + 10 * expected["gamma"])
+
+
+def test_gamma_exposure_profile_by_strike() -> None:
+    engine = AdvancedOpenInterestEngine()
+    oi = {
+        "strike": [90, 100, 110, 100],
+        "expiry": ["2030-01-01"] * 4,
+        "call_oi": [100, 200, 300, 50],
+        "put_oi": [300, 100, 50, 20],
+        "gamma": [0.01, 0.02, 0.01, 0.02],
+    }
+    result = asyncio.run(engine.analyze({"open_interest": oi, "prices": {"SPY": [100.0]}}))
+    gamma = result["gamma_exposure"]
+    assert gamma["gamma_profile"] == {90.0: -2.0, 100.0: 2.6, 110.0: 2.5}
+    assert np.isclose(gamma["total_gamma"], 3.1)
+    assert gamma["gamma_flip_level"] == 90.0
@@ -0,0 +1,49 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from intelligence.sharpe_intelligence import AdvancedSharpeEngine
+
+
+@pytest.fixture
+def returns() -> pd.Series:
+    rng = np.random.default_rng(11)
+    return pd.Series(0.01 * rng.standard_t(5, size=500) + 0.0005)
+
+
+def test_vectorized_sharpes_match_scalar_helper() -> None:
+    engine = AdvancedSharpeEngine()
+    samples = np.random.default_rng(0).normal(0.0005, 0.01, size=(8, 120))
+    expected = [engine._sharpe_ratio(row) for row in samples]
+    np.testing.assert_allclose(engine._sharpe_ratios(samples), expected, atol=1e-12)
+
+
+def test_seeded_bootstrap_is_reproducible(returns: pd.Series) -> None:
+    first = AdvancedSharpeEngine({"seed": 42, "psr_method": "bootstrap"})._probabilistic_sharpe(returns)
+    second = AdvancedSharpeEngine({"seed": 42, "psr_method": "bootstrap"})._probabilistic_sharpe(returns)
+    assert first == second
+    assert first["method"] == "bootstrap"
+
+
+def test_analytic_psr_agrees_with_bootstrap(returns: pd.Series) -> None:
+    engine = AdvancedSharpeEngine({"seed": 1, "simulations": 4000})
+    analytic = engine._probabilistic_sharpe(returns)
+    bootstrap = engine._probabilistic_sharpe(returns, method="bootstrap")
+    assert analytic["method"] == "analytic"
+    assert analytic["probability_skill"] == pytest.approx(bootstrap["probability_skill"], abs=0.05)
+    assert analytic["sharpe_std_error"] == pytest.approx(bootstrap["sharpe_std_error"], rel=0.15)
+
+
+def test_deflated_sharpe_penalises_multiple_trials(returns: pd.Series) -> None:
+    single = AdvancedSharpeEngine()._probabilistic_sharpe(returns)
+    many = AdvancedSharpeEngine({"num_trials": 50})._probabilistic_sharpe(returns)
+    assert single["deflated_sharpe"] == single["probability_skill"]
+    assert many["deflated_sharpe"] < many["probability_skill"]
+
+
+def test_analyze_reports_probabilistic_sharpe(returns: pd.Series) -> None:
+    result = asyncio.run(AdvancedSharpeEngine({"seed": 3}).analyze({"returns": returns.tolist()}))
+    assert 0.0 <= result["probabilistic_sharpe"]["probability_skill"] <= 1.0
+    assert "daily" in result["multi_timeframe_sharpe"]
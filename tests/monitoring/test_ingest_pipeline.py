@@ -1,7 +1,7 @@
 import asyncio
 from datetime import datetime, timezone
 
-from monitoring.ingest_pipeline import EventProcessor, IngestPipeline
+from monitoring.ingest_pipeline import EventProcessor, IngestPipeline, IngestPipelineConfig
 
 
 class DummyProcessor(EventProcessor):
@@ -67,3 +67,65 @@ async def _run_missing_timestamp() -> None:
     assert isinstance(event.timestamp, datetime)
     assert event.timestamp.tzinfo is not None
 
+
+
+class BatchProcessor(EventProcessor):
+    def __init__(self) -> None:
+        self.batches = []
+
+    async def process_batch(self, events) -> None:
+        self.batches.append(list(events))
+
+
+class SlowProcessor(EventProcessor):
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+
+    async def process(self, event) -> None:
+        await self.release.wait()
+
+
+def test_ingest_pipeline_micro_batches_events():
+    asyncio.run(_run_micro_batches())
+
+
+async def _run_micro_batches() -> None:
+    pipeline = IngestPipeline(IngestPipelineConfig(batch_size=50, batch_max_wait_ms=20, normaliser_workers=2))
+    processor = BatchProcessor()
+    pipeline.register_processor(processor)
+
+    await pipeline.start()
+    try:
+        for idx in range(100):
+            pipeline.submit_nowait({"source": "qa_engine", "score": idx})
+    finally:
+        await pipeline.stop()
+
+    assert sum(len(batch) for batch in processor.batches) == 100
+    assert len(processor.batches) < 100
+    assert pipeline.stats()["normalised"] == 100
+
+
+def test_slow_processor_does_not_stall_others():
+    asyncio.run(_run_slow_processor())
+
+
+async def _run_slow_processor() -> None:
+    pipeline = IngestPipeline(IngestPipelineConfig(batch_size=1, batch_max_wait_ms=0))
+    fast = DummyProcessor()
+    slow = SlowProcessor()
+    pipeline.register_processor(slow, policy="drop", queue_size=2)
+    pipeline.register_processor(fast)
+
+    await pipeline.start()
+    try:
+        for idx in range(10):
+            await pipeline.submit({"source": "trading_service", "score": idx})
+        await asyncio.sleep(0.1)
+
+        assert len(fast.events) == 10
+        slow_stats = pipeline.stats()["processors"]["SlowProcessor"]
+        assert slow_stats["dropped"] > 0
+    finally:
+        slow.release.set()
+        await pipeline.stop()
@@ -8,3 +8,15 @@ def test_log_aggregator_buffers_events():
     assert agg.recent(1)[0]["fields"]["symbol"] == "AAPL"
     assert '"events"' in agg.to_json(limit=2)
 
+
+
+def test_log_aggregator_reads_by_cursor():
+    agg = LogAggregator(max_events=3)
+    for idx in range(5):
+        agg.emit("info", f"event {idx}")
+    events, cursor, dropped = agg.read_since(0, limit=2)
+    assert dropped == 2
+    assert [e["message"] for e in events] == ["event 2", "event 3"]
+    events, cursor, dropped = agg.read_since(cursor, limit=10)
+    assert [e["message"] for e in events] == ["event 4"]
+    assert cursor == agg.sequence
@@ -1,3 +1,4 @@
+import gzip
 import json
 from datetime import datetime, timezone
 
@@ -14,24 +15,30 @@ class DummyResponse:
         self.text = text
 
 
+def _body(data, headers):
+    if headers.get("Content-Encoding") == "gzip":
+        data = gzip.decompress(data)
+    return data.decode("utf-8") if isinstance(data, bytes) else data
+
+
 @pytest.mark.skipif(log_exporter_module.requests is None, reason="requests library not available")
-def test_log_exporter_sends_to_elastic(monkeypatch):
+def test_log_exporter_sends_to_elastic(monkeypatch, tmp_path):
     aggregator = LogAggregator(max_events=10)
     aggregator.emit_json(
         {"message": "test", "timestamp": datetime.now(timezone.utc).isoformat()}
     )
     config = LogExporterConfig(
-        batch_size=5, elastic_url="http://elastic:9200", elastic_index="fame-test"
+        batch_size=5, elastic_url="http://elastic:9200", elastic_index="fame-test", spill_dir=tmp_path
     )
     exporter = LogExporter(aggregator, config)
 
     calls = []
 
-    def fake_post(url, data=None, headers=None, timeout=10):
-        calls.append((url, data, headers))
+    def fake_post(self, url, data=None, headers=None, timeout=10):
+        calls.append((url, _body(data, headers), headers))
         return DummyResponse()
 
-    monkeypatch.setattr("monitoring.log_exporter.requests.post", fake_post)
+    monkeypatch.setattr("monitoring.log_exporter.requests.Session.post", fake_post)
 
     exported = exporter._export_batch()
 
@@ -41,3 +48,87 @@ def test_log_exporter_sends_to_elastic(monkeypatch):
     lines = calls[0][1].strip().split("\n")
     assert json.loads(lines[1])["message"] == "test"
 
+
+@pytest.mark.skipif(log_exporter_module.requests is None, reason="requests library not available")
+def test_log_exporter_batches_splunk_and_keeps_same_timestamp_events(monkeypatch, tmp_path):
+    aggregator = LogAggregator(max_events=10)
+    timestamp = datetime.now(timezone.utc).isoformat()
+    for idx in range(3):
+        aggregator.emit_json({"message": f"event-{idx}", "timestamp": timestamp})
+    config = LogExporterConfig(
+        batch_size=10, splunk_url="http://splunk:8088/services/collector", splunk_token="token", spill_dir=tmp_path
+    )
+    exporter = LogExporter(aggregator, config)
+
+    calls = []
+
+    def fake_post(self, url, data=None, headers=None, timeout=10):
+        calls.append(_body(data, headers))
+        return DummyResponse()
+
+    monkeypatch.setattr("monitoring.log_exporter.requests.Session.post", fake_post)
+
+    assert exporter._export_batch() == 3
+    assert len(calls) == 1
+    messages = [json.loads(line)["event"]["message"] for line in calls[0].split("\n")]
+    assert messages == ["event-0", "event-1", "event-2"]
+
+    aggregator.emit_json({"message": "event-3", "timestamp": timestamp})
+    assert exporter._export_batch() == 1
+    assert exporter.stats()["lag"] == 0
+
+
+@pytest.mark.skipif(log_exporter_module.requests is None, reason="requests library not available")
+def test_log_exporter_spills_when_sink_down_and_replays(monkeypatch, tmp_path):
+    aggregator = LogAggregator(max_events=10)
+    aggregator.emit_json({"message": "kept"})
+    config = LogExporterConfig(
+        batch_size=5, elastic_url="http://elastic:9200", spill_dir=tmp_path, max_retries=1, retry_backoff_seconds=0
+    )
+    exporter = LogExporter(aggregator, config)
+
+    status = {"code": 503}
+    calls = []
+
+    def fake_post(self, url, data=None, headers=None, timeout=10):
+        calls.append(_body(data, headers))
+        return DummyResponse(status_code=status["code"])
+
+    monkeypatch.setattr("monitoring.log_exporter.requests.Session.post", fake_post)
+
+    exporter._export_batch()
+    assert len(calls) == 2  # initial attempt + one retry
+    assert (tmp_path / "elastic.ndjson").exists()
+
+    status["code"] = 200
+    exporter._replay_spill()
+    assert not (tmp_path / "elastic.ndjson").exists()
+    assert "kept" in calls[-1]
+    assert exporter.stats()["sinks"]["elastic"]["spilled_pending"] == 0
+
+
+@pytest.mark.skipif(log_exporter_module.requests is None, reason="requests library not available")
+def test_log_exporter_quarantines_corrupt_spill_lines(monkeypatch, tmp_path):
+    aggregator = LogAggregator(max_events=10)
+    config = LogExporterConfig(batch_size=5, elastic_url="http://elastic:9200", spill_dir=tmp_path)
+    exporter = LogExporter(aggregator, config)
+    spill = tmp_path / "elastic.ndjson"
+    spill.write_text(json.dumps({"message": "before"}) + "\n{\"message\": \"torn\n" + json.dumps({"message": "after"}) + "\n")
+
+    calls = []
+
+    def fake_post(self, url, data=None, headers=None, timeout=10):
+        calls.append(_body(data, headers))
+        return DummyResponse(status_code=200)
+
+    monkeypatch.setattr("monitoring.log_exporter.requests.Session.post", fake_post)
+
+    exporter._replay_spill()
+    assert not spill.exists()
+    assert "before" in calls[-1] and "after" in calls[-1]
+    assert "torn" in (tmp_path / "elastic.corrupt").read_text()
+
+    # new batches flow straight to the sink again
+    aggregator.emit_json({"message": "fresh"})
+    assert exporter._export_batch() == 1
+    assert "fresh" in calls[-1]
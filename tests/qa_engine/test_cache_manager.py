@@ -0,0 +1,135 @@
+import importlib.util
+import time
+from pathlib import Path
+
+import pytest
+
+# core/qa_engine.py shadows the core/qa_engine/ directory, so load the module by path
+_SPEC = importlib.util.spec_from_file_location(
+    "qa_engine_cache_manager", Path(__file__).resolve().parents[2] / "core" / "qa_engine" / "cache_manager.py"
+)
+cache_manager = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(cache_manager)
+
+BoundedTTLCache = cache_manager.BoundedTTLCache
+CacheSerializer = cache_manager.CacheSerializer
+ProductionCacheManager = cache_manager.ProductionCacheManager
+
+
+class StandInRedis:
+    """In-process stand-in for redis.Redis that counts network round trips"""
+
+    def __init__(self):
+        self.store = {}
+        self.round_trips = 0
+        self.fail = False
+
+    def _call(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.round_trips += 1
+
+    def ping(self):
+        self._call()
+        return True
+
+    def get(self, key):
+        self._call()
+        return self.store.get(key)
+
+    def mget(self, keys):
+        self._call()
+        return [self.store.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self._call()
+        assert isinstance(value, bytes)
+        self.store[key] = value
+
+    def delete(self, *keys):
+        self._call()
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=True):
+        return _StandInPipeline(self)
+
+
+class _StandInPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+
+    def execute(self):
+        self.client._call()
+        for key, value in self.commands:
+            assert isinstance(value, bytes)
+            self.client.store[key] = value
+        return [True] * len(self.commands)
+
+
+def test_bulk_operations_batch_round_trips():
+    client = StandInRedis()
+    cache = ProductionCacheManager(redis_client=client, batch_size=100)
+    items = {f"price:{i}": {"symbol": f"S{i}", "price": float(i)} for i in range(250)}
+
+    assert cache.set_many(items, ttl=60) == 250
+    assert client.round_trips == 3
+
+    client.round_trips = 0
+    found = cache.get_many(list(items) + ["price:missing"])
+    assert found == items
+    assert client.round_trips == 3
+
+    assert cache.get("price:7") == {"symbol": "S7", "price": 7.0}
+    assert cache.get("price:7", max_age_seconds=0) is None
+    assert cache.delete_many(["price:1", "price:2", "nope"]) == 2
+
+
+def test_serializer_compresses_large_values_and_reads_legacy_json():
+    serializer = CacheSerializer(compress_threshold=256)
+    small = serializer.dumps(1.0, 60, {"a": 1})
+    large = serializer.dumps(2.0, 60, {"rows": ["x" * 50] * 100})
+    assert small[1:2] == b"-" and large[1:2] == b"z"
+    assert len(large) < 500
+    assert serializer.loads(large) == (2.0, 60, {"rows": ["x" * 50] * 100})
+
+    legacy = '{"data": {"a": 1}, "timestamp": 5.0, "ttl": 30}'
+    assert serializer.loads(legacy) == (5.0, 30, {"a": 1})
+
+    client = StandInRedis()
+    client.store["old"] = b'{"data": {"v": 2}, "timestamp": %f, "ttl": 30}' % time.time()
+    cache = ProductionCacheManager(redis_client=client)
+    assert cache.get("old") == {"v": 2}
+    assert cache.get_timestamp("old") == pytest.approx(time.time(), abs=5)
+
+
+def test_falls_back_to_memory_when_redis_fails():
+    client = StandInRedis()
+    cache = ProductionCacheManager(redis_client=client)
+    client.fail = True
+    assert cache.set_many({"a": {"v": 1}, "b": {"v": 2}}) == 2
+    assert cache.get_many(["a", "b", "c"]) == {"a": {"v": 1}, "b": {"v": 2}}
+    assert cache.get_timestamp("a") is not None
+
+
+def test_memory_fallback_is_bounded_with_amortized_expiry():
+    store = BoundedTTLCache(max_entries=100, expire_batch=8)
+    now = time.time()
+    for i in range(50):
+        store.set(f"old:{i}", now - 10, 1, i)  # already past their ttl
+    for i in range(200):
+        store.set(f"new:{i}", now, 60, i)
+
+    assert len(store) == 100
+    assert all(f"new:{i}" in store for i in range(100, 200))
+    assert store.expirations + store.evictions == 150
+    assert len(store._expiry) <= 200
+
+    cache = ProductionCacheManager(max_memory_entries=10)
+    for i in range(25):
+        cache.set(f"k{i}", {"i": i})
+    assert len(cache.memory_cache) == 10
+    assert cache.get("k0") is None and cache.get("k24") == {"i": 24}
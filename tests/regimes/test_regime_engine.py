@@ -1,7 +1,13 @@
 import asyncio
+import time
+from statistics import stdev
+
+import numpy as np
+import pytest
 
 from regimes.regime_engine import RegimeDetectionEngine
 from regimes.regime_types import MarketRegime
+from regimes.volatility import SimpleVolatilityModel
 
 
 def test_regime_detection_engine_basic():
@@ -14,3 +20,57 @@ def test_regime_detection_engine_basic():
     regime = asyncio.run(engine.analyze(market_data))
     assert isinstance(regime, MarketRegime)
 
+
+def test_vectorized_volatility_matches_statistics_stdev():
+    def reference(returns, model):
+        if len(returns) < model.window_short:
+            return MarketRegime.RANGING
+        short_vol = stdev(returns[-model.window_short:])
+        long_vol = stdev(returns[-model.window_long:]) if len(returns) >= model.window_long else short_vol
+        if short_vol > long_vol * 1.5:
+            return MarketRegime.HIGH_VOLATILITY
+        if short_vol < long_vol * 0.5:
+            return MarketRegime.LOW_VOLATILITY
+        return MarketRegime.RANGING
+
+    rng = np.random.default_rng(5)
+    model = SimpleVolatilityModel()
+    series = {}
+    for i, length in enumerate([5, 20, 35, 60, 200] * 8):
+        scale = np.where(np.arange(length) >= length - 20, rng.choice([0.2, 1.0, 3.0]), 1.0)
+        series[f"S{i}"] = list(0.01 * scale * rng.standard_normal(length))
+
+    regimes = asyncio.run(model.detect_regimes(series))
+    assert regimes == {name: reference(values, model) for name, values in series.items()}
+    assert len(set(regimes.values())) == 3
+
+
+def test_detectors_run_concurrently_within_budgets():
+    class SlowMacro:
+        async def classify(self, market_data):
+            await asyncio.sleep(1.0)
+            return MarketRegime.CRASH
+
+    engine = RegimeDetectionEngine(detector_budget=0.1)
+    engine.macro_classifier = SlowMacro()
+    started = time.perf_counter()
+    regime = asyncio.run(engine.analyze({"returns": [0.01] * 30}))
+    assert time.perf_counter() - started < 0.5
+    assert regime == MarketRegime.RANGING
+    assert engine.last_failures == {"macro": "timeout"}
+
+
+def test_detectors_receive_read_only_snapshot():
+    seen = {}
+
+    class Inspecting:
+        async def analyze(self, market_data):
+            seen["data"] = market_data
+            return MarketRegime.RANGING
+
+    engine = RegimeDetectionEngine()
+    engine.correlation_engine = Inspecting()
+    asyncio.run(engine.analyze({"returns": [0.01] * 30, "macro": {"growth": 1.0}}))
+    with pytest.raises(TypeError):
+        seen["data"]["macro"]["growth"] = 2.0
+    assert seen["data"]["returns"] == (0.01,) * 30
@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+
+from rl.rl_trainer import QTable, RLTrainer, RunningRewardStats
+
+
+def _trainer(tmp_path, **rl):
+    return RLTrainer({"memory": {"data_dir": str(tmp_path)}, "rl": {"learning_rate": 0.5, **rl}})
+
+
+def _interaction(intent, query="q", source="web"):
+    return {"intent": intent, "query": query, "sources": [source], "response": "x" * 100}
+
+
+def test_update_matches_tabular_q_learning(tmp_path):
+    trainer = _trainer(tmp_path)
+    trainer.update(_interaction("search"), 1.0)
+    trainer.update(_interaction("search"), 1.0)
+    # second step bootstraps from the first: 0.5 + 0.5 * (1 + 0.95 * 0.5 - 0.5)
+    assert abs(trainer.q_table.get("search_1", "web") - 0.9875) < 1e-12
+    assert trainer.q_values == {"search_1_web": trainer.q_table.get("search_1", "web")}
+    trainer.epsilon = 0.0
+    assert trainer.get_action("search_1") == "web"
+    assert trainer.get_action("never_seen") == "memory"
+
+
+def test_running_reward_stats_match_numpy():
+    stats = RunningRewardStats(window=50)
+    rewards = np.random.default_rng(0).normal(size=500)
+    for reward in rewards:
+        stats.add(float(reward))
+    assert abs(stats.window_mean - rewards[-50:].mean()) < 1e-12
+    assert abs(stats.mean - rewards.mean()) < 1e-12
+    assert abs(stats.variance - rewards.var(ddof=1)) < 1e-12
+
+
+def test_batch_update_accumulates_duplicates(tmp_path):
+    trainer = _trainer(tmp_path)
+    errors = trainer.batch_update([
+        {"state": "s", "action": "web", "reward": 1.0, "done": True},
+        {"state": "s", "action": "web", "reward": 3.0, "done": True},
+        {"state": "t", "action": "memory", "reward": 2.0, "next_state": "s"},
+    ])
+    assert errors.tolist() == [1.0, 3.0, 2.0]
+    assert trainer.q_table.get("s", "web") == 0.5 * (1.0 + 3.0)
+    assert trainer.q_table.get("t", "memory") == 1.0
+    assert trainer.get_stats()["experience_count"] == 3
+    assert len(trainer.replay(batch_size=8, rng=np.random.default_rng(1))) == 8
+
+
+def test_incremental_checkpoint_round_trip(tmp_path):
+    trainer = _trainer(tmp_path, checkpoint_interval=10)
+    for i in range(30):
+        trainer.update(_interaction(f"intent{i % 7}", query="q" * (i % 3)), float(i % 2))
+    table_file = tmp_path / "rl_policy" / "q_table.npy"
+    first_write = table_file.stat().st_ino
+
+    for i in range(10):
+        trainer.update(_interaction("late", source="memory"), 1.0)
+    assert table_file.stat().st_ino == first_write  # updated in place, not rewritten
+
+    restored = _trainer(tmp_path)
+    assert restored.q_table.states == trainer.q_table.states
+    count = len(trainer.q_table)
+    assert np.array_equal(restored.q_table.values[:count], trainer.q_table.values[:count])
+    assert restored.avg_reward == trainer.avg_reward
+    assert restored.policy == trainer.policy
+
+
+def test_legacy_json_policy_is_migrated(tmp_path):
+    (tmp_path / "rl_policy.json").write_text(json.dumps({
+        "policy": {"response_length": 0.7},
+        "q_values": {"chat_12_llm_cloud": 0.4, "chat_12_web": -0.1},
+        "avg_reward": 0.25,
+    }))
+    trainer = _trainer(tmp_path)
+    assert trainer.q_table.get("chat_12", "llm_cloud") == 0.4
+    assert trainer.q_table.get("chat_12", "web") == -0.1
+    assert trainer.policy.response_length == 0.7
+    trainer.epsilon = 0.0
+    assert trainer.get_action("chat_12") == "llm_cloud"
+
+
+def test_uncommitted_states_from_a_crashed_save_are_discarded(tmp_path):
+    table = QTable(["a", "b"])
+    for i, state in enumerate(["s0", "s1", "s2"]):
+        table.values[table.encode_state(state), 0] = float(i + 1)
+    table.save(tmp_path, {})
+    # crash between the states.jsonl append and the meta.json replace
+    with open(tmp_path / "states.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps("orphan") + "\n")
+
+    resumed = QTable(["a", "b"])
+    resumed.load(tmp_path)
+    resumed.values[resumed.encode_state("s3"), 0] = 4.0
+    resumed.save(tmp_path, {})
+
+    restored = QTable(["a", "b"])
+    restored.load(tmp_path)
+    assert restored.states == ["s0", "s1", "s2", "s3"]
+    assert [restored.get(state, "a") for state in restored.states] == [1.0, 2.0, 3.0, 4.0]
@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from spiders.spider_fleet import BaseSpider, SpiderConfig, SpiderFleet, SpiderType
+
+
+async def _start_fixture_server():
+    """Local HTTP source: validators on some routes, churn on others"""
+    seen = {"requests": [], "changing": 0}
+
+    async def etag(request):
+        seen["requests"].append(("etag", dict(request.headers)))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response([{"headline": "fed holds"}], headers={"ETag": '"v1"'})
+
+    async def lastmod(request):
+        stamp = "Wed, 01 Jan 2025 00:00:00 GMT"
+        seen["requests"].append(("lastmod", dict(request.headers)))
+        if request.headers.get("If-Modified-Since") == stamp:
+            return web.Response(status=304)
+        return web.Response(text="10-K filed", headers={"Last-Modified": stamp})
+
+    async def static(request):
+        seen["requests"].append(("static", dict(request.headers)))
+        return web.json_response({"price": 100})
+
+    async def changing(request):
+        seen["changing"] += 1
+        return web.Response(text=json.dumps([{"tick": seen["changing"]}]), content_type="application/json")
+
+    async def broken(request):
+        return web.Response(status=500)
+
+    app = web.Application()
+    app.add_routes([
+        web.get("/etag", etag),
+        web.get("/lastmod", lastmod),
+        web.get("/static", static),
+        web.get("/changing", changing),
+        web.get("/broken", broken),
+    ])
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", seen
+
+
+def _spider(url, spider_type=SpiderType.NEWS_AGGREGATOR, **options):
+    options.setdefault("interval", 0.05)
+    options.setdefault("min_interval", 0.02)
+    options.setdefault("max_interval", 0.4)
+    return BaseSpider(SpiderConfig(spider_type, url=url, **options))
+
+
+def test_conditional_requests_and_content_dedup():
+    async def main():
+        runner, base, seen = await _start_fixture_server()
+        fleet = SpiderFleet({"default_spiders": False})
+        fleet.session = fleet._create_session()  # crawl by hand, without the scheduler
+        try:
+            for name in ("etag", "lastmod", "static"):
+                fleet.add_spider(name, _spider(f"{base}/{name}"))
+            first = {name: await s.crawl() for name, s in fleet.spiders.items()}
+            second = {name: await s.crawl() for name, s in fleet.spiders.items()}
+            await fleet.session.close()
+            return first, second, fleet, seen
+        finally:
+            await runner.cleanup()
+
+    first, second, fleet, seen = asyncio.run(main())
+    assert first["etag"][0]["headline"] == "fed holds"
+    assert first["lastmod"][0]["content"] == "10-K filed"
+    assert first["static"][0]["price"] == 100
+    assert second == {"etag": None, "lastmod": None, "static": None}
+
+    etag, lastmod, static = (fleet.spiders[n] for n in ("etag", "lastmod", "static"))
+    assert etag.not_modified == 1 and lastmod.not_modified == 1
+    assert static.duplicates == 1 and static.not_modified == 0
+    conditional = [h for name, h in seen["requests"] if name == "etag"][-1]
+    assert conditional["If-None-Match"] == '"v1"'
+
+
+def test_fleet_adapts_intervals_over_shared_session():
+    async def main():
+        runner, base, seen = await _start_fixture_server()
+        fleet = SpiderFleet({"default_spiders": False, "max_concurrency": 4})
+        try:
+            fleet.add_spider("changing", _spider(f"{base}/changing"))
+            fleet.add_spider("static", _spider(f"{base}/static"))
+            fleet.add_spider("broken", _spider(f"{base}/broken"))
+            await fleet.start_fleet()
+            sessions = {id(s.session) for s in fleet.spiders.values()}
+            await asyncio.sleep(0.8)
+            stats = fleet.get_fleet_stats()
+            await fleet.stop_fleet()
+            return stats, sessions, seen
+        finally:
+            await runner.cleanup()
+
+    stats, sessions, seen = asyncio.run(main())
+    schedule = stats["schedule"]
+    assert len(sessions) == 1
+    assert schedule["changing"]["interval"] == 0.02
+    assert schedule["changing"]["change_rate"] > 0.9
+    assert schedule["static"]["interval"] > 0.1
+    assert schedule["static"]["duplicates"] >= 1
+    assert schedule["broken"]["errors"] >= 1 and schedule["broken"]["interval"] > 0.05
+    assert schedule["changing"]["runs"] > 3 * schedule["static"]["runs"]
+    assert seen["changing"] == schedule["changing"]["fetches"]
+
+
+def test_due_spiders_run_in_priority_order():
+    order = []
+
+    class Recorder(BaseSpider):
+        async def crawl(self):
+            order.append(self.config.priority)
+            await asyncio.sleep(0.01)
+            return []
+
+    async def main():
+        fleet = SpiderFleet({"default_spiders": False, "max_concurrency": 1})
+        for priority in (3, 9, 5, 1, 7):
+            fleet.add_spider(f"p{priority}", Recorder(SpiderConfig(SpiderType.DEEP_WEB, interval=60.0, priority=priority)))
+        await fleet.start_fleet()
+        await asyncio.sleep(0.2)
+        stats = fleet.get_fleet_stats()
+        await fleet.stop_fleet()
+        return stats
+
+    stats = asyncio.run(main())
+    assert order == [9, 7, 5, 3, 1]
+    # nothing changed, so every interval backed off from 60s
+    assert all(entry["interval"] == 90.0 for entry in stats["schedule"].values())
@@ -25,3 +25,57 @@ def test_hierarchical_controller_outputs_signals():
         assert -1.0 <= signal.direction <= 1.0
         assert 0.0 <= signal.confidence <= 1.0
 
+
+
+def _signal(asset, strategy, direction, size=0.1, confidence=0.5):
+    from strategies.strategy_base import TradingSignal
+
+    return TradingSignal(asset=asset, direction=direction, confidence=confidence, size=size,
+                         strategy=strategy, expected_hold_hours=1.0)
+
+
+class _Delayed:
+    def __init__(self, name, delay, direction):
+        self.name = name
+        self.delay = delay
+        self.emitted = _signal("AAPL", name, direction)
+
+    def is_suitable_for_regime(self, regime):
+        return True
+
+    async def generate_signals(self, market_data, regime):
+        await asyncio.sleep(self.delay)
+        return {"AAPL": self.emitted}
+
+
+def _controller(strategies, **kwargs):
+    from strategies.strategy_universe import StrategyUniverse
+
+    universe = StrategyUniverse(strategy_classes={})
+    universe._instances.update(strategies)
+    controller = HierarchicalStrategyController(strategy_universe=universe, **kwargs)
+    controller.allocator.default_weights[MarketRegime.RANGING] = {name: 1.0 for name in strategies}
+    return controller
+
+
+def test_merge_order_is_deterministic_and_inputs_untouched():
+    results = []
+    for delays in [(0.0, 0.05), (0.05, 0.0)]:
+        first, second = _Delayed("first", delays[0], 1.0), _Delayed("second", delays[1], -1.0)
+        controller = _controller({"first": first, "second": second})
+        _, signals, _ = asyncio.run(controller.decide_action({}, regime_override=MarketRegime.RANGING))
+        results.append(signals["AAPL"])
+        assert first.emitted.size == 0.1 and first.emitted.direction == 1.0
+    assert results[0] == results[1]
+    assert results[0].strategy == "first"
+    assert results[0].direction == (1.0 - 0.5) / 2.0
+
+
+def test_slow_strategy_is_skipped_after_its_budget():
+    controller = _controller(
+        {"fast": _Delayed("fast", 0.0, 1.0), "slow": _Delayed("slow", 1.0, -1.0)},
+        strategy_budgets={"slow": 0.05},
+    )
+    _, signals, _ = asyncio.run(controller.decide_action({}, regime_override=MarketRegime.RANGING))
+    assert signals["AAPL"].strategy == "fast"
+    assert controller.last_failures == {"slow": "timeout"}
@@ -0,0 +1,108 @@
+import pytest
+
+import core.knowledge_base as knowledge_base
+from core import book_reader
+from core.book_reader import IngestCheckpoints, ingest_book, ingest_books
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    directory = tmp_path / "kb"
+    directory.mkdir()
+    monkeypatch.setattr(knowledge_base, "KNOWLEDGE_BASE_DIR", directory)
+    monkeypatch.setattr(knowledge_base, "BOOKS_INDEX_FILE", directory / "books_index.json")
+    monkeypatch.setattr(knowledge_base, "KNOWLEDGE_INDEX_FILE", directory / "knowledge_index.json")
+    return directory
+
+
+@pytest.fixture
+def fake_pdf(tmp_path, monkeypatch):
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    pages = [f"Page {n} covers firewall rules and python security.\n" * 5 for n in range(40)]
+    calls = []
+
+    def extract(task):
+        calls.append(task)
+        _, start, end = task
+        return pages[start:end]
+
+    monkeypatch.setattr(book_reader, "PDF_AVAILABLE", True)
+    monkeypatch.setattr(book_reader, "_pdf_page_count", lambda file_path: len(pages))
+    monkeypatch.setattr(book_reader, "_extract_pdf_pages", extract)
+    return path, pages, calls
+
+
+def test_text_books_are_stored_and_skipped_on_rerun(store, tmp_path):
+    book = tmp_path / "notes.txt"
+    book.write_text("Encryption and authentication basics. " * 20, encoding="utf-8")
+    checkpoints = IngestCheckpoints(store / "checkpoints.json")
+
+    first = ingest_books([book], workers=1, checkpoints=checkpoints)
+    result = first["books"][0]
+    assert result["success"] and not result["skipped"]
+    assert first["pages"] == 1
+    assert knowledge_base.book_content_path(result["book_id"]).read_text(encoding="utf-8").startswith("Encryption")
+    assert result["book_id"] in knowledge_base.load_index(knowledge_base.BOOKS_INDEX_FILE)
+
+    # a renamed copy has the same content hash, so nothing is extracted again
+    copy = tmp_path / "renamed.txt"
+    copy.write_bytes(book.read_bytes())
+    second = ingest_book(copy, IngestCheckpoints(store / "checkpoints.json"))
+    assert second["skipped"] and second["book_id"] == result["book_id"]
+    assert second["pages"] == 0
+
+
+def test_interrupted_pdf_resumes_from_checkpoint(store, fake_pdf, monkeypatch):
+    path, pages, calls = fake_pdf
+    extract = book_reader._extract_pdf_pages
+
+    def failing(task):
+        if task[1] >= 24:
+            raise RuntimeError("worker died")
+        return extract(task)
+
+    monkeypatch.setattr(book_reader, "_extract_pdf_pages", failing)
+    checkpoints = IngestCheckpoints(store / "checkpoints.json")
+    interrupted = ingest_book(path, checkpoints, pages_per_task=8)
+    assert not interrupted["success"] and "worker died" in interrupted["error"]
+    assert interrupted["pages"] == 24
+
+    # simulate a crash after a partial write that was never checkpointed
+    content_file = knowledge_base.book_content_path(interrupted["book_id"])
+    with open(content_file, "a", encoding="utf-8") as f:
+        f.write("half a page")
+
+    monkeypatch.setattr(book_reader, "_extract_pdf_pages", extract)
+    calls.clear()
+    resumed = ingest_book(path, IngestCheckpoints(store / "checkpoints.json"), pages_per_task=8)
+    assert resumed["success"]
+    assert resumed["pages"] == 16
+    assert [task[1] for task in calls] == [24, 32]
+    assert content_file.read_text(encoding="utf-8") == "".join(page + "\n\n" for page in pages)
+    assert resumed["content_length"] == len(content_file.read_text(encoding="utf-8"))
+    assert resumed["pages_per_sec"] > 0
+    assert "firewall" in knowledge_base.load_index(knowledge_base.BOOKS_INDEX_FILE)[resumed["book_id"]]["key_concepts"]
+
+
+def test_pages_are_yielded_in_order_from_a_pool(fake_pdf):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path, pages, _ = fake_pdf
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        ranges = list(book_reader.iter_pdf_pages(str(path), start=3, executor=executor,
+                                                 pages_per_task=5, max_in_flight=3))
+    assert [end for end, _ in ranges] == [8, 13, 18, 23, 28, 33, 38, 40]
+    assert [text for _, texts in ranges for text in texts] == pages[3:]
+
+
+def test_books_stored_under_legacy_ids_are_not_duplicated(store, tmp_path):
+    book = tmp_path / "legacy.txt"
+    book.write_text("Network segmentation limits blast radius. " * 20, encoding="utf-8")
+    legacy_id = knowledge_base.store_book_knowledge(str(book), "legacy", book.read_text(encoding="utf-8"))
+    checkpoints = IngestCheckpoints(store / "checkpoints.json")
+
+    result = ingest_book(book, checkpoints)
+    assert result["skipped"] and result["book_id"] == legacy_id
+    assert list(knowledge_base.load_index(knowledge_base.BOOKS_INDEX_FILE)) == [legacy_id]
+    assert checkpoints.is_complete(str(book))
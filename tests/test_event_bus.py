@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+from core.event_bus import EventBus, EventLog
+from orchestrator.event_bus import EventBus as OrchestratorEventBus
+
+
+def test_event_log_ring_buffer_and_topic_index():
+    log = EventLog(capacity=5)
+    for i in range(12):
+        log.append({"topic": "even" if i % 2 == 0 else "odd", "payload": i})
+
+    assert len(log) == 5 and log.first_offset == 7
+    assert [e["payload"] for e in log.tail(limit=3)] == [9, 10, 11]
+    assert [e["payload"] for e in log.tail("even", limit=10)] == [8, 10]
+    assert [e["payload"] for e in log.since(9)] == [9, 10, 11]
+    assert [e["payload"] for e in log.since(0, topic="odd")] == [7, 9, 11]
+    assert [e["offset"] for e in log.since(8, topic="even", limit=1)] == [8]
+
+    log.clear()
+    assert log.since(0) == [] and log.tail("odd") == []
+
+
+def test_sync_and_async_subscribers_receive_events_in_order():
+    bus = EventBus()
+    seen_sync, seen_async, threads = [], [], set()
+
+    def sync_handler(payload):
+        threads.add(threading.current_thread().name)
+        seen_sync.append(payload)
+
+    async def async_handler(payload):
+        seen_async.append(payload)
+
+    bus.subscribe("t", sync_handler)
+    bus.subscribe("t", async_handler)
+
+    async def run():
+        for i in range(200):
+            await bus.publish("t", i)
+        await bus.drain()
+        await bus.close()
+
+    asyncio.run(run())
+    assert seen_sync == list(range(200)) and seen_async == list(range(200))
+    assert all(name.startswith("event-bus") for name in threads)
+    assert [m["delivered"] for m in bus.subscriber_metrics()] == [200, 200]
+    assert [e["payload"] for e in bus.replay_since(195, topic="t")] == [195, 196, 197, 198, 199]
+
+
+def test_slow_subscriber_policies_and_lag_metrics():
+    bus = EventBus()
+    release = asyncio.Event
+    received = {"oldest": [], "newest": [], "block": []}
+
+    async def run():
+        gate = release()
+
+        def make(name):
+            async def handler(payload):
+                await gate.wait()
+                received[name].append(payload)
+            return handler
+
+        oldest = bus.subscribe("t", make("oldest"), max_queue=3, policy="drop_oldest")
+        newest = bus.subscribe("t", make("newest"), max_queue=3, policy="drop_newest")
+        blocked = bus.subscribe("t", make("block"), max_queue=3, policy="block", block_timeout=0.05)
+        await bus.publish("t", 0)
+        await asyncio.sleep(0)  # let every worker pick up the first event
+        for i in range(1, 10):
+            await bus.publish("t", i)
+
+        lagging = {m["policy"]: m for m in bus.subscriber_metrics()}
+        assert lagging["drop_oldest"]["lag"] == 4  # one in flight + a full queue
+        assert lagging["drop_oldest"]["lag_seconds"] > 0
+        gate.set()
+        await bus.drain()
+        return oldest, newest, blocked
+
+    oldest, newest, blocked = asyncio.run(run())
+    assert received["oldest"] == [0, 7, 8, 9]
+    assert received["newest"] == [0, 1, 2, 3]
+    assert received["block"] == [0, 1, 2, 3]
+    assert oldest.dropped == 6 and newest.dropped == 6 and blocked.dropped == 6
+
+
+def test_publish_wait_and_orchestrator_history():
+    bus = OrchestratorEventBus()
+    results = []
+
+    async def handler(payload):
+        await asyncio.sleep(0.01)
+        results.append(payload)
+
+    bus.subscribe("query.completed", handler)
+
+    async def run():
+        await bus.publish("query.received", {"id": 1})
+        await bus.publish("query.completed", {"id": 1}, wait=True)
+        assert results == [{"id": 1}]
+
+    asyncio.run(run())
+    assert [e["topic"] for e in bus.get_history()] == ["query.received", "query.completed"]
+    assert bus.get_history("query.received", limit=1)[0]["payload"] == {"id": 1}
+
+
+def test_brain_leaves_no_pending_tasks_on_short_lived_loops(monkeypatch, tmp_path):
+    import tempfile
+
+    import telemetry.events
+    from orchestrator.brain import Brain
+
+    monkeypatch.setattr(telemetry.events, "EVENT_SINK", tmp_path)
+    brain = Brain(plugin_folder=tempfile.mkdtemp())
+    seen = []
+
+    async def on_completed(payload):
+        await asyncio.sleep(0)
+        seen.append(payload["id"])
+
+    brain.bus.subscribe("query.completed", on_completed)
+    brain.bus.subscribe("query.received", lambda payload: seen.append("received"))
+
+    for _ in range(2):
+        # like fame_simple: a fresh loop per query, closed right after it
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(brain.handle_query({"text": "hi", "selected_modules": ["missing"]}))
+        assert asyncio.all_tasks(loop) == set()
+        loop.close()
+
+    assert seen.count("received") == 2 and len([s for s in seen if s != "received"]) == 2
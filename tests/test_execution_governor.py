@@ -0,0 +1,79 @@
+import asyncio
+import tempfile
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.execution_governor import ExecutionDecision, ExecutionGovernor, ExecutionMode
+
+
+def _decision(hedge_after=0.02, fallback=("cloud_llm",)):
+    return ExecutionDecision(
+        executor="local_llm", mode=ExecutionMode.FAST, expected_latency=0.1, confidence=0.9,
+        reasoning="test", fallback_chain=list(fallback), hedge_after=hedge_after,
+    )
+
+
+def _sleeper(seconds, result, finished=None):
+    async def run():
+        await asyncio.sleep(seconds)
+        if finished is not None:
+            finished.append(result)
+        return result
+    return run
+
+
+def test_hedge_wins_and_cancelled_primary_latency_is_recorded():
+    governor = ExecutionGovernor({})
+    finished = []
+    runners = {"local_llm": _sleeper(1.0, "slow", finished), "cloud_llm": _sleeper(0.01, "fast")}
+
+    winner, result = asyncio.run(governor.execute_hedged(_decision(), runners, intent="qa", complexity=2))
+
+    assert (winner, result) == ("cloud_llm", "fast") and finished == []
+    assert governor.hedge_stats == {"hedged": 1, "fallback_wins": 1}
+    # the cancelled primary still contributes a (censored) sample of at least hedge_after
+    assert governor.executor_models["local_llm"].samples == 1
+    assert governor.latency_history["local_llm"][0] >= 0.02
+
+
+def test_wait_is_bounded_without_a_hedge(monkeypatch):
+    governor = ExecutionGovernor({})
+    monkeypatch.setattr(governor, "_get_timeout", lambda executor: 0.05)
+
+    started = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(governor.execute_hedged(_decision(fallback=()), {"local_llm": _sleeper(5.0, "never")}))
+    assert time.perf_counter() - started < 1.0
+
+
+def test_brain_runs_governor_chain_hedged(monkeypatch, tmp_path):
+    import telemetry.events
+    from orchestrator.brain import Brain
+
+    monkeypatch.setattr(telemetry.events, "EVENT_SINK", tmp_path)
+    brain = Brain(plugin_folder=tempfile.mkdtemp())
+    calls = []
+
+    async def slow(query):
+        calls.append("local_llm")
+        await asyncio.sleep(1.0)
+        return {"response": "slow answer", "confidence": 0.9}
+
+    async def fast(query):
+        calls.append("cloud_llm")
+        return {"response": "fast answer", "confidence": 0.8}
+
+    brain.plugins = {"local_llm": SimpleNamespace(handle=slow), "cloud_llm": SimpleNamespace(handle=fast)}
+    brain.execution_governor = ExecutionGovernor({})
+
+    response = asyncio.run(brain.handle_query({
+        "text": "hello",
+        "selected_modules": ["local_llm", "cloud_llm"],
+        "execution_decision": _decision(),
+    }))
+
+    assert response["response"] == "fast answer" and response["executor"] == "cloud_llm"
+    assert calls == ["local_llm", "cloud_llm"]
+    assert brain.execution_governor.hedge_stats["fallback_wins"] == 1
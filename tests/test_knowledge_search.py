@@ -0,0 +1,73 @@
+import os
+
+from core.knowledge_search import KnowledgeSearchIndex
+
+
+def _write_book(directory, book_id, text):
+    path = directory / f"{book_id}_content.txt"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _index(tmp_path):
+    _write_book(tmp_path, "book_a", "Firewalls filter traffic.\n\n" + "filler words here. " * 80
+                + "\n\nSQL injection attacks abuse unsanitised input in queries.")
+    _write_book(tmp_path, "book_b", "Injection of SQL into logs is not the same thing.\n\nEncryption keys rotate.")
+    return KnowledgeSearchIndex(tmp_path, passage_chars=400, check_interval=0.0)
+
+
+def test_bm25_ranks_passages_with_offsets(tmp_path):
+    index = _index(tmp_path)
+    results = index.search_passages("sql injection", max_results=5)
+    assert {r["book_id"] for r in results} == {"book_a", "book_b"}
+    for result in results:
+        content = (tmp_path / f"{result['book_id']}_content.txt").read_text(encoding="utf-8")
+        assert content[result["offset"]:result["offset"] + result["length"]] == result["text"]
+    assert results == sorted(results, key=lambda r: r["score"], reverse=True)
+
+
+def test_phrase_and_prefix_queries(tmp_path):
+    index = _index(tmp_path)
+    phrase = index.search_passages('"sql injection"')
+    assert [r["book_id"] for r in phrase] == ["book_a"]
+    assert "SQL injection attacks" in phrase[0]["text"]
+
+    prefix = index.search_passages("encrypt*")
+    assert [r["book_id"] for r in prefix] == ["book_b"]
+
+
+def test_changed_and_removed_files_are_reindexed(tmp_path):
+    index = _index(tmp_path)
+    assert index.search_passages("kerberos") == []
+
+    path = _write_book(tmp_path, "book_b", "Kerberos tickets authenticate users.")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert [r["book_id"] for r in index.search_passages("kerberos")] == ["book_b"]
+    assert index.search_passages("encryption") == []
+
+    os.remove(path)
+    assert index.search_passages("kerberos") == []
+    assert index.stats()["books"] == 1
+
+
+def test_offsets_index_raw_text_with_cr_line_endings(tmp_path):
+    for book_id, eol in (("crlf", "\r\n"), ("cr", "\r")):
+        text = eol.join(["Preface line."] * 40 + ["Kerberos tickets authenticate users."])
+        (tmp_path / f"{book_id}_content.txt").write_bytes(text.encode("utf-8"))
+    index = KnowledgeSearchIndex(tmp_path, passage_chars=200, check_interval=0.0)
+
+    results = index.search_passages("kerberos")
+    assert {r["book_id"] for r in results} == {"crlf", "cr"}
+    for result in results:
+        raw = (tmp_path / f"{result['book_id']}_content.txt").read_bytes().decode("utf-8")
+        assert raw[result["offset"]:result["offset"] + result["length"]] == result["text"]
+
+
+def test_phrase_matches_tokens_ending_in_symbols(tmp_path):
+    _write_book(tmp_path, "cpp", "Templates in modern C++ are instantiated lazily.")
+    _write_book(tmp_path, "c", "Macros in modern C are expanded eagerly.")
+    index = KnowledgeSearchIndex(tmp_path, check_interval=0.0)
+
+    assert [r["book_id"] for r in index.search_passages('"modern c++"')] == ["cpp"]
+    assert [r["book_id"] for r in index.search_passages('"modern c"')] == ["c"]
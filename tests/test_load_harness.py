@@ -0,0 +1,141 @@
+import asyncio
+import random
+import socket
+import sys
+
+import pytest
+
+from benchmarks.benchmark_suite import BenchmarkSuite, _OfflineRequests, default_load_targets, offline_providers
+from benchmarks.load_harness import (
+    BenchmarkRegression,
+    LatencyHistogram,
+    compare_to_baseline,
+    mann_whitney_u,
+    run_open_loop,
+)
+
+
+def test_histogram_percentiles_within_three_significant_figures():
+    rng = random.Random(3)
+    values = sorted(int(rng.lognormvariate(8, 1.5)) + 1 for _ in range(20000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for percentile in (50, 90, 99, 99.9):
+        exact = values[int(len(values) * percentile / 100.0 + 0.5) - 1]
+        assert abs(histogram.percentile(percentile) - exact) <= exact * 0.001 + 1
+    assert histogram.percentile(100) == values[-1]
+
+    other = LatencyHistogram()
+    other.record(10 ** 7)
+    histogram.merge(other)
+    assert histogram.total_count == 20001 and histogram.max_value == 10 ** 7
+
+
+def test_mann_whitney_detects_slowdown_only():
+    rng = random.Random(11)
+    baseline = [rng.gauss(10.0, 1.0) for _ in range(300)]
+    same = [rng.gauss(10.0, 1.0) for _ in range(300)]
+    slower = [rng.gauss(11.0, 1.0) for _ in range(300)]
+
+    assert mann_whitney_u(slower, baseline) < 1e-6
+    assert mann_whitney_u(same, baseline) > 0.01
+    assert mann_whitney_u(baseline, slower) > 0.99  # faster is not a regression
+    assert mann_whitney_u([], baseline) == 1.0
+
+
+def test_open_loop_counts_queueing_behind_a_slow_target():
+    async def slow():
+        await asyncio.sleep(0.02)
+
+    # 100 req/s offered against a single 20 ms worker (50 req/s capacity)
+    result = asyncio.run(run_open_loop(slow, rate=100, duration=0.5, concurrency=1, arrivals="uniform"))
+
+    service = result.service_time.summary()
+    latency = result.latency.summary()
+    assert result.completed == result.sent == 50 and result.errors == 0
+    assert service["p99_ms"] < 60
+    # the last request waited for the whole backlog, not just its own 20 ms
+    assert latency["max_ms"] > 10 * service["p50_ms"]
+    assert result.throughput < 60
+
+
+def _entry(samples, error_rate=0.0):
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record_seconds(value)
+    return {"samples": samples, "latency": histogram.summary(), "error_rate": error_rate}
+
+
+def test_baseline_comparison_flags_slowdowns_and_error_spikes():
+    rng = random.Random(5)
+    base = _entry([rng.lognormvariate(-6, 0.3) for _ in range(500)])
+    same = _entry([rng.lognormvariate(-6, 0.3) for _ in range(500)])
+    slower = _entry([value * 1.5 for value in same["samples"]])
+    failing = _entry(same["samples"], error_rate=0.2)
+
+    report = {entry["target"]: entry for entry in compare_to_baseline(
+        {"same": same, "slower": slower, "failing": failing, "new": same},
+        {"same": base, "slower": base, "failing": base},
+    )}
+    assert not report["same"]["regressed"]
+    assert report["slower"]["regressed"] and report["slower"]["p_value"] < 1e-6
+    assert report["failing"]["regressed"] and report["failing"]["error_rate_change"] == 0.2
+    assert report["new"]["status"] == "no_baseline"
+
+
+def test_open_loop_records_latency_of_failed_requests():
+    async def fail():
+        await asyncio.sleep(0.005)
+        raise RuntimeError("boom")
+
+    result = asyncio.run(run_open_loop(fail, rate=100, duration=0.2, concurrency=4, arrivals="uniform"))
+    assert result.completed == 0 and result.errors == result.sent == 20
+    assert result.error_rate == 1.0
+    assert result.latency.total_count == 20 and len(result.samples) == 20
+    assert result.latency.percentile(50) >= 5000
+
+
+def test_load_benchmark_raises_on_regression(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = random.Random(9)
+    scale = {"value": 0.002}
+
+    async def target():
+        # service time drawn from a fixed distribution; `scale` shifts it
+        await asyncio.sleep(scale["value"] * rng.uniform(0.8, 1.2))
+
+    suite = BenchmarkSuite(None)
+    baseline_path = suite.data_dir / "load_baseline.json"
+    first = asyncio.run(suite.run_load_benchmark(
+        targets={"target": target}, rates=(100, 200), duration=0.5, concurrency=8, warmup=1
+    ))
+    assert baseline_path.exists() and first.details["regressions"] == []
+    assert len(first.details["targets"]["target"]["curve"]) == 2
+
+    scale["value"] = 0.010
+    with pytest.raises(BenchmarkRegression):
+        asyncio.run(suite.run_load_benchmark(
+            targets={"target": target}, rates=(100,), duration=0.5, concurrency=8, warmup=1
+        ))
+    assert suite.results[-1].details["regressions"] == ["target"]
+
+
+def test_default_targets_run_offline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    connects = []
+    monkeypatch.setattr(socket.socket, "connect", lambda self, address: connects.append(address))
+    monkeypatch.setattr(socket, "create_connection", lambda address, *args, **kwargs: connects.append(address))
+
+    with offline_providers():
+        assert isinstance(sys.modules["core.qa_engine"].requests, _OfflineRequests)
+        targets = default_load_targets()
+    assert set(targets) == {"brain", "qa_engine", "risk"}
+
+    result = asyncio.run(BenchmarkSuite(None).run_load_benchmark(
+        rates=(20,), duration=0.2, concurrency=4, warmup=1, baseline_path=tmp_path / "baseline.json"
+    ))
+    for name, entry in result.details["targets"].items():
+        assert entry["curve"][0]["errors"] == 0, name
+    assert connects == []
@@ -0,0 +1,78 @@
+from core.autonomous_response_engine import Config, MemoryManager
+
+
+def _config(tmp_path, **overrides):
+    options = dict(data_dir=tmp_path, save_every_seconds=0, memory_segment_bytes=512,
+                   memory_compact_ratio=1000.0, convo_history_max=50)
+    options.update(overrides)
+    return Config(**options)
+
+
+def test_segments_rotate_and_reload_newest_window(tmp_path):
+    cfg = _config(tmp_path)
+    memory = MemoryManager(cfg)
+    for i in range(30):
+        memory.add_conversation(f"question {i}", f"answer {i}", "unit", 0.5)
+        memory.save(force=True)
+
+    segments = memory._segments(MemoryManager.CONVO_PREFIX)
+    assert len(segments) > 3
+    assert all(path.stat().st_size < 512 + 400 for path in segments)
+
+    reloaded = MemoryManager(_config(tmp_path, convo_history_max=10))
+    assert [c["query"] for c in reloaded.get_conversations()] == [f"question {i}" for i in range(20, 30)]
+    # only the newest segments were needed to fill the window
+    assert reloaded._convo_records < 30
+
+
+def test_partial_last_line_is_dropped_and_log_stays_appendable(tmp_path):
+    cfg = _config(tmp_path)
+    memory = MemoryManager(cfg)
+    memory.cache_knowledge("alpha", {"answer": "a"})
+    memory.save(force=True)
+    segment = memory._segments(MemoryManager.KNOWLEDGE_PREFIX)[-1]
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"key": "beta", "item": {"ans')  # interrupted append
+
+    recovered = MemoryManager(cfg)
+    assert recovered.get_knowledge("alpha") == {"answer": "a"}
+    assert recovered.get_knowledge("beta") is None
+    recovered.cache_knowledge("gamma", {"answer": "g"})
+    recovered.save(force=True)
+
+    again = MemoryManager(cfg)
+    assert again.get_knowledge("alpha") == {"answer": "a"}
+    assert again.get_knowledge("gamma") == {"answer": "g"}
+
+
+def test_knowledge_lookup_last_write_wins_with_embeddings(tmp_path):
+    cfg = _config(tmp_path)
+    memory = MemoryManager(cfg)
+    memory.cache_knowledge("k", {"answer": "old", "embedding": [0.5, 1.5]})
+    memory.save(force=True)
+    memory.cache_knowledge("k", {"answer": "new", "embedding": [2.0, -1.0, 0.25]})
+    assert memory.get_knowledge("k")["embedding"] == [2.0, -1.0, 0.25]  # before save
+    memory.save(force=True)
+
+    reloaded = MemoryManager(cfg)
+    item = reloaded.get_knowledge("k")
+    assert item["answer"] == "new" and item["embedding"] == [2.0, -1.0, 0.25]
+    assert reloaded.get_knowledge("missing") is None
+
+    reloaded.compact()
+    assert MemoryManager(cfg).get_knowledge("k")["embedding"] == [2.0, -1.0, 0.25]
+
+
+def test_clear_wipes_memory_on_disk(tmp_path):
+    cfg = _config(tmp_path)
+    memory = MemoryManager(cfg)
+    memory.add_conversation("q", "a", "unit", 0.9)
+    memory.cache_knowledge("k", {"answer": "a", "embedding": [1.0]})
+    memory.add_pattern("greeting", "hello")
+    memory.save(force=True)
+
+    memory.clear()
+    assert memory.stats()["conversations"] == 0 and memory.get_knowledge("k") is None
+
+    reloaded = MemoryManager(cfg)
+    assert reloaded.stats() == {"conversations": 0, "knowledge_cache": 0, "patterns": 0, "source_stats": {}}
@@ -1,6 +1,11 @@
 import asyncio
+import threading
+import time
 
-from telemetry.queue import consume_events, enqueue_event
+import pytest
+
+import telemetry.queue as telemetry_queue
+from telemetry.queue import InMemoryQueue, TelemetryProducer, _QueueSettings, consume_events, enqueue_event
 
 
 def test_in_memory_queue_consumption():
@@ -21,3 +26,170 @@ def test_in_memory_queue_consumption():
     asyncio.run(main())
     assert captured and captured[0]["session_id"] == "q1"
 
+
+
+class FakeKafkaProducer:
+    """Stands in for AIOKafkaProducer: acks each linger window as one batch."""
+
+    instances = []
+
+    def __init__(self, **options):
+        self.options = options
+        self.batch = []
+        self.batches = 0
+        self.max_outstanding = 0
+        self.outstanding = 0
+        self.started = self.stopped = False
+        FakeKafkaProducer.instances.append(self)
+
+    async def start(self):
+        self.started = True
+
+    async def send(self, topic, value):
+        future = asyncio.get_running_loop().create_future()
+        if not self.batch:
+            asyncio.get_running_loop().call_later(self.options["linger_ms"] / 1000.0, self._ack)
+        self.batch.append(future)
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        return future
+
+    def _ack(self):
+        batch, self.batch = self.batch, []
+        if batch:
+            self.batches += 1
+        for future in batch:
+            self.outstanding -= 1
+            if not future.done():
+                future.set_result(None)
+
+    async def flush(self):
+        self._ack()
+
+    async def stop(self):
+        self.stopped = True
+
+
+async def _measure(publish, count=2000):
+    """Publish `count` events; returns (events/sec, p99 publish latency in ms)."""
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        began = time.perf_counter()
+        await publish({"session_id": f"s{i}", "seq": i})
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return count / elapsed, latencies[int(len(latencies) * 0.99) - 1] * 1000.0
+
+
+def _in_memory_backend():
+    queue = InMemoryQueue(maxsize=10000)
+    received = []
+
+    async def run(count):
+        stop = asyncio.Event()
+
+        async def consume():
+            while len(received) < count:
+                event = await queue.get(stop)
+                if event is None:
+                    break
+                received.append(event["seq"])
+
+        consumer = asyncio.create_task(consume())
+
+        async def publish(event):
+            queue.put_nowait(event)
+
+        stats = await _measure(publish, count)
+        await asyncio.wait_for(consumer, timeout=2.0)
+        return stats, received
+
+    return run
+
+
+def _kafka_backend():
+    settings = _QueueSettings(brokers="localhost:9092", linger_ms=2, max_in_flight=256)
+    producer = TelemetryProducer(settings, producer_factory=FakeKafkaProducer)
+    FakeKafkaProducer.instances.clear()
+
+    async def run(count):
+        stats = await _measure(producer.publish, count)
+        await producer.close()
+        (fake,) = FakeKafkaProducer.instances
+        assert fake.max_outstanding <= 256 and fake.stopped and fake.batches > 1
+        assert fake.options["linger_ms"] == 2 and fake.options["max_batch_size"] == 16384
+        return stats, list(range(producer.sent))
+
+    return run
+
+
+@pytest.mark.parametrize("backend", [_in_memory_backend, _kafka_backend], ids=["memory", "kafka"])
+def test_backends_throughput_and_p99_latency(backend):
+    count = 2000
+    (events_per_sec, p99_ms), delivered = asyncio.run(backend()(count))
+    assert delivered == list(range(count))
+    assert events_per_sec > 1000
+    assert p99_ms < 50
+
+
+def test_in_memory_queue_cross_thread_and_rebinding():
+    queue = InMemoryQueue(maxsize=3)
+    for i in range(5):
+        queue.put_nowait({"seq": i})
+    assert queue.dropped == 2 and queue.qsize() == 3
+
+    async def drain(expected):
+        seen = []
+        while len(seen) < expected:
+            seen.append((await asyncio.wait_for(queue.get(), timeout=1.0))["seq"])
+        return seen
+
+    assert asyncio.run(drain(3)) == [2, 3, 4]
+
+    async def from_thread():
+        queue.bind()
+        thread = threading.Thread(target=lambda: [queue.put_nowait({"seq": i}) for i in range(3)])
+        thread.start()
+        seen = await drain(3)
+        thread.join()
+        stop = asyncio.Event()
+        stop.set()
+        assert await queue.get(stop) is None
+        return seen
+
+    # a second event loop picks the queue up again
+    assert asyncio.run(from_thread()) == [0, 1, 2]
+
+
+def test_publish_event_async_reuses_one_producer(monkeypatch):
+    monkeypatch.setenv("TRAINING_QUEUE_BROKERS", "localhost:9092")
+    monkeypatch.setattr(telemetry_queue, "AIOKafkaProducer", FakeKafkaProducer)
+    FakeKafkaProducer.instances.clear()
+
+    async def main():
+        for i in range(50):
+            await telemetry_queue.publish_event_async({"seq": i})
+        await telemetry_queue.flush_producer()
+        producer = telemetry_queue.get_producer()
+        assert producer.sent == 50 and producer.in_flight == 0
+        await telemetry_queue.close_producer()
+
+    asyncio.run(main())
+    assert len(FakeKafkaProducer.instances) == 1 and FakeKafkaProducer.instances[0].stopped
+
+
+def test_producer_from_a_previous_loop_is_stopped(monkeypatch):
+    monkeypatch.setenv("TRAINING_QUEUE_BROKERS", "localhost:9092")
+    monkeypatch.setattr(telemetry_queue, "AIOKafkaProducer", FakeKafkaProducer)
+    FakeKafkaProducer.instances.clear()
+    producer = telemetry_queue.TelemetryProducer(telemetry_queue._QueueSettings.from_env())
+
+    asyncio.run(producer.start())
+    asyncio.run(producer.start())  # a new loop replaces the producer
+    first, second = FakeKafkaProducer.instances
+    assert first.stopped and not second.stopped
+
+    asyncio.run(producer.close())
+    assert second.stopped
@@ -25,3 +25,98 @@ def test_cache_eviction_policy():
     asyncio.run(scenario())
 
 
+
+
+def test_frequent_keys_survive_a_scan():
+    cache = EnterpriseCache(max_size=200, default_ttl=0)
+    hot = [f"hot-{i}" for i in range(50)]
+    for _ in range(5):
+        for key in hot:
+            cache.set_sync(key, key)
+            cache.get_sync(key)
+    # one pass over many one-off keys must not flush the working set
+    for i in range(2000):
+        cache.set_sync(f"scan-{i}", i)
+
+    survivors = sum(cache.get_sync(key) == key for key in hot)
+    assert survivors >= 48
+    stats = cache.get_stats()
+    assert stats["size"] <= 200 and stats["rejections"] > 0
+
+
+def test_byte_budget_bounds_memory():
+    cache = EnterpriseCache(max_size=10_000, default_ttl=0, max_bytes=64_000, num_shards=4)
+    for i in range(500):
+        cache.set_sync(f"blob-{i}", "x" * 1000)
+    stats = cache.get_stats()
+    assert 0 < stats["bytes"] <= 64_000
+    assert stats["size"] < 64
+    # a value bigger than a shard's budget is refused outright
+    assert cache.set_sync("huge", "x" * 20_000) is False and "huge" not in cache
+
+
+def test_per_shard_stats_and_contains_is_not_an_access():
+    cache = EnterpriseCache(max_size=640, num_shards=8)  # roomy: no shard overflows whatever the hash seed
+    for i in range(32):
+        cache.set_sync(f"k{i}", i)
+    assert "k1" in cache and "missing" not in cache
+    for i in range(48):
+        cache.get_sync(f"k{i}")
+
+    stats = cache.get_stats()
+    assert len(stats["shards"]) == 8
+    assert sum(s["hits"] for s in stats["shards"]) == stats["hits"] == 32
+    assert stats["misses"] == 16 and stats["hit_ratio"] == 32 / 48
+    assert all(0.0 <= s["hit_ratio"] <= 1.0 for s in stats["shards"])
+
+
+def test_mixed_thread_and_coroutine_contention():
+    import random
+    import threading
+
+    cache = EnterpriseCache(max_size=500, default_ttl=0, max_bytes=200_000)
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(3000):
+                key = f"k{int(rng.paretovariate(1.2)) % 2000}"
+                if cache.get_sync(key) is None:
+                    cache.set_sync(key, {"key": key, "pad": "x" * rng.randint(10, 200)})
+                elif rng.random() < 0.05:
+                    cache.delete(key)
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    async def coroutine_load(seed):
+        rng = random.Random(seed)
+        for i in range(3000):
+            key = f"k{int(rng.paretovariate(1.2)) % 2000}"
+            value = await cache.get(key)
+            if value is None:
+                await cache.set(key, {"key": key, "pad": "y" * 50})
+            else:
+                assert value["key"] == key
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+
+    async def scenario():
+        await asyncio.gather(*(coroutine_load(seed) for seed in range(4)))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(100, 104)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(scenario())
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    stats = cache.get_stats()
+    assert stats["size"] == len(cache) <= 500
+    assert stats["bytes"] <= 200_000
+    assert stats["hits"] + stats["misses"] == 8 * 3000
+    assert stats["hit_ratio"] > 0.3
+    for shard in cache._shards:
+        assert shard.bytes == sum(entry.size for entry in shard.data.values())
+        assert len(shard.window) + len(shard.probation) + len(shard.protected) == len(shard.data)
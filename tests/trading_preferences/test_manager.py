@@ -1,4 +1,5 @@
 import asyncio
+import json
 from datetime import timedelta
 
 import pytest
@@ -42,6 +43,7 @@ def test_manager_updates_preferences_with_audit():
         )
 
         assert prefs.trading_style.value == "day_trading"
+        await manager.flush()
         stored = await session_manager.get_session("session-1")
         assert stored["trading_preferences"]["trading_style"] == "day_trading"
 
@@ -69,7 +71,7 @@ def test_manager_rate_limiting():
                 actor="tester",
             )
 
-        manager._rate_limit["user-1:write"]["window_start"] -= timedelta(minutes=2)
+        manager._rate_limiter.buckets["user-1:write"].updated -= timedelta(minutes=2).total_seconds()
         prefs = await manager.update_preferences(
             user_id="user-1",
             session_id="session-1",
@@ -81,3 +83,229 @@ def test_manager_rate_limiting():
 
     asyncio.run(scenario())
 
+
+
+class CountingSessionManager(FakeSessionManager):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = []
+
+    async def update_session(self, session_id: str, data):
+        self.writes.append(sorted(data))
+        await super().update_session(session_id, data)
+
+
+class FakeAsyncRedis:
+    def __init__(self) -> None:
+        self.values = {}
+        self.lists = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def rpush(self, key, *items):
+        self.lists.setdefault(key, []).extend(items)
+        return len(self.lists[key])
+
+    async def ltrim(self, key, start, end):
+        items = self.lists.get(key, [])
+        self.lists[key] = items[start:] if end == -1 else items[start : end + 1]
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    async def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return items[start:] if end == -1 else items[start : end + 1]
+
+
+def test_updates_are_coalesced_into_one_write_behind_flush():
+    session_manager = CountingSessionManager()
+    manager = TradingPreferencesManagerEnterprise(session_manager=session_manager, flush_interval=0.02)
+
+    async def scenario():
+        for style in ["day_trading", "scalping", "position_trading", "swing_trading", "day_trading"]:
+            await manager.update_preferences("user-1", "session-1", {"trading_style": style}, "unit_test", "tester")
+        assert session_manager.writes == []
+        await asyncio.sleep(0.05)
+
+        stored = session_manager.sessions["session-1"]
+        snapshot = stored["trading_preferences"]
+        assert snapshot["revision"] == 5 and snapshot["trading_style"] == "day_trading"
+        assert "audit_trail" not in snapshot
+        assert [delta["revision"] for delta in stored["trading_preferences_log"]] == [1, 2, 3, 4, 5]
+        # one snapshot write and one log append for five updates
+        assert session_manager.writes == [["trading_preferences_log"], ["trading_preferences"]]
+
+        trail = await manager.get_audit_trail("session-1", "user-1")
+        assert [d.changes["trading_style"] for d in trail][-2:] == ["swing_trading", "day_trading"]
+
+    asyncio.run(scenario())
+
+
+def test_write_behind_survives_per_query_event_loops():
+    session_manager = FakeSessionManager()
+    manager = TradingPreferencesManagerEnterprise(session_manager=session_manager, flush_interval=0.01)
+
+    # like fame_simple: a fresh loop per query, closed with the flush still pending
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(
+        manager.update_preferences("user-1", "session-1", {"trading_style": "scalping"}, "t", "a")
+    )
+    loop.close()
+
+    async def next_query():
+        await manager.update_preferences("user-1", "session-1", {"max_open_positions": 4}, "t", "a")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(next_query())
+    snapshot = session_manager.sessions["session-1"]["trading_preferences"]
+    assert snapshot["revision"] == 2 and snapshot["trading_style"] == "scalping"
+    assert snapshot["max_open_positions"] == 4
+    assert len(manager._pending) == 0
+
+
+def test_failed_flush_is_retried_and_in_flight_writes_stay_visible():
+    session_manager = FakeSessionManager()
+    manager = TradingPreferencesManagerEnterprise(session_manager=session_manager, flush_interval=0.01)
+    original_persist = manager._persist_preferences
+    release = asyncio.Event()
+    calls = []
+
+    async def persist(preferences, user_id):
+        calls.append(preferences.revision)
+        if len(calls) == 1:
+            raise RuntimeError("storage down")
+        if len(calls) == 2:
+            await release.wait()
+        await original_persist(preferences, user_id)
+
+    manager._persist_preferences = persist
+
+    async def scenario():
+        await manager.update_preferences("user-1", "session-1", {"trading_style": "scalping"}, "t", "a")
+        await asyncio.sleep(0.05)  # first flush fails, the retry blocks in persist
+        assert calls == [1, 1]
+
+        # storage still has nothing, yet the in-flight revision is what updates build on
+        manager.cache.clear()
+        updated = await manager.update_preferences("user-1", "session-1", {"max_open_positions": 3}, "t", "a")
+        assert updated.revision == 2 and updated.trading_style.value == "scalping"
+
+        release.set()
+        await asyncio.sleep(0.1)
+        snapshot = session_manager.sessions["session-1"]["trading_preferences"]
+        assert snapshot["revision"] == 2 and snapshot["max_open_positions"] == 3
+        log = session_manager.sessions["session-1"]["trading_preferences_log"]
+        assert [delta["revision"] for delta in log] == [1, 2]
+        assert len(manager._pending) == 0
+
+    asyncio.run(scenario())
+
+
+def test_optimistic_concurrency_on_revisions():
+    from services.trading_preferences_store import VersionConflict
+
+    manager = TradingPreferencesManagerEnterprise(session_manager=FakeSessionManager())
+    original_rules = manager._validate_business_rules
+
+    async def slow_rules(preferences):
+        await asyncio.sleep(0.01)
+        await original_rules(preferences)
+
+    manager._validate_business_rules = slow_rules
+
+    async def scenario():
+        first = await manager.update_preferences("user-1", "session-1", {"watchlist": ["AAPL"]}, "t", "a")
+        assert first.revision == 1
+
+        with pytest.raises(VersionConflict):
+            await manager.update_preferences(
+                "user-1", "session-1", {"watchlist": ["MSFT"]}, "t", "a", expected_revision=0
+            )
+
+        # two racing writers: the loser re-applies its change on the winner's revision
+        left, right = await asyncio.gather(
+            manager.update_preferences("user-1", "session-1", {"max_open_positions": 5}, "t", "a"),
+            manager.update_preferences("user-1", "session-1", {"preferred_currency": "EUR"}, "t", "b"),
+        )
+        assert sorted([left.revision, right.revision]) == [2, 3]
+        current = await manager.get_preferences("session-1", "user-1")
+        assert current.revision == 3
+        assert current.max_open_positions == 5 and current.preferred_currency == "EUR"
+        assert current.watchlist == ["AAPL"]
+        await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_redis_snapshot_and_delta_log_round_trip():
+    redis = FakeAsyncRedis()
+
+    async def scenario():
+        manager = TradingPreferencesManagerEnterprise(redis_client=redis)
+        await manager.update_preferences("user-9", "s", {"banned_symbols": ["GME"]}, "compliance", "ops")
+        await manager.update_preferences("user-9", "s", {"risk_tolerance": "conservative"}, "review", "ops")
+        await manager.close()
+
+        assert redis.values["trading_preferences:user-9"]["revision"] == 2
+        assert len(redis.lists["trading_preferences:user-9:deltas"]) == 2
+
+        fresh = TradingPreferencesManagerEnterprise(redis_client=redis)
+        prefs = await fresh.get_preferences("s", "user-9")
+        assert prefs.banned_symbols == ["GME"] and prefs.revision == 2
+        assert prefs.last_risk_tolerance_change is not None
+        trail = await fresh.get_audit_trail("s", "user-9")
+        assert [(d.revision, d.actor, d.reason) for d in trail] == [(1, "ops", "compliance"), (2, "ops", "review")]
+        assert trail[1].changes == {"risk_tolerance": "conservative"}
+
+    asyncio.run(scenario())
+
+
+def test_rate_limit_state_is_bounded():
+    from services.trading_preferences_store import RateLimiter
+
+    now = [0.0]
+    limiter = RateLimiter(max_keys=3, period=60.0, clock=lambda: now[0])
+    assert all(limiter.allow(f"user-{i}:read", 2) for i in range(100))
+    assert len(limiter) == 3
+
+    assert limiter.allow("hot:write", 2) and limiter.allow("hot:write", 2)
+    assert not limiter.allow("hot:write", 2)
+    now[0] += 30.0  # half the period refills half the bucket
+    assert limiter.allow("hot:write", 2) and not limiter.allow("hot:write", 2)
+
+
+def test_redis_delta_log_is_capped_and_expires_with_the_snapshot():
+    redis = FakeAsyncRedis()
+
+    async def scenario():
+        manager = TradingPreferencesManagerEnterprise(redis_client=redis, max_audit_entries=2)
+        for style in ["day_trading", "scalping", "position_trading"]:
+            await manager.update_preferences("user-3", "s", {"trading_style": style}, "unit_test", "tester")
+            await manager.flush()
+        await manager.close()
+
+    asyncio.run(scenario())
+    log_key = "trading_preferences:user-3:deltas"
+    assert [json.loads(item)["revision"] for item in redis.lists[log_key]] == [2, 3]
+    assert redis.ttls[log_key] == redis.ttls["trading_preferences:user-3"] == 86400
+
+
+def test_rate_limiter_evicts_refilled_buckets_before_draining_ones():
+    from services.trading_preferences_store import RateLimiter
+
+    now = [0.0]
+    limiter = RateLimiter(max_keys=2, period=60.0, clock=lambda: now[0])
+    assert limiter.allow("slow", 1) and not limiter.allow("slow", 1)  # drained, refills over 60s
+    assert limiter.allow("fast", 600)
+    now[0] = 1.0  # "fast" has refilled, "slow" has not
+
+    assert limiter.allow("new", 1)
+    assert set(limiter.buckets) == {"slow", "new"}
+    assert not limiter.allow("slow", 1)
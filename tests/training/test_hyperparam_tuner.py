@@ -1,4 +1,13 @@
-from training.hyperparam import HyperparameterConfig, HyperparameterTuner
+import pytest
+
+from training.hyperparam import (
+    HyperbandConfig,
+    HyperbandTuner,
+    HyperparameterConfig,
+    HyperparameterTuner,
+    TrialContext,
+    TrialStore,
+)
 
 
 def objective(params):
@@ -24,3 +33,124 @@ def test_hyperparameter_tuner_finds_good_params():
         for res in results
     )
 
+
+
+SPACE = {"lr": [0.001, 0.003, 0.01, 0.03, 0.1, 0.3], "depth": [2, 4, 6, 8]}
+
+
+def budgeted_objective(params, trial):
+    # quality is known up front; more budget narrows the gap to it
+    quality = -abs(params["lr"] - 0.03) * 10 - abs(params["depth"] - 6) * 0.1
+    score = quality - 1.0 / trial.budget
+    trial.report(trial.budget, score)
+    return score
+
+
+def _hyperband(tmp_path=None, **overrides):
+    options = dict(search_space=SPACE, min_budget=1, max_budget=27, eta=3, seed=7)
+    if tmp_path is not None:
+        options["storage_path"] = tmp_path / "trials.json"
+    options.update(overrides)
+    return HyperbandConfig(**options)
+
+
+def test_hyperband_prunes_weak_configs_early(tmp_path):
+    calls = []
+
+    def objective(params, trial):
+        calls.append(trial.budget)
+        return budgeted_objective(params, trial)
+
+    tuner = HyperbandTuner(_hyperband(tmp_path), objective)
+    assert [(count, budget) for _, count, budget in tuner.brackets()] == [(27, 1), (12, 3), (6, 9), (4, 27)]
+
+    results = tuner.run()
+    best = tuner.best()
+    assert results[0] is best and best.budget == 27
+    sampled = [r.params for r in results]
+    quality = lambda p: budgeted_objective(p, TrialContext("q", budget=float("inf"), seed=0))
+    assert quality(best.params) == max(quality(p) for p in sampled)
+    # 49 configurations, but only 1 + 1 + 2 + 4 of them ever see the full budget
+    assert calls.count(27) == 8
+    assert sum(calls) < 49 * 27 / 3
+
+    trials = TrialStore(tmp_path / "trials.json").trials()
+    assert sum(t["status"] == "pruned" for t in trials.values()) == 41
+    assert trials["b0-t0"]["reports"]["1"] == [[1.0, trials["b0-t0"]["results"]["1"]]]
+
+
+def test_hyperband_is_deterministic_with_seed():
+    first = [(r.trial_id, r.params, r.score) for r in HyperbandTuner(_hyperband(), budgeted_objective).run()]
+    second = [(r.trial_id, r.params, r.score) for r in HyperbandTuner(_hyperband(), budgeted_objective).run()]
+    assert first == second
+
+
+def test_killed_search_resumes_from_store(tmp_path):
+    reference_calls = []
+
+    def counting(params, trial):
+        reference_calls.append(trial.trial_id)
+        return budgeted_objective(params, trial)
+
+    HyperbandTuner(_hyperband(), counting).run()
+
+    calls = []
+
+    def dying(params, trial):
+        if len(calls) == 40:
+            raise KeyboardInterrupt
+        calls.append(trial.trial_id)
+        return budgeted_objective(params, trial)
+
+    with pytest.raises(KeyboardInterrupt):
+        HyperbandTuner(_hyperband(tmp_path, seed=None), dying).run()
+    assert len(calls) == 40
+
+    resumed_calls = []
+
+    def resumed(params, trial):
+        resumed_calls.append(trial.trial_id)
+        return budgeted_objective(params, trial)
+
+    # no seed given: the stored one is reused
+    store_seed = TrialStore(tmp_path / "trials.json").data["seed"]
+    results = HyperbandTuner(_hyperband(tmp_path, seed=None), resumed).run()
+    assert len(calls) + len(resumed_calls) == len(reference_calls)
+    assert not set(calls[:27]) & set(resumed_calls[:27])  # first rung of bracket 0 is not rerun
+    assert results[0].budget == 27
+    assert TrialStore(tmp_path / "trials.json").data["seed"] == store_seed
+
+    with pytest.raises(ValueError):
+        HyperbandTuner(_hyperband(tmp_path, eta=2), resumed).run()
+
+
+def test_hyperband_process_pool_matches_serial():
+    serial = HyperbandTuner(_hyperband(max_brackets=2), budgeted_objective).run()
+    parallel = HyperbandTuner(_hyperband(max_brackets=2, max_workers=2), budgeted_objective).run()
+    assert [(r.trial_id, r.score) for r in serial] == [(r.trial_id, r.score) for r in parallel]
+
+
+def test_resumed_search_restores_warm_start_checkpoints(tmp_path):
+    starts = {f"b{bracket}": budget for bracket, (_, _, budget) in enumerate(HyperbandTuner(_hyperband(), budgeted_objective).brackets())}
+    received = []
+
+    def warm(params, trial):
+        received.append((trial.trial_id, trial.budget, trial.checkpoint))
+        if len(received) == 31:
+            raise KeyboardInterrupt
+        trial.save({"trained_to": trial.budget})
+        return budgeted_objective(params, trial)
+
+    # dies inside bracket 0's second rung, after its survivors saved checkpoints at budget 1
+    with pytest.raises(KeyboardInterrupt):
+        HyperbandTuner(_hyperband(tmp_path), warm).run()
+    killed = len(received)
+    HyperbandTuner(_hyperband(tmp_path), warm).run()
+
+    resumed = received[killed:]
+    assert resumed[0][1] == 3 and resumed[0][2] == {"trained_to": 1.0}
+    for trial_id, budget, checkpoint in resumed:
+        first_rung = budget == starts[trial_id.split("-")[0]]
+        assert checkpoint == (None if first_rung else {"trained_to": budget / 3})
+    # finished and pruned trials leave no checkpoints behind
+    assert not list((tmp_path / "trials.json.checkpoints").iterdir())
@@ -4,7 +4,7 @@ from .context import TrainingContext
 from .promotion import PromotionManager, promote_policy, rollback_policy, list_policies, show_active_policy
 from .monitoring import TrainingPerformanceTracker, PerformanceSnapshot
 from .replay import ExperienceBuffer, ExperienceRecord
-from .hyperparam import HyperparameterConfig, HyperparameterTuner, TuningResult
+from .hyperparam import HyperbandConfig, HyperbandTuner, HyperparameterConfig, HyperparameterTuner, TuningResult
 
 __all__ = [
     "TrainingContext",
@@ -1,6 +1,22 @@
 """Hyperparameter tuning utilities."""
 
-from .tuner import HyperparameterConfig, HyperparameterTuner, TuningResult
+from .tuner import (
+    HyperbandConfig,
+    HyperbandTuner,
+    HyperparameterConfig,
+    HyperparameterTuner,
+    TrialContext,
+    TrialStore,
+    TuningResult,
+)
 
-__all__ = ["HyperparameterConfig", "HyperparameterTuner", "TuningResult"]
+__all__ = [
+    "HyperbandConfig",
+    "HyperbandTuner",
+    "HyperparameterConfig",
+    "HyperparameterTuner",
+    "TrialContext",
+    "TrialStore",
+    "TuningResult",
+]
 
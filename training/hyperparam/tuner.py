@@ -1,14 +1,21 @@
 """
-Hyperparameter tuning utilities with simple Bayesian-inspired random search and bandit updates.
+Hyperparameter tuning utilities with simple Bayesian-inspired random search and bandit updates,
+plus a parallel Hyperband tuner that prunes weak configurations early.
 """
 
 from __future__ import annotations
 
 import itertools
+import json
 import logging
 import math
+import os
+import pickle
 import random
-from dataclasses import dataclass
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
@@ -30,6 +37,8 @@ class TuningResult:
     params: Dict[str, Any]
     score: float
     trial_index: int
+    budget: Optional[float] = None
+    trial_id: Optional[str] = None
 
 
 class HyperparameterTuner:
@@ -123,3 +132,358 @@ class HyperparameterTuner:
             score = float("-inf")
         return score
 
+
+
+# ---------------------------------------------------------------------- #
+# Hyperband
+# ---------------------------------------------------------------------- #
+
+
+@dataclass(slots=True)
+class HyperbandConfig:
+    search_space: Dict[str, Sequence[Any]]
+    min_budget: float = 1.0
+    max_budget: float = 27.0
+    eta: int = 3
+    max_brackets: Optional[int] = None  # 1 = plain successive halving
+    max_workers: int = 1  # > 1 runs trials in a process pool
+    seed: Optional[int] = None
+    storage_path: Optional[Path] = None
+
+
+@dataclass(slots=True)
+class TrialContext:
+    """
+    Passed to a budgeted objective with the budget to train for (epochs,
+    steps, samples...). `report` records intermediate results; `save`
+    stores warm-start state that the same trial receives as `checkpoint`
+    at its next, larger budget.
+    """
+
+    trial_id: str
+    budget: float
+    seed: int
+    checkpoint: Any = None
+    reports: List[Tuple[float, float]] = field(default_factory=list)
+
+    def report(self, step: float, value: float) -> None:
+        self.reports.append((float(step), float(value)))
+
+    def save(self, state: Any) -> None:
+        self.checkpoint = state
+
+
+BudgetedObjectiveFn = Callable[[Dict[str, Any], TrialContext], float]
+
+
+def _execute_trial(
+    objective: BudgetedObjectiveFn,
+    params: Dict[str, Any],
+    context: TrialContext,
+) -> Tuple[float, List[Tuple[float, float]], Any, Optional[str]]:
+    """Run one trial at one budget; module level so it can run in a worker process."""
+    try:
+        score = float(objective(params, context))
+    except Exception as exc:
+        return float("-inf"), context.reports, None, f"{type(exc).__name__}: {exc}"
+    if math.isnan(score):
+        score = float("-inf")
+    return score, context.reports, context.checkpoint, None
+
+
+def _budget_key(budget: float) -> str:
+    return f"{budget:g}"
+
+
+class TrialStore:
+    """
+    JSON record of every trial's results per budget, rewritten atomically
+    after each result so that a killed search can resume where it stopped.
+    Warm-start checkpoints are pickled next to it (``<path>.checkpoints/``)
+    and referenced from their trial, so a resumed search continues each
+    surviving trial from its last saved state. Without a path it only keeps
+    results and checkpoints in memory.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else None
+        self.data: Dict[str, Any] = {"search": None, "seed": None, "trials": {}}
+        self._checkpoints: Dict[str, Any] = {}
+        if self.path and self.path.exists():
+            with self.path.open("r", encoding="utf-8") as handle:
+                self.data = json.load(handle)
+
+    @property
+    def checkpoint_dir(self) -> Optional[Path]:
+        return self.path.with_name(self.path.name + ".checkpoints") if self.path else None
+
+    def bind(self, fingerprint: str, seed: int) -> int:
+        """Attach the store to a search definition; returns the seed to use (the stored one on resume)."""
+        if self.data["search"] is None:
+            self.data["search"] = fingerprint
+            self.data["seed"] = seed
+            self.save()
+        elif self.data["search"] != fingerprint:
+            raise ValueError(f"Trial store {self.path} belongs to a different search definition")
+        return int(self.data["seed"])
+
+    def result(self, trial_id: str, budget: float) -> Optional[float]:
+        trial = self.data["trials"].get(trial_id)
+        if trial is None:
+            return None
+        return trial["results"].get(_budget_key(budget))
+
+    def record(
+        self,
+        trial_id: str,
+        params: Dict[str, Any],
+        bracket: int,
+        budget: float,
+        score: float,
+        reports: List[Tuple[float, float]],
+        error: Optional[str] = None,
+        checkpoint: Any = None,
+    ) -> None:
+        """Record a result and the checkpoint the trial left at this budget (replacing the previous one)."""
+        trial = self.data["trials"].setdefault(
+            trial_id,
+            {"params": params, "bracket": bracket, "results": {}, "reports": {}, "status": "running"},
+        )
+        trial["results"][_budget_key(budget)] = score
+        trial["reports"][_budget_key(budget)] = [list(report) for report in reports]
+        if error:
+            trial["status"] = "failed"
+            trial["error"] = error
+        previous = trial.get("checkpoint")
+        trial["checkpoint"] = self._write_checkpoint(trial_id, budget, checkpoint)
+        self.save()
+        # the new checkpoint is referenced before the old file goes away
+        if previous and previous != trial["checkpoint"]:
+            self._remove_checkpoint_file(previous)
+
+    def checkpoint(self, trial_id: str) -> Any:
+        """Warm-start state saved by the trial at its last budget, or None."""
+        if self.path is None:
+            return self._checkpoints.get(trial_id)
+        reference = self.data["trials"].get(trial_id, {}).get("checkpoint")
+        if not reference:
+            return None
+        try:
+            with (self.checkpoint_dir / reference).open("rb") as handle:
+                return pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError) as exc:
+            logger.warning("Checkpoint %s for trial %s unreadable, starting cold: %s", reference, trial_id, exc)
+            return None
+
+    def drop_checkpoint(self, trial_id: str) -> None:
+        """Forget a trial's checkpoint once it will not be trained further."""
+        self._checkpoints.pop(trial_id, None)
+        trial = self.data["trials"].get(trial_id)
+        if trial is None or not trial.get("checkpoint"):
+            return
+        reference = trial.pop("checkpoint")
+        self.save()
+        self._remove_checkpoint_file(reference)
+
+    def _write_checkpoint(self, trial_id: str, budget: float, checkpoint: Any) -> Optional[str]:
+        if self.path is None:
+            self._checkpoints[trial_id] = checkpoint
+            return None
+        if checkpoint is None:
+            return None
+        reference = f"{trial_id}@{_budget_key(budget)}.pkl"
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_dir / (reference + ".tmp")
+        with tmp_path.open("wb") as handle:
+            pickle.dump(checkpoint, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.checkpoint_dir / reference)
+        return reference
+
+    def _remove_checkpoint_file(self, reference: str) -> None:
+        try:
+            (self.checkpoint_dir / reference).unlink()
+        except FileNotFoundError:
+            pass
+
+    def mark(self, trial_id: str, status: str) -> None:
+        trial = self.data["trials"].get(trial_id)
+        if trial is not None and trial["status"] != status:
+            trial["status"] = status
+            self.save()
+
+    def trials(self) -> Dict[str, Dict[str, Any]]:
+        return self.data["trials"]
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.data, handle)
+        os.replace(tmp_path, self.path)
+
+
+class HyperbandTuner:
+    """
+    Hyperband search: several successive-halving brackets, each sampling
+    configurations, training them at a small budget and promoting the best
+    1/eta to an eta-times larger budget until `max_budget`. Trials of a rung
+    run concurrently in a process pool (`max_workers` > 1; the objective
+    must then be picklable). Results and warm-start checkpoints are persisted
+    per trial in a `TrialStore`, and configurations are drawn from a seeded
+    generator, so rerunning with the same store skips work already done and
+    promoted trials resume from their saved state. A fixed `seed` makes the
+    whole search deterministic.
+    """
+
+    def __init__(self, config: HyperbandConfig, objective: BudgetedObjectiveFn) -> None:
+        if not config.search_space:
+            raise ValueError("Hyperparameter search space must not be empty.")
+        if config.eta < 2:
+            raise ValueError("eta must be at least 2.")
+        if not 0 < config.min_budget <= config.max_budget:
+            raise ValueError("Budgets must satisfy 0 < min_budget <= max_budget.")
+        self.config = config
+        self.objective = objective
+        self.store = TrialStore(config.storage_path)
+        self._results: List[TuningResult] = []
+
+    def brackets(self) -> List[Tuple[int, int, float]]:
+        """(rungs - 1, configurations, starting budget) per bracket, most aggressive first."""
+        eta = self.config.eta
+        s_max = int(math.floor(math.log(self.config.max_budget / self.config.min_budget, eta) + 1e-9))
+        brackets = []
+        for s in range(s_max, -1, -1):
+            count = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            brackets.append((s, count, self.config.max_budget * eta ** -s))
+        if self.config.max_brackets:
+            brackets = brackets[: self.config.max_brackets]
+        return brackets
+
+    def run(self) -> List[TuningResult]:
+        seed = self.config.seed if self.config.seed is not None else random.SystemRandom().randrange(2 ** 32)
+        seed = self.store.bind(self._fingerprint(), seed)
+        rng = random.Random(seed)
+        logger.info(
+            "Starting Hyperband tuning",
+            extra={"brackets": len(self.brackets()), "max_workers": self.config.max_workers, "seed": seed},
+        )
+
+        executor: Optional[Executor] = None
+        if self.config.max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.config.max_workers)
+        try:
+            for bracket, (rungs, count, budget) in enumerate(self.brackets()):
+                trials = [(f"b{bracket}-t{index}", self._sample(rng)) for index in range(count)]
+                for rung in range(rungs + 1):
+                    scores = self._run_rung(trials, budget, bracket, seed, executor)
+                    if rung == rungs:
+                        break
+                    keep = max(1, len(trials) // self.config.eta)
+                    ranked = sorted(range(len(trials)), key=lambda i: (-scores[i], i))
+                    survivors = sorted(ranked[:keep])
+                    for index in set(range(len(trials))) - set(survivors):
+                        trial_id = trials[index][0]
+                        self.store.mark(trial_id, "pruned")
+                        self.store.drop_checkpoint(trial_id)
+                    trials = [trials[index] for index in survivors]
+                    budget = min(self.config.max_budget, budget * self.config.eta)
+                for trial_id, _ in trials:
+                    if self.store.trials()[trial_id]["status"] == "running":
+                        self.store.mark(trial_id, "complete")
+                    self.store.drop_checkpoint(trial_id)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self._results = self._collect_results()
+        logger.info(
+            "Hyperband tuning completed with best score %.4f",
+            self._results[0].score if self._results else float("nan"),
+        )
+        return list(self._results)
+
+    def best(self) -> Optional[TuningResult]:
+        return self._results[0] if self._results else None
+
+    # ------------------------------------------------------------------ #
+    def _run_rung(
+        self,
+        trials: List[Tuple[str, Dict[str, Any]]],
+        budget: float,
+        bracket: int,
+        seed: int,
+        executor: Optional[Executor],
+    ) -> List[float]:
+        scores: List[float] = [float("-inf")] * len(trials)
+        pending: List[Tuple[int, str, Dict[str, Any], TrialContext]] = []
+        for index, (trial_id, params) in enumerate(trials):
+            cached = self.store.result(trial_id, budget)
+            if cached is not None:
+                scores[index] = cached
+                continue
+            context = TrialContext(
+                trial_id=trial_id,
+                budget=budget,
+                seed=zlib.crc32(f"{seed}:{trial_id}".encode()),
+                checkpoint=self.store.checkpoint(trial_id),
+            )
+            pending.append((index, trial_id, params, context))
+
+        def finish(index: int, trial_id: str, params: Dict[str, Any], outcome: Tuple) -> None:
+            score, reports, checkpoint, error = outcome
+            scores[index] = score
+            self.store.record(trial_id, params, bracket, budget, score, reports, error, checkpoint)
+            if error:
+                logger.error("Trial %s failed at budget %g: %s", trial_id, budget, error)
+            logger.debug("Trial %s budget %g -> score %.4f", trial_id, budget, score)
+
+        if executor is None:
+            for index, trial_id, params, context in pending:
+                finish(index, trial_id, params, _execute_trial(self.objective, params, context))
+        else:
+            futures = {
+                executor.submit(_execute_trial, self.objective, params, context): (index, trial_id, params)
+                for index, trial_id, params, context in pending
+            }
+            for future in as_completed(futures):
+                finish(*futures[future], future.result())
+        return scores
+
+    def _sample(self, rng: random.Random) -> Dict[str, Any]:
+        return {key: rng.choice(list(values)) for key, values in self.config.search_space.items()}
+
+    def _fingerprint(self) -> str:
+        return json.dumps(
+            {
+                "search_space": {key: [repr(value) for value in values] for key, values in self.config.search_space.items()},
+                "min_budget": self.config.min_budget,
+                "max_budget": self.config.max_budget,
+                "eta": self.config.eta,
+                "max_brackets": self.config.max_brackets,
+            },
+            sort_keys=True,
+        )
+
+    def _collect_results(self) -> List[TuningResult]:
+        results = []
+        trials = sorted(
+            self.store.trials().items(),
+            key=lambda item: (item[1]["bracket"], int(item[0].rsplit("-t", 1)[1])),
+        )
+        for trial_index, (trial_id, trial) in enumerate(trials):
+            if not trial["results"]:
+                continue
+            budget_key = max(trial["results"], key=float)
+            results.append(
+                TuningResult(
+                    params=trial["params"],
+                    score=trial["results"][budget_key],
+                    trial_index=trial_index,
+                    budget=float(budget_key),
+                    trial_id=trial_id,
+                )
+            )
+        results.sort(key=lambda r: (r.budget, r.score), reverse=True)
+        return results
@@ -7,7 +7,7 @@ import logging
 
 from training.context import TrainingContext
 from training.pipelines.run_online_update import OnlinePolicyTrainer
-from telemetry.queue import consume_events
+from telemetry.queue import close_producer, consume_events
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +29,7 @@ async def run_consumer(context: TrainingContext) -> None:
         await consume_events(handler, stop_event=stop_event)
     finally:
         stop_event.set()
+        await close_producer()
 
 
 def main() -> None: